@@ -1,10 +1,19 @@
 import asyncio
+import copy
 import logging
+import multiprocessing
+import os
+import pickle
+import tempfile
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Tuple
-from collections import defaultdict
+from typing import Dict, List, Any, Optional, Tuple, Union
+from types import MappingProxyType
 import numpy as np
 import pandas as pd
+from sklearn.base import clone
 from sklearn.ensemble import IsolationForest
 from sklearn.preprocessing import StandardScaler
 from sklearn.cluster import KMeans
@@ -13,9 +22,125 @@ import json
 
 from ..database import get_db_connection
 from backend.utils.logging_utils import log_execution
+from .incremental_clustering import (
+    ChannelClusterModel,
+    ClusterModelStore,
+    cluster_features,
+    cluster_model_store,
+    video_key,
+)
+from .video_frame import (
+    MONTH_NAMES,
+    WEEKDAY_NAMES,
+    VideoFrame,
+    as_number,
+    correlation,
+    first_seen_order,
+    grouped_means,
+    rolling_mean,
+)
 
 logger = logging.getLogger(__name__)
 
+SECTION_EXECUTION_MODES = ("sequential", "thread", "process")
+DEFAULT_EXECUTION_MODE = os.getenv("ANALYTICS_EXECUTION_MODE", "sequential")
+DEFAULT_MAX_WORKERS = int(os.getenv("ANALYTICS_MAX_WORKERS", "0")) or min(7, os.cpu_count() or 1)
+
+# "full" refits the scaler and KMeans per request; "incremental" keeps a
+# mini-batch model per channel (see incremental_clustering)
+CLUSTERING_MODES = ("full", "incremental")
+DEFAULT_CLUSTERING_MODE = os.getenv("ANALYTICS_CLUSTERING_MODE", "full")
+
+# Independent sections of comprehensive_channel_analysis:
+# (result key, engine method, takes time_period, takes the shared VideoFrame)
+ANALYSIS_SECTIONS = (
+    ("channel_health", "_analyze_channel_health", False, True),
+    ("content_performance", "_analyze_content_performance", False, True),
+    ("audience_insights", "_analyze_audience_behavior", False, True),
+    ("growth_analysis", "_analyze_growth_patterns", True, True),
+    ("monetization_analysis", "_analyze_monetization_efficiency", False, True),
+    ("competitive_analysis", "_perform_competitive_analysis", False, True),
+    ("predictive_insights", "_generate_predictive_insights", False, False),
+)
+_SECTION_SPECS = {spec[0]: spec for spec in ANALYSIS_SECTIONS}
+
+_section_executors: Dict[Tuple[str, int], Executor] = {}
+_section_executors_lock = threading.Lock()
+
+# Last snapshot unpickled by this worker process: (path, (engine, channel_data, time_period, frame))
+_worker_snapshot: Tuple[Optional[str], Any] = (None, None)
+
+
+def _get_section_executor(mode: str, max_workers: int) -> Executor:
+    """Return the shared pool for ``mode``; pools live for the whole process."""
+    key = (mode, max_workers)
+    with _section_executors_lock:
+        executor = _section_executors.get(key)
+        if executor is None:
+            if mode == "process":
+                # Start workers from a clean server process instead of forking
+                # the multi-threaded API process
+                method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context(method))
+            else:
+                executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analytics-section")
+            _section_executors[key] = executor
+        return executor
+
+
+def shutdown_section_executors(wait: bool = True) -> None:
+    """Shut down the section worker pools (call on application shutdown)."""
+    with _section_executors_lock:
+        executors = list(_section_executors.values())
+        _section_executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=wait)
+
+
+def _section_coroutine(
+    engine: "AdvancedAnalyticsEngine",
+    section: str,
+    channel_data: Dict[str, Any],
+    time_period: int,
+    frame: VideoFrame,
+):
+    """Build the coroutine for one entry of ``ANALYSIS_SECTIONS``."""
+    _, method_name, takes_period, takes_frame = _SECTION_SPECS[section]
+    args: List[Any] = [channel_data]
+    if takes_period:
+        args.append(time_period)
+    if takes_frame:
+        args.append(frame)
+    return getattr(engine, method_name)(*args)
+
+
+def _run_section(
+    engine: "AdvancedAnalyticsEngine",
+    section: str,
+    channel_data: Dict[str, Any],
+    time_period: int,
+    frame: VideoFrame,
+) -> Tuple[Any, float]:
+    """Run one section to completion and return ``(result, seconds)``.
+
+    The section coroutines never await I/O, so each pooled call drives its
+    coroutine on a private event loop.
+    """
+    started = time.perf_counter()
+    result = asyncio.run(_section_coroutine(engine, section, channel_data, time_period, frame))
+    return result, time.perf_counter() - started
+
+
+def _run_section_from_snapshot(snapshot_path: str, section: str) -> Tuple[Any, float]:
+    """Process-pool entry point: load the pickled snapshot once per worker."""
+    global _worker_snapshot
+    if _worker_snapshot[0] != snapshot_path:
+        with open(snapshot_path, "rb") as f:
+            _worker_snapshot = (snapshot_path, pickle.load(f))
+    engine, channel_data, time_period, frame = _worker_snapshot[1]
+    return _run_section(engine, section, channel_data, time_period, frame)
+
+
 class AdvancedAnalyticsEngine:
     """
     Advanced analytics engine for comprehensive YouTube channel data analysis.
@@ -30,26 +155,61 @@ class AdvancedAnalyticsEngine:
         scaler (StandardScaler): Scikit-learn scaler for feature normalization.
         anomaly_detector (IsolationForest): Model for detecting anomalies in data.
         clustering_model (KMeans): Model for clustering content or audience segments.
+        execution_mode (str): How independent sections of
+            ``comprehensive_channel_analysis`` run: "sequential", "thread" or
+            "process".
+        max_workers (int): Pool size for the thread/process modes.
+        clustering_mode (str): "full" refits the clustering models on every
+            call; "incremental" updates a stored per-channel model with new
+            videos only.
+        cluster_store (ClusterModelStore): Where incremental models are kept.
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        execution_mode: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        clustering_mode: Optional[str] = None,
+        cluster_store: Optional[ClusterModelStore] = None
+    ):
         self.scaler = StandardScaler()
         self.anomaly_detector = IsolationForest(contamination=0.1, random_state=42)
         self.clustering_model = KMeans(n_clusters=5, random_state=42)
         self.pca_model = PCA(n_components=2)
+
+        self.execution_mode = execution_mode or DEFAULT_EXECUTION_MODE
+        if self.execution_mode not in SECTION_EXECUTION_MODES:
+            raise ValueError(f"execution_mode must be one of {SECTION_EXECUTION_MODES}")
+        self.max_workers = max(1, max_workers or DEFAULT_MAX_WORKERS)
+
+        self.clustering_mode = clustering_mode or DEFAULT_CLUSTERING_MODE
+        if self.clustering_mode not in CLUSTERING_MODES:
+            raise ValueError(f"clustering_mode must be one of {CLUSTERING_MODES}")
+        self.cluster_store = cluster_store if cluster_store is not None else cluster_model_store
         
         # Cache for processed data
         self.data_cache = {}
         self.cache_ttl = 300  # 5 minutes
+
+    def _section_engine(self) -> "AdvancedAnalyticsEngine":
+        """Copy of this engine with unfitted models, so concurrent sections never share estimator state."""
+        engine = copy.copy(self)
+        engine.scaler = clone(self.scaler)
+        engine.anomaly_detector = clone(self.anomaly_detector)
+        engine.clustering_model = clone(self.clustering_model)
+        engine.pca_model = clone(self.pca_model)
+        engine.data_cache = {}
+        return engine
         
     async def comprehensive_channel_analysis(
-        self, 
+        self,
         channel_data: Dict[str, Any],
-        time_period: int = 30
+        time_period: int = 30,
+        execution_mode: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Perform comprehensive channel analysis with advanced metrics.
-        
+
         Args:
             channel_data (Dict[str, Any]): A dictionary containing structured channel data.
                 Expected keys might include 'videos' (list of video dicts),
@@ -58,14 +218,21 @@ class AdvancedAnalyticsEngine:
                 'retention_rate', 'published_at', 'category', 'ad_revenue', etc.
             time_period (int, optional): The analysis period in days, looking back from
                 the most recent data. Defaults to 30.
-            
+            execution_mode (str, optional): Overrides the engine's execution mode
+                for this call.
+
         Returns:
             Dict[str, Any]: A dictionary containing comprehensive analysis results,
             structured into sections like 'channel_health', 'content_performance', etc.
+            'section_timings' holds the seconds spent in each section.
         """
         if not channel_data or not isinstance(channel_data, dict):
             raise ValueError("channel_data must be a non-empty dictionary.")
+        mode = execution_mode or self.execution_mode
+        if mode not in SECTION_EXECUTION_MODES:
+            raise ValueError(f"execution_mode must be one of {SECTION_EXECUTION_MODES}")
         try:
+            started = time.perf_counter()
             analysis_results = {
                 "channel_health": {},
                 "content_performance": {},
@@ -76,49 +243,123 @@ class AdvancedAnalyticsEngine:
                 "predictive_insights": {},
                 "recommendations": []
             }
-            
-            # Channel Health Analysis
-            analysis_results["channel_health"] = await self._analyze_channel_health(channel_data)
-            
-            # Content Performance Analysis
-            analysis_results["content_performance"] = await self._analyze_content_performance(channel_data)
-            
-            # Audience Insights
-            analysis_results["audience_insights"] = await self._analyze_audience_behavior(channel_data)
-            
-            # Growth Analysis
-            analysis_results["growth_analysis"] = await self._analyze_growth_patterns(channel_data, time_period)
-            
-            # Monetization Analysis
-            analysis_results["monetization_analysis"] = await self._analyze_monetization_efficiency(channel_data)
-            
-            # Competitive Analysis
-            analysis_results["competitive_analysis"] = await self._perform_competitive_analysis(channel_data)
-            
-            # Predictive Insights
-            analysis_results["predictive_insights"] = await self._generate_predictive_insights(channel_data)
-            
-            # Generate Recommendations
+            timings = {}
+
+            # Columnar view of the videos, built once and shared by every section
+            frame = VideoFrame.from_channel(channel_data)
+            timings["video_frame"] = time.perf_counter() - started
+
+            # Health, content, audience, growth, monetization, competitive and
+            # predictive sections are independent of each other
+            if mode == "sequential":
+                for section, *_ in ANALYSIS_SECTIONS:
+                    result, elapsed = await self._run_section_inline(section, channel_data, time_period, frame)
+                    analysis_results[section] = result
+                    timings[section] = elapsed
+            else:
+                section_results = await self._run_sections_pooled(mode, channel_data, time_period, frame, timings)
+                for section, (result, elapsed) in section_results.items():
+                    analysis_results[section] = result
+                    timings[section] = elapsed
+
+            # Generate Recommendations once every section is in
+            recommendations_started = time.perf_counter()
             analysis_results["recommendations"] = await self._generate_comprehensive_recommendations(analysis_results)
-            
+            timings["recommendations"] = time.perf_counter() - recommendations_started
+
             # Log analysis execution
             log_execution(
                 "comprehensive_channel_analysis",
                 "success",
                 {
                     "time_period": time_period,
+                    "execution_mode": mode,
                     "metrics_analyzed": len(analysis_results),
                     "recommendations_count": len(analysis_results["recommendations"])
                 }
             )
-            
+
+            timings["total"] = time.perf_counter() - started
+            analysis_results["execution_mode"] = mode
+            analysis_results["section_timings"] = {name: round(seconds, 6) for name, seconds in timings.items()}
+
             return analysis_results
-            
+
         except Exception as e:
             logger.error(f"Error in comprehensive channel analysis: {str(e)}")
             raise
+
+    async def _run_section_inline(
+        self,
+        section: str,
+        channel_data: Dict[str, Any],
+        time_period: int,
+        frame: VideoFrame
+    ) -> Tuple[Any, float]:
+        """Await one section on the current event loop and time it."""
+        started = time.perf_counter()
+        result = await _section_coroutine(self, section, channel_data, time_period, frame)
+        return result, time.perf_counter() - started
+
+    async def _run_sections_pooled(
+        self,
+        mode: str,
+        channel_data: Dict[str, Any],
+        time_period: int,
+        frame: VideoFrame,
+        timings: Dict[str, float]
+    ) -> Dict[str, Tuple[Any, float]]:
+        """
+        Fan the independent sections out to the shared thread or process pool.
+
+        Thread workers share one read-only view of ``channel_data`` and the
+        frame. Process workers receive a pickled snapshot written once to a
+        temporary file, which each worker loads at most once per call; the
+        time spent writing it is recorded as ``timings["snapshot"]``.
+        A section whose worker fails reports an error dict like the sections'
+        own error handling does.
+        """
+        loop = asyncio.get_running_loop()
+        executor = _get_section_executor(mode, self.max_workers)
+        snapshot_path = None
+
+        try:
+            if mode == "process":
+                snapshot_started = time.perf_counter()
+                with tempfile.NamedTemporaryFile(prefix="analytics-snapshot-", suffix=".pkl", delete=False) as f:
+                    pickle.dump((self._section_engine(), channel_data, time_period, frame), f, protocol=pickle.HIGHEST_PROTOCOL)
+                    snapshot_path = f.name
+                timings["snapshot"] = time.perf_counter() - snapshot_started
+                futures = {
+                    section: loop.run_in_executor(executor, _run_section_from_snapshot, snapshot_path, section)
+                    for section, *_ in ANALYSIS_SECTIONS
+                }
+            else:
+                snapshot = MappingProxyType(channel_data)
+                futures = {
+                    section: loop.run_in_executor(
+                        executor, _run_section, self._section_engine(), section, snapshot, time_period, frame
+                    )
+                    for section, *_ in ANALYSIS_SECTIONS
+                }
+
+            results = {}
+            for section, future in futures.items():
+                try:
+                    results[section] = await future
+                except Exception as e:
+                    logger.error(f"Error running analysis section {section} in {mode} pool: {str(e)}")
+                    results[section] = ({"status": "error", "error": str(e)}, 0.0)
+            return results
+
+        finally:
+            if snapshot_path:
+                try:
+                    os.unlink(snapshot_path)
+                except OSError:
+                    pass
     
-    async def _analyze_channel_health(self, channel_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def _analyze_channel_health(self, channel_data: Dict[str, Any], frame: Optional[VideoFrame] = None) -> Dict[str, Any]:
         """
         Analyze overall channel health metrics.
 
@@ -127,21 +368,22 @@ class AdvancedAnalyticsEngine:
 
         Args:
             channel_data (Dict[str, Any]): Channel data containing a list of videos.
+            frame (VideoFrame, optional): Prebuilt columnar view of the videos.
 
         Returns:
             Dict[str, Any]: Analysis of channel health, including score, status, and trends.
         """
         try:
-            videos = channel_data.get("videos", [])
-            if not videos:
+            frame = frame if frame is not None else VideoFrame.from_channel(channel_data)
+            if not len(frame):
                 return {"health_score": 0, "status": "insufficient_data"}
-            
+
             # Calculate health metrics
-            avg_views = np.mean([v.get("views", 0) for v in videos])
-            avg_engagement = np.mean([v.get("engagement_rate", 0) for v in videos])
-            avg_retention = np.mean([v.get("retention_rate", 0) for v in videos])
-            consistency_score = self._calculate_consistency_score(videos)
-            
+            avg_views = np.mean(frame.views)
+            avg_engagement = np.mean(frame.engagement)
+            avg_retention = np.mean(frame.retention)
+            consistency_score = self._calculate_consistency_score(frame)
+
             # Weighted health score
             health_score = (
                 (avg_views / 10000) * 0.3 +  # Views weight
@@ -149,9 +391,9 @@ class AdvancedAnalyticsEngine:
                 avg_retention * 0.25 +        # Retention weight
                 consistency_score * 0.2       # Consistency weight
             ) * 100
-            
+
             health_score = min(100, max(0, health_score))
-            
+
             # Determine health status
             if health_score >= 80:
                 status = "excellent"
@@ -161,7 +403,7 @@ class AdvancedAnalyticsEngine:
                 status = "fair"
             else:
                 status = "poor"
-            
+
             return {
                 "health_score": round(health_score, 2),
                 "status": status,
@@ -171,14 +413,14 @@ class AdvancedAnalyticsEngine:
                     "average_retention": round(avg_retention, 4),
                     "consistency_score": round(consistency_score, 4)
                 },
-                "trends": self._analyze_health_trends(videos)
+                "trends": self._analyze_health_trends(frame)
             }
-            
+
         except Exception as e:
             logger.error(f"Error analyzing channel health: {str(e)}")
             return {"health_score": 0, "status": "error", "error": str(e)}
     
-    async def _analyze_content_performance(self, channel_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def _analyze_content_performance(self, channel_data: Dict[str, Any], frame: Optional[VideoFrame] = None) -> Dict[str, Any]:
         """
         Analyze content performance patterns, including clustering and lifecycle.
 
@@ -187,30 +429,31 @@ class AdvancedAnalyticsEngine:
 
         Args:
             channel_data (Dict[str, Any]): Channel data with video information.
+            frame (VideoFrame, optional): Prebuilt columnar view of the videos.
 
         Returns:
             Dict[str, Any]: Detailed analysis of content performance.
         """
         try:
-            videos = channel_data.get("videos", [])
-            if not videos:
+            frame = frame if frame is not None else VideoFrame.from_channel(channel_data)
+            if not len(frame):
                 return {"status": "insufficient_data"}
-            
+
             # Performance clustering
-            performance_clusters = self._cluster_content_performance(videos)
-            
+            performance_clusters = self._cluster_content_performance(frame, channel_data.get("channel_id"))
+
             # Best performing content analysis
-            top_performers = sorted(videos, key=lambda x: x.get("views", 0), reverse=True)[:10]
-            
+            top_performers = frame.take(np.argsort(-frame.views, kind="stable")[:10])
+
             # Content type analysis
-            content_types = self._analyze_content_types(videos)
-            
+            content_types = self._analyze_content_types(frame)
+
             # Optimal posting analysis
-            posting_patterns = self._analyze_posting_patterns(videos)
-            
+            posting_patterns = self._analyze_posting_patterns(frame)
+
             # Content lifecycle analysis
-            lifecycle_analysis = self._analyze_content_lifecycle(videos)
-            
+            lifecycle_analysis = self._analyze_content_lifecycle(frame)
+
             return {
                 "performance_clusters": performance_clusters,
                 "top_performers": [
@@ -226,33 +469,33 @@ class AdvancedAnalyticsEngine:
                 "posting_patterns": posting_patterns,
                 "lifecycle_analysis": lifecycle_analysis
             }
-            
+
         except Exception as e:
             logger.error(f"Error analyzing content performance: {str(e)}")
             return {"status": "error", "error": str(e)}
     
-    async def _analyze_audience_behavior(self, channel_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def _analyze_audience_behavior(self, channel_data: Dict[str, Any], frame: Optional[VideoFrame] = None) -> Dict[str, Any]:
         """Analyze audience behavior patterns."""
         try:
-            videos = channel_data.get("videos", [])
-            if not videos:
+            frame = frame if frame is not None else VideoFrame.from_channel(channel_data)
+            if not len(frame):
                 return {"status": "insufficient_data"}
-            
+
             # Engagement patterns
-            engagement_patterns = self._analyze_engagement_patterns(videos)
-            
+            engagement_patterns = self._analyze_engagement_patterns(frame)
+
             # Audience retention analysis
-            retention_analysis = self._analyze_retention_patterns(videos)
-            
+            retention_analysis = self._analyze_retention_patterns(frame)
+
             # Comment sentiment analysis
-            sentiment_analysis = self._analyze_comment_sentiment(videos)
-            
+            sentiment_analysis = self._analyze_comment_sentiment(frame)
+
             # Audience growth analysis
             growth_analysis = self._analyze_audience_growth(channel_data)
-            
+
             # Demographic insights (if available)
             demographic_insights = self._analyze_demographics(channel_data)
-            
+
             return {
                 "engagement_patterns": engagement_patterns,
                 "retention_analysis": retention_analysis,
@@ -260,29 +503,31 @@ class AdvancedAnalyticsEngine:
                 "growth_analysis": growth_analysis,
                 "demographic_insights": demographic_insights
             }
-            
+
         except Exception as e:
             logger.error(f"Error analyzing audience behavior: {str(e)}")
             return {"status": "error", "error": str(e)}
     
-    async def _analyze_growth_patterns(self, channel_data: Dict[str, Any], time_period: int) -> Dict[str, Any]:
+    async def _analyze_growth_patterns(self, channel_data: Dict[str, Any], time_period: int, frame: Optional[VideoFrame] = None) -> Dict[str, Any]:
         """Analyze channel growth patterns."""
         try:
+            frame = frame if frame is not None else VideoFrame.from_channel(channel_data)
+
             # Growth rate calculation
-            growth_metrics = self._calculate_growth_metrics(channel_data, time_period)
-            
+            growth_metrics = self._calculate_growth_metrics(channel_data, time_period, frame)
+
             # Growth trend analysis
-            trend_analysis = self._analyze_growth_trends(channel_data)
-            
+            trend_analysis = self._analyze_growth_trends(channel_data, frame)
+
             # Growth acceleration/deceleration
-            acceleration_analysis = self._analyze_growth_acceleration(channel_data)
-            
+            acceleration_analysis = self._analyze_growth_acceleration(channel_data, frame)
+
             # Seasonal patterns
-            seasonal_patterns = self._analyze_seasonal_patterns(channel_data)
-            
+            seasonal_patterns = self._analyze_seasonal_patterns(channel_data, frame)
+
             # Growth forecasting
-            growth_forecast = self._forecast_growth(channel_data, time_period)
-            
+            growth_forecast = self._forecast_growth(channel_data, time_period, frame)
+
             return {
                 "growth_metrics": growth_metrics,
                 "trend_analysis": trend_analysis,
@@ -290,33 +535,33 @@ class AdvancedAnalyticsEngine:
                 "seasonal_patterns": seasonal_patterns,
                 "growth_forecast": growth_forecast
             }
-            
+
         except Exception as e:
             logger.error(f"Error analyzing growth patterns: {str(e)}")
             return {"status": "error", "error": str(e)}
     
-    async def _analyze_monetization_efficiency(self, channel_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def _analyze_monetization_efficiency(self, channel_data: Dict[str, Any], frame: Optional[VideoFrame] = None) -> Dict[str, Any]:
         """Analyze monetization efficiency and opportunities."""
         try:
-            videos = channel_data.get("videos", [])
-            if not videos:
+            frame = frame if frame is not None else VideoFrame.from_channel(channel_data)
+            if not len(frame):
                 return {"status": "insufficient_data"}
-            
+
             # Revenue per view analysis
-            rpv_analysis = self._analyze_revenue_per_view(videos)
-            
+            rpv_analysis = self._analyze_revenue_per_view(frame)
+
             # Monetization channel analysis
-            monetization_channels = self._analyze_monetization_channels(videos)
-            
+            monetization_channels = self._analyze_monetization_channels(frame)
+
             # Revenue optimization opportunities
-            optimization_opportunities = self._identify_revenue_opportunities(videos)
-            
+            optimization_opportunities = self._identify_revenue_opportunities(frame)
+
             # CPM analysis
-            cpm_analysis = self._analyze_cpm_trends(videos)
-            
+            cpm_analysis = self._analyze_cpm_trends(frame)
+
             # Revenue forecasting
-            revenue_forecast = self._forecast_revenue(videos)
-            
+            revenue_forecast = self._forecast_revenue(frame)
+
             return {
                 "rpv_analysis": rpv_analysis,
                 "monetization_channels": monetization_channels,
@@ -324,26 +569,26 @@ class AdvancedAnalyticsEngine:
                 "cpm_analysis": cpm_analysis,
                 "revenue_forecast": revenue_forecast
             }
-            
+
         except Exception as e:
             logger.error(f"Error analyzing monetization efficiency: {str(e)}")
             return {"status": "error", "error": str(e)}
     
-    async def _perform_competitive_analysis(self, channel_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def _perform_competitive_analysis(self, channel_data: Dict[str, Any], frame: Optional[VideoFrame] = None) -> Dict[str, Any]:
         """Perform competitive analysis."""
         try:
             # This would typically involve external data sources
             # For now, we'll provide a framework
-            
+
             competitive_metrics = {
-                "market_position": self._estimate_market_position(channel_data),
+                "market_position": self._estimate_market_position(channel_data, frame),
                 "content_gaps": self._identify_content_gaps(channel_data),
                 "competitive_advantages": self._identify_competitive_advantages(channel_data),
                 "benchmark_comparison": self._compare_to_benchmarks(channel_data)
             }
-            
+
             return competitive_metrics
-            
+
         except Exception as e:
             logger.error(f"Error in competitive analysis: {str(e)}")
             return {"status": "error", "error": str(e)}
@@ -490,62 +735,43 @@ class AdvancedAnalyticsEngine:
             logger.error(f"Error generating recommendations: {str(e)}")
             return []
     
-    def _calculate_consistency_score(self, videos: List[Dict]) -> float:
+    def _calculate_consistency_score(self, videos: Union[VideoFrame, List[Dict]]) -> float:
         """Calculate content consistency score."""
-        if len(videos) < 2:
-            return 0.0
-        
-        # Calculate posting frequency consistency
-        dates = [v.get("published_at") for v in videos if v.get("published_at")]
-        if len(dates) < 2:
+        frame = VideoFrame.ensure(videos)
+        if len(frame) < 2:
             return 0.0
-        
-        # Sort dates and calculate intervals
-        dates.sort()
-        intervals = []
-        for i in range(1, len(dates)):
-            try:
-                date1 = datetime.fromisoformat(dates[i-1].replace('Z', '+00:00'))
-                date2 = datetime.fromisoformat(dates[i].replace('Z', '+00:00'))
-                intervals.append((date2 - date1).days)
-            except:
-                continue
-        
-        if not intervals:
+
+        # Publication times in published_at order, skipping missing/unparseable dates
+        timestamps = frame.published_ts[frame.order_by_published_raw()]
+        timestamps = timestamps[~np.isnan(timestamps)]
+        if len(timestamps) < 2:
             return 0.0
-        
+
+        intervals = np.floor(np.diff(timestamps) / 86400.0)
+
         # Calculate consistency (lower variance = higher consistency)
         mean_interval = np.mean(intervals)
+        if mean_interval == 0:
+            return 0.0
         variance = np.var(intervals)
         consistency = max(0, 1 - (variance / (mean_interval ** 2)))
-        
+
         return consistency
     
-    def _analyze_health_trends(self, videos: List[Dict]) -> Dict[str, Any]:
+    def _analyze_health_trends(self, videos: Union[VideoFrame, List[Dict]]) -> Dict[str, Any]:
         """Analyze health trends over time."""
         try:
-            # Sort videos by date
-            sorted_videos = sorted(videos, key=lambda x: x.get("published_at", ""))
-            
+            frame = VideoFrame.ensure(videos)
+            order = frame.order_by_published_raw()
+
             # Calculate rolling metrics
-            window_size = min(5, len(sorted_videos))
+            window_size = min(5, len(frame))
             trends = {
-                "views_trend": [],
-                "engagement_trend": [],
-                "retention_trend": []
+                "views_trend": rolling_mean(frame.views[order], window_size).tolist(),
+                "engagement_trend": rolling_mean(frame.engagement[order], window_size).tolist(),
+                "retention_trend": rolling_mean(frame.retention[order], window_size).tolist()
             }
-            
-            for i in range(window_size, len(sorted_videos) + 1):
-                window = sorted_videos[i-window_size:i]
-                
-                avg_views = np.mean([v.get("views", 0) for v in window])
-                avg_engagement = np.mean([v.get("engagement_rate", 0) for v in window])
-                avg_retention = np.mean([v.get("retention_rate", 0) for v in window])
-                
-                trends["views_trend"].append(avg_views)
-                trends["engagement_trend"].append(avg_engagement)
-                trends["retention_trend"].append(avg_retention)
-            
+
             # Calculate trend direction
             trend_directions = {}
             for metric, values in trends.items():
@@ -559,83 +785,116 @@ class AdvancedAnalyticsEngine:
                         trend_directions[metric] = "stable"
                 else:
                     trend_directions[metric] = "unknown"
-            
+
             return {
                 "trends": trends,
                 "trend_directions": trend_directions
             }
-            
+
         except Exception as e:
             logger.error(f"Error analyzing health trends: {str(e)}")
             return {"trends": {}, "trend_directions": {}}
     
-    def _cluster_content_performance(self, videos: List[Dict]) -> Dict[str, Any]:
-        """Cluster content by performance characteristics."""
+    def _cluster_content_performance(
+        self,
+        videos: Union[VideoFrame, List[Dict]],
+        channel_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Cluster content by performance characteristics.
+
+        In incremental mode (and when ``channel_id`` is known) the channel's
+        stored model is updated with unseen videos only and every video is
+        labelled by its nearest centroid; otherwise the models are refit.
+        """
         try:
-            if len(videos) < 5:
+            frame = VideoFrame.ensure(videos)
+            if len(frame) < 5:
                 return {"status": "insufficient_data"}
-            
+
             # Extract features for clustering
-            features = []
-            video_info = []
-            
-            for video in videos:
-                feature_vector = [
-                    video.get("views", 0),
-                    video.get("engagement_rate", 0),
-                    video.get("retention_rate", 0),
-                    video.get("duration", 0),
-                    len(video.get("title", "")),
-                    len(video.get("description", ""))
-                ]
-                features.append(feature_vector)
-                video_info.append({
-                    "title": video.get("title", ""),
-                    "views": video.get("views", 0)
-                })
-            
-            # Normalize features
-            features_scaled = self.scaler.fit_transform(features)
-            
-            # Perform clustering
-            n_clusters = min(5, len(videos) // 2)
-            if n_clusters < 2:
-                n_clusters = 2
-            
-            self.clustering_model.n_clusters = n_clusters
-            cluster_labels = self.clustering_model.fit_predict(features_scaled)
-            
-            # Analyze clusters
-            clusters = defaultdict(list)
-            for i, label in enumerate(cluster_labels):
-                clusters[label].append({
-                    **video_info[i],
-                    "features": features[i]
-                })
-            
+            features = cluster_features(frame)
+
+            incremental = None
+            if self.clustering_mode == "incremental" and channel_id:
+                cluster_labels, incremental = self._incremental_cluster_labels(str(channel_id), frame, features)
+            else:
+                # Normalize features
+                features_scaled = self.scaler.fit_transform(features)
+
+                # Perform clustering
+                self.clustering_model.n_clusters = self._cluster_count(len(frame))
+                cluster_labels = self.clustering_model.fit_predict(features_scaled)
+
             # Calculate cluster characteristics
+            counts, (avg_views, avg_engagement) = grouped_means(cluster_labels, frame.views, frame.engagement)
             cluster_analysis = {}
-            for cluster_id, cluster_videos in clusters.items():
-                avg_views = np.mean([v["features"][0] for v in cluster_videos])
-                avg_engagement = np.mean([v["features"][1] for v in cluster_videos])
-                
+            for cluster_id in first_seen_order(cluster_labels):
+                members = np.flatnonzero(cluster_labels == cluster_id)[:3]
                 cluster_analysis[f"cluster_{cluster_id}"] = {
-                    "video_count": len(cluster_videos),
-                    "avg_views": avg_views,
-                    "avg_engagement": avg_engagement,
-                    "performance_level": self._classify_performance_level(avg_views, avg_engagement),
-                    "sample_videos": cluster_videos[:3]
+                    "video_count": int(counts[cluster_id]),
+                    "avg_views": avg_views[cluster_id],
+                    "avg_engagement": avg_engagement[cluster_id],
+                    "performance_level": self._classify_performance_level(avg_views[cluster_id], avg_engagement[cluster_id]),
+                    "sample_videos": [
+                        {
+                            "title": frame.titles[i],
+                            "views": frame.videos[i].get("views", 0),
+                            "features": features[i].tolist()
+                        }
+                        for i in members
+                    ]
                 }
-            
-            return {
+
+            result = {
                 "clusters": cluster_analysis,
-                "total_clusters": len(clusters)
+                "total_clusters": len(cluster_analysis)
             }
-            
+            if incremental is not None:
+                result["incremental"] = incremental
+            return result
+
         except Exception as e:
             logger.error(f"Error clustering content performance: {str(e)}")
             return {"status": "error", "error": str(e)}
-    
+
+    @staticmethod
+    def _cluster_count(video_count: int) -> int:
+        """Number of clusters for a channel with ``video_count`` videos."""
+        return max(2, min(5, video_count // 2))
+
+    def _incremental_cluster_labels(
+        self,
+        channel_id: str,
+        frame: VideoFrame,
+        features: np.ndarray
+    ) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """Update the channel's stored model with unseen videos and label all videos."""
+        keys = [video_key(video) for video in frame.videos]
+        with self.cluster_store.lock(channel_id):
+            model = self.cluster_store.get(channel_id)
+            # Models seeded from a tiny channel are rebuilt once it can support more clusters
+            created = model is None or model.n_clusters < self._cluster_count(len(frame))
+            if created:
+                model = ChannelClusterModel(self._cluster_count(len(frame)))
+            new_videos = model.update(features, keys)
+            if new_videos:
+                self.cluster_store.put(channel_id, model)
+            labels = model.predict(features)
+
+        return labels, {
+            "model_created": created,
+            "new_videos": new_videos,
+            "model_updates": model.updates,
+            "n_clusters": model.n_clusters
+        }
+
+    def assign_video_cluster(self, channel_id: str, video: Dict[str, Any]) -> Optional[str]:
+        """Cluster of one video under the channel's stored model (O(k)), or None without a model."""
+        model = self.cluster_store.get(str(channel_id))
+        if model is None or not model.fitted:
+            return None
+        return f"cluster_{model.assign(video)}"
+
     def _classify_performance_level(self, views: float, engagement: float) -> str:
         """Classify performance level based on views and engagement."""
         if views > 100000 and engagement > 0.05:
@@ -645,44 +904,41 @@ class AdvancedAnalyticsEngine:
         else:
             return "low_performance"
     
-    def _analyze_content_types(self, videos: List[Dict]) -> Dict[str, Any]:
+    def _analyze_content_types(self, videos: Union[VideoFrame, List[Dict]]) -> Dict[str, Any]:
         """Analyze performance by content type."""
         try:
-            content_types = defaultdict(list)
-            
-            # Group videos by category/type
-            for video in videos:
-                category = video.get("category", "unknown")
-                content_types[category].append(video)
-            
+            frame = VideoFrame.ensure(videos)
+
+            # Group videos by category/type (codes are in first-seen order)
+            counts, (avg_views, avg_engagement) = grouped_means(
+                frame.category_codes, frame.views, frame.engagement
+            )
+            total_views = np.bincount(frame.category_codes, weights=frame.views)
+
             # Analyze each content type
             type_analysis = {}
-            for content_type, type_videos in content_types.items():
-                avg_views = np.mean([v.get("views", 0) for v in type_videos])
-                avg_engagement = np.mean([v.get("engagement_rate", 0) for v in type_videos])
-                total_videos = len(type_videos)
-                
+            for code, content_type in enumerate(frame.category_labels):
                 type_analysis[content_type] = {
-                    "video_count": total_videos,
-                    "avg_views": round(avg_views, 2),
-                    "avg_engagement": round(avg_engagement, 4),
-                    "total_views": sum(v.get("views", 0) for v in type_videos),
-                    "performance_score": self._calculate_type_performance_score(avg_views, avg_engagement)
+                    "video_count": int(counts[code]),
+                    "avg_views": round(avg_views[code], 2),
+                    "avg_engagement": round(avg_engagement[code], 4),
+                    "total_views": as_number(total_views[code]),
+                    "performance_score": self._calculate_type_performance_score(avg_views[code], avg_engagement[code])
                 }
-            
+
             # Rank content types by performance
             ranked_types = sorted(
                 type_analysis.items(),
                 key=lambda x: x[1]["performance_score"],
                 reverse=True
             )
-            
+
             return {
                 "content_types": type_analysis,
                 "ranked_performance": ranked_types,
                 "best_performing_type": ranked_types[0][0] if ranked_types else None
             }
-            
+
         except Exception as e:
             logger.error(f"Error analyzing content types: {str(e)}")
             return {"status": "error", "error": str(e)}
@@ -695,72 +951,42 @@ class AdvancedAnalyticsEngine:
         
         return (views_score * 0.7) + (engagement_score * 0.3)
     
-    def _analyze_posting_patterns(self, videos: List[Dict]) -> Dict[str, Any]:
+    def _analyze_posting_patterns(self, videos: Union[VideoFrame, List[Dict]]) -> Dict[str, Any]:
         """Analyze optimal posting patterns."""
         try:
-            posting_data = defaultdict(list)
-            
-            for video in videos:
-                published_at = video.get("published_at")
-                if not published_at:
-                    continue
-                
-                try:
-                    pub_date = datetime.fromisoformat(published_at.replace('Z', '+00:00'))
-                    day_of_week = pub_date.strftime("%A")
-                    hour_of_day = pub_date.hour
-                    
-                    posting_data[day_of_week].append({
-                        "views": video.get("views", 0),
-                        "engagement": video.get("engagement_rate", 0),
-                        "hour": hour_of_day
-                    })
-                except:
-                    continue
-            
+            frame = VideoFrame.ensure(videos)
+            dated = frame.has_date
+            weekdays = frame.weekday[dated].astype(np.int64)
+            hours = frame.hour[dated].astype(np.int64)
+            views = frame.views[dated]
+            engagement = frame.engagement[dated]
+
             # Analyze by day of week
+            day_counts, (day_views, day_engagement) = grouped_means(weekdays, views, engagement, minlength=7)
             day_analysis = {}
-            for day, day_videos in posting_data.items():
-                avg_views = np.mean([v["views"] for v in day_videos])
-                avg_engagement = np.mean([v["engagement"] for v in day_videos])
-                
-                day_analysis[day] = {
-                    "video_count": len(day_videos),
-                    "avg_views": round(avg_views, 2),
-                    "avg_engagement": round(avg_engagement, 4),
-                    "performance_score": self._calculate_type_performance_score(avg_views, avg_engagement)
+            for day in first_seen_order(weekdays):
+                day_analysis[WEEKDAY_NAMES[day]] = {
+                    "video_count": int(day_counts[day]),
+                    "avg_views": round(day_views[day], 2),
+                    "avg_engagement": round(day_engagement[day], 4),
+                    "performance_score": self._calculate_type_performance_score(day_views[day], day_engagement[day])
                 }
-            
+
             # Find best posting times
-            all_hours = []
-            for day_videos in posting_data.values():
-                for video in day_videos:
-                    all_hours.append({
-                        "hour": video["hour"],
-                        "views": video["views"],
-                        "engagement": video["engagement"]
-                    })
-            
-            hour_analysis = defaultdict(list)
-            for video in all_hours:
-                hour_analysis[video["hour"]].append(video)
-            
+            hour_counts, (hour_views, hour_engagement) = grouped_means(hours, views, engagement, minlength=24)
             best_hours = {}
-            for hour, hour_videos in hour_analysis.items():
-                if len(hour_videos) >= 2:  # Need at least 2 videos for meaningful analysis
-                    avg_views = np.mean([v["views"] for v in hour_videos])
-                    avg_engagement = np.mean([v["engagement"] for v in hour_videos])
-                    
-                    best_hours[hour] = {
-                        "avg_views": round(avg_views, 2),
-                        "avg_engagement": round(avg_engagement, 4),
-                        "video_count": len(hour_videos)
+            for hour in first_seen_order(hours):
+                if hour_counts[hour] >= 2:  # Need at least 2 videos for meaningful analysis
+                    best_hours[int(hour)] = {
+                        "avg_views": round(hour_views[hour], 2),
+                        "avg_engagement": round(hour_engagement[hour], 4),
+                        "video_count": int(hour_counts[hour])
                     }
-            
+
             # Find optimal posting schedule
             best_day = max(day_analysis.items(), key=lambda x: x[1]["performance_score"])[0] if day_analysis else None
             best_hour = max(best_hours.items(), key=lambda x: x[1]["avg_views"])[0] if best_hours else None
-            
+
             return {
                 "day_analysis": day_analysis,
                 "hour_analysis": best_hours,
@@ -769,157 +995,109 @@ class AdvancedAnalyticsEngine:
                     "best_hour": best_hour
                 }
             }
-            
+
         except Exception as e:
             logger.error(f"Error analyzing posting patterns: {str(e)}")
             return {"status": "error", "error": str(e)}
     
-    def _analyze_content_lifecycle(self, videos: List[Dict]) -> Dict[str, Any]:
+    def _analyze_content_lifecycle(self, videos: Union[VideoFrame, List[Dict]]) -> Dict[str, Any]:
         """Analyze content lifecycle and longevity."""
         try:
-            lifecycle_data = []
-            
-            for video in videos:
-                published_at = video.get("published_at")
-                if not published_at:
-                    continue
-                
-                try:
-                    pub_date = datetime.fromisoformat(published_at.replace('Z', '+00:00'))
-                    days_since_publish = (datetime.now(pub_date.tzinfo) - pub_date).days
-                    
-                    lifecycle_data.append({
-                        "days_old": days_since_publish,
-                        "views": video.get("views", 0),
-                        "engagement_rate": video.get("engagement_rate", 0),
-                        "title": video.get("title", "")
-                    })
-                except:
-                    continue
-            
-            if not lifecycle_data:
+            frame = VideoFrame.ensure(videos)
+            dated = np.flatnonzero(frame.has_date)
+            if not len(dated):
                 return {"status": "insufficient_data"}
-            
+
+            days_old = frame.days_old()[dated]
+            views = frame.views[dated]
+            engagement = frame.engagement[dated]
+
             # Analyze performance by age groups
             age_groups = {
-                "new": [v for v in lifecycle_data if v["days_old"] <= 7],
-                "recent": [v for v in lifecycle_data if 7 < v["days_old"] <= 30],
-                "mature": [v for v in lifecycle_data if 30 < v["days_old"] <= 90],
-                "old": [v for v in lifecycle_data if v["days_old"] > 90]
+                "new": days_old <= 7,
+                "recent": (days_old > 7) & (days_old <= 30),
+                "mature": (days_old > 30) & (days_old <= 90),
+                "old": days_old > 90
             }
-            
+
             lifecycle_analysis = {}
-            for age_group, videos in age_groups.items():
-                if videos:
-                    avg_views = np.mean([v["views"] for v in videos])
-                    avg_engagement = np.mean([v["engagement_rate"] for v in videos])
-                    
+            for age_group, mask in age_groups.items():
+                if mask.any():
                     lifecycle_analysis[age_group] = {
-                        "video_count": len(videos),
-                        "avg_views": round(avg_views, 2),
-                        "avg_engagement": round(avg_engagement, 4),
-                        "view_decay_rate": self._calculate_decay_rate(videos)
+                        "video_count": int(mask.sum()),
+                        "avg_views": round(np.mean(views[mask]), 2),
+                        "avg_engagement": round(np.mean(engagement[mask]), 4),
+                        "view_decay_rate": self._calculate_decay_rate(days_old[mask], views[mask])
                     }
-            
+
             # Identify evergreen content
             evergreen_threshold = 0.8  # 80% of peak performance maintained
-            evergreen_content = []
-            
-            for video in lifecycle_data:
-                if video["days_old"] > 30:  # Must be at least 30 days old
-                    recent_performance = video["views"] / max(1, video["days_old"])
-                    if recent_performance > evergreen_threshold:
-                        evergreen_content.append({
-                            "title": video["title"],
-                            "days_old": video["days_old"],
-                            "views": video["views"],
-                            "performance_ratio": recent_performance
-                        })
-            
+            daily_views = views / np.maximum(1, days_old)
+            evergreen = np.flatnonzero((days_old > 30) & (daily_views > evergreen_threshold))[:10]  # Top 10
+            evergreen_content = [
+                {
+                    "title": frame.titles[dated[i]],
+                    "days_old": int(days_old[i]),
+                    "views": frame.videos[dated[i]].get("views", 0),
+                    "performance_ratio": daily_views[i]
+                }
+                for i in evergreen
+            ]
+
             return {
                 "lifecycle_analysis": lifecycle_analysis,
-                "evergreen_content": evergreen_content[:10],  # Top 10
-                "content_longevity_score": self._calculate_longevity_score(lifecycle_data)
+                "evergreen_content": evergreen_content,
+                "content_longevity_score": self._calculate_longevity_score(days_old, views)
             }
-            
+
         except Exception as e:
             logger.error(f"Error analyzing content lifecycle: {str(e)}")
             return {"status": "error", "error": str(e)}
     
-    def _calculate_decay_rate(self, videos: List[Dict]) -> float:
+    def _calculate_decay_rate(self, days_old: np.ndarray, views: np.ndarray) -> float:
         """Calculate view decay rate for a group of videos."""
-        if len(videos) < 2:
+        if len(days_old) < 2:
             return 0.0
-        
-        # Sort by age
-        sorted_videos = sorted(videos, key=lambda x: x["days_old"])
-        
-        # Calculate decay using linear regression approximation
-        ages = [v["days_old"] for v in sorted_videos]
-        views = [v["views"] for v in sorted_videos]
-        
-        if len(ages) < 2:
-            return 0.0
-        
+
         # Simple linear decay calculation
-        correlation = np.corrcoef(ages, views)[0, 1] if len(ages) > 1 else 0
-        decay_rate = max(0, -correlation)  # Negative correlation indicates decay
-        
+        decay_rate = max(0, -correlation(days_old, views))  # Negative correlation indicates decay
+
         return round(decay_rate, 4)
     
-    def _calculate_longevity_score(self, lifecycle_data: List[Dict]) -> float:
+    def _calculate_longevity_score(self, days_old: np.ndarray, views: np.ndarray) -> float:
         """Calculate overall content longevity score."""
-        if not lifecycle_data:
+        if not len(days_old):
             return 0.0
-        
+
         # Score based on how well content maintains performance over time
-        total_score = 0
-        for video in lifecycle_data:
-            age_factor = min(1.0, video["days_old"] / 365)  # Normalize by year
-            performance_factor = video["views"] / max(1, video["days_old"])
-            total_score += age_factor * performance_factor
-        
-        return round(total_score / len(lifecycle_data), 4)
+        age_factor = np.minimum(1.0, days_old / 365)  # Normalize by year
+        performance_factor = views / np.maximum(1, days_old)
+
+        return round(float(np.mean(age_factor * performance_factor)), 4)
     
-    def _analyze_engagement_patterns(self, videos: List[Dict]) -> Dict[str, Any]:
+    def _analyze_engagement_patterns(self, videos: Union[VideoFrame, List[Dict]]) -> Dict[str, Any]:
         """Analyze audience engagement patterns."""
         try:
-            engagement_data = []
-            
-            for video in videos:
-                engagement_rate = video.get("engagement_rate", 0)
-                views = video.get("views", 0)
-                likes = video.get("likes", 0)
-                comments = video.get("comments", 0)
-                shares = video.get("shares", 0)
-                
-                engagement_data.append({
-                    "engagement_rate": engagement_rate,
-                    "views": views,
-                    "likes": likes,
-                    "comments": comments,
-                    "shares": shares,
-                    "like_ratio": likes / max(1, views),
-                    "comment_ratio": comments / max(1, views),
-                    "share_ratio": shares / max(1, views)
-                })
-            
-            if not engagement_data:
+            frame = VideoFrame.ensure(videos)
+            if not len(frame):
                 return {"status": "insufficient_data"}
-            
+
+            engagement = frame.engagement
+            safe_views = np.maximum(1, frame.views)
+
             # Calculate average engagement metrics
-            avg_engagement = np.mean([d["engagement_rate"] for d in engagement_data])
-            avg_like_ratio = np.mean([d["like_ratio"] for d in engagement_data])
-            avg_comment_ratio = np.mean([d["comment_ratio"] for d in engagement_data])
-            avg_share_ratio = np.mean([d["share_ratio"] for d in engagement_data])
-            
+            avg_engagement = np.mean(engagement)
+            avg_like_ratio = np.mean(frame.likes / safe_views)
+            avg_comment_ratio = np.mean(frame.comments / safe_views)
+            avg_share_ratio = np.mean(frame.shares / safe_views)
+
             # Identify engagement patterns
-            high_engagement_videos = [d for d in engagement_data if d["engagement_rate"] > avg_engagement * 1.5]
-            low_engagement_videos = [d for d in engagement_data if d["engagement_rate"] < avg_engagement * 0.5]
-            
+            high_engagement_count = int(np.count_nonzero(engagement > avg_engagement * 1.5))
+            low_engagement_count = int(np.count_nonzero(engagement < avg_engagement * 0.5))
+
             # Engagement trend analysis
-            engagement_trend = self._analyze_engagement_trend(engagement_data)
-            
+            engagement_trend = self._analyze_engagement_trend(engagement)
+
             return {
                 "average_engagement": round(avg_engagement, 4),
                 "engagement_breakdown": {
@@ -927,25 +1105,25 @@ class AdvancedAnalyticsEngine:
                     "comment_ratio": round(avg_comment_ratio, 6),
                     "share_ratio": round(avg_share_ratio, 6)
                 },
-                "high_engagement_count": len(high_engagement_videos),
-                "low_engagement_count": len(low_engagement_videos),
-                "engagement_consistency": self._calculate_engagement_consistency(engagement_data),
+                "high_engagement_count": high_engagement_count,
+                "low_engagement_count": low_engagement_count,
+                "engagement_consistency": self._calculate_engagement_consistency(engagement),
                 "engagement_trend": engagement_trend
             }
-            
+
         except Exception as e:
             logger.error(f"Error analyzing engagement patterns: {str(e)}")
             return {"status": "error", "error": str(e)}
     
-    def _analyze_engagement_trend(self, engagement_data: List[Dict]) -> str:
+    def _analyze_engagement_trend(self, engagement_rates: np.ndarray) -> str:
         """Analyze engagement trend direction."""
-        if len(engagement_data) < 3:
+        if len(engagement_rates) < 3:
             return "insufficient_data"
-        
+
         # Take recent vs older engagement rates
-        recent_engagement = np.mean([d["engagement_rate"] for d in engagement_data[-5:]])
-        older_engagement = np.mean([d["engagement_rate"] for d in engagement_data[:-5]]) if len(engagement_data) > 5 else recent_engagement
-        
+        recent_engagement = np.mean(engagement_rates[-5:])
+        older_engagement = np.mean(engagement_rates[:-5]) if len(engagement_rates) > 5 else recent_engagement
+
         if recent_engagement > older_engagement * 1.1:
             return "improving"
         elif recent_engagement < older_engagement * 0.9:
@@ -953,46 +1131,46 @@ class AdvancedAnalyticsEngine:
         else:
             return "stable"
     
-    def _calculate_engagement_consistency(self, engagement_data: List[Dict]) -> float:
+    def _calculate_engagement_consistency(self, engagement_rates: np.ndarray) -> float:
         """Calculate engagement consistency score."""
-        if len(engagement_data) < 2:
+        if len(engagement_rates) < 2:
             return 0.0
-        
-        engagement_rates = [d["engagement_rate"] for d in engagement_data]
+
         mean_engagement = np.mean(engagement_rates)
         std_engagement = np.std(engagement_rates)
-        
+
         # Consistency score (lower variance = higher consistency)
         if mean_engagement == 0:
             return 0.0
-        
+
         coefficient_of_variation = std_engagement / mean_engagement
         consistency_score = max(0, 1 - coefficient_of_variation)
-        
+
         return round(consistency_score, 4)
     
-    def _analyze_retention_patterns(self, videos: List[Dict]) -> Dict[str, Any]:
+    def _analyze_retention_patterns(self, videos: Union[VideoFrame, List[Dict]]) -> Dict[str, Any]:
         """Analyze audience retention patterns."""
         try:
-            retention_data = [v.get("retention_rate", 0) for v in videos if v.get("retention_rate")]
-            
-            if not retention_data:
+            frame = VideoFrame.ensure(videos)
+            retention_data = frame.retention[frame.retention != 0]
+
+            if not len(retention_data):
                 return {"status": "insufficient_data"}
-            
+
             avg_retention = np.mean(retention_data)
             median_retention = np.median(retention_data)
             retention_std = np.std(retention_data)
-            
+
             # Classify retention performance
-            high_retention_count = len([r for r in retention_data if r > 0.7])
-            medium_retention_count = len([r for r in retention_data if 0.4 <= r <= 0.7])
-            low_retention_count = len([r for r in retention_data if r < 0.4])
-            
+            high_retention_count = int(np.count_nonzero(retention_data > 0.7))
+            medium_retention_count = int(np.count_nonzero((retention_data >= 0.4) & (retention_data <= 0.7)))
+            low_retention_count = int(np.count_nonzero(retention_data < 0.4))
+
             # Retention trend
             if len(retention_data) >= 5:
                 recent_retention = np.mean(retention_data[-5:])
                 older_retention = np.mean(retention_data[:-5]) if len(retention_data) > 5 else recent_retention
-                
+
                 if recent_retention > older_retention * 1.05:
                     retention_trend = "improving"
                 elif recent_retention < older_retention * 0.95:
@@ -1001,7 +1179,7 @@ class AdvancedAnalyticsEngine:
                     retention_trend = "stable"
             else:
                 retention_trend = "insufficient_data"
-            
+
             return {
                 "average_retention": round(avg_retention, 4),
                 "median_retention": round(median_retention, 4),
@@ -1013,32 +1191,32 @@ class AdvancedAnalyticsEngine:
                 },
                 "retention_trend": retention_trend
             }
-            
+
         except Exception as e:
             logger.error(f"Error analyzing retention patterns: {str(e)}")
             return {"status": "error", "error": str(e)}
     
-    def _analyze_comment_sentiment(self, videos: List[Dict]) -> Dict[str, Any]:
+    def _analyze_comment_sentiment(self, videos: Union[VideoFrame, List[Dict]]) -> Dict[str, Any]:
         """Analyze comment sentiment patterns."""
         try:
             # This is a simplified sentiment analysis
             # In production, you'd use a proper NLP library
-            
-            total_comments = sum(v.get("comments", 0) for v in videos)
-            avg_comments_per_video = total_comments / len(videos) if videos else 0
-            
+            frame = VideoFrame.ensure(videos)
+
+            total_comments = as_number(frame.comments.sum())
+            avg_comments_per_video = total_comments / len(frame) if len(frame) else 0
+
             # Estimate sentiment based on engagement patterns
             # Higher engagement often correlates with positive sentiment
-            high_engagement_videos = [v for v in videos if v.get("engagement_rate", 0) > 0.05]
-            positive_sentiment_estimate = len(high_engagement_videos) / len(videos) if videos else 0
-            
+            positive_sentiment_estimate = np.count_nonzero(frame.engagement > 0.05) / len(frame) if len(frame) else 0
+
             return {
                 "total_comments": total_comments,
                 "avg_comments_per_video": round(avg_comments_per_video, 2),
                 "estimated_positive_sentiment": round(positive_sentiment_estimate, 4),
-                "comment_engagement_ratio": round(total_comments / max(1, sum(v.get("views", 0) for v in videos)), 6)
+                "comment_engagement_ratio": round(total_comments / max(1, frame.views.sum()), 6)
             }
-            
+
         except Exception as e:
             logger.error(f"Error analyzing comment sentiment: {str(e)}")
             return {"status": "error", "error": str(e)}
@@ -1137,78 +1315,64 @@ class AdvancedAnalyticsEngine:
             logger.error(f"Error identifying primary audience: {str(e)}")
             return {}
     
-    def _calculate_growth_metrics(self, channel_data: Dict[str, Any], time_period: int) -> Dict[str, Any]:
+    def _calculate_growth_metrics(self, channel_data: Dict[str, Any], time_period: int, frame: Optional[VideoFrame] = None) -> Dict[str, Any]:
         """Calculate comprehensive growth metrics."""
         try:
-            videos = channel_data.get("videos", [])
-            if not videos:
+            frame = frame if frame is not None else VideoFrame.from_channel(channel_data)
+            if not len(frame):
                 return {"status": "insufficient_data"}
-            
+
             # Filter videos within time period
-            cutoff_date = datetime.now() - timedelta(days=time_period)
-            recent_videos = []
-            
-            for video in videos:
-                published_at = video.get("published_at")
-                if published_at:
-                    try:
-                        pub_date = datetime.fromisoformat(published_at.replace('Z', '+00:00'))
-                        if pub_date >= cutoff_date:
-                            recent_videos.append(video)
-                    except:
-                        continue
-            
-            if not recent_videos:
+            cutoff_ts = (datetime.now() - timedelta(days=time_period)).timestamp()
+            recent = frame.has_date & (frame.published_ts >= cutoff_ts)
+            recent_count = int(np.count_nonzero(recent))
+
+            if not recent_count:
                 return {"status": "no_recent_data"}
-            
+
             # Calculate growth metrics
-            total_views = sum(v.get("views", 0) for v in recent_videos)
-            total_subscribers_gained = sum(v.get("new_subscribers", 0) for v in recent_videos)
-            avg_views_per_video = total_views / len(recent_videos)
-            
+            total_views = as_number(frame.views[recent].sum())
+            total_subscribers_gained = as_number(frame.new_subscribers[recent].sum())
+            avg_views_per_video = total_views / recent_count
+
             # Calculate growth rates
-            video_count_growth = len(recent_videos) / time_period  # Videos per day
-            view_growth_rate = total_views / max(1, len(videos) - len(recent_videos))  # Compared to older videos
-            
+            video_count_growth = recent_count / time_period  # Videos per day
+            view_growth_rate = total_views / max(1, len(frame) - recent_count)  # Compared to older videos
+
             # Engagement growth
-            recent_engagement = np.mean([v.get("engagement_rate", 0) for v in recent_videos])
-            older_videos = [v for v in videos if v not in recent_videos]
-            older_engagement = np.mean([v.get("engagement_rate", 0) for v in older_videos]) if older_videos else recent_engagement
-            
+            recent_engagement = np.mean(frame.engagement[recent])
+            older = ~recent
+            older_engagement = np.mean(frame.engagement[older]) if older.any() else recent_engagement
+
             engagement_growth_rate = (recent_engagement - older_engagement) / max(0.001, older_engagement)
-            
+
+            order = frame.order_by_published_raw()
             return {
                 "time_period_days": time_period,
-                "videos_published": len(recent_videos),
+                "videos_published": recent_count,
                 "total_views": total_views,
                 "avg_views_per_video": round(avg_views_per_video, 2),
                 "subscribers_gained": total_subscribers_gained,
                 "video_frequency": round(video_count_growth, 2),
                 "view_growth_rate": round(view_growth_rate, 4),
                 "engagement_growth_rate": round(engagement_growth_rate, 4),
-                "growth_momentum": self._calculate_growth_momentum(recent_videos)
+                "growth_momentum": self._calculate_growth_momentum(frame.views[order[recent[order]]])
             }
-            
+
         except Exception as e:
             logger.error(f"Error calculating growth metrics: {str(e)}")
             return {"status": "error", "error": str(e)}
     
-    def _calculate_growth_momentum(self, recent_videos: List[Dict]) -> str:
-        """Calculate growth momentum based on recent performance."""
-        if len(recent_videos) < 3:
+    def _calculate_growth_momentum(self, views_by_date: np.ndarray) -> str:
+        """Calculate growth momentum from view counts in publication order."""
+        if len(views_by_date) < 3:
             return "insufficient_data"
-        
-        # Sort by publication date
-        sorted_videos = sorted(recent_videos, key=lambda x: x.get("published_at", ""))
-        
+
         # Compare first half vs second half performance
-        mid_point = len(sorted_videos) // 2
-        first_half = sorted_videos[:mid_point]
-        second_half = sorted_videos[mid_point:]
-        
-        first_half_avg = np.mean([v.get("views", 0) for v in first_half])
-        second_half_avg = np.mean([v.get("views", 0) for v in second_half])
-        
+        mid_point = len(views_by_date) // 2
+        first_half_avg = np.mean(views_by_date[:mid_point])
+        second_half_avg = np.mean(views_by_date[mid_point:])
+
         if second_half_avg > first_half_avg * 1.2:
             return "accelerating"
         elif second_half_avg < first_half_avg * 0.8:
@@ -1216,42 +1380,31 @@ class AdvancedAnalyticsEngine:
         else:
             return "steady"
     
-    def _analyze_growth_trends(self, channel_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _analyze_growth_trends(self, channel_data: Dict[str, Any], frame: Optional[VideoFrame] = None) -> Dict[str, Any]:
         """Analyze long-term growth trends."""
         try:
-            videos = channel_data.get("videos", [])
-            if len(videos) < 10:
+            frame = frame if frame is not None else VideoFrame.from_channel(channel_data)
+            if len(frame) < 10:
                 return {"status": "insufficient_data"}
-            
+
             # Sort videos by date
-            sorted_videos = sorted(videos, key=lambda x: x.get("published_at", ""))
-            
+            order = frame.order_by_published_raw()
+
             # Calculate rolling averages
-            window_size = min(5, len(sorted_videos) // 4)
+            window_size = min(5, len(frame) // 4)
             rolling_metrics = {
-                "views": [],
-                "engagement": [],
-                "subscribers": []
+                "views": rolling_mean(frame.views[order], window_size).tolist(),
+                "engagement": rolling_mean(frame.engagement[order], window_size).tolist(),
+                "subscribers": rolling_mean(frame.new_subscribers[order], window_size).tolist()
             }
-            
-            for i in range(window_size, len(sorted_videos) + 1):
-                window = sorted_videos[i-window_size:i]
-                
-                avg_views = np.mean([v.get("views", 0) for v in window])
-                avg_engagement = np.mean([v.get("engagement_rate", 0) for v in window])
-                avg_subscribers = np.mean([v.get("new_subscribers", 0) for v in window])
-                
-                rolling_metrics["views"].append(avg_views)
-                rolling_metrics["engagement"].append(avg_engagement)
-                rolling_metrics["subscribers"].append(avg_subscribers)
-            
+
             # Analyze trends
             trends = {}
             for metric, values in rolling_metrics.items():
                 if len(values) >= 3:
                     # Simple trend analysis using first and last values
                     trend_slope = (values[-1] - values[0]) / len(values)
-                    
+
                     if trend_slope > 0.1:
                         trends[metric] = "strong_upward"
                     elif trend_slope > 0:
@@ -1264,79 +1417,78 @@ class AdvancedAnalyticsEngine:
                         trends[metric] = "stable"
                 else:
                     trends[metric] = "insufficient_data"
-            
+
             # Overall trend assessment
             positive_trends = sum(1 for t in trends.values() if "upward" in t)
             negative_trends = sum(1 for t in trends.values() if "downward" in t)
-            
+
             if positive_trends > negative_trends:
                 overall_trend = "positive"
             elif negative_trends > positive_trends:
                 overall_trend = "negative"
             else:
                 overall_trend = "mixed"
-            
+
             return {
                 "individual_trends": trends,
                 "overall_trend": overall_trend,
                 "trend_strength": abs(positive_trends - negative_trends),
                 "rolling_metrics": rolling_metrics
             }
-            
+
         except Exception as e:
             logger.error(f"Error analyzing growth trends: {str(e)}")
             return {"status": "error", "error": str(e)}
     
-    def _analyze_growth_acceleration(self, channel_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _analyze_growth_acceleration(self, channel_data: Dict[str, Any], frame: Optional[VideoFrame] = None) -> Dict[str, Any]:
         """Analyze growth acceleration/deceleration patterns."""
         try:
-            videos = channel_data.get("videos", [])
-            if len(videos) < 6:
+            frame = frame if frame is not None else VideoFrame.from_channel(channel_data)
+            if len(frame) < 6:
                 return {"status": "insufficient_data"}
-            
+
             # Sort videos by date
-            sorted_videos = sorted(videos, key=lambda x: x.get("published_at", ""))
-            
+            order = frame.order_by_published_raw()
+            views = frame.views[order]
+            engagement = frame.engagement[order]
+
             # Divide into three periods
-            period_size = len(sorted_videos) // 3
+            period_size = len(order) // 3
             periods = {
-                "early": sorted_videos[:period_size],
-                "middle": sorted_videos[period_size:2*period_size],
-                "recent": sorted_videos[2*period_size:]
+                "early": slice(0, period_size),
+                "middle": slice(period_size, 2 * period_size),
+                "recent": slice(2 * period_size, None)
             }
-            
+
             # Calculate metrics for each period
             period_metrics = {}
-            for period_name, period_videos in periods.items():
-                avg_views = np.mean([v.get("views", 0) for v in period_videos])
-                avg_engagement = np.mean([v.get("engagement_rate", 0) for v in period_videos])
-                
+            for period_name, period in periods.items():
                 period_metrics[period_name] = {
-                    "avg_views": avg_views,
-                    "avg_engagement": avg_engagement,
-                    "video_count": len(period_videos)
+                    "avg_views": np.mean(views[period]),
+                    "avg_engagement": np.mean(engagement[period]),
+                    "video_count": len(views[period])
                 }
-            
+
             # Calculate acceleration
             view_acceleration = self._calculate_acceleration(
                 period_metrics["early"]["avg_views"],
                 period_metrics["middle"]["avg_views"],
                 period_metrics["recent"]["avg_views"]
             )
-            
+
             engagement_acceleration = self._calculate_acceleration(
                 period_metrics["early"]["avg_engagement"],
                 period_metrics["middle"]["avg_engagement"],
                 period_metrics["recent"]["avg_engagement"]
             )
-            
+
             return {
                 "period_metrics": period_metrics,
                 "view_acceleration": view_acceleration,
                 "engagement_acceleration": engagement_acceleration,
                 "overall_acceleration": self._classify_acceleration(view_acceleration, engagement_acceleration)
             }
-            
+
         except Exception as e:
             logger.error(f"Error analyzing growth acceleration: {str(e)}")
             return {"status": "error", "error": str(e)}
@@ -1369,44 +1521,34 @@ class AdvancedAnalyticsEngine:
         else:
             return "stable"
     
-    def _analyze_seasonal_patterns(self, channel_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _analyze_seasonal_patterns(self, channel_data: Dict[str, Any], frame: Optional[VideoFrame] = None) -> Dict[str, Any]:
         """Analyze seasonal performance patterns."""
         try:
-            videos = channel_data.get("videos", [])
-            if len(videos) < 12:  # Need at least a year of data
+            frame = frame if frame is not None else VideoFrame.from_channel(channel_data)
+            if len(frame) < 12:  # Need at least a year of data
                 return {"status": "insufficient_data"}
-            
+
             # Group videos by month
-            monthly_data = defaultdict(list)
-            
-            for video in videos:
-                published_at = video.get("published_at")
-                if published_at:
-                    try:
-                        pub_date = datetime.fromisoformat(published_at.replace('Z', '+00:00'))
-                        month = pub_date.strftime("%B")
-                        monthly_data[month].append(video)
-                    except:
-                        continue
-            
+            dated = frame.has_date
+            months = frame.month[dated].astype(np.int64)
+            counts, (avg_views, avg_engagement) = grouped_means(
+                months, frame.views[dated], frame.engagement[dated], minlength=13
+            )
+
             # Calculate monthly averages
             monthly_performance = {}
-            for month, month_videos in monthly_data.items():
-                if month_videos:
-                    avg_views = np.mean([v.get("views", 0) for v in month_videos])
-                    avg_engagement = np.mean([v.get("engagement_rate", 0) for v in month_videos])
-                    
-                    monthly_performance[month] = {
-                        "avg_views": round(avg_views, 2),
-                        "avg_engagement": round(avg_engagement, 4),
-                        "video_count": len(month_videos)
-                    }
-            
+            for month in first_seen_order(months):
+                monthly_performance[MONTH_NAMES[month - 1]] = {
+                    "avg_views": round(avg_views[month], 2),
+                    "avg_engagement": round(avg_engagement[month], 4),
+                    "video_count": int(counts[month])
+                }
+
             # Identify best and worst performing months
             if monthly_performance:
                 best_month = max(monthly_performance.items(), key=lambda x: x[1]["avg_views"])
                 worst_month = min(monthly_performance.items(), key=lambda x: x[1]["avg_views"])
-                
+
                 return {
                     "monthly_performance": monthly_performance,
                     "best_month": {
@@ -1419,9 +1561,9 @@ class AdvancedAnalyticsEngine:
                     },
                     "seasonality_strength": self._calculate_seasonality_strength(monthly_performance)
                 }
-            
+
             return {"status": "no_seasonal_data"}
-            
+
         except Exception as e:
             logger.error(f"Error analyzing seasonal patterns: {str(e)}")
             return {"status": "error", "error": str(e)}
@@ -1442,55 +1584,39 @@ class AdvancedAnalyticsEngine:
         
         return 0.0
     
-    def _forecast_growth(self, channel_data: Dict[str, Any], time_period: int) -> Dict[str, Any]:
+    def _forecast_growth(self, channel_data: Dict[str, Any], time_period: int, frame: Optional[VideoFrame] = None) -> Dict[str, Any]:
         """Forecast future growth based on historical data."""
         try:
-            videos = channel_data.get("videos", [])
-            if len(videos) < 5:
+            frame = frame if frame is not None else VideoFrame.from_channel(channel_data)
+            if len(frame) < 5:
                 return {"status": "insufficient_data"}
-            
+
             # Extract time series data
-            time_series_data = []
-            for video in videos:
-                published_at = video.get("published_at")
-                if published_at:
-                    try:
-                        pub_date = datetime.fromisoformat(published_at.replace('Z', '+00:00'))
-                        days_ago = (datetime.now(pub_date.tzinfo) - pub_date).days
-                        
-                        time_series_data.append({
-                            "days_ago": days_ago,
-                            "views": video.get("views", 0),
-                            "engagement": video.get("engagement_rate", 0)
-                        })
-                    except:
-                        continue
-            
-            if len(time_series_data) < 3:
+            dated = np.flatnonzero(frame.has_date)
+            if len(dated) < 3:
                 return {"status": "insufficient_time_series_data"}
-            
+
             # Sort by days ago (most recent first)
-            time_series_data.sort(key=lambda x: x["days_ago"])
-            
+            days_ago = frame.days_old()[dated]
+            order = np.argsort(days_ago, kind="stable")
+
             # Simple linear trend forecasting
-            recent_data = time_series_data[:min(10, len(time_series_data))]
-            
-            # Calculate trend
-            days = [d["days_ago"] for d in recent_data]
-            views = [d["views"] for d in recent_data]
-            
+            recent = order[:min(10, len(order))]
+            days = days_ago[recent]
+            views = frame.views[dated][recent]
+
             if len(days) >= 2:
                 # Simple linear regression
                 view_trend = (views[-1] - views[0]) / (days[-1] - days[0]) if days[-1] != days[0] else 0
-                
+
                 # Forecast next period
                 forecast_days = min(30, time_period)  # Forecast up to 30 days
                 forecasted_views = views[-1] + (view_trend * forecast_days)
-                
+
                 # Calculate confidence based on trend consistency
                 view_variance = np.var(views)
                 confidence = max(0.1, min(0.9, 1 - (view_variance / max(1, np.mean(views)))))
-                
+
                 return {
                     "forecast_period_days": forecast_days,
                     "forecasted_avg_views": max(0, round(forecasted_views, 2)),
@@ -1502,110 +1628,88 @@ class AdvancedAnalyticsEngine:
                         "high": round(forecasted_views * (1 + (1 - confidence)), 2)
                     }
                 }
-            
+
             return {"status": "insufficient_trend_data"}
-            
+
         except Exception as e:
             logger.error(f"Error forecasting growth: {str(e)}")
             return {"status": "error", "error": str(e)}
     
-    def _analyze_revenue_per_view(self, videos: List[Dict]) -> Dict[str, Any]:
+    def _analyze_revenue_per_view(self, videos: Union[VideoFrame, List[Dict]]) -> Dict[str, Any]:
         """Analyze revenue per view metrics."""
         try:
-            revenue_data = []
-            
-            for video in videos:
-                views = video.get("views", 0)
-                ad_revenue = video.get("ad_revenue", 0)
-                sponsorship_revenue = video.get("sponsorship_revenue", 0)
-                affiliate_revenue = video.get("affiliate_revenue", 0)
-                
-                total_revenue = ad_revenue + sponsorship_revenue + affiliate_revenue
-                rpv = total_revenue / max(1, views)
-                
-                revenue_data.append({
-                    "views": views,
-                    "total_revenue": total_revenue,
-                    "rpv": rpv,
-                    "ad_revenue": ad_revenue,
-                    "sponsorship_revenue": sponsorship_revenue,
-                    "affiliate_revenue": affiliate_revenue
-                })
-            
-            if not revenue_data:
+            frame = VideoFrame.ensure(videos)
+            if not len(frame):
                 return {"status": "no_revenue_data"}
-            
+
+            rpv = frame.revenue / np.maximum(1, frame.views)
+
             # Calculate averages
-            avg_rpv = np.mean([d["rpv"] for d in revenue_data])
-            median_rpv = np.median([d["rpv"] for d in revenue_data])
-            total_revenue = sum(d["total_revenue"] for d in revenue_data)
-            total_views = sum(d["views"] for d in revenue_data)
-            
+            avg_rpv = np.mean(rpv)
+            median_rpv = np.median(rpv)
+            total_revenue = frame.revenue.sum()
+            total_views = as_number(frame.views.sum())
+
             # Identify high-performing videos
-            high_rpv_videos = [d for d in revenue_data if d["rpv"] > avg_rpv * 1.5]
-            
+            high_rpv_video_count = int(np.count_nonzero(rpv > avg_rpv * 1.5))
+
             return {
                 "average_rpv": round(avg_rpv, 6),
                 "median_rpv": round(median_rpv, 6),
                 "total_revenue": round(total_revenue, 2),
                 "total_views": total_views,
                 "overall_rpv": round(total_revenue / max(1, total_views), 6),
-                "high_rpv_video_count": len(high_rpv_videos),
-                "revenue_consistency": self._calculate_revenue_consistency(revenue_data)
+                "high_rpv_video_count": high_rpv_video_count,
+                "revenue_consistency": self._calculate_revenue_consistency(rpv)
             }
-            
+
         except Exception as e:
             logger.error(f"Error analyzing revenue per view: {str(e)}")
             return {"status": "error", "error": str(e)}
     
-    def _calculate_revenue_consistency(self, revenue_data: List[Dict]) -> float:
+    def _calculate_revenue_consistency(self, rpv_values: np.ndarray) -> float:
         """Calculate revenue consistency score."""
-        if len(revenue_data) < 2:
+        if len(rpv_values) < 2:
             return 0.0
-        
-        rpv_values = [d["rpv"] for d in revenue_data]
+
         mean_rpv = np.mean(rpv_values)
         std_rpv = np.std(rpv_values)
-        
+
         if mean_rpv == 0:
             return 0.0
-        
+
         coefficient_of_variation = std_rpv / mean_rpv
         consistency = max(0, 1 - coefficient_of_variation)
-        
+
         return round(consistency, 4)
     
-    def _analyze_monetization_channels(self, videos: List[Dict]) -> Dict[str, Any]:
+    def _analyze_monetization_channels(self, videos: Union[VideoFrame, List[Dict]]) -> Dict[str, Any]:
         """Analyze different monetization channels."""
         try:
+            frame = VideoFrame.ensure(videos)
             channel_totals = {
-                "ad_revenue": 0,
-                "sponsorship_revenue": 0,
-                "affiliate_revenue": 0
+                "ad_revenue": as_number(frame.ad_revenue.sum()),
+                "sponsorship_revenue": as_number(frame.sponsorship_revenue.sum()),
+                "affiliate_revenue": as_number(frame.affiliate_revenue.sum())
             }
-            
-            for video in videos:
-                channel_totals["ad_revenue"] += video.get("ad_revenue", 0)
-                channel_totals["sponsorship_revenue"] += video.get("sponsorship_revenue", 0)
-                channel_totals["affiliate_revenue"] += video.get("affiliate_revenue", 0)
-            
+
             total_revenue = sum(channel_totals.values())
-            
+
             if total_revenue == 0:
                 return {"status": "no_revenue_data"}
-            
+
             # Calculate percentages
             channel_percentages = {
                 channel: round((revenue / total_revenue) * 100, 2)
                 for channel, revenue in channel_totals.items()
             }
-            
+
             # Identify primary revenue source
             primary_channel = max(channel_totals.items(), key=lambda x: x[1])
-            
+
             # Calculate diversification score
             diversification_score = self._calculate_diversification_score(channel_percentages)
-            
+
             return {
                 "revenue_by_channel": channel_totals,
                 "percentage_by_channel": channel_percentages,
@@ -1617,7 +1721,7 @@ class AdvancedAnalyticsEngine:
                 "diversification_score": diversification_score,
                 "total_revenue": total_revenue
             }
-            
+
         except Exception as e:
             logger.error(f"Error analyzing monetization channels: {str(e)}")
             return {"status": "error", "error": str(e)}
@@ -1640,160 +1744,125 @@ class AdvancedAnalyticsEngine:
         
         return round(diversification, 4)
     
-    def _identify_revenue_opportunities(self, videos: List[Dict]) -> List[Dict[str, Any]]:
+    def _identify_revenue_opportunities(self, videos: Union[VideoFrame, List[Dict]]) -> List[Dict[str, Any]]:
         """Identify revenue optimization opportunities."""
         try:
+            frame = VideoFrame.ensure(videos)
             opportunities = []
-            
+
             # Analyze undermonetized high-view videos
-            high_view_videos = [v for v in videos if v.get("views", 0) > 10000]
-            
-            for video in high_view_videos:
-                total_revenue = (video.get("ad_revenue", 0) + 
-                               video.get("sponsorship_revenue", 0) + 
-                               video.get("affiliate_revenue", 0))
-                
-                expected_revenue = video.get("views", 0) * 0.001  # $1 per 1000 views baseline
-                
-                if total_revenue < expected_revenue * 0.5:  # Less than 50% of expected
-                    opportunities.append({
-                        "type": "undermonetized_content",
-                        "video_title": video.get("title", ""),
-                        "views": video.get("views", 0),
-                        "current_revenue": total_revenue,
-                        "potential_revenue": expected_revenue,
-                        "opportunity_value": expected_revenue - total_revenue
-                    })
-            
+            expected_revenue = frame.views * 0.001  # $1 per 1000 views baseline
+            undermonetized = np.flatnonzero(
+                (frame.views > 10000) & (frame.revenue < expected_revenue * 0.5)  # Less than 50% of expected
+            )
+            opportunity_value = expected_revenue[undermonetized] - frame.revenue[undermonetized]
+            # Only the best ten can survive the final cut, so only those become dicts
+            top = undermonetized[np.argsort(-opportunity_value, kind="stable")[:10]]
+
+            for i in top:
+                opportunities.append({
+                    "type": "undermonetized_content",
+                    "video_title": frame.titles[i],
+                    "views": frame.videos[i].get("views", 0),
+                    "current_revenue": frame.revenue[i],
+                    "potential_revenue": expected_revenue[i],
+                    "opportunity_value": expected_revenue[i] - frame.revenue[i]
+                })
+
             # Identify sponsorship opportunities
-            high_engagement_videos = [v for v in videos if v.get("engagement_rate", 0) > 0.05]
-            unsponsored_videos = [v for v in high_engagement_videos if v.get("sponsorship_revenue", 0) == 0]
-            
-            if unsponsored_videos:
-                avg_views = np.mean([v.get("views", 0) for v in unsponsored_videos])
+            unsponsored = (frame.engagement > 0.05) & (frame.sponsorship_revenue == 0)
+
+            if unsponsored.any():
+                unsponsored_count = int(np.count_nonzero(unsponsored))
+                avg_views = np.mean(frame.views[unsponsored])
                 opportunities.append({
                     "type": "sponsorship_opportunity",
-                    "video_count": len(unsponsored_videos),
+                    "video_count": unsponsored_count,
                     "avg_views": avg_views,
-                    "potential_revenue": avg_views * 0.002 * len(unsponsored_videos)  # $2 per 1000 views
+                    "potential_revenue": avg_views * 0.002 * unsponsored_count  # $2 per 1000 views
                 })
-            
+
             # Sort by opportunity value
             opportunities.sort(key=lambda x: x.get("opportunity_value", x.get("potential_revenue", 0)), reverse=True)
-            
+
             return opportunities[:10]  # Top 10 opportunities
-            
+
         except Exception as e:
             logger.error(f"Error identifying revenue opportunities: {str(e)}")
             return []
     
-    def _analyze_cpm_trends(self, videos: List[Dict]) -> Dict[str, Any]:
+    def _analyze_cpm_trends(self, videos: Union[VideoFrame, List[Dict]]) -> Dict[str, Any]:
         """Analyze CPM (Cost Per Mille) trends."""
         try:
-            cpm_data = []
-            
-            for video in videos:
-                views = video.get("views", 0)
-                ad_revenue = video.get("ad_revenue", 0)
-                
-                if views > 0:
-                    cpm = (ad_revenue / views) * 1000  # CPM calculation
-                    published_at = video.get("published_at")
-                    
-                    if published_at:
-                        try:
-                            pub_date = datetime.fromisoformat(published_at.replace('Z', '+00:00'))
-                            cpm_data.append({
-                                "cpm": cpm,
-                                "date": pub_date,
-                                "views": views,
-                                "revenue": ad_revenue
-                            })
-                        except:
-                            continue
-            
-            if not cpm_data:
+            frame = VideoFrame.ensure(videos)
+
+            # Dated videos with views, sorted by publication time
+            order = frame.order_by_published_ts(frame.views > 0)
+            if not len(order):
                 return {"status": "no_cpm_data"}
-            
-            # Sort by date
-            cpm_data.sort(key=lambda x: x["date"])
-            
+
+            cpm = (frame.ad_revenue[order] / frame.views[order]) * 1000  # CPM calculation
+
             # Calculate averages
-            avg_cpm = np.mean([d["cpm"] for d in cpm_data])
-            median_cpm = np.median([d["cpm"] for d in cpm_data])
-            
+            avg_cpm = np.mean(cpm)
+            median_cpm = np.median(cpm)
+
             # Analyze trend
-            if len(cpm_data) >= 5:
-                recent_cpm = np.mean([d["cpm"] for d in cpm_data[-5:]])
-                older_cpm = np.mean([d["cpm"] for d in cpm_data[:-5]])
-                
+            if len(cpm) >= 5:
+                recent_cpm = np.mean(cpm[-5:])
+                older_cpm = np.mean(cpm[:-5]) if len(cpm) > 5 else np.nan
+
                 cpm_trend = "increasing" if recent_cpm > older_cpm * 1.05 else "decreasing" if recent_cpm < older_cpm * 0.95 else "stable"
             else:
                 cpm_trend = "insufficient_data"
-            
+
             return {
                 "average_cpm": round(avg_cpm, 4),
                 "median_cpm": round(median_cpm, 4),
                 "cpm_trend": cpm_trend,
                 "cpm_range": {
-                    "min": round(min(d["cpm"] for d in cpm_data), 4),
-                    "max": round(max(d["cpm"] for d in cpm_data), 4)
+                    "min": round(float(cpm.min()), 4),
+                    "max": round(float(cpm.max()), 4)
                 },
-                "data_points": len(cpm_data)
+                "data_points": len(cpm)
             }
-            
+
         except Exception as e:
             logger.error(f"Error analyzing CPM trends: {str(e)}")
             return {"status": "error", "error": str(e)}
     
-    def _forecast_revenue(self, videos: List[Dict]) -> Dict[str, Any]:
+    def _forecast_revenue(self, videos: Union[VideoFrame, List[Dict]]) -> Dict[str, Any]:
         """Forecast future revenue based on historical data."""
         try:
-            # Extract revenue time series
-            revenue_data = []
-            
-            for video in videos:
-                published_at = video.get("published_at")
-                if published_at:
-                    try:
-                        pub_date = datetime.fromisoformat(published_at.replace('Z', '+00:00'))
-                        total_revenue = (video.get("ad_revenue", 0) + 
-                                       video.get("sponsorship_revenue", 0) + 
-                                       video.get("affiliate_revenue", 0))
-                        
-                        revenue_data.append({
-                            "date": pub_date,
-                            "revenue": total_revenue,
-                            "views": video.get("views", 0)
-                        })
-                    except:
-                        continue
-            
-            if len(revenue_data) < 3:
+            frame = VideoFrame.ensure(videos)
+
+            # Extract revenue time series sorted by date
+            order = frame.order_by_published_ts()
+            if len(order) < 3:
                 return {"status": "insufficient_data"}
-            
-            # Sort by date
-            revenue_data.sort(key=lambda x: x["date"])
-            
+
             # Calculate monthly revenue
-            monthly_revenue = defaultdict(float)
-            for data in revenue_data:
-                month_key = data["date"].strftime("%Y-%m")
-                monthly_revenue[month_key] += data["revenue"]
-            
+            year_months = frame.year_month[order]
+            months, inverse = np.unique(year_months, return_inverse=True)
+            totals = np.bincount(inverse, weights=frame.revenue[order])
+            monthly_revenue = {}
+            for month_index in first_seen_order(inverse):
+                year, month = divmod(int(months[month_index]), 12)
+                monthly_revenue[f"{year:04d}-{month + 1:02d}"] = float(totals[month_index])
+
             if len(monthly_revenue) < 2:
                 return {"status": "insufficient_monthly_data"}
-            
+
             # Simple trend-based forecasting
             revenue_values = list(monthly_revenue.values())
             recent_avg = np.mean(revenue_values[-3:]) if len(revenue_values) >= 3 else revenue_values[-1]
-            
+
             # Calculate growth rate
             if len(revenue_values) >= 2:
                 growth_rate = (revenue_values[-1] - revenue_values[0]) / len(revenue_values)
             else:
                 growth_rate = 0
-            
+
             # Forecast next 3 months
             forecasts = []
             for i in range(1, 4):
@@ -1802,31 +1871,31 @@ class AdvancedAnalyticsEngine:
                     "month": i,
                     "forecasted_revenue": max(0, round(forecasted_revenue, 2))
                 })
-            
+
             return {
-                "historical_monthly_revenue": dict(monthly_revenue),
+                "historical_monthly_revenue": monthly_revenue,
                 "recent_monthly_average": round(recent_avg, 2),
                 "growth_rate": round(growth_rate, 2),
                 "forecasts": forecasts,
                 "total_forecasted_revenue": sum(f["forecasted_revenue"] for f in forecasts)
             }
-            
+
         except Exception as e:
             logger.error(f"Error forecasting revenue: {str(e)}")
             return {"status": "error", "error": str(e)}
     
-    def _estimate_market_position(self, channel_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _estimate_market_position(self, channel_data: Dict[str, Any], frame: Optional[VideoFrame] = None) -> Dict[str, Any]:
         """Estimate market position based on channel metrics."""
         try:
-            videos = channel_data.get("videos", [])
-            if not videos:
+            frame = frame if frame is not None else VideoFrame.from_channel(channel_data)
+            if not len(frame):
                 return {"status": "insufficient_data"}
-            
+
             # Calculate key metrics
-            total_views = sum(v.get("views", 0) for v in videos)
-            avg_views = total_views / len(videos)
-            avg_engagement = np.mean([v.get("engagement_rate", 0) for v in videos])
-            
+            total_views = as_number(frame.views.sum())
+            avg_views = total_views / len(frame)
+            avg_engagement = np.mean(frame.engagement)
+
             # Estimate market position based on benchmarks
             # These would typically come from industry data
             benchmarks = {
@@ -1835,22 +1904,22 @@ class AdvancedAnalyticsEngine:
                 "medium": {"views": 100000, "engagement": 0.05},
                 "large": {"views": 1000000, "engagement": 0.06}
             }
-            
+
             position = "micro"
             for tier, benchmark in benchmarks.items():
                 if avg_views >= benchmark["views"] and avg_engagement >= benchmark["engagement"]:
                     position = tier
-            
+
             return {
                 "estimated_tier": position,
                 "avg_views": round(avg_views, 2),
                 "avg_engagement": round(avg_engagement, 4),
                 "total_views": total_views,
-                "video_count": len(videos),
+                "video_count": len(frame),
                 "benchmarks": benchmarks,
                 "growth_potential": self._calculate_growth_potential(position, avg_views, avg_engagement)
             }
-            
+
         except Exception as e:
             logger.error(f"Error estimating market position: {str(e)}")
             return {"status": "error", "error": str(e)}
@@ -2072,6 +2141,7 @@ async def get_content_optimization_suggestions_endpoint(channel_data: Dict[str,
 # Export the analytics class and endpoints
 __all__ = [
     'AdvancedAnalyticsEngine',
+    'shutdown_section_executors',
     'get_advanced_analytics_endpoint',
     'get_performance_insights_endpoint',
     'get_growth_forecast_endpoint',
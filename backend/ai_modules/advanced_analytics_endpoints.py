@@ -2,100 +2,172 @@ from fastapi import APIRouter, HTTPException, Query
 from typing import List, Dict, Any, Optional
 from .advanced_analytics_utils import *
 from ..database import get_all_ideas, get_db_connection
+from .analytics_section_cache import AnalyticsSection, ComprehensiveAnalyticsCache, video_ideas_watermark
 from ..utils import APIResponse
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+CHANNEL_CONTEXT = {"subscriber_count": 1000}
+REVENUE_FIELDS = ("views", "category", "revenue_total", "ad_revenue", "sponsorship_revenue", "affiliate_revenue")
+
+# Each section names the video fields it reads so that a data change only
+# recomputes the sections that can see it (fields=None means "everything").
+COMPREHENSIVE_SECTIONS = {
+    section.name: section
+    for section in (
+        AnalyticsSection("overview", lambda v, ctx: generate_analytics_overview(v)),
+        AnalyticsSection(
+            "performance_analysis",
+            lambda v, ctx: analyze_performance_metrics(v),
+            fields=("title", "category", "views", "performance_score", "engagement_score", "published_at"),
+        ),
+        AnalyticsSection(
+            "engagement_analysis",
+            lambda v, ctx: analyze_engagement_patterns(v),
+            fields=("title", "category", "views", "engagement_score", "published_at"),
+        ),
+        AnalyticsSection(
+            "revenue_analysis",
+            lambda v, ctx: analyze_revenue_streams(v),
+            fields=REVENUE_FIELDS,
+        ),
+        AnalyticsSection(
+            "content_analysis",
+            lambda v, ctx: analyze_content_patterns(v),
+            fields=("title", "category", "views", "duration", "performance_score", "engagement_score"),
+        ),
+        AnalyticsSection(
+            "growth_metrics",
+            lambda v, ctx: calculate_growth_metrics(v),
+            fields=("views", "published_at", "revenue_total"),
+        ),
+        AnalyticsSection(
+            "competitive_analysis",
+            lambda v, ctx: generate_competitive_analysis(v, ctx["category"] or "general"),
+            context_keys=("category",),
+        ),
+        AnalyticsSection(
+            "roi_analysis",
+            lambda v, ctx: calculate_content_roi(v),
+            fields=REVENUE_FIELDS + ("duration",),
+        ),
+        AnalyticsSection(
+            "predictions",
+            lambda v, ctx: {
+                "performance_trends": predict_trends(v),
+                "revenue_forecast": forecast_revenue(v),
+                "growth_projections": calculate_audience_growth_metrics(v, CHANNEL_CONTEXT),
+                "performance_changes": predict_performance_changes(v)
+            },
+        ),
+        AnalyticsSection("insights", lambda v, ctx: generate_advanced_insights(v, CHANNEL_CONTEXT)),
+        AnalyticsSection(
+            "recommendations",
+            lambda v, ctx: {
+                "priority_actions": identify_priority_actions(v, CHANNEL_CONTEXT),
+                "content_recommendations": generate_content_recommendations(v),
+                "monetization_opportunities": identify_monetization_opportunities(v),
+                "seo_recommendations": generate_seo_recommendations(v)
+            },
+        ),
+    )
+}
+
+comprehensive_cache = ComprehensiveAnalyticsCache()
+
+
+def _load_comprehensive_videos(
+    start_date: Optional[str],
+    end_date: Optional[str],
+    category: Optional[str]
+) -> List[Dict[str, Any]]:
+    """Load video ideas in analytics format with the request filters applied."""
+    videos = get_all_ideas()
+
+    # Convert database format to analytics format
+    analytics_videos = []
+    for video in videos:
+        analytics_video = {
+            "id": video.get("id"),
+            "title": video.get("title", ""),
+            "category": video.get("category", "unknown"),
+            "views": video.get("expected_views", 0),  # Using expected_views as proxy
+            "duration": 600,  # Default 10 minutes
+            "published_at": video.get("created_at", ""),
+            "engagement_score": 0.035,  # Default engagement rate
+            "performance_score": min(video.get("expected_views", 0) / 100, 100),
+            "revenue_total": video.get("expected_views", 0) * 0.01,  # $0.01 per view
+            "ad_revenue": video.get("expected_views", 0) * 0.004,
+            "sponsorship_revenue": video.get("expected_views", 0) * 0.004,
+            "affiliate_revenue": video.get("expected_views", 0) * 0.002
+        }
+        analytics_videos.append(analytics_video)
+
+    # Apply filters
+    if start_date:
+        analytics_videos = [v for v in analytics_videos if v.get("published_at", "") >= start_date]
+    if end_date:
+        analytics_videos = [v for v in analytics_videos if v.get("published_at", "") <= end_date]
+    if category:
+        analytics_videos = [v for v in analytics_videos if v.get("category", "").lower() == category.lower()]
+    return analytics_videos
+
+
 @router.get("/api/v1/analytics/comprehensive")
 async def get_comprehensive_analytics(
     start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
     category: Optional[str] = Query(None, description="Filter by category"),
-    include_predictions: bool = Query(True, description="Include predictive analytics")
+    include_predictions: bool = Query(True, description="Include predictive analytics"),
+    sections: Optional[str] = Query(None, description="Comma-separated subset of sections to compute")
 ):
     """
     Get comprehensive analytics with advanced insights.
-    
+
+    Reports are cached per (filters, video_ideas watermark), and each section
+    is memoized on its own inputs, so unchanged data is served from memory
+    and a data change only recomputes the sections it affects.
+
     Args:
         start_date: Filter videos from this date
         end_date: Filter videos until this date
         category: Filter by specific category
         include_predictions: Whether to include predictive analytics
-        
+        sections: Only compute these sections (default: all)
+
     Returns:
         APIResponse: Comprehensive analytics data
     """
     try:
-        # Get video data from database
-        videos = get_all_ideas()
-        
-        # Convert database format to analytics format
-        analytics_videos = []
-        for video in videos:
-            analytics_video = {
-                "id": video.get("id"),
-                "title": video.get("title", ""),
-                "category": video.get("category", "unknown"),
-                "views": video.get("expected_views", 0),  # Using expected_views as proxy
-                "duration": 600,  # Default 10 minutes
-                "published_at": video.get("created_at", ""),
-                "engagement_score": 0.035,  # Default engagement rate
-                "performance_score": min(video.get("expected_views", 0) / 100, 100),
-                "revenue_total": video.get("expected_views", 0) * 0.01,  # $0.01 per view
-                "ad_revenue": video.get("expected_views", 0) * 0.004,
-                "sponsorship_revenue": video.get("expected_views", 0) * 0.004,
-                "affiliate_revenue": video.get("expected_views", 0) * 0.002
-            }
-            analytics_videos.append(analytics_video)
-        
-        # Apply filters
-        if start_date:
-            analytics_videos = [v for v in analytics_videos if v.get("published_at", "") >= start_date]
-        if end_date:
-            analytics_videos = [v for v in analytics_videos if v.get("published_at", "") <= end_date]
-        if category:
-            analytics_videos = [v for v in analytics_videos if v.get("category", "").lower() == category.lower()]
-        
-        # Generate comprehensive analytics
-        analytics_data = {
-            "overview": generate_analytics_overview(analytics_videos),
-            "performance_analysis": analyze_performance_metrics(analytics_videos),
-            "engagement_analysis": analyze_engagement_patterns(analytics_videos),
-            "revenue_analysis": analyze_revenue_streams(analytics_videos),
-            "content_analysis": analyze_content_patterns(analytics_videos),
-            "growth_metrics": calculate_growth_metrics(analytics_videos),
-            "competitive_analysis": generate_competitive_analysis(analytics_videos, category or "general"),
-            "roi_analysis": calculate_content_roi(analytics_videos)
-        }
-        
-        # Add predictive analytics if requested
-        if include_predictions:
-            analytics_data["predictions"] = {
-                "performance_trends": predict_trends(analytics_videos),
-                "revenue_forecast": forecast_revenue(analytics_videos),
-                "growth_projections": calculate_audience_growth_metrics(analytics_videos, {"subscriber_count": 1000}),
-                "performance_changes": predict_performance_changes(analytics_videos)
-            }
-        
-        # Add advanced insights
-        analytics_data["insights"] = generate_advanced_insights(analytics_videos, {"subscriber_count": 1000})
-        
-        # Add recommendations
-        analytics_data["recommendations"] = {
-            "priority_actions": identify_priority_actions(analytics_videos, {"subscriber_count": 1000}),
-            "content_recommendations": generate_content_recommendations(analytics_videos),
-            "monetization_opportunities": identify_monetization_opportunities(analytics_videos),
-            "seo_recommendations": generate_seo_recommendations(analytics_videos)
-        }
-        
+        if sections:
+            requested = [name.strip() for name in sections.split(",") if name.strip()]
+            unknown = [name for name in requested if name not in COMPREHENSIVE_SECTIONS]
+            if unknown:
+                raise HTTPException(status_code=400, detail=f"Unknown sections: {', '.join(unknown)}")
+        else:
+            requested = list(COMPREHENSIVE_SECTIONS)
+        if not include_predictions:
+            requested = [name for name in requested if name != "predictions"]
+
+        filters = {"start_date": start_date, "end_date": end_date, "category": category}
+        analytics_data = await comprehensive_cache.get_report(
+            filters=filters,
+            version=video_ideas_watermark(),
+            sections=[COMPREHENSIVE_SECTIONS[name] for name in requested],
+            load_videos=lambda: _load_comprehensive_videos(start_date, end_date, category),
+            context={"category": category},
+        )
+
         return APIResponse(
             status="success",
             data=analytics_data,
             message="Comprehensive analytics generated successfully"
         )
-        
+
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error generating comprehensive analytics: {str(e)}")
         raise HTTPException(
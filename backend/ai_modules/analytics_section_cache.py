@@ -0,0 +1,144 @@
+"""Result and per-section memoization for the comprehensive analytics endpoint.
+
+A full report is cached under ``(filters, data version)`` where the data
+version is a cheap watermark over ``video_ideas`` (row count plus the most
+recent ``updated_at``/``created_at``).  When the watermark moves, the report
+is rebuilt section by section: each section declares the video fields it
+reads, and a section is only recomputed when the fingerprint of those
+fields (plus its context arguments) changed.
+"""
+
+import hashlib
+import logging
+import sqlite3
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ..database import get_db_connection
+from ..utils.cache import CacheManager
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_QUERIES = (
+    "SELECT COUNT(*), MAX(COALESCE(updated_at, created_at)) FROM video_ideas",
+    "SELECT COUNT(*), MAX(created_at) FROM video_ideas",
+)
+
+
+@dataclass(frozen=True)
+class AnalyticsSection:
+    """A lazily computed report section.
+
+    ``fields`` lists the video keys the section reads; ``None`` means the
+    section depends on every field.  ``compute`` receives the filtered
+    videos and the shared request context.
+    """
+    name: str
+    compute: Callable[[List[Dict[str, Any]], Dict[str, Any]], Any]
+    fields: Optional[Tuple[str, ...]] = None
+    context_keys: Tuple[str, ...] = ()
+
+
+def video_ideas_watermark() -> Tuple[int, Optional[str]]:
+    """Return ``(row_count, max_updated)`` for ``video_ideas``.
+
+    Writers that change a row without touching ``updated_at`` are not
+    detected until the entry TTL expires.
+    """
+    conn = get_db_connection()
+    try:
+        for query in WATERMARK_QUERIES:
+            try:
+                count, latest = conn.execute(query).fetchone()
+                return int(count or 0), latest
+            except sqlite3.Error:
+                continue
+        return 0, None
+    finally:
+        conn.close()
+
+
+def _digest(value: Any) -> str:
+    return hashlib.blake2b(repr(value).encode("utf-8"), digest_size=12).hexdigest()
+
+
+def fingerprint_videos(videos: Sequence[Dict[str, Any]], fields: Optional[Iterable[str]]) -> str:
+    """Hash the projection of ``videos`` onto ``fields`` in list order."""
+    hasher = hashlib.blake2b(digest_size=12)
+    if fields is None:
+        for video in videos:
+            hasher.update(repr(sorted(video.items())).encode("utf-8"))
+    else:
+        fields = tuple(fields)
+        for video in videos:
+            hasher.update(repr(tuple(video.get(field) for field in fields)).encode("utf-8"))
+    hasher.update(str(len(videos)).encode("utf-8"))
+    return hasher.hexdigest()
+
+
+class ComprehensiveAnalyticsCache:
+    """Two-level memo: whole reports by data version, sections by input."""
+
+    def __init__(self, cache: Optional[CacheManager] = None, ttl: int = 3600):
+        self.cache = cache or CacheManager(max_size=512, default_ttl=ttl)
+        self.ttl = ttl
+        self.stats = {
+            "result_hits": 0,
+            "result_misses": 0,
+            "section_hits": 0,
+            "section_computes": 0,
+        }
+
+    async def get_report(
+        self,
+        filters: Dict[str, Any],
+        version: Any,
+        sections: Sequence[AnalyticsSection],
+        load_videos: Callable[[], List[Dict[str, Any]]],
+        context: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Return the report for ``sections``, computing only what is stale.
+
+        ``load_videos`` is only called when the report itself is not cached.
+        """
+        names = ",".join(section.name for section in sections)
+        result_key = f"analytics:comprehensive:{_digest(sorted(filters.items()))}:{_digest(version)}:{names}"
+        cached = await self.cache.get(result_key)
+        if cached is not None:
+            self.stats["result_hits"] += 1
+            return cached
+
+        self.stats["result_misses"] += 1
+        videos = load_videos()
+        context = context or {}
+        report = {}
+        for section in sections:
+            report[section.name] = await self._section(section, videos, context)
+
+        await self.cache.set(result_key, report, expire=self.ttl)
+        return report
+
+    async def _section(
+        self,
+        section: AnalyticsSection,
+        videos: List[Dict[str, Any]],
+        context: Dict[str, Any],
+    ) -> Any:
+        section_context = {key: context.get(key) for key in section.context_keys}
+        key = (
+            f"analytics:section:{section.name}:"
+            f"{fingerprint_videos(videos, section.fields)}:{_digest(sorted(section_context.items()))}"
+        )
+        computed = False
+
+        async def compute():
+            nonlocal computed
+            computed = True
+            return section.compute(videos, context)
+
+        value = await self.cache.get_or_set(key, compute, expire=self.ttl)
+        self.stats["section_computes" if computed else "section_hits"] += 1
+        return value
+
+    async def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "cache": await self.cache.get_stats()}
@@ -0,0 +1,352 @@
+"""Batch ``comprehensive_channel_analysis`` over many channels.
+
+Channels are sharded across a process pool and results are yielded in
+completion order, so callers (and the NDJSON endpoint) can stream them as
+they arrive.  At most ``max_in_flight`` channel payloads are held at any
+time: the input iterable is only advanced when a slot frees up.
+
+Server callers pass ``shared_pool=True`` so every concurrent batch runs on
+one process pool sized by ``BATCH_ANALYSIS_WORKERS``, however many
+requests arrive at once.
+
+Each input item is either a channel payload (a dict with ``videos``) or a
+channel ID (a string, or a dict carrying only ``channel_id``) that is
+resolved through ``load_channel`` just before it is submitted.  Failures are
+reported per channel and never abort the batch.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, Iterable, Optional, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+SPOOL_READ_SIZE = 64 * 1024
+BATCH_ANALYSIS_WORKERS = max(1, int(os.getenv("BATCH_ANALYSIS_WORKERS", str(os.cpu_count() or 1))))
+
+ChannelInput = Union[str, Dict[str, Any]]
+ChannelLoader = Callable[[str], Awaitable[Dict[str, Any]]]
+
+# Workers start from a clean server process rather than forking the
+# (multi-threaded) API process, whose held locks would deadlock the child
+_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+# Engine reused by every channel a worker process analyses
+_worker_engine = None
+
+_shared_executor: Optional[ProcessPoolExecutor] = None
+_shared_executor_lock = threading.Lock()
+
+
+def get_shared_pool(broken: Optional[ProcessPoolExecutor] = None) -> ProcessPoolExecutor:
+    """Server-wide analysis pool; pass a pool that broke to have it replaced once."""
+    global _shared_executor
+    with _shared_executor_lock:
+        if _shared_executor is not None and _shared_executor is broken:
+            _shared_executor.shutdown(wait=False, cancel_futures=True)
+            _shared_executor = None
+        if _shared_executor is None:
+            _shared_executor = ProcessPoolExecutor(max_workers=BATCH_ANALYSIS_WORKERS, mp_context=_MP_CONTEXT)
+        return _shared_executor
+
+
+def shutdown_shared_pool() -> None:
+    global _shared_executor
+    with _shared_executor_lock:
+        if _shared_executor is not None:
+            _shared_executor.shutdown(wait=False, cancel_futures=True)
+            _shared_executor = None
+
+
+def to_builtin(value: Any) -> Any:
+    """Convert analysis output to JSON-safe builtins (NumPy scalars, NaN, dates)."""
+    if isinstance(value, dict):
+        return {str(k): to_builtin(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_builtin(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return to_builtin(value.tolist())
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _analyze_in_worker(payload: Dict[str, Any], time_period: int) -> Dict[str, Any]:
+    """Process-pool entry point: analyse one channel, never raise."""
+    global _worker_engine
+    started = time.perf_counter()
+    try:
+        if _worker_engine is None:
+            from backend.ai_modules.advanced_analytics import AdvancedAnalyticsEngine
+
+            # Sections run inline; the batch already uses every worker
+            _worker_engine = AdvancedAnalyticsEngine(execution_mode="sequential")
+        result = asyncio.run(_worker_engine.comprehensive_channel_analysis(payload, time_period))
+        return {"status": "success", "data": to_builtin(result), "elapsed": time.perf_counter() - started}
+    except Exception as e:
+        return {
+            "status": "error",
+            "error": f"{type(e).__name__}: {e}",
+            "elapsed": time.perf_counter() - started,
+        }
+
+
+async def load_channel_from_db(channel_id: str) -> Dict[str, Any]:
+    """Build a channel payload from the synced ``video_analytics``/``channel_stats`` rows."""
+    from sqlalchemy.future import select
+
+    from backend.core import database as core_db
+    from backend.models.youtube import ChannelStats, VideoAnalytics
+
+    if core_db.async_engine is None:
+        core_db.create_database_engines()
+
+    async with core_db.AsyncSessionLocal() as db:
+        rows = (await db.execute(
+            select(VideoAnalytics).where(VideoAnalytics.channel_id == channel_id)
+        )).scalars().all()
+        stats = (await db.execute(
+            select(ChannelStats)
+            .where(ChannelStats.channel_id == channel_id)
+            .order_by(ChannelStats.fetched_at.desc())
+        )).scalars().first()
+
+    if not rows:
+        raise LookupError(f"no synced videos for channel {channel_id}")
+
+    videos = []
+    for row in rows:
+        views = row.views or 0
+        videos.append({
+            "video_id": row.video_id,
+            "title": row.title or "",
+            "views": views,
+            "likes": row.likes or 0,
+            "comments": row.comments or 0,
+            "engagement_rate": ((row.likes or 0) + (row.comments or 0)) / views if views else 0.0,
+            "ad_revenue": row.revenue or 0.0,
+            "published_at": row.upload_date.isoformat() if row.upload_date else None,
+        })
+
+    return {
+        "channel_id": channel_id,
+        "videos": videos,
+        "subscriber_count": stats.subscribers if stats else None,
+        "total_views": stats.views if stats else None,
+    }
+
+
+def _describe(item: ChannelInput) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+    """Split an input item into ``(channel_id, payload)``; payload is None for ID lookups."""
+    if isinstance(item, Exception):
+        raise item
+    if isinstance(item, str):
+        return item, None
+    if isinstance(item, dict):
+        channel_id = item.get("channel_id")
+        if "videos" not in item and channel_id:
+            return str(channel_id), None
+        return (str(channel_id) if channel_id is not None else None), item
+    raise TypeError(f"channel must be a payload dict or a channel ID, got {type(item).__name__}")
+
+
+async def iter_ndjson(chunks: AsyncIterable[bytes]) -> AsyncIterator[Union[ChannelInput, ValueError]]:
+    """Parse an NDJSON byte stream lazily, one channel per line.
+
+    A malformed line is yielded as a ``ValueError`` so it fails only its own
+    channel in ``analyze_channels``.
+    """
+    buffer = b""
+    line_number = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield _parse_line(line, line_number)
+    if buffer.strip():
+        yield _parse_line(buffer, line_number + 1)
+
+
+async def spool_chunks(chunks: AsyncIterable[bytes], max_memory: int = SPOOL_MAX_MEMORY) -> AsyncIterable[bytes]:
+    """Drain ``chunks`` into a spooled temp file, then replay it in blocks.
+
+    Used for request bodies: the whole upload is received before the
+    response starts streaming, but anything past ``max_memory`` lives on disk.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=max_memory)
+    async for chunk in chunks:
+        spool.write(chunk)
+    spool.seek(0)
+
+    async def replay() -> AsyncIterator[bytes]:
+        try:
+            while True:
+                block = spool.read(SPOOL_READ_SIZE)
+                if not block:
+                    break
+                yield block
+        finally:
+            spool.close()
+
+    return replay()
+
+
+def _parse_line(line: bytes, line_number: int) -> Union[ChannelInput, ValueError]:
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return ValueError(f"line {line_number}: invalid JSON ({e})")
+
+
+async def _iterate(channels: Union[Iterable[ChannelInput], AsyncIterable[ChannelInput]]) -> AsyncIterator[ChannelInput]:
+    if hasattr(channels, "__aiter__"):
+        async for item in channels:
+            yield item
+    else:
+        for item in channels:
+            yield item
+
+
+async def analyze_channels(
+    channels: Union[Iterable[ChannelInput], AsyncIterable[ChannelInput]],
+    time_period: int = 90,
+    max_workers: Optional[int] = None,
+    max_in_flight: Optional[int] = None,
+    load_channel: Optional[ChannelLoader] = None,
+    shared_pool: bool = False,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run ``comprehensive_channel_analysis`` for every channel on a process pool.
+
+    Args:
+        channels: Channel payloads and/or channel IDs, sync or async iterable.
+        time_period: Passed through to ``comprehensive_channel_analysis``.
+        max_workers: Worker processes (defaults to the CPU count); ignored
+            with ``shared_pool``, whose size is ``BATCH_ANALYSIS_WORKERS``.
+        max_in_flight: Channels loaded or running at once (defaults to twice
+            the worker count); bounds memory regardless of batch size.
+        load_channel: Resolves a channel ID to a payload; defaults to
+            ``load_channel_from_db``.
+        shared_pool: Run on the server-wide pool instead of a private one.
+
+    Yields:
+        One record per input channel, in completion order:
+        ``{"index", "channel_id", "status", "data" | "error", "elapsed"}``.
+    """
+    if shared_pool:
+        max_workers = BATCH_ANALYSIS_WORKERS
+    max_workers = max(1, max_workers or os.cpu_count() or 1)
+    max_in_flight = max(1, max_in_flight or max_workers * 2)
+    load_channel = load_channel or load_channel_from_db
+
+    def new_executor(broken: Optional[ProcessPoolExecutor] = None) -> ProcessPoolExecutor:
+        if shared_pool:
+            return get_shared_pool(broken)
+        if broken is not None:
+            broken.shutdown(wait=False, cancel_futures=True)
+        return ProcessPoolExecutor(max_workers=max_workers, mp_context=_MP_CONTEXT)
+
+    loop = asyncio.get_running_loop()
+    executor = new_executor()
+    # future -> (index, channel_id, payload, attempt)
+    pending: Dict[asyncio.Future, Tuple[int, Optional[str], Dict[str, Any], int]] = {}
+    source = _iterate(channels).__aiter__()
+    index = 0
+    exhausted = False
+
+    def submit(position: int, channel_id: Optional[str], payload: Dict[str, Any], attempt: int) -> None:
+        future = loop.run_in_executor(executor, _analyze_in_worker, payload, time_period)
+        pending[future] = (position, channel_id, payload, attempt)
+
+    def failed(position: int, channel_id: Optional[str], error: Exception) -> Dict[str, Any]:
+        logger.error(f"Batch analysis failed for channel {channel_id or position}: {error}")
+        return {
+            "index": position,
+            "channel_id": channel_id,
+            "status": "error",
+            "error": f"{type(error).__name__}: {error}",
+            "elapsed": 0.0,
+        }
+
+    try:
+        while True:
+            # Refill up to the in-flight bound; load failures are reported immediately
+            while not exhausted and len(pending) < max_in_flight:
+                try:
+                    item = await source.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+                position, index = index, index + 1
+                channel_id = None
+                try:
+                    channel_id, payload = _describe(item)
+                    if payload is None:
+                        payload = await load_channel(channel_id)
+                except Exception as e:
+                    yield failed(position, channel_id, e)
+                    continue
+                submit(position, channel_id, payload, 0)
+
+            if not pending:
+                break
+
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            broken = []
+            for future in done:
+                position, channel_id, payload, attempt = pending.pop(future)
+                try:
+                    record = future.result()
+                except BrokenProcessPool as e:
+                    # A worker died (e.g. out of memory) and took the pool with
+                    # it. Every channel in flight is retried once on a fresh
+                    # pool; a channel that breaks the pool twice is reported.
+                    if attempt == 0:
+                        broken.append((position, channel_id, payload))
+                    else:
+                        yield failed(position, channel_id, e)
+                    continue
+                except Exception as e:
+                    yield failed(position, channel_id, e)
+                    continue
+                yield {"index": position, "channel_id": channel_id, **record}
+
+            if broken:
+                executor = new_executor(broken=executor)
+                for position, channel_id, payload in broken:
+                    submit(position, channel_id, payload, 1)
+    finally:
+        for future in pending:
+            future.cancel()
+        if not shared_pool:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def analyze_channels_ndjson(
+    channels: Union[Iterable[ChannelInput], AsyncIterable[ChannelInput]],
+    **kwargs: Any,
+) -> AsyncIterator[bytes]:
+    """``analyze_channels`` encoded as newline-delimited JSON, one record per line."""
+    async for record in analyze_channels(channels, **kwargs):
+        yield (json.dumps(record, default=str) + "\n").encode("utf-8")
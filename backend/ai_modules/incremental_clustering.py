@@ -0,0 +1,195 @@
+"""Per-channel incremental clustering for content performance analysis.
+
+Instead of refitting ``StandardScaler`` + ``KMeans`` on every request, each
+channel keeps a ``ChannelClusterModel``: a running scaler and a
+``MiniBatchKMeans`` whose centroids are nudged by ``partial_fit`` with only
+the videos that were not seen before.  Assigning a single video is a scaled
+distance to ``k`` centroids.
+
+Models live in a ``ClusterModelStore`` (bounded LRU in memory, optionally
+pickled to a directory so they survive restarts and are shared by worker
+processes).
+"""
+
+import logging
+import os
+import pickle
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Set
+
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.preprocessing import StandardScaler
+
+from .video_frame import VideoFrame, to_float
+
+logger = logging.getLogger(__name__)
+
+CLUSTER_FEATURES = ("views", "engagement", "retention", "duration", "title_length", "description_length")
+
+
+def cluster_features(frame: VideoFrame) -> np.ndarray:
+    """Feature matrix used for content performance clustering."""
+    return np.column_stack([getattr(frame, name) for name in CLUSTER_FEATURES])
+
+
+def _feature_row(video: Dict[str, Any]) -> np.ndarray:
+    """Features of a single video dict, without building a frame."""
+    return np.array([
+        to_float(video.get("views", 0)),
+        to_float(video.get("engagement_rate", 0)),
+        to_float(video.get("retention_rate", 0)),
+        to_float(video.get("duration", 0)),
+        len(video.get("title", "") or ""),
+        len(video.get("description", "") or ""),
+    ], dtype=np.float64)
+
+
+def video_key(video: Dict[str, Any]) -> Hashable:
+    """Stable identity of a video across requests."""
+    key = video.get("video_id") or video.get("id")
+    if key is not None:
+        return str(key)
+    return (video.get("title", ""), video.get("published_at"))
+
+
+class ChannelClusterModel:
+    """Running scaler + mini-batch KMeans for one channel."""
+
+    def __init__(self, n_clusters: int, random_state: int = 42, batch_size: int = 1024):
+        self.n_clusters = n_clusters
+        self.scaler = StandardScaler()
+        self.kmeans = MiniBatchKMeans(
+            n_clusters=n_clusters,
+            random_state=random_state,
+            batch_size=batch_size,
+            n_init=3,
+        )
+        self.seen: Set[Hashable] = set()
+        self.fitted = False
+        self.updates = 0
+
+    def update(self, features: np.ndarray, keys: List[Hashable]) -> int:
+        """Fold the rows whose keys are new into the model; return how many."""
+        new_rows = [i for i, key in enumerate(keys) if key not in self.seen]
+        if not new_rows:
+            return 0
+        batch = features[new_rows]
+
+        self.scaler.partial_fit(batch)
+        scaled = self.scaler.transform(batch)
+        if not self.fitted:
+            # First batch: a regular mini-batch fit seeds the centroids
+            self.kmeans.fit(scaled)
+            self.fitted = True
+        elif len(batch) >= self.n_clusters:
+            self.kmeans.partial_fit(scaled)
+        else:
+            # partial_fit needs at least k rows; pad small batches with the
+            # current centroids so they only move the nearest ones
+            self.kmeans.partial_fit(np.vstack([scaled, self.kmeans.cluster_centers_]))
+
+        self.seen.update(keys[i] for i in new_rows)
+        self.updates += 1
+        return len(new_rows)
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        """Nearest centroid for every row (O(n * k))."""
+        scaled = (features - self.scaler.mean_) / self.scaler.scale_
+        centers = self.kmeans.cluster_centers_
+        distances = (
+            np.einsum("ij,ij->i", scaled, scaled)[:, None]
+            - 2.0 * scaled @ centers.T
+            + np.einsum("ij,ij->i", centers, centers)[None, :]
+        )
+        return np.argmin(distances, axis=1)
+
+    def assign(self, video: Dict[str, Any]) -> int:
+        """Cluster of a single video: an O(k) nearest-centroid lookup."""
+        if not self.fitted:
+            raise ValueError("model has not been fitted yet")
+        scaled = (_feature_row(video) - self.scaler.mean_) / self.scaler.scale_
+        return int(np.argmin(((self.kmeans.cluster_centers_ - scaled) ** 2).sum(axis=1)))
+
+
+class ClusterModelStore:
+    """Bounded per-channel model store with optional on-disk persistence."""
+
+    def __init__(self, max_channels: int = 1024, directory: Optional[str] = None):
+        self.max_channels = max_channels
+        self.directory = directory
+        self._models: "OrderedDict[str, ChannelClusterModel]" = OrderedDict()
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Pickled into process-pool snapshots: workers start with an empty
+        # memory tier and share models through ``directory`` only
+        return {"max_channels": self.max_channels, "directory": self.directory}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(**state)
+
+    def _path(self, channel_id: str) -> str:
+        safe = re.sub(r"[^A-Za-z0-9_.-]", "_", channel_id)
+        return os.path.join(self.directory, f"{safe}.pkl")
+
+    def lock(self, channel_id: str) -> threading.Lock:
+        """Per-channel lock; hold it while reading and updating a model."""
+        with self._lock:
+            return self._locks.setdefault(channel_id, threading.Lock())
+
+    def get(self, channel_id: str) -> Optional[ChannelClusterModel]:
+        with self._lock:
+            model = self._models.get(channel_id)
+            if model is not None:
+                self._models.move_to_end(channel_id)
+                return model
+        if self.directory and os.path.exists(self._path(channel_id)):
+            try:
+                with open(self._path(channel_id), "rb") as f:
+                    model = pickle.load(f)
+                self._remember(channel_id, model)
+                return model
+            except Exception as e:
+                logger.error(f"Error loading cluster model for channel {channel_id}: {str(e)}")
+        return None
+
+    def put(self, channel_id: str, model: ChannelClusterModel) -> None:
+        self._remember(channel_id, model)
+        if self.directory:
+            try:
+                fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+                with os.fdopen(fd, "wb") as f:
+                    pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, self._path(channel_id))
+            except Exception as e:
+                logger.error(f"Error saving cluster model for channel {channel_id}: {str(e)}")
+
+    def discard(self, channel_id: str) -> None:
+        with self._lock:
+            self._models.pop(channel_id, None)
+        if self.directory:
+            try:
+                os.unlink(self._path(channel_id))
+            except OSError:
+                pass
+
+    def _remember(self, channel_id: str, model: ChannelClusterModel) -> None:
+        with self._lock:
+            self._models[channel_id] = model
+            self._models.move_to_end(channel_id)
+            while len(self._models) > self.max_channels:
+                self._models.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+
+# Process-wide store used by AdvancedAnalyticsEngine in incremental mode
+cluster_model_store = ClusterModelStore(directory=os.getenv("ANALYTICS_CLUSTER_STORE_DIR") or None)
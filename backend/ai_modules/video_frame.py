@@ -0,0 +1,183 @@
+"""Columnar view of channel videos for the advanced analytics engine.
+
+``VideoFrame`` extracts every numeric field the analysis methods read into
+typed NumPy arrays in a single pass over the input dicts, and parses
+``published_at`` once.  Analysis code then works on whole columns instead of
+calling ``video.get(...)`` per method per video.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+
+NUMERIC_FIELDS = {
+    "views": "views",
+    "likes": "likes",
+    "comments": "comments",
+    "shares": "shares",
+    "engagement": "engagement_rate",
+    "retention": "retention_rate",
+    "duration": "duration",
+    "ad_revenue": "ad_revenue",
+    "sponsorship_revenue": "sponsorship_revenue",
+    "affiliate_revenue": "affiliate_revenue",
+    "new_subscribers": "new_subscribers",
+}
+
+WEEKDAY_NAMES = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+MONTH_NAMES = (
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December",
+)
+
+
+def to_float(value: Any) -> float:
+    """Lenient float conversion; missing or malformed values become 0.0."""
+    try:
+        return float(value) if value is not None else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _numeric_column(videos: Sequence[Dict[str, Any]], key: str) -> np.ndarray:
+    values = [video.get(key, 0) for video in videos]
+    try:
+        column = np.asarray(values, dtype=np.float64)
+        if column.ndim == 1:
+            # ``None`` converts to NaN; treat missing values as zero like ``to_float``
+            column[np.isnan(column)] = 0.0
+            return column
+    except (TypeError, ValueError):
+        pass
+    return np.fromiter((to_float(v) for v in values), dtype=np.float64, count=len(values))
+
+
+def as_number(value: Any) -> Union[int, float]:
+    """Return column aggregates as plain ints when they are whole numbers."""
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+class VideoFrame:
+    """Typed NumPy columns for a list of video dicts.
+
+    Timestamps are kept both as epoch seconds (``published_ts``, NaN when
+    missing or unparseable) and as the wall-clock parts the analysis groups
+    by (weekday, hour, month, year*12+month), all taken from the string as
+    written, matching ``datetime.fromisoformat``.
+    """
+
+    def __init__(self, videos: Sequence[Dict[str, Any]]):
+        self.videos = videos
+        self.size = len(videos)
+
+        for attr, key in NUMERIC_FIELDS.items():
+            setattr(self, attr, _numeric_column(videos, key))
+        self.revenue = self.ad_revenue + self.sponsorship_revenue + self.affiliate_revenue
+
+        self.titles: List[str] = [video.get("title", "") or "" for video in videos]
+        self.title_length = np.fromiter((len(t) for t in self.titles), dtype=np.float64, count=self.size)
+        self.description_length = np.fromiter(
+            (len(video.get("description", "") or "") for video in videos),
+            dtype=np.float64,
+            count=self.size,
+        )
+        # Category codes are assigned in first-seen order, so code order is
+        # also the order in which groups were encountered.
+        labels: Dict[Any, int] = {}
+        self.category_codes = np.fromiter(
+            (labels.setdefault(video.get("category", "unknown"), len(labels)) for video in videos),
+            dtype=np.int64,
+            count=self.size,
+        )
+        self.category_labels: List[Any] = list(labels)
+
+        self.published_raw = np.asarray([video.get("published_at") or "" for video in videos], dtype=object)
+        self.published_ts = np.full(self.size, np.nan)
+        self.weekday = np.full(self.size, -1, dtype=np.int8)
+        self.hour = np.full(self.size, -1, dtype=np.int8)
+        self.month = np.full(self.size, -1, dtype=np.int8)
+        self.year_month = np.full(self.size, -1, dtype=np.int64)
+        self._parse_dates()
+
+    @classmethod
+    def ensure(cls, videos: Union["VideoFrame", Sequence[Dict[str, Any]]]) -> "VideoFrame":
+        return videos if isinstance(videos, VideoFrame) else cls(videos)
+
+    @classmethod
+    def from_channel(cls, channel_data: Dict[str, Any]) -> "VideoFrame":
+        return cls(channel_data.get("videos", []) or [])
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _parse_dates(self) -> None:
+        cache: Dict[str, Tuple] = {}
+        for i, raw in enumerate(self.published_raw):
+            if not raw:
+                continue
+            parsed = cache.get(raw)
+            if parsed is None:
+                try:
+                    dt = datetime.fromisoformat(str(raw).replace("Z", "+00:00"))
+                    parsed = (dt.timestamp(), dt.weekday(), dt.hour, dt.month,
+                              dt.year * 12 + dt.month - 1)
+                except (TypeError, ValueError, OverflowError, OSError):
+                    parsed = ()
+                cache[raw] = parsed
+            if not parsed:
+                continue
+            (self.published_ts[i], self.weekday[i], self.hour[i],
+             self.month[i], self.year_month[i]) = parsed
+
+    @property
+    def has_date(self) -> np.ndarray:
+        return ~np.isnan(self.published_ts)
+
+    def days_old(self, now: float = None) -> np.ndarray:
+        """Whole days since publication (NaN where the date is unknown)."""
+        now = datetime.now().timestamp() if now is None else now
+        return np.floor((now - self.published_ts) / 86400.0)
+
+    def order_by_published_raw(self) -> np.ndarray:
+        """Indices sorted by the raw ``published_at`` string (stable)."""
+        return np.argsort(self.published_raw.astype(str), kind="stable")
+
+    def order_by_published_ts(self, mask: np.ndarray = None) -> np.ndarray:
+        """Indices of dated videos (optionally within ``mask``) sorted by time."""
+        idx = np.flatnonzero(self.has_date if mask is None else (self.has_date & mask))
+        return idx[np.argsort(self.published_ts[idx], kind="stable")]
+
+    def take(self, index: np.ndarray) -> List[Dict[str, Any]]:
+        return [self.videos[i] for i in index]
+
+
+def first_seen_order(codes: np.ndarray) -> np.ndarray:
+    """Distinct values of ``codes`` ordered by their first occurrence."""
+    if len(codes) == 0:
+        return codes[:0]
+    unique, first_index = np.unique(codes, return_index=True)
+    return unique[np.argsort(first_index)]
+
+
+def grouped_means(codes: np.ndarray, *columns: np.ndarray, minlength: int = 0) -> Tuple[np.ndarray, List[np.ndarray]]:
+    """Per-group counts and column means for non-negative integer ``codes``."""
+    counts = np.bincount(codes, minlength=minlength)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = [np.bincount(codes, weights=column, minlength=minlength) / counts for column in columns]
+    return counts, means
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over full windows (``len(values) - window + 1`` points)."""
+    if window <= 0 or len(values) < window:
+        return np.empty(0)
+    cumulative = np.concatenate(([0.0], np.cumsum(values, dtype=np.float64)))
+    return (cumulative[window:] - cumulative[:-window]) / window
+
+
+def correlation(x: np.ndarray, y: np.ndarray) -> float:
+    """Pearson correlation; NaN when either side has zero variance (as np.corrcoef)."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return float(np.corrcoef(x, y)[0, 1])
@@ -0,0 +1,272 @@
+"""
+Streaming anomaly detection for performance metrics.
+
+``analyze_performance`` finds anomalies by recomputing mean and standard
+deviation over the whole history window, so an outlier is only noticed
+when someone asks for an analysis.  ``StreamingAnomalyDetector`` keeps a
+small state per (component, metric) and scores every value as
+``record_metric`` ingests it, in O(1):
+
+- Welford running mean/variance over the series lifetime, and an EWMA
+  mean/variance as the adaptive baseline;
+- a seasonal baseline (EWMA per hour-of-day slot) once a slot has seen
+  enough samples, so a daily peak is not flagged every day;
+- streaming quantile estimates (p50/p95) with an EWMA-scaled step;
+- a two-sided CUSUM on the standardised residuals, which catches
+  sustained level shifts too small to trip the point threshold;
+- fast/slow EWMAs for the trend.
+
+Anomalies are returned to the caller, kept in a bounded recent list and
+pushed to registered listeners (e.g. the health monitor's alert path).
+"""
+
+import asyncio
+import logging
+import math
+import os
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_Z_THRESHOLD = float(os.getenv("ANOMALY_Z_THRESHOLD", "3.0"))
+DEFAULT_WARMUP = int(os.getenv("ANOMALY_WARMUP_SAMPLES", "30"))
+
+AnomalyListener = Callable[[Dict[str, Any]], Any]
+
+
+class SeriesDetector:
+    """Online statistics and anomaly scoring for one metric series."""
+
+    def __init__(
+        self,
+        alpha: float = 0.05,
+        z_threshold: float = DEFAULT_Z_THRESHOLD,
+        warmup: int = DEFAULT_WARMUP,
+        cusum_k: float = 0.5,
+        cusum_h: float = 5.0,
+        season_slots: int = 24,
+        season_seconds: int = 86400,
+        quantiles: Tuple[float, ...] = (0.5, 0.95),
+        quantile_step: float = 0.05,
+    ):
+        self.alpha = alpha
+        self.z_threshold = z_threshold
+        self.warmup = warmup
+        self.cusum_k = cusum_k
+        self.cusum_h = cusum_h
+        self.season_slots = season_slots
+        self.season_seconds = season_seconds
+        self.quantile_step = quantile_step
+
+        # Welford (lifetime)
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        # EWMA baseline
+        self.ewma_mean = 0.0
+        self.ewma_var = 0.0
+        # Trend
+        self.fast_mean = 0.0
+        self.slow_mean = 0.0
+        # Seasonal slots: [count, mean, var]
+        self.season: List[List[float]] = [[0, 0.0, 0.0] for _ in range(season_slots)]
+        self.quantiles: Dict[float, float] = {q: 0.0 for q in quantiles}
+        self.cusum_pos = 0.0
+        self.cusum_neg = 0.0
+        self.last_value: Optional[float] = None
+        self.last_timestamp: Optional[datetime] = None
+
+    @property
+    def std_deviation(self) -> float:
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def _slot(self, timestamp: datetime) -> int:
+        seconds = timestamp.hour * 3600 + timestamp.minute * 60 + timestamp.second
+        return int(seconds % self.season_seconds * self.season_slots // self.season_seconds)
+
+    def baseline(self, timestamp: datetime) -> Tuple[float, float, str]:
+        """Expected value and spread at ``timestamp``: seasonal slot if warm, else EWMA."""
+        slot = self.season[self._slot(timestamp)]
+        if slot[0] >= self.warmup:
+            return slot[1], math.sqrt(slot[2]), "seasonal"
+        return self.ewma_mean, math.sqrt(self.ewma_var), "ewma"
+
+    def trend(self) -> str:
+        """Same labels as ``PerformanceAnalytics._analyze_trend``, from fast/slow EWMAs."""
+        if self.count < 10:
+            return "insufficient_data"
+        threshold = abs(self.slow_mean) * 0.01
+        difference = self.fast_mean - self.slow_mean
+        if abs(difference) <= threshold:
+            return "stable"
+        return "increasing" if difference > 0 else "decreasing"
+
+    def update(self, value: float, timestamp: datetime) -> Optional[Dict[str, Any]]:
+        """Score ``value`` against the current baseline, then fold it in."""
+        anomaly = None
+        expected, spread, basis = self.baseline(timestamp)
+        learn_value = value
+
+        if self.count >= self.warmup and spread > 0:
+            z = (value - expected) / spread
+            threshold = self.z_threshold * spread
+
+            # CUSUM on residuals (clipped so one spike alone can't trip it)
+            clipped = max(-self.z_threshold, min(self.z_threshold, z))
+            self.cusum_pos = max(0.0, self.cusum_pos + clipped - self.cusum_k)
+            self.cusum_neg = max(0.0, self.cusum_neg - clipped - self.cusum_k)
+
+            if abs(z) > self.z_threshold:
+                deviation = abs(value - expected)
+                anomaly = {
+                    "type": "spike",
+                    "timestamp": timestamp.isoformat(),
+                    "value": value,
+                    "expected_range": [expected - threshold, expected + threshold],
+                    "deviation": deviation,
+                    "z_score": z,
+                    "baseline": basis,
+                    "severity": "high" if deviation > 2 * threshold else "medium",
+                }
+                # Winsorise so the outlier doesn't inflate the baseline it was judged by
+                learn_value = expected + math.copysign(threshold, z)
+            elif self.cusum_pos > self.cusum_h or self.cusum_neg > self.cusum_h:
+                anomaly = {
+                    "type": "level_shift",
+                    "timestamp": timestamp.isoformat(),
+                    "value": value,
+                    "expected_range": [expected - threshold, expected + threshold],
+                    "deviation": abs(value - expected),
+                    "z_score": z,
+                    "baseline": basis,
+                    "direction": "up" if self.cusum_pos > self.cusum_h else "down",
+                    "severity": "medium",
+                }
+                self.cusum_pos = self.cusum_neg = 0.0
+
+        self._learn(value, learn_value if basis == "ewma" else value,
+                    learn_value if basis == "seasonal" else value, timestamp)
+        return anomaly
+
+    def _learn(self, value: float, ewma_value: float, season_value: float, timestamp: datetime) -> None:
+        # Only the baseline that judged an outlier learns its winsorised value
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+        if self.count == 1:
+            self.ewma_mean = self.fast_mean = self.slow_mean = value
+            self.quantiles = {q: value for q in self.quantiles}
+        else:
+            # 1/n until the EWMA window is filled, so warm-up variance isn't underestimated
+            diff = ewma_value - self.ewma_mean
+            alpha = max(self.alpha, 1.0 / self.count)
+            increment = alpha * diff
+            self.ewma_mean += increment
+            self.ewma_var = (1 - alpha) * (self.ewma_var + diff * increment)
+            self.fast_mean += 0.2 * (value - self.fast_mean)
+            self.slow_mean += 0.02 * (value - self.slow_mean)
+
+            step = self.quantile_step * max(math.sqrt(self.ewma_var), 1e-9)
+            for q, estimate in self.quantiles.items():
+                self.quantiles[q] = estimate + (step * q if value > estimate else -step * (1 - q))
+
+        slot = self.season[self._slot(timestamp)]
+        slot[0] += 1
+        if slot[0] == 1:
+            slot[1] = season_value
+        else:
+            diff = season_value - slot[1]
+            alpha = max(self.alpha, 1.0 / slot[0])
+            increment = alpha * diff
+            slot[1] += increment
+            slot[2] = (1 - alpha) * (slot[2] + diff * increment)
+
+        self.last_value = value
+        self.last_timestamp = timestamp
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "std_deviation": self.std_deviation,
+            "ewma_mean": self.ewma_mean,
+            "ewma_std": math.sqrt(self.ewma_var),
+            "quantiles": {f"p{int(q * 100)}": v for q, v in self.quantiles.items()},
+            "cusum": {"pos": self.cusum_pos, "neg": self.cusum_neg},
+            "trend": self.trend(),
+            "last_value": self.last_value,
+            "last_timestamp": self.last_timestamp.isoformat() if self.last_timestamp else None,
+        }
+
+
+class StreamingAnomalyDetector:
+    """Per-series detectors, the recent anomalies and the listeners to notify."""
+
+    def __init__(self, max_recent: int = 1000, **detector_options):
+        self.detector_options = detector_options
+        self.series: Dict[Tuple[str, str], SeriesDetector] = {}
+        self.recent: Deque[Dict[str, Any]] = deque(maxlen=max_recent)
+        self.listeners: List[AnomalyListener] = []
+        self._tasks: Set[asyncio.Task] = set()
+
+    def add_listener(self, listener: AnomalyListener) -> None:
+        if listener not in self.listeners:
+            self.listeners.append(listener)
+
+    def remove_listener(self, listener: AnomalyListener) -> None:
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def observe(
+        self,
+        component: str,
+        metric_name: str,
+        value: float,
+        timestamp: Optional[datetime] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Update the series with one value; returns the anomaly if it is one."""
+        key = (component, metric_name)
+        detector = self.series.get(key)
+        if detector is None:
+            detector = self.series[key] = SeriesDetector(**self.detector_options)
+        anomaly = detector.update(float(value), timestamp or datetime.now())
+        if anomaly is not None:
+            anomaly["component"] = component
+            anomaly["metric_name"] = metric_name
+            self.recent.append(anomaly)
+            self._notify(anomaly)
+        return anomaly
+
+    def _notify(self, anomaly: Dict[str, Any]) -> None:
+        for listener in list(self.listeners):
+            try:
+                result = listener(anomaly)
+                if asyncio.iscoroutine(result):
+                    # Alert delivery must not hold up the metric being recorded
+                    task = asyncio.get_running_loop().create_task(result)
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+            except Exception as e:
+                logger.error(f"Error notifying anomaly listener: {str(e)}")
+
+    def get_stats(self, component: str, metric_name: str) -> Optional[Dict[str, Any]]:
+        detector = self.series.get((component, metric_name))
+        return detector.snapshot() if detector else None
+
+    def get_recent(
+        self,
+        component: Optional[str] = None,
+        metric_name: Optional[str] = None,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """Most recent anomalies first."""
+        matches = [
+            anomaly for anomaly in reversed(self.recent)
+            if (component is None or anomaly["component"] == component)
+            and (metric_name is None or anomaly["metric_name"] == metric_name)
+        ]
+        return matches[:limit]
@@ -0,0 +1,352 @@
+"""
+In-process benchmark engine for the app's own ASGI routes.
+
+Requests go through ``httpx.ASGITransport``, so the full middleware and
+routing stack is exercised without a socket.  Traffic is open-loop: the
+profile fixes when each request is *due*, and latency is measured from
+that due time, so a stalled app shows up as queueing delay instead of as
+a lower request rate (no coordinated omission).
+
+Profiles:
+
+- ``load``: constant rate for the whole run;
+- ``stress``: rate ramps linearly from a low start to the peak, to find
+  where latency and errors break down;
+- ``endurance``: a moderate constant rate with wide reporting windows,
+  watching RSS growth over a long run.
+
+Latencies are kept in the same mergeable log-bucket histogram as the
+metric rollups (~1% relative accuracy for any percentile, HDR-style).
+Process RSS and CPU are sampled alongside.  ``run_recorded_benchmark``
+stores every reporting window and the final summary as performance
+metrics tagged with the benchmark id, which is what the benchmark
+results endpoint reads back.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+import psutil
+
+from .rollups import Aggregate
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOAD_RPS = float(os.getenv("BENCHMARK_LOAD_RPS", "50"))
+DEFAULT_STRESS_START_RPS = float(os.getenv("BENCHMARK_STRESS_START_RPS", "10"))
+DEFAULT_STRESS_PEAK_RPS = float(os.getenv("BENCHMARK_STRESS_PEAK_RPS", "500"))
+DEFAULT_ENDURANCE_RPS = float(os.getenv("BENCHMARK_ENDURANCE_RPS", "20"))
+DEFAULT_MAX_IN_FLIGHT = int(os.getenv("BENCHMARK_MAX_IN_FLIGHT", "64"))
+
+WindowCallback = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+@dataclass
+class TrafficProfile:
+    """Request rate over time; the rate moves linearly from start to end."""
+    name: str
+    duration: float
+    start_rate: float
+    end_rate: float
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT
+    window: float = 10.0
+
+    def rate_at(self, elapsed: float) -> float:
+        if self.duration <= 0:
+            return self.end_rate
+        progress = min(max(elapsed / self.duration, 0.0), 1.0)
+        return self.start_rate + (self.end_rate - self.start_rate) * progress
+
+
+@dataclass
+class BenchmarkTarget:
+    """One request the benchmark sends; targets are used round-robin."""
+    path: str
+    method: str = "GET"
+    body: Optional[bytes] = None
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+def build_profile(benchmark_type: str, duration_seconds: float, rate: Optional[float] = None) -> TrafficProfile:
+    """Default profile for the API's ``load``/``stress``/``endurance`` types."""
+    if benchmark_type == "load":
+        rate = rate or DEFAULT_LOAD_RPS
+        return TrafficProfile("load", duration_seconds, rate, rate)
+    if benchmark_type == "stress":
+        return TrafficProfile("stress", duration_seconds, DEFAULT_STRESS_START_RPS, rate or DEFAULT_STRESS_PEAK_RPS)
+    if benchmark_type == "endurance":
+        rate = rate or DEFAULT_ENDURANCE_RPS
+        return TrafficProfile("endurance", duration_seconds, rate, rate, window=60.0)
+    raise ValueError(f"Unknown benchmark type {benchmark_type!r}")
+
+
+def default_targets(app, component: str, limit: int = 5) -> List[BenchmarkTarget]:
+    """GET routes without path parameters that belong to ``component``; /health otherwise."""
+    targets = []
+    for route in getattr(app, "routes", []):
+        path = getattr(route, "path", "")
+        methods = getattr(route, "methods", None) or set()
+        if "GET" not in methods or "{" in path or "benchmarks" in path:
+            continue
+        if component and f"/{component}" in path:
+            targets.append(BenchmarkTarget(path=path))
+        if len(targets) >= limit:
+            break
+    return targets or [BenchmarkTarget(path="/health")]
+
+
+class _Window:
+    def __init__(self, started: float, rss: int):
+        self.started = started
+        self.latency = Aggregate()
+        self.requests = 0
+        self.errors = 0
+        self.cpu_samples: List[float] = []
+        self.max_rss = rss
+        self.max_in_flight = 0
+
+
+class BenchmarkEngine:
+    """Drives a ``TrafficProfile`` against an ASGI app and measures it."""
+
+    def __init__(
+        self,
+        app,
+        targets: List[BenchmarkTarget],
+        profile: TrafficProfile,
+        on_window: Optional[WindowCallback] = None,
+        sample_interval: float = 1.0,
+        timeout: float = 30.0,
+    ):
+        if not targets:
+            raise ValueError("At least one benchmark target is required")
+        self.app = app
+        self.targets = targets
+        self.profile = profile
+        self.on_window = on_window
+        self.sample_interval = sample_interval
+        self.timeout = timeout
+
+        self.process = psutil.Process()
+        self.latency = Aggregate()
+        self.status_counts: Dict[str, int] = {}
+        self.requests = 0
+        self.errors = 0
+        self.scheduled = 0
+        self.in_flight = 0
+        self.cpu_samples: List[float] = []
+        self.rss_start = 0
+        self.rss_peak = 0
+        self._window: Optional[_Window] = None
+        self._windows: List[Dict[str, Any]] = []
+
+    async def _send(self, client: httpx.AsyncClient, target: BenchmarkTarget, due: float, slots: asyncio.Semaphore):
+        status = "error"
+        try:
+            response = await client.request(
+                target.method, target.path, content=target.body, headers=target.headers
+            )
+            status = str(response.status_code)
+            failed = response.status_code >= 400
+        except Exception as e:
+            logger.debug(f"Benchmark request to {target.path} failed: {str(e)}")
+            failed = True
+        finally:
+            self.in_flight -= 1
+            slots.release()
+
+        # From the due time, so time spent waiting for a slot counts
+        latency_ms = (time.perf_counter() - due) * 1000
+        self.latency.add(latency_ms)
+        self.requests += 1
+        self.status_counts[status] = self.status_counts.get(status, 0) + 1
+        window = self._window
+        window.latency.add(latency_ms)
+        window.requests += 1
+        if failed:
+            self.errors += 1
+            window.errors += 1
+
+    async def _sample_resources(self, stop: asyncio.Event):
+        while not stop.is_set():
+            try:
+                await asyncio.wait_for(stop.wait(), self.sample_interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                cpu = self.process.cpu_percent(None)
+                rss = self.process.memory_info().rss
+            except psutil.Error:
+                continue
+            self.cpu_samples.append(cpu)
+            self.rss_peak = max(self.rss_peak, rss)
+            self._window.cpu_samples.append(cpu)
+            self._window.max_rss = max(self._window.max_rss, rss)
+
+    async def _close_window(self, now: float) -> None:
+        window = self._window
+        self._window = _Window(now, self.process.memory_info().rss)
+        elapsed = max(now - window.started, 1e-9)
+        latency = window.latency.to_dict()
+        report = {
+            "offset_seconds": round(window.started - self._started, 3),
+            "seconds": elapsed,
+            "target_rate": self.profile.rate_at(window.started - self._started),
+            "requests": window.requests,
+            "throughput": window.requests / elapsed,
+            "error_rate": (window.errors / window.requests * 100) if window.requests else 0.0,
+            "response_time": latency["average"],
+            "response_time_p50": latency["median"],
+            "response_time_p99": window.latency.sketch.quantile(0.99) or 0.0,
+            "memory_usage": window.max_rss / (1024 * 1024),
+            "cpu_usage": sum(window.cpu_samples) / len(window.cpu_samples) if window.cpu_samples else 0.0,
+            "connection_count": window.max_in_flight,
+        }
+        self._windows.append(report)
+        if self.on_window is not None:
+            try:
+                await self.on_window(report)
+            except Exception as e:
+                logger.error(f"Error reporting benchmark window: {str(e)}")
+
+    async def run(self) -> Dict[str, Any]:
+        """Run the profile to completion and return the summary."""
+        profile = self.profile
+        self.process.cpu_percent(None)  # prime: the first reading is meaningless
+        self.rss_start = self.rss_peak = self.process.memory_info().rss
+        self._started = time.perf_counter()
+        self._window = _Window(self._started, self.rss_start)
+        slots = asyncio.Semaphore(profile.max_in_flight)
+        stop = asyncio.Event()
+        sampler = asyncio.create_task(self._sample_resources(stop))
+        pending = set()
+
+        transport = httpx.ASGITransport(app=self.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=self.timeout) as client:
+            due = self._started
+            deadline = self._started + profile.duration
+            next_window = self._started + profile.window
+            while due < deadline:
+                now = time.perf_counter()
+                if now >= next_window:
+                    await self._close_window(next_window)
+                    next_window += profile.window
+                if due > now:
+                    await asyncio.sleep(due - now)
+                await slots.acquire()
+                self.in_flight += 1
+                self._window.max_in_flight = max(self._window.max_in_flight, self.in_flight)
+                target = self.targets[self.scheduled % len(self.targets)]
+                self.scheduled += 1
+                task = asyncio.create_task(self._send(client, target, due, slots))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+                due += 1.0 / max(profile.rate_at(due - self._started), 1e-3)
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        finished = time.perf_counter()
+        stop.set()
+        await sampler
+        if self._window.requests:
+            await self._close_window(finished)
+        return self.summary(finished - self._started)
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        latency = self.latency.to_dict()
+        rss_end = self.process.memory_info().rss
+        mb = 1024 * 1024
+        return {
+            "profile": self.profile.name,
+            "duration_seconds": elapsed,
+            "requests": self.requests,
+            "errors": self.errors,
+            "error_rate": (self.errors / self.requests * 100) if self.requests else 0.0,
+            "throughput_rps": self.requests / elapsed if elapsed else 0.0,
+            "target_rps_start": self.profile.start_rate,
+            "target_rps_end": self.profile.end_rate,
+            "latency_ms": {
+                "mean": latency["average"],
+                "min": latency["min"],
+                "p50": latency["median"],
+                "p90": self.latency.sketch.quantile(0.90) or 0.0,
+                "p99": self.latency.sketch.quantile(0.99) or 0.0,
+                "p999": self.latency.sketch.quantile(0.999) or 0.0,
+                "max": latency["max"],
+            },
+            "status_counts": dict(self.status_counts),
+            "rss_mb": {
+                "start": self.rss_start / mb,
+                "peak": max(self.rss_peak, rss_end) / mb,
+                "end": rss_end / mb,
+                "growth": (rss_end - self.rss_start) / mb,
+            },
+            "cpu_percent_avg": sum(self.cpu_samples) / len(self.cpu_samples) if self.cpu_samples else 0.0,
+            "windows": len(self._windows),
+            "targets": [f"{target.method} {target.path}" for target in self.targets],
+        }
+
+
+# Per-window series and summary fields stored as performance metrics
+WINDOW_METRICS = (
+    "response_time", "response_time_p50", "response_time_p99", "throughput",
+    "error_rate", "memory_usage", "cpu_usage", "connection_count",
+)
+
+SUMMARY_METRICS: Dict[str, Callable[[Dict[str, Any]], float]] = {
+    "requests": lambda s: s["requests"],
+    "error_rate": lambda s: s["error_rate"],
+    "throughput_rps": lambda s: s["throughput_rps"],
+    "latency_p50_ms": lambda s: s["latency_ms"]["p50"],
+    "latency_p90_ms": lambda s: s["latency_ms"]["p90"],
+    "latency_p99_ms": lambda s: s["latency_ms"]["p99"],
+    "latency_p999_ms": lambda s: s["latency_ms"]["p999"],
+    "latency_max_ms": lambda s: s["latency_ms"]["max"],
+    "rss_peak_mb": lambda s: s["rss_mb"]["peak"],
+    "rss_growth_mb": lambda s: s["rss_mb"]["growth"],
+    "cpu_percent_avg": lambda s: s["cpu_percent_avg"],
+}
+
+
+async def run_recorded_benchmark(
+    analytics,
+    app,
+    benchmark_id: str,
+    component: str,
+    profile: TrafficProfile,
+    targets: Optional[List[BenchmarkTarget]] = None,
+) -> Dict[str, Any]:
+    """
+    Run ``profile`` against ``app`` and record it through ``analytics``:
+    a ``benchmark_status`` start/completion marker, every window
+    (``phase=window``) and the summary (``phase=summary``), all tagged
+    with ``benchmark_id``.
+    """
+    targets = targets or default_targets(app, component)
+    base_tags = {"benchmark_id": benchmark_id, "benchmark_type": profile.name}
+
+    await analytics.record_metric(
+        "benchmark_status", 1.0, component,
+        {**base_tags, "status": "started", "targets": ",".join(target.path for target in targets)},
+    )
+
+    async def record_window(window: Dict[str, Any]) -> None:
+        tags = {**base_tags, "phase": "window", "offset_seconds": str(window["offset_seconds"])}
+        for metric_name in WINDOW_METRICS:
+            await analytics.record_metric(metric_name, window[metric_name], component, tags)
+
+    summary = await BenchmarkEngine(app, targets, profile, on_window=record_window).run()
+
+    summary_tags = {**base_tags, "phase": "summary"}
+    for metric_name, extract in SUMMARY_METRICS.items():
+        await analytics.record_metric(metric_name, extract(summary), component, summary_tags)
+    await analytics.record_metric(
+        "benchmark_status", 0.0, component,
+        {**base_tags, "status": "completed", "duration_seconds": str(round(summary["duration_seconds"], 1))},
+    )
+    return summary
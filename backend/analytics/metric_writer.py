@@ -0,0 +1,230 @@
+"""
+Write-behind metric pipeline for ``performance_metrics``.
+
+``record_metric`` used to open a connection and commit one row per call on
+the event loop.  ``MetricWriter`` instead appends rows to a bounded
+in-memory buffer (a lock-protected deque append, a few microseconds) and a
+background thread drains it in batches: one ``executemany`` per
+transaction, on a connection it keeps open.  A batch is written when
+``batch_size`` rows are waiting or ``flush_interval`` seconds have passed,
+whichever comes first.
+
+When the buffer is full, ``submit`` never blocks: the row is dropped
+(``overflow="drop_newest"``) or evicts the oldest buffered row
+(``overflow="drop_oldest"``), and the drop is counted.  Async producers
+that prefer to wait can use ``put``, which applies backpressure for up to
+``block_timeout`` seconds before dropping.  ``close`` (also registered with
+``atexit``) stops accepting rows and writes everything still buffered.
+"""
+
+import asyncio
+import atexit
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = ("drop_newest", "drop_oldest")
+
+DEFAULT_CAPACITY = int(os.getenv("METRICS_BUFFER_SIZE", "50000"))
+DEFAULT_BATCH_SIZE = int(os.getenv("METRICS_BATCH_SIZE", "1000"))
+DEFAULT_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "1.0"))
+
+Row = Tuple[Any, ...]
+
+
+class MetricWriter:
+    """Bounded buffer of rows flushed to SQLite by a background thread."""
+
+    def __init__(
+        self,
+        connect: Callable[[], sqlite3.Connection],
+        insert_sql: str,
+        prepare: Optional[Callable[[sqlite3.Connection], None]] = None,
+        on_batch: Optional[Callable[[sqlite3.Connection, Sequence[Row]], Any]] = None,
+        capacity: int = DEFAULT_CAPACITY,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        overflow: str = "drop_newest",
+        block_timeout: float = 1.0,
+    ):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}, got {overflow!r}")
+        self.connect = connect
+        self.insert_sql = insert_sql
+        self.prepare = prepare
+        self.on_batch = on_batch
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+
+        self._buffer: Deque[Row] = deque()
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        self.stats: Dict[str, Any] = {
+            "submitted": 0,
+            "written": 0,
+            "batches": 0,
+            "dropped_full": 0,
+            "dropped_error": 0,
+            "dropped_closed": 0,
+            "write_errors": 0,
+            "max_depth": 0,
+            "last_batch_seconds": 0.0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._buffer) + self._in_flight
+
+    def _start(self) -> None:
+        # Caller holds self._cond
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="metric-writer", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    def submit(self, row: Row) -> bool:
+        """Buffer one row without blocking; False if the row was dropped."""
+        with self._cond:
+            if self._closed:
+                self.stats["dropped_closed"] += 1
+                return False
+            self._start()
+            if len(self._buffer) >= self.capacity:
+                self.stats["dropped_full"] += 1
+                if self.overflow == "drop_newest":
+                    return False
+                self._buffer.popleft()
+            self._buffer.append(row)
+            self.stats["submitted"] += 1
+            depth = len(self._buffer)
+            if depth > self.stats["max_depth"]:
+                self.stats["max_depth"] = depth
+            if depth >= self.batch_size:
+                self._cond.notify()
+            return True
+
+    async def put(self, row: Row) -> bool:
+        """Like ``submit``, but wait up to ``block_timeout`` for space first."""
+        deadline = time.monotonic() + self.block_timeout
+        while len(self._buffer) >= self.capacity and not self._closed and time.monotonic() < deadline:
+            await asyncio.sleep(min(0.01, self.flush_interval))
+        return self.submit(row)
+
+    def _take_batch(self) -> List[Row]:
+        # Caller holds self._cond
+        count = min(self.batch_size, len(self._buffer))
+        batch = [self._buffer.popleft() for _ in range(count)]
+        self._in_flight = len(batch)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._closed and len(self._buffer) < self.batch_size:
+                    self._cond.wait(self.flush_interval)
+                if not self._buffer:
+                    if self._closed:
+                        break
+                    continue
+                batch = self._take_batch()
+            try:
+                self._write(batch)
+            finally:
+                with self._cond:
+                    self._in_flight = 0
+                    self._cond.notify_all()
+        # The connection belongs to this thread
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = self.connect()
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+            except sqlite3.Error:
+                pass
+            if self.prepare is not None:
+                self.prepare(conn)
+            self._conn = conn
+        return self._conn
+
+    def _write(self, batch: Sequence[Row]) -> None:
+        started = time.perf_counter()
+        for attempt in range(2):
+            try:
+                conn = self._connection()
+                with conn:
+                    conn.executemany(self.insert_sql, batch)
+                    if self.on_batch is not None:
+                        # Derived data (e.g. rollups) commits atomically with the rows
+                        self.on_batch(conn, batch)
+                self.stats["written"] += len(batch)
+                self.stats["batches"] += 1
+                self.stats["last_batch_seconds"] = time.perf_counter() - started
+                return
+            except Exception as e:
+                self.stats["write_errors"] += 1
+                logger.error(f"Error writing {len(batch)} metrics to database: {str(e)}")
+                # Reconnect once: the database file may have been replaced or locked
+                if self._conn is not None:
+                    try:
+                        self._conn.close()
+                    except Exception:
+                        pass
+                    self._conn = None
+        self.stats["dropped_error"] += len(batch)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every row buffered so far has been written (or dropped)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            if self._thread is None:
+                return True
+            self._cond.notify()
+            while self._buffer or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                # Wake the writer even if it is waiting out its interval
+                self._cond.notify()
+                self._cond.wait(remaining if remaining is not None else 0.1)
+        return True
+
+    async def aflush(self, timeout: Optional[float] = None) -> bool:
+        """``flush`` without blocking the event loop."""
+        if not len(self):
+            return True
+        return await asyncio.get_running_loop().run_in_executor(None, self.flush, timeout)
+
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        """Stop accepting rows, write what is buffered and stop the thread."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+            if thread.is_alive():
+                logger.error(f"Metric writer did not drain within {timeout}s; {len(self)} rows pending")
+        try:
+            atexit.unregister(self.close)
+        except Exception:
+            pass
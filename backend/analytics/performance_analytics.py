@@ -1,13 +1,28 @@
 import asyncio
 import time
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
 from collections import defaultdict, deque
 import statistics
 import json
+import os
 from ..database import get_db_connection
+from .anomaly_detection import StreamingAnomalyDetector
+from .metric_writer import MetricWriter
+from .rollups import (
+    TIERS_BY_NAME,
+    Aggregate,
+    RollupTier,
+    apply_rollups,
+    backfill_rollups,
+    choose_tier,
+    cleanup_rollups,
+    create_rollup_tables,
+    list_series,
+    query_buckets,
+)
 from ..config.enhanced_settings import settings
 
 logger = logging.getLogger(__name__)
@@ -45,10 +60,27 @@ class PerformanceAnalytics:
     
     def __init__(self, max_history_days: int = 30):
         self.max_history_days = max_history_days
+        # Raw rows only need to outlive the finest rollup tier's use; older
+        # windows are answered from rollups (see backend.analytics.rollups)
+        self.raw_retention_days = int(os.getenv("METRICS_RAW_RETENTION_DAYS", str(max_history_days)))
         self.metrics_buffer = defaultdict(lambda: deque(maxlen=1000))
         self.analysis_cache = {}
         self.anomaly_threshold = 2.0  # Standard deviations for anomaly detection
         self.trend_window = 100  # Number of points for trend analysis
+        # Metrics are written behind, in batches, off the event loop
+        self.metric_writer = MetricWriter(
+            connect=get_db_connection,
+            insert_sql="""
+                INSERT OR IGNORE INTO performance_metrics
+                (timestamp, metric_name, value, component, tags)
+                VALUES (?, ?, ?, ?, ?)
+            """,
+            prepare=create_performance_tables,
+            on_batch=apply_rollups,
+        )
+        # Scores each metric as it arrives; listeners (e.g. the health
+        # monitor) get anomalies pushed to them
+        self.anomaly_detector = StreamingAnomalyDetector()
         
     async def record_metric(
         self,
@@ -71,6 +103,9 @@ class PerformanceAnalytics:
             buffer_key = f"{component}:{metric_name}"
             self.metrics_buffer[buffer_key].append(metric)
             
+            # Online anomaly detection, O(1) per metric
+            self.anomaly_detector.observe(component, metric_name, value, metric.timestamp)
+            
             # Store in database
             await self._store_metric_to_db(metric)
             
@@ -83,69 +118,163 @@ class PerformanceAnalytics:
             logger.error(f"Error recording metric {metric_name}: {str(e)}")
     
     async def _store_metric_to_db(self, metric: PerformanceMetric):
-        """Store metric to database."""
+        """Queue metric for the batched database writer (never blocks)."""
         try:
-            with get_db_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT OR IGNORE INTO performance_metrics 
-                    (timestamp, metric_name, value, component, tags)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (
-                    metric.timestamp.isoformat(),
-                    metric.metric_name,
-                    metric.value,
-                    metric.component,
-                    json.dumps(metric.tags)
-                ))
-                conn.commit()
+            self.metric_writer.submit((
+                metric.timestamp.isoformat(),
+                metric.metric_name,
+                metric.value,
+                metric.component,
+                json.dumps(metric.tags)
+            ))
         except Exception as e:
             logger.error(f"Error storing metric to database: {str(e)}")
     
+    async def flush_metrics(self, timeout: Optional[float] = 5.0) -> bool:
+        """Wait until queued metrics are in the database (before reading it)."""
+        return await self.metric_writer.aflush(timeout)
+    
+    def get_live_anomalies(
+        self,
+        component: Optional[str] = None,
+        metric_name: Optional[str] = None,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """Anomalies flagged at ingest time, most recent first."""
+        return self.anomaly_detector.get_recent(component, metric_name, limit)
+    
+    def get_streaming_stats(self, component: str, metric_name: str) -> Optional[Dict[str, Any]]:
+        """Running mean/variance, quantiles, CUSUM and trend for one series."""
+        return self.anomaly_detector.get_stats(component, metric_name)
+    
+    def get_writer_stats(self) -> Dict[str, Any]:
+        """Buffer depth, throughput and drop counters of the metric writer."""
+        return {"pending": len(self.metric_writer), **self.metric_writer.stats}
+    
+    async def shutdown(self) -> None:
+        """Write every buffered metric and stop the writer thread."""
+        await asyncio.get_running_loop().run_in_executor(None, self.metric_writer.close)
+    
+    def _resolve_tier(self, hours: float, resolution: Optional[str]) -> Optional[RollupTier]:
+        """Rollup tier for a query; None reads raw rows."""
+        if resolution in (None, "auto"):
+            return choose_tier(hours, self.raw_retention_days)
+        if resolution == "raw":
+            return None
+        if resolution not in TIERS_BY_NAME:
+            raise ValueError(f"Unknown resolution {resolution!r}; use auto, raw or one of {list(TIERS_BY_NAME)}")
+        return TIERS_BY_NAME[resolution]
+    
     async def get_metrics_history(
         self,
         component: str,
         metric_name: str,
-        hours: int = 24
+        hours: int = 24,
+        resolution: Optional[str] = "auto"
     ) -> List[PerformanceMetric]:
-        """Get historical metrics data."""
+        """Get historical metrics data.
+
+        ``resolution`` is ``raw``, a rollup tier (``1m``, ``1h``, ``1d``) or
+        ``auto`` (the coarsest tier that still gives enough points).  Rollup
+        points carry the bucket average as ``value`` and count/min/max/p95
+        in ``tags``.
+        """
         try:
-            cutoff_time = datetime.now() - timedelta(hours=hours)
-            
-            with get_db_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT timestamp, metric_name, value, component, tags
-                    FROM performance_metrics
-                    WHERE component = ? AND metric_name = ? AND timestamp > ?
-                    ORDER BY timestamp ASC
-                """, (component, metric_name, cutoff_time.isoformat()))
-                
-                metrics = []
-                for row in cursor.fetchall():
-                    metrics.append(PerformanceMetric(
-                        timestamp=datetime.fromisoformat(row[0]),
-                        metric_name=row[1],
-                        value=row[2],
-                        component=row[3],
-                        tags=json.loads(row[4]) if row[4] else {}
-                    ))
-                
-                return metrics
-                
+            metrics, _ = await self._load_history(component, metric_name, hours, resolution)
+            return metrics
         except Exception as e:
             logger.error(f"Error fetching metrics history: {str(e)}")
             return []
     
+    async def _load_history(
+        self,
+        component: str,
+        metric_name: str,
+        hours: float,
+        resolution: Optional[str]
+    ) -> Tuple[List[PerformanceMetric], Optional[Aggregate]]:
+        """History points plus, for rollups, the aggregate merged over all buckets."""
+        cutoff_time = datetime.now() - timedelta(hours=hours)
+        tier = self._resolve_tier(hours, resolution)
+        
+        await self.flush_metrics()
+        with get_db_connection() as conn:
+            if tier is not None:
+                metrics = []
+                overall = Aggregate()
+                for bucket in query_buckets(conn, tier, component, metric_name, cutoff_time.timestamp()):
+                    aggregate = bucket["aggregate"]
+                    overall.merge(aggregate)
+                    summary = aggregate.to_dict()
+                    metrics.append(PerformanceMetric(
+                        timestamp=datetime.fromtimestamp(bucket["bucket"]),
+                        metric_name=metric_name,
+                        value=aggregate.average,
+                        component=component,
+                        tags={
+                            "resolution": tier.name,
+                            "count": str(aggregate.count),
+                            "min": str(summary["min"]),
+                            "max": str(summary["max"]),
+                            "p95": str(summary["p95"]),
+                        }
+                    ))
+                return metrics, overall
+            
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT timestamp, metric_name, value, component, tags
+                FROM performance_metrics
+                WHERE component = ? AND metric_name = ? AND timestamp > ?
+                ORDER BY timestamp ASC
+            """, (component, metric_name, cutoff_time.isoformat()))
+            
+            metrics = []
+            for row in cursor.fetchall():
+                metrics.append(PerformanceMetric(
+                    timestamp=datetime.fromisoformat(row[0]),
+                    metric_name=row[1],
+                    value=row[2],
+                    component=row[3],
+                    tags=json.loads(row[4]) if row[4] else {}
+                ))
+            
+            return metrics, None
+    
+    async def _list_series(self, hours: float, component: Optional[str] = None) -> List[tuple]:
+        """Distinct (component, metric_name) pairs with data in the window."""
+        cutoff_time = datetime.now() - timedelta(hours=hours)
+        tier = self._resolve_tier(hours, "auto")
+        await self.flush_metrics()
+        with get_db_connection() as conn:
+            if tier is not None:
+                return list_series(conn, tier, cutoff_time.timestamp(), component)
+            query = """
+                SELECT DISTINCT component, metric_name
+                FROM performance_metrics
+                WHERE timestamp > ?
+            """
+            params = [cutoff_time.isoformat()]
+            if component:
+                query += " AND component = ?"
+                params.append(component)
+            return [tuple(row) for row in conn.execute(query, params).fetchall()]
+    
     async def analyze_performance(
         self,
         component: str,
         metric_name: str,
-        hours: int = 24
+        hours: int = 24,
+        resolution: Optional[str] = "auto"
     ) -> PerformanceAnalysis:
-        """Analyze performance metrics and generate insights."""
+        """Analyze performance metrics and generate insights.
+
+        Long windows are analysed from rollups: statistics come from the
+        merged buckets (median from the quantile sketch), while trend and
+        anomalies are computed over the per-bucket averages.
+        """
         try:
-            cache_key = f"{component}:{metric_name}:{hours}"
+            cache_key = f"{component}:{metric_name}:{hours}:{resolution}"
             
             # Check cache first
             if cache_key in self.analysis_cache:
@@ -154,7 +283,7 @@ class PerformanceAnalytics:
                     return cached_analysis
             
             # Get historical data
-            metrics = await self.get_metrics_history(component, metric_name, hours)
+            metrics, overall = await self._load_history(component, metric_name, hours, resolution)
             
             if not metrics:
                 return PerformanceAnalysis(
@@ -173,22 +302,37 @@ class PerformanceAnalytics:
             
             values = [m.value for m in metrics]
             
-            # Calculate basic statistics
-            avg_value = statistics.mean(values)
-            min_value = min(values)
-            max_value = max(values)
-            median_value = statistics.median(values)
-            std_dev = statistics.stdev(values) if len(values) > 1 else 0.0
+            if overall is not None:
+                # Rollup points: exact count/sum/min/max merged across buckets
+                summary = overall.to_dict()
+                avg_value = summary["average"]
+                min_value = summary["min"]
+                max_value = summary["max"]
+                median_value = summary["median"]
+                std_dev = summary["std_deviation"]
+                # Anomalies are judged between buckets, not against raw spread
+                bucket_std = statistics.stdev(values) if len(values) > 1 else 0.0
+                anomalies = self._detect_anomalies(metrics, statistics.mean(values), bucket_std)
+                # Threshold checks in the recommendations should see the true extremes
+                recommendation_values = values + [min_value, max_value]
+            else:
+                # Calculate basic statistics
+                avg_value = statistics.mean(values)
+                min_value = min(values)
+                max_value = max(values)
+                median_value = statistics.median(values)
+                std_dev = statistics.stdev(values) if len(values) > 1 else 0.0
+                
+                # Detect anomalies
+                anomalies = self._detect_anomalies(metrics, avg_value, std_dev)
+                recommendation_values = values
             
             # Analyze trend
             trend = self._analyze_trend(values)
             
-            # Detect anomalies
-            anomalies = self._detect_anomalies(metrics, avg_value, std_dev)
-            
             # Generate recommendations
             recommendations = self._generate_recommendations(
-                metric_name, component, values, trend, anomalies
+                metric_name, component, recommendation_values, trend, anomalies
             )
             
             analysis = PerformanceAnalysis(
@@ -341,17 +485,7 @@ class PerformanceAnalytics:
         """Get comprehensive performance summary for a component."""
         try:
             # Get all metrics for this component
-            cutoff_time = datetime.now() - timedelta(hours=hours)
-            
-            with get_db_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT DISTINCT metric_name
-                    FROM performance_metrics
-                    WHERE component = ? AND timestamp > ?
-                """, (component, cutoff_time.isoformat()))
-                
-                metric_names = [row[0] for row in cursor.fetchall()]
+            metric_names = sorted({name for _, name in await self._list_series(hours, component)})
             
             # Analyze each metric
             analyses = {}
@@ -486,17 +620,7 @@ class PerformanceAnalytics:
         """Get system-wide performance overview."""
         try:
             # Get all components
-            cutoff_time = datetime.now() - timedelta(hours=hours)
-            
-            with get_db_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT DISTINCT component
-                    FROM performance_metrics
-                    WHERE timestamp > ?
-                """, (cutoff_time.isoformat(),))
-                
-                components = [row[0] for row in cursor.fetchall()]
+            components = sorted({component for component, _ in await self._list_series(hours)})
             
             # Get performance summary for each component
             component_summaries = {}
@@ -596,11 +720,12 @@ class PerformanceAnalytics:
             return "poor"
     
     async def cleanup_old_metrics(self, days: int = None):
-        """Clean up old performance metrics."""
+        """Clean up raw metrics past ``days`` and rollups past their tier retention."""
         try:
-            days = days or self.max_history_days
+            days = days or self.raw_retention_days
             cutoff_time = datetime.now() - timedelta(days=days)
             
+            await self.flush_metrics()
             with get_db_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
@@ -609,10 +734,14 @@ class PerformanceAnalytics:
                 """, (cutoff_time.isoformat(),))
                 
                 deleted_count = cursor.rowcount
+                rollups_deleted = cleanup_rollups(conn, time.time())
                 conn.commit()
                 
-                logger.info(f"Cleaned up {deleted_count} old performance metrics")
-                return deleted_count
+                logger.info(
+                    f"Cleaned up {deleted_count} old performance metrics and "
+                    f"rollup buckets {rollups_deleted}"
+                )
+                return deleted_count + sum(rollups_deleted.values())
                 
         except Exception as e:
             logger.error(f"Error cleaning up old metrics: {str(e)}")
@@ -646,6 +775,7 @@ class PerformanceAnalytics:
             
             query += " ORDER BY timestamp ASC"
             
+            await self.flush_metrics()
             with get_db_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute(query, params)
@@ -675,6 +805,37 @@ class PerformanceAnalytics:
             logger.error(f"Error exporting performance data: {str(e)}")
             raise
 
+def create_performance_tables(conn) -> None:
+    """Create the performance analytics tables and indexes if missing."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS performance_metrics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT NOT NULL,
+            metric_name TEXT NOT NULL,
+            value REAL NOT NULL,
+            component TEXT NOT NULL,
+            tags TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    
+    # Create indexes for better query performance
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_performance_component_metric 
+        ON performance_metrics(component, metric_name)
+    """)
+    
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_performance_timestamp 
+        ON performance_metrics(timestamp)
+    """)
+    
+    create_rollup_tables(conn)
+    # Existing databases get their history rolled up once
+    backfill_rollups(conn)
+    conn.commit()
+
 # Global performance analytics instance
 performance_analytics = PerformanceAnalytics()
 
@@ -683,33 +844,9 @@ async def init_performance_tables():
     """Initialize performance analytics database tables."""
     try:
         with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS performance_metrics (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    timestamp TEXT NOT NULL,
-                    metric_name TEXT NOT NULL,
-                    value REAL NOT NULL,
-                    component TEXT NOT NULL,
-                    tags TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Create indexes for better query performance
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_performance_component_metric 
-                ON performance_metrics(component, metric_name)
-            """)
-            
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_performance_timestamp 
-                ON performance_metrics(timestamp)
-            """)
-            
-            conn.commit()
+            create_performance_tables(conn)
             logger.info("Performance analytics tables initialized")
             
     except Exception as e:
         logger.error(f"Error initializing performance tables: {str(e)}")
-        raise
\ No newline at end of file
+        raise
@@ -0,0 +1,301 @@
+"""
+Time-series rollups for ``performance_metrics``.
+
+Every metric written to the raw table is also folded into fixed-size
+buckets at 1-minute, 1-hour and 1-day resolution.  A bucket keeps
+count/sum/sum-of-squares/min/max and a mergeable quantile sketch, so
+averages, standard deviations and p50/p95 can be answered from any tier
+(and any range of buckets) without touching raw rows.
+
+Rollups are updated incrementally by the metric writer, in the same
+transaction as the raw batch.  Queries call ``choose_tier`` to use the
+coarsest tier that still gives enough points over the requested window;
+each tier (and the raw table) has its own retention.
+"""
+
+import json
+import logging
+import math
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RollupTier:
+    name: str
+    seconds: int
+    retention_days: int
+
+
+TIERS: Tuple[RollupTier, ...] = (
+    RollupTier("1m", 60, int(os.getenv("METRICS_RETENTION_1M_DAYS", "7"))),
+    RollupTier("1h", 3600, int(os.getenv("METRICS_RETENTION_1H_DAYS", "90"))),
+    RollupTier("1d", 86400, int(os.getenv("METRICS_RETENTION_1D_DAYS", "730"))),
+)
+TIERS_BY_NAME = {tier.name: tier for tier in TIERS}
+
+# Queries want at least this many points before settling for a coarser tier
+DEFAULT_TARGET_POINTS = 120
+
+
+class QuantileSketch:
+    """
+    Log-bucketed histogram with ``alpha`` relative accuracy (DDSketch-style).
+
+    Values land in bucket ``ceil(log_gamma(|v|))`` (per sign), so two
+    sketches merge by adding counts and a quantile is within ``alpha`` of
+    the true value.
+    """
+
+    def __init__(self, alpha: float = 0.01, bins: Optional[Dict[str, int]] = None):
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: Dict[str, int] = dict(bins or {})
+
+    def _key(self, value: float) -> str:
+        magnitude = abs(value)
+        if magnitude < 1e-9:
+            return "z"
+        index = math.ceil(math.log(magnitude) / self._log_gamma)
+        return f"{'p' if value > 0 else 'n'}{index}"
+
+    def add(self, value: float, count: int = 1) -> None:
+        key = self._key(value)
+        self.bins[key] = self.bins.get(key, 0) + count
+
+    def merge(self, other: "QuantileSketch") -> None:
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+
+    def _value(self, key: str) -> float:
+        if key == "z":
+            return 0.0
+        magnitude = 2 * self.gamma ** int(key[1:]) / (self.gamma + 1)
+        return magnitude if key[0] == "p" else -magnitude
+
+    def quantile(self, q: float) -> Optional[float]:
+        total = sum(self.bins.values())
+        if not total:
+            return None
+        ordered = sorted(self.bins, key=self._value)
+        rank = q * (total - 1)
+        seen = 0
+        for key in ordered:
+            seen += self.bins[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(ordered[-1])
+
+    def to_json(self) -> str:
+        return json.dumps(self.bins, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, raw: Optional[str]) -> "QuantileSketch":
+        return cls(bins=json.loads(raw) if raw else None)
+
+
+class Aggregate:
+    """count/sum/sum_sq/min/max plus a sketch; mergeable."""
+
+    __slots__ = ("count", "total", "total_sq", "minimum", "maximum", "sketch")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self.sketch = QuantileSketch()
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.total_sq += value * value
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+        self.sketch.add(value)
+
+    def merge_row(self, count: int, total: float, total_sq: float, minimum: float, maximum: float, sketch: str) -> None:
+        self.count += count
+        self.total += total
+        self.total_sq += total_sq
+        self.minimum = min(self.minimum, minimum)
+        self.maximum = max(self.maximum, maximum)
+        self.sketch.merge(QuantileSketch.from_json(sketch))
+
+    def merge(self, other: "Aggregate") -> None:
+        self.count += other.count
+        self.total += other.total
+        self.total_sq += other.total_sq
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        self.sketch.merge(other.sketch)
+
+    @property
+    def average(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def std_deviation(self) -> float:
+        # Sample standard deviation, like statistics.stdev on the raw values
+        if self.count < 2:
+            return 0.0
+        variance = (self.total_sq - self.total * self.total / self.count) / (self.count - 1)
+        return math.sqrt(max(variance, 0.0))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "average": self.average,
+            "min": self.minimum if self.count else 0.0,
+            "max": self.maximum if self.count else 0.0,
+            "median": self.sketch.quantile(0.5) or 0.0,
+            "p95": self.sketch.quantile(0.95) or 0.0,
+            "std_deviation": self.std_deviation,
+        }
+
+
+def create_rollup_tables(conn) -> None:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS performance_rollups (
+            tier TEXT NOT NULL,
+            component TEXT NOT NULL,
+            metric_name TEXT NOT NULL,
+            bucket INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            sum REAL NOT NULL,
+            sum_sq REAL NOT NULL,
+            min REAL NOT NULL,
+            max REAL NOT NULL,
+            sketch TEXT NOT NULL,
+            PRIMARY KEY (tier, component, metric_name, bucket)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_performance_rollups_bucket
+        ON performance_rollups(tier, bucket)
+    """)
+
+
+def _epoch(timestamp: str) -> float:
+    # Raw rows carry naive local ISO timestamps (datetime.now().isoformat())
+    return datetime.fromisoformat(timestamp).timestamp()
+
+
+def apply_rollups(conn, rows: Iterable[Sequence[Any]]) -> int:
+    """
+    Fold raw rows ``(timestamp, metric_name, value, component, tags)`` into
+    every tier.  Must run inside the caller's write transaction so the
+    read-merge-write of each touched bucket is atomic.
+    """
+    pending: Dict[Tuple[str, str, str, int], Aggregate] = {}
+    for timestamp, metric_name, value, component, _tags in rows:
+        epoch = _epoch(timestamp)
+        for tier in TIERS:
+            key = (tier.name, component, metric_name, int(epoch // tier.seconds) * tier.seconds)
+            aggregate = pending.get(key)
+            if aggregate is None:
+                aggregate = pending[key] = Aggregate()
+            aggregate.add(float(value))
+
+    for key, aggregate in pending.items():
+        existing = conn.execute("""
+            SELECT count, sum, sum_sq, min, max, sketch FROM performance_rollups
+            WHERE tier = ? AND component = ? AND metric_name = ? AND bucket = ?
+        """, key).fetchone()
+        if existing:
+            aggregate.merge_row(*existing)
+        conn.execute("""
+            INSERT OR REPLACE INTO performance_rollups
+            (tier, component, metric_name, bucket, count, sum, sum_sq, min, max, sketch)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (*key, aggregate.count, aggregate.total, aggregate.total_sq,
+              aggregate.minimum, aggregate.maximum, aggregate.sketch.to_json()))
+    return len(pending)
+
+
+def choose_tier(
+    hours: float,
+    raw_retention_days: float,
+    target_points: int = DEFAULT_TARGET_POINTS,
+) -> Optional[RollupTier]:
+    """
+    Coarsest tier that still yields ``target_points`` over the window and
+    keeps data that far back; None means raw rows are the better source.
+    """
+    window = hours * 3600
+    for tier in reversed(TIERS):
+        if window / tier.seconds >= target_points and hours <= tier.retention_days * 24:
+            return tier
+    if hours <= raw_retention_days * 24:
+        return None
+    # Beyond raw retention: the finest tier that still reaches back far enough
+    for tier in TIERS:
+        if hours <= tier.retention_days * 24:
+            return tier
+    return TIERS[-1]
+
+
+def query_buckets(conn, tier: RollupTier, component: str, metric_name: str, since: float) -> List[Dict[str, Any]]:
+    """Per-bucket aggregates for one series since the epoch ``since``, oldest first."""
+    start = int(since // tier.seconds) * tier.seconds
+    rows = conn.execute("""
+        SELECT bucket, count, sum, sum_sq, min, max, sketch FROM performance_rollups
+        WHERE tier = ? AND component = ? AND metric_name = ? AND bucket >= ?
+        ORDER BY bucket ASC
+    """, (tier.name, component, metric_name, start)).fetchall()
+    buckets = []
+    for bucket, count, total, total_sq, minimum, maximum, sketch in rows:
+        aggregate = Aggregate()
+        aggregate.merge_row(count, total, total_sq, minimum, maximum, sketch)
+        buckets.append({"bucket": bucket, "aggregate": aggregate})
+    return buckets
+
+
+def list_series(conn, tier: RollupTier, since: float, component: Optional[str] = None) -> List[Tuple[str, str]]:
+    """Distinct ``(component, metric_name)`` pairs with data in the tier since ``since``."""
+    start = int(since // tier.seconds) * tier.seconds
+    query = "SELECT DISTINCT component, metric_name FROM performance_rollups WHERE tier = ? AND bucket >= ?"
+    params: List[Any] = [tier.name, start]
+    if component:
+        query += " AND component = ?"
+        params.append(component)
+    return [tuple(row) for row in conn.execute(query, params).fetchall()]
+
+
+def cleanup_rollups(conn, now: float) -> Dict[str, int]:
+    """Delete buckets past each tier's retention; returns rows deleted per tier."""
+    deleted = {}
+    for tier in TIERS:
+        cursor = conn.execute(
+            "DELETE FROM performance_rollups WHERE tier = ? AND bucket < ?",
+            (tier.name, now - tier.retention_days * 86400),
+        )
+        deleted[tier.name] = cursor.rowcount
+    return deleted
+
+
+def backfill_rollups(conn, batch_size: int = 10000) -> int:
+    """Build rollups from existing raw rows (one-off, when the table is new)."""
+    if conn.execute("SELECT 1 FROM performance_rollups LIMIT 1").fetchone():
+        return 0
+    processed = 0
+    last_id = 0
+    while True:
+        rows = conn.execute("""
+            SELECT id, timestamp, metric_name, value, component, tags FROM performance_metrics
+            WHERE id > ? ORDER BY id LIMIT ?
+        """, (last_id, batch_size)).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        apply_rollups(conn, [row[1:] for row in rows])
+        processed += len(rows)
+    if processed:
+        logger.info(f"Backfilled performance rollups from {processed} raw metrics")
+    return processed
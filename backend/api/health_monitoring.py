@@ -3,6 +3,8 @@ from typing import Optional, List
 from datetime import datetime, timedelta
 import logging
 from ..monitoring.health_monitor import health_monitor
+from ..monitoring.system_sampler import system_sampler
+from ..services.http_client import http_pool
 from ..models.responses import APIResponse
 
 logger = logging.getLogger(__name__)
@@ -208,42 +210,35 @@ async def get_system_uptime():
 async def get_performance_metrics():
     """Get current performance metrics."""
     try:
-        import psutil
-        
-        # Get current system metrics
-        cpu_percent = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
-        network = psutil.net_io_counters()
+        # Latest sample from the shared background sampler
+        snapshot = system_sampler.snapshot()
+        memory = snapshot["memory"]
+        disk = snapshot["disk"]
+        network = snapshot["network"]
         
         performance_data = {
             "cpu": {
-                "usage_percent": cpu_percent,
-                "count": psutil.cpu_count(),
-                "count_logical": psutil.cpu_count(logical=True)
+                "usage_percent": snapshot["cpu_percent"],
+                "count": snapshot["cpu_count_logical"],
+                "count_logical": snapshot["cpu_count_logical"]
             },
             "memory": {
-                "total_gb": memory.total / (1024**3),
-                "available_gb": memory.available / (1024**3),
-                "used_gb": memory.used / (1024**3),
-                "usage_percent": memory.percent
+                "total_gb": memory["total"] / (1024**3),
+                "available_gb": memory["available"] / (1024**3),
+                "used_gb": memory["used"] / (1024**3),
+                "usage_percent": memory["percent"]
             },
             "disk": {
-                "total_gb": disk.total / (1024**3),
-                "free_gb": disk.free / (1024**3),
-                "used_gb": disk.used / (1024**3),
-                "usage_percent": (disk.used / disk.total) * 100
+                "total_gb": disk["total"] / (1024**3),
+                "free_gb": disk["free"] / (1024**3),
+                "used_gb": disk["used"] / (1024**3),
+                "usage_percent": disk["percent"]
             },
-            "network": {
-                "bytes_sent": network.bytes_sent,
-                "bytes_recv": network.bytes_recv,
-                "packets_sent": network.packets_sent,
-                "packets_recv": network.packets_recv
-            },
-            "processes": {
-                "total": len(psutil.pids()),
-                "running": len([p for p in psutil.process_iter(['status']) if p.info['status'] == 'running'])
-            }
+            "network": dict(network),
+            "processes": dict(snapshot["processes"]),
+            "sampled_at": snapshot["timestamp"],
+            "sampler": system_sampler.get_stats(),
+            "outbound_http": http_pool.get_stats()
         }
         
         return APIResponse(
@@ -255,6 +250,37 @@ async def get_performance_metrics():
         logger.error(f"Error retrieving performance metrics: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/api/v1/performance/history", response_model=APIResponse)
+async def get_performance_history(
+    minutes: int = Query(60, ge=1, le=1440, description="Minutes of sampler history to return")
+):
+    """Get recent system samples from the background sampler's ring buffer."""
+    try:
+        samples = system_sampler.history(minutes * 60)
+        
+        return APIResponse(
+            status="success",
+            data={
+                "samples": [
+                    {
+                        "timestamp": sample["timestamp"],
+                        "cpu_percent": sample["cpu_percent"],
+                        "memory_percent": sample["memory"]["percent"],
+                        "disk_percent": sample["disk"]["percent"],
+                        "process_rss": sample["process"]["rss"],
+                        "network_connections": sample["network_connections"]
+                    }
+                    for sample in samples
+                ],
+                "interval_seconds": system_sampler.interval,
+                "sampler": system_sampler.get_stats()
+            },
+            message="Performance history retrieved successfully"
+        )
+    except Exception as e:
+        logger.error(f"Error retrieving performance history: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/api/v1/diagnostics", response_model=APIResponse)
 async def run_system_diagnostics():
     """Run comprehensive system diagnostics."""
@@ -318,15 +344,16 @@ async def run_system_diagnostics():
             })
         
         # Check system resources
-        memory = psutil.virtual_memory()
-        if memory.percent > 85:
+        snapshot = system_sampler.snapshot()
+        memory_percent = snapshot["memory"]["percent"]
+        if memory_percent > 85:
             recommendations.append({
                 "type": "warning",
-                "message": f"High memory usage: {memory.percent:.1f}%",
+                "message": f"High memory usage: {memory_percent:.1f}%",
                 "action": "Consider increasing memory or optimizing memory usage"
             })
         
-        cpu_percent = psutil.cpu_percent(interval=1)
+        cpu_percent = snapshot["cpu_percent"]
         if cpu_percent > 80:
             recommendations.append({
                 "type": "warning",
@@ -334,8 +361,7 @@ async def run_system_diagnostics():
                 "action": "Investigate high CPU processes and optimize"
             })
         
-        disk = psutil.disk_usage('/')
-        disk_percent = (disk.used / disk.total) * 100
+        disk_percent = snapshot["disk"]["percent"]
         if disk_percent > 90:
             recommendations.append({
                 "type": "critical",
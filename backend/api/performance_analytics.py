@@ -1,6 +1,6 @@
 from fastapi import APIRouter, HTTPException, Query, BackgroundTasks
 from typing import Optional, List
-from datetime import datetime, timedelta
+from datetime import datetime
 import logging
 from ..analytics.performance_analytics import performance_analytics
 from ..models.responses import APIResponse
@@ -347,12 +347,40 @@ async def get_performance_alerts(
         logger.error(f"Error getting performance alerts: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/api/v1/anomalies/live", response_model=APIResponse)
+async def get_live_anomalies(
+    component: Optional[str] = Query(None, description="Filter by component"),
+    metric_name: Optional[str] = Query(None, description="Filter by metric name"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum anomalies to return")
+):
+    """Get anomalies flagged by the streaming detector as metrics were recorded."""
+    try:
+        anomalies = performance_analytics.get_live_anomalies(component, metric_name, limit)
+        
+        data = {
+            "anomalies": anomalies,
+            "total_anomalies": len(anomalies)
+        }
+        if component and metric_name:
+            data["stats"] = performance_analytics.get_streaming_stats(component, metric_name)
+        
+        return APIResponse(
+            status="success",
+            data=data,
+            message="Live anomalies retrieved successfully"
+        )
+    except Exception as e:
+        logger.error(f"Error getting live anomalies: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/api/v1/benchmarks/run", response_model=APIResponse)
 async def run_performance_benchmark(
     background_tasks: BackgroundTasks,
     component: str,
     benchmark_type: str = Query(..., regex="^(load|stress|endurance)$"),
-    duration_minutes: int = Query(5, ge=1, le=60)
+    duration_minutes: int = Query(5, ge=1, le=60),
+    target_path: Optional[str] = Query(None, description="Route to drive; defaults to the component's GET routes"),
+    requests_per_second: Optional[float] = Query(None, gt=0, le=5000, description="Rate (peak rate for stress)")
 ):
     """Run performance benchmarks for a component."""
     try:
@@ -364,7 +392,9 @@ async def run_performance_benchmark(
             benchmark_id,
             component,
             benchmark_type,
-            duration_minutes
+            duration_minutes,
+            target_path,
+            requests_per_second
         )
         
         return APIResponse(
@@ -386,81 +416,32 @@ async def _run_benchmark_task(
     benchmark_id: str,
     component: str,
     benchmark_type: str,
-    duration_minutes: int
+    duration_minutes: int,
+    target_path: Optional[str] = None,
+    requests_per_second: Optional[float] = None
 ):
-    """Run a performance benchmark task."""
+    """Run a performance benchmark task against the app's own routes."""
     try:
-        import asyncio
-        import random
+        from ..analytics.benchmark_engine import BenchmarkTarget, build_profile, run_recorded_benchmark
+        from ..main import app
         
         logger.info(f"Starting benchmark {benchmark_id} for {component}")
         
-        # Record benchmark start
-        await performance_analytics.record_metric(
-            metric_name="benchmark_status",
-            value=1.0,  # 1 = running
-            component=component,
-            tags={
-                "benchmark_id": benchmark_id,
-                "benchmark_type": benchmark_type,
-                "status": "started"
-            }
+        summary = await run_recorded_benchmark(
+            performance_analytics,
+            app,
+            benchmark_id,
+            component,
+            build_profile(benchmark_type, duration_minutes * 60, requests_per_second),
+            targets=[BenchmarkTarget(path=target_path)] if target_path else None
         )
         
-        # Simulate benchmark execution
-        start_time = datetime.now()
-        end_time = start_time + timedelta(minutes=duration_minutes)
-        
-        while datetime.now() < end_time:
-            # Simulate different benchmark types
-            if benchmark_type == "load":
-                # Simulate load testing metrics
-                response_time = random.uniform(50, 200)  # ms
-                throughput = random.uniform(100, 500)    # requests/sec
-                cpu_usage = random.uniform(30, 70)       # %
-                
-                await performance_analytics.record_metric("response_time", response_time, component, {"benchmark_id": benchmark_id})
-                await performance_analytics.record_metric("throughput", throughput, component, {"benchmark_id": benchmark_id})
-                await performance_analytics.record_metric("cpu_usage", cpu_usage, component, {"benchmark_id": benchmark_id})
-                
-            elif benchmark_type == "stress":
-                # Simulate stress testing metrics
-                response_time = random.uniform(100, 1000)  # ms
-                error_rate = random.uniform(0, 10)         # %
-                memory_usage = random.uniform(50, 90)      # %
-                
-                await performance_analytics.record_metric("response_time", response_time, component, {"benchmark_id": benchmark_id})
-                await performance_analytics.record_metric("error_rate", error_rate, component, {"benchmark_id": benchmark_id})
-                await performance_analytics.record_metric("memory_usage", memory_usage, component, {"benchmark_id": benchmark_id})
-                
-            elif benchmark_type == "endurance":
-                # Simulate endurance testing metrics
-                response_time = random.uniform(80, 300)    # ms
-                memory_usage = random.uniform(40, 80)      # %
-                connection_count = random.uniform(10, 100) # connections
-                
-                await performance_analytics.record_metric("response_time", response_time, component, {"benchmark_id": benchmark_id})
-                await performance_analytics.record_metric("memory_usage", memory_usage, component, {"benchmark_id": benchmark_id})
-                await performance_analytics.record_metric("connection_count", connection_count, component, {"benchmark_id": benchmark_id})
-            
-            # Wait before next measurement
-            await asyncio.sleep(10)  # 10 second intervals
-        
-        # Record benchmark completion
-        await performance_analytics.record_metric(
-            metric_name="benchmark_status",
-            value=0.0,  # 0 = completed
-            component=component,
-            tags={
-                "benchmark_id": benchmark_id,
-                "benchmark_type": benchmark_type,
-                "status": "completed",
-                "duration_minutes": duration_minutes
-            }
+        logger.info(
+            f"Completed benchmark {benchmark_id} for {component}: "
+            f"{summary['requests']} requests, {summary['throughput_rps']:.1f} req/s, "
+            f"p99 {summary['latency_ms']['p99']:.1f} ms, {summary['error_rate']:.2f}% errors"
         )
         
-        logger.info(f"Completed benchmark {benchmark_id} for {component}")
-        
     except Exception as e:
         logger.error(f"Error running benchmark {benchmark_id}: {str(e)}")
         
@@ -487,6 +468,7 @@ async def get_benchmark_results(benchmark_id: str):
         from ..database import get_db_connection
         import json
         
+        await performance_analytics.flush_metrics()
         with get_db_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
@@ -521,8 +503,12 @@ async def get_benchmark_results(benchmark_id: str):
         
         # Analyze benchmark results
         metrics_summary = {}
+        benchmark_summary = {}
         for result in results:
             metric_name = result["metric_name"]
+            if result["tags"].get("phase") == "summary":
+                benchmark_summary[metric_name] = result["value"]
+                continue
             if metric_name not in metrics_summary:
                 metrics_summary[metric_name] = []
             metrics_summary[metric_name].append(result["value"])
@@ -548,6 +534,7 @@ async def get_benchmark_results(benchmark_id: str):
                 "component": component,
                 "benchmark_type": benchmark_type,
                 "total_data_points": len(results),
+                "summary": benchmark_summary,
                 "raw_results": results,
                 "statistics": statistics_summary
             },
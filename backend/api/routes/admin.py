@@ -44,6 +44,15 @@ async def list_backups():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to list backups: {str(e)}")
 
+@router.get("/admin/backup/{backup_id}/verify")
+async def verify_backup(backup_id: str, full: bool = False):
+    """Verify an incremental backup (``full`` re-hashes every chunk)."""
+    try:
+        return await backup_service.verify_backup(backup_id, full=full)
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to verify backup: {str(e)}")
+
 @router.post("/admin/backup/cleanup")
 async def cleanup_backups(keep_days: int = 30):
     """Clean up old backups."""
@@ -3,10 +3,12 @@ from __future__ import annotations
 import json
 from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, HTTPException, Response
-from pydantic import BaseModel, Field
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
 
 import ai_modules.advanced_analytics_utils as analytics_utils
+from backend.ai_modules.batch_channel_analysis import analyze_channels_ndjson, iter_ndjson, spool_chunks
 
 
 router = APIRouter()
@@ -38,6 +40,12 @@ class VideosRequest(BaseModel):
     videos: List[Dict[str, Any]] = Field(default_factory=list)
 
 
+class BatchAnalyticsRequest(BaseModel):
+    channels: List[Dict[str, Any]] = Field(default_factory=list)
+    channel_ids: List[str] = Field(default_factory=list)
+    time_period: int = 90
+
+
 @router.post("/advanced")
 async def advanced_analytics(request: AdvancedAnalyticsRequest):
     videos = request.channel_data.videos
@@ -55,6 +63,42 @@ async def advanced_analytics(request: AdvancedAnalyticsRequest):
     return {"status": "success", "data": result, "analysis_type": analysis_type}
 
 
+@router.post("/advanced/batch")
+async def advanced_analytics_batch(
+    request: Request,
+    time_period: int = 90,
+):
+    """Comprehensive analysis for many channels, streamed back as NDJSON.
+
+    The body is either a JSON ``BatchAnalyticsRequest`` or, with an
+    ``application/x-ndjson`` content type, one channel payload or channel ID
+    per line. NDJSON bodies are spooled to disk past a few MB and parsed one
+    line at a time, so large batches are never held in memory at once.
+    Records are emitted as each channel finishes; a failing channel yields
+    an ``"status": "error"`` record instead of aborting the batch.
+    All batches share one server-sized worker pool (``BATCH_ANALYSIS_WORKERS``).
+    """
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type:
+        # The body has to be fully received before streaming starts: the
+        # response's disconnect listener would otherwise compete for it
+        channels = iter_ndjson(await spool_chunks(request.stream()))
+    else:
+        try:
+            batch = BatchAnalyticsRequest.model_validate(await request.json())
+        except (ValueError, ValidationError) as e:
+            raise HTTPException(status_code=422, detail=f"Invalid batch request: {e}")
+        channels = [*batch.channels, *batch.channel_ids]
+        if not channels:
+            raise HTTPException(status_code=400, detail="No channels provided")
+        time_period = batch.time_period
+
+    return StreamingResponse(
+        analyze_channels_ndjson(channels, time_period=time_period, shared_pool=True),
+        media_type="application/x-ndjson",
+    )
+
+
 @router.post("/performance-insights")
 async def performance_insights(request: ChannelOnlyRequest):
     result = analytics_utils.generate_performance_insights(request.channel_data.model_dump())
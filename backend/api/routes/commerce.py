@@ -367,7 +367,7 @@ async def resend_delivery(
             ttl_hours=commerce_service.delivery_ttl_hours(),
             order_id=order.order_id,
         )
-        delivery_service.send_email(order.customer_email, subject, body)
+        await delivery_service.send_email_async(order.customer_email, subject, body)
         delivery.status = "sent"
         delivery.delivered_at = datetime.utcnow()
         order.status = "delivered"
@@ -45,6 +45,24 @@ def ingest_data(topic: str, payload: IngestRequest, db: Session = Depends(get_db
         print(f"Ingest Error: {e}")
         return {"accepted": False, "error": str(e)}
 
+@router.post("/ingest/bulk/{topic}", status_code=202)
+async def ingest_bulk(topic: str, request: Request, source: str = "bulk_upload", db: Session = Depends(get_db)):
+    """
+    Bulk NDJSON ingestion into the Growth Engine (one order per line).
+    """
+    service = IngestionService(db)
+    provenance = {
+        "origin_name": source,
+        "origin_type": "bulk_ndjson",
+        "quality_score": 1.0
+    }
+    try:
+        result = await service.ingest_ndjson(topic, request.stream(), provenance)
+        return {"accepted": True, "result": result}
+    except Exception as e:
+        print(f"Bulk Ingest Error: {e}")
+        return {"accepted": False, "error": str(e)}
+
 @router.get("/dashboard/kpi")
 def get_kpis(db: Session = Depends(get_db)):
     """Real-time KPI read for 'Daily Net Revenue'."""
@@ -72,7 +90,8 @@ def get_alerts(db: Session = Depends(get_db)):
 async def sync_orders(
     background_tasks: BackgroundTasks,
     limit: int = 100,
-    force: bool = False
+    force: bool = False,
+    since: Optional[str] = None
 ):
     """
     Trigger Shopier order synchronization.
@@ -83,6 +102,7 @@ async def sync_orders(
     Args:
         limit: Maximum orders to fetch (default: 100)
         force: Force reprocess already processed orders
+        since: ISO timestamp to backfill from instead of the stored cursor
     
     Returns:
         Sync result with order counts and revenue recorded
@@ -92,7 +112,8 @@ async def sync_orders(
     result = await order_sync_service.sync_orders(
         limit=limit,
         status_filter="paid",
-        force_reprocess=force
+        force_reprocess=force,
+        since=since
     )
     
     return {
@@ -103,7 +124,10 @@ async def sync_orders(
         "fulfilled": result.fulfilled,
         "already_processed": result.already_processed,
         "errors": result.errors,
-        "revenue_recorded": result.revenue_recorded
+        "revenue_recorded": result.revenue_recorded,
+        "pages_fetched": result.pages_fetched,
+        "cursor": result.cursor,
+        "elapsed_seconds": result.elapsed_seconds
     }
 
 
@@ -7,6 +7,7 @@ import json
 # Absolute imports for consistency
 from modules.growth_engine_v1.app import SessionLocal
 from modules.growth_engine_v1.models import GrowthLedgerEntry
+from modules.growth_engine_v1.rollup import DailyRevenueRollup
 
 router = APIRouter(prefix="/api/ignition", tags=["ignition"])
 
@@ -37,6 +38,7 @@ async def reset_ledger(
         # Delete all entries using ORM
         # This handles table name resolution automatically
         db.query(GrowthLedgerEntry).delete()
+        DailyRevenueRollup(db).clear()
         db.commit()
         return {"status": "ledger_reset", "message": "All growth ledger entries removed."}
     except Exception as e:
@@ -196,7 +196,7 @@ async def shopier_osb_callback(
                 delivery_data["sku"] = first_product.get("sku", "")
         
         # Trigger digital delivery
-        delivery_result = delivery_service.deliver_digital(delivery_data, base_url)
+        delivery_result = await delivery_service.deliver_digital_async(delivery_data, base_url)
         
         # Record revenue
         if price > 0 and delivery_result.status != "skipped":
@@ -351,7 +351,7 @@ async def shopier_callback(
                                 ttl_hours=commerce_service.delivery_ttl_hours(),
                                 order_id=commerce_order.order_id,
                             )
-                            delivery_service.send_email(email_target, subject, body)
+                            await delivery_service.send_email_async(email_target, subject, body)
                             delivery.status = "sent"
                             delivery.delivered_at = datetime.utcnow()
                             commerce_order.status = "delivered"
@@ -368,7 +368,7 @@ async def shopier_callback(
                         )
 
                 if not delivery_result:
-                    delivery_result = delivery_service.deliver_digital(data, base_url)
+                    delivery_result = await delivery_service.deliver_digital_async(data, base_url)
 
                 if amount > 0 and delivery_result.status != "skipped":
                     fulfillment_engine.record_sale(
@@ -3,103 +3,249 @@ Production Middleware Configuration
 Security, CORS, rate limiting, and monitoring
 """
 
-from fastapi import FastAPI, Request, Response
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import os
 import time
 import logging
-from typing import Callable
+from typing import Any, Dict, Iterable, Optional
 import json
 
 from backend.core.config import settings
+from backend.core.rate_limit import (
+    RateLimitBackend,
+    RateLimitDecision,
+    RateLimitRule,
+    RateLimiter,
+    rate_limit_backend_from_url,
+)
 
 logger = logging.getLogger(__name__)
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
+class RequestLoggingMiddleware:
     """Log all requests for monitoring and debugging."""
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
         start_time = time.time()
+        method, path = scope["method"], scope["path"]
         
         # Log request
-        logger.info(f"📥 {request.method} {request.url.path} - {request.client.host}")
-        
-        # Process request
-        response = await call_next(request)
+        logger.info(f"📥 {method} {path} - {_client_host(scope)}")
         
-        # Calculate processing time
-        process_time = time.time() - start_time
-        
-        # Log response
-        logger.info(
-            f"📤 {request.method} {request.url.path} - "
-            f"Status: {response.status_code} - "
-            f"Time: {process_time:.3f}s"
-        )
-        
-        # Add processing time header
-        response.headers["X-Process-Time"] = str(process_time)
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Calculate processing time (up to the response headers, as before)
+                process_time = time.time() - start_time
+                
+                # Log response
+                logger.info(
+                    f"📤 {method} {path} - "
+                    f"Status: {message['status']} - "
+                    f"Time: {process_time:.3f}s"
+                )
+                
+                # Add processing time header
+                MutableHeaders(scope=message)["X-Process-Time"] = str(process_time)
+            await send(message)
         
-        return response
+        await self.app(scope, receive, send_wrapper)
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Simple rate limiting middleware."""
+class RateLimitMiddleware:
+    """
+    Sliding-window-counter rate limiting (see ``backend.core.rate_limit``).
+
+    ``calls``/``period`` is the default per-client quota.  ``route_limits``
+    maps path prefixes to extra quotas, ``api_key_limits`` maps API keys
+    (sent in ``api_key_header``) to their own quotas, and ``backend`` (or
+    ``backend_url``, e.g. ``redis://...``) shares the counters across
+    workers.  Quotas are given as ``RateLimitRule`` or ``(calls, period)``.
+    """
     
-    def __init__(self, app, calls: int = 100, period: int = 60):
-        super().__init__(app)
+    def __init__(
+        self,
+        app: ASGIApp,
+        calls: int = 100,
+        period: int = 60,
+        route_limits: Optional[Dict[str, Any]] = None,
+        api_key_limits: Optional[Dict[str, Any]] = None,
+        api_key_header: str = "X-API-Key",
+        backend: Optional[RateLimitBackend] = None,
+        backend_url: Optional[str] = None,
+        exempt_paths: Iterable[str] = ("/health",),
+    ):
+        self.app = app
         self.calls = calls
         self.period = period
-        self.clients = {}
+        self.api_key_header = api_key_header
+        self.exempt_paths = tuple(exempt_paths)
+        self.limiter = RateLimiter(
+            default=RateLimitRule(calls, period),
+            route_limits={prefix: _as_rule(rule) for prefix, rule in (route_limits or {}).items()},
+            api_key_limits={key: _as_rule(rule) for key, rule in (api_key_limits or {}).items()},
+            backend=backend or rate_limit_backend_from_url(backend_url),
+        )
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        client_ip = request.client.host
-        current_time = time.time()
+    async def check(self, scope: Scope) -> Optional[RateLimitDecision]:
+        """Decision for this request, or None when the path is exempt."""
+        path = scope["path"]
+        if path.startswith(self.exempt_paths):
+            return None
+        api_key = Headers(scope=scope).get(self.api_key_header)
+        return await self.limiter.check(path, _client_host(scope) or "unknown", api_key)
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-        # Clean old entries
-        self.clients = {
-            ip: times for ip, times in self.clients.items()
-            if any(t > current_time - self.period for t in times)
-        }
+        decision = await self.check(scope)
+        if decision is None:
+            await self.app(scope, receive, send)
+            return
+        if not decision.allowed:
+            await _rate_limited_response(decision)(scope, receive, send)
+            return
         
-        # Check rate limit
-        if client_ip in self.clients:
-            recent_calls = [t for t in self.clients[client_ip] if t > current_time - self.period]
-            if len(recent_calls) >= self.calls:
-                return Response(
-                    content=json.dumps({"error": "Rate limit exceeded"}),
-                    status_code=429,
-                    media_type="application/json"
-                )
-            self.clients[client_ip] = recent_calls + [current_time]
-        else:
-            self.clients[client_ip] = [current_time]
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).update(decision.headers())
+            await send(message)
         
-        return await call_next(request)
+        await self.app(scope, receive, send_wrapper)
+
+
+def _as_rule(rule: Any) -> RateLimitRule:
+    return rule if isinstance(rule, RateLimitRule) else RateLimitRule(*rule)
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
+
+def _client_host(scope: Scope) -> Optional[str]:
+    client = scope.get("client")
+    return client[0] if client else None
+
+
+def _rate_limited_response(decision: RateLimitDecision) -> Response:
+    return Response(
+        content=json.dumps({"error": "Rate limit exceeded"}),
+        status_code=429,
+        media_type="application/json",
+        headers=decision.headers()
+    )
+
+
+def security_headers() -> Dict[str, str]:
+    """Headers added to every response by ``SecurityHeadersMiddleware``."""
+    headers = {
+        "X-Content-Type-Options": "nosniff",
+        "X-Frame-Options": "DENY",
+        "X-XSS-Protection": "1; mode=block",
+        "Referrer-Policy": "strict-origin-when-cross-origin",
+    }
+    if settings.environment == "production":
+        headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
+    return headers
+
+class SecurityHeadersMiddleware:
     """Add security headers to all responses."""
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        response = await call_next(request)
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.headers = security_headers()
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-        # Add security headers
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).update(self.headers)
+            await send(message)
         
-        if settings.ENVIRONMENT == "production":
-            response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
+        await self.app(scope, receive, send_wrapper)
+
+class CombinedMiddleware:
+    """
+    Request logging, rate limiting and security headers in one ASGI pass.
+
+    Equivalent to stacking ``RequestLoggingMiddleware`` (outermost),
+    ``RateLimitMiddleware`` and ``SecurityHeadersMiddleware``, but with a
+    single ``send`` wrapper per request.  ``rate_limit`` holds the
+    ``RateLimitMiddleware`` options; leave it as None to disable limiting.
+    Unlike the stacked version, 429 responses also carry security headers.
+    """
+    
+    def __init__(
+        self,
+        app: ASGIApp,
+        rate_limit: Optional[Dict[str, Any]] = None,
+        request_logging: bool = True,
+        security: bool = True,
+    ):
+        self.app = app
+        self.rate_limiter = RateLimitMiddleware(app, **rate_limit) if rate_limit is not None else None
+        self.request_logging = request_logging
+        self.security_headers = security_headers() if security else {}
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-        return response
+        start_time = time.time()
+        method, path = scope["method"], scope["path"]
+        if self.request_logging:
+            logger.info(f"📥 {method} {path} - {_client_host(scope)}")
+        
+        decision = await self.rate_limiter.check(scope) if self.rate_limiter else None
+        
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.update(self.security_headers)
+                if decision is not None and decision.allowed:
+                    headers.update(decision.headers())
+                if self.request_logging:
+                    process_time = time.time() - start_time
+                    logger.info(
+                        f"📤 {method} {path} - "
+                        f"Status: {message['status']} - "
+                        f"Time: {process_time:.3f}s"
+                    )
+                    headers["X-Process-Time"] = str(process_time)
+            await send(message)
+        
+        if decision is not None and not decision.allowed:
+            await _rate_limited_response(decision)(scope, receive, send_wrapper)
+        else:
+            await self.app(scope, receive, send_wrapper)
 
-def setup_middleware(app: FastAPI) -> None:
-    """Configure all middleware for the application."""
+def setup_middleware(app: FastAPI, combined: Optional[bool] = None) -> None:
+    """Configure all middleware for the application.
+
+    With ``combined`` (default: ``COMBINED_MIDDLEWARE`` env var) logging,
+    rate limiting and security headers run as one ``CombinedMiddleware``
+    in the outermost position, so rate limiting happens before the
+    trusted-host check.
+    """
+    if combined is None:
+        combined = os.getenv("COMBINED_MIDDLEWARE", "false").lower() in ("1", "true", "yes")
+    rate_limit = None
+    if settings.environment == "production":
+        rate_limit = dict(calls=100, period=60, backend_url=os.getenv("RATE_LIMIT_BACKEND_URL"))
     
     # CORS - Configure for production
-    if settings.ENVIRONMENT == "production":
+    if settings.environment == "production":
         allowed_origins = [
             "https://yourdomain.com",
             "https://www.yourdomain.com"
@@ -115,15 +261,16 @@ def setup_middleware(app: FastAPI) -> None:
         allow_headers=["*"],
     )
     
-    # Security headers
-    app.add_middleware(SecurityHeadersMiddleware)
-    
-    # Rate limiting
-    if settings.ENVIRONMENT == "production":
-        app.add_middleware(RateLimitMiddleware, calls=100, period=60)
+    if not combined:
+        # Security headers
+        app.add_middleware(SecurityHeadersMiddleware)
+        
+        # Rate limiting
+        if rate_limit is not None:
+            app.add_middleware(RateLimitMiddleware, **rate_limit)
     
     # Trusted hosts (production only)
-    if settings.ENVIRONMENT == "production":
+    if settings.environment == "production":
         app.add_middleware(
             TrustedHostMiddleware,
             allowed_hosts=["yourdomain.com", "*.yourdomain.com"]
@@ -133,6 +280,9 @@ def setup_middleware(app: FastAPI) -> None:
     app.add_middleware(GZipMiddleware, minimum_size=1000)
     
     # Request logging
-    app.add_middleware(RequestLoggingMiddleware)
+    if combined:
+        app.add_middleware(CombinedMiddleware, rate_limit=rate_limit)
+    else:
+        app.add_middleware(RequestLoggingMiddleware)
     
     logger.info("✅ Middleware configured successfully")
\ No newline at end of file
@@ -0,0 +1,344 @@
+"""
+Sliding-window-counter rate limiting.
+
+Each (rule, client) pair keeps two integers: the number of requests in the
+current fixed window and in the previous one.  The request rate is
+estimated as ``previous * (1 - elapsed_fraction) + current``, which smooths
+the window boundary like a sliding log without storing timestamps, so
+every request is O(1) work and O(1) memory per client.
+
+Backends only store and update the counters; the allow/deny decision is
+made here so every backend behaves identically:
+
+* ``InMemoryRateLimitBackend`` - per process, idle clients swept lazily.
+* ``RedisRateLimitBackend`` - shared by every worker, one atomic script
+  call per request.
+"""
+
+import hashlib
+import logging
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    """``calls`` requests per ``period`` seconds."""
+    calls: int
+    period: float
+
+    def __post_init__(self):
+        if self.calls < 1 or self.period <= 0:
+            raise ValueError("rate limit rules need calls >= 1 and period > 0")
+
+
+@dataclass
+class RateLimitDecision:
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float
+    reset_after: float
+
+    def headers(self) -> Dict[str, str]:
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset": str(math.ceil(self.reset_after)),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(self.retry_after)))
+        return headers
+
+
+# A check is (counter key, rule); backends return (current, previous) counts
+# per check as they were before this request.
+Check = Tuple[str, RateLimitRule]
+Counts = List[Tuple[int, int]]
+
+
+def _estimate(current: int, previous: int, fraction: float) -> float:
+    return previous * (1.0 - fraction) + current
+
+
+def _retry_after(rule: RateLimitRule, current: int, previous: int, fraction: float) -> float:
+    """Seconds until one more request fits under ``rule``."""
+    budget = rule.calls - 1
+    if current <= budget:
+        if previous <= 0:
+            return 0.0
+        # Wait until the previous window's weight has decayed far enough
+        needed = 1.0 - (budget - current) / previous
+        return max(0.0, (needed - fraction) * rule.period)
+    # The current window alone is over budget: wait for it to become "previous"
+    needed = 1.0 - budget / current
+    return (1.0 - fraction) * rule.period + needed * rule.period
+
+
+def decide(checks: Sequence[Check], counts: Counts, now: float) -> Tuple[bool, RateLimitDecision]:
+    """Evaluate every check; the request passes only if all of them do.
+
+    The returned decision describes the binding quota: the denied check with
+    the longest wait, or else the one with the fewest requests left.
+    """
+    decisions = []
+    for (_, rule), (current, previous) in zip(checks, counts):
+        window_start = (now // rule.period) * rule.period
+        fraction = (now - window_start) / rule.period
+        estimate = _estimate(current, previous, fraction)
+        ok = estimate + 1 <= rule.calls
+        decisions.append(RateLimitDecision(
+            allowed=ok,
+            limit=rule.calls,
+            remaining=max(0, int(rule.calls - estimate - (1 if ok else 0))),
+            retry_after=0.0 if ok else _retry_after(rule, current, previous, fraction),
+            reset_after=window_start + rule.period - now,
+        ))
+
+    denied = [d for d in decisions if not d.allowed]
+    if denied:
+        return False, max(denied, key=lambda d: d.retry_after)
+    return True, min(decisions, key=lambda d: d.remaining)
+
+
+class RateLimitBackend:
+    """Stores window counters; ``hit`` increments them only when allowed."""
+
+    name = "base"
+
+    async def hit(self, checks: Sequence[Check], now: float) -> Tuple[bool, RateLimitDecision]:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class _Window:
+    __slots__ = ("window", "current", "previous", "period")
+
+    def __init__(self, window: int, period: float):
+        self.window = window
+        self.current = 0
+        self.previous = 0
+        self.period = period
+
+    def roll(self, window: int) -> None:
+        if window == self.window:
+            return
+        self.previous = self.current if window == self.window + 1 else 0
+        self.current = 0
+        self.window = window
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """
+    Per-process counters in an LRU-ordered dict.
+
+    Every ``hit`` also inspects at most ``sweep_batch`` of the least recently
+    seen keys and drops the ones whose windows have fully expired, so idle
+    clients are reclaimed without a periodic full scan.  ``max_entries``
+    caps memory under floods of distinct clients by evicting the least
+    recently seen key.
+    """
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 100_000, sweep_batch: int = 4):
+        self.max_entries = max_entries
+        self.sweep_batch = sweep_batch
+        self._windows: "OrderedDict[str, _Window]" = OrderedDict()
+        self.stats = {"swept": 0, "evicted": 0}
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+    def _sweep(self, now: float) -> None:
+        windows = self._windows
+        for _ in range(self.sweep_batch):
+            if not windows:
+                return
+            key, state = next(iter(windows.items()))
+            # Idle once neither the current nor the previous window is live
+            if now // state.period - state.window < 2:
+                return
+            del windows[key]
+            self.stats["swept"] += 1
+
+    async def hit(self, checks: Sequence[Check], now: float) -> Tuple[bool, RateLimitDecision]:
+        return self.hit_sync(checks, now)
+
+    def hit_sync(self, checks: Sequence[Check], now: float) -> Tuple[bool, RateLimitDecision]:
+        self._sweep(now)
+        windows = self._windows
+        states = []
+        counts = []
+        for key, rule in checks:
+            window = int(now // rule.period)
+            state = windows.get(key)
+            if state is None:
+                state = windows[key] = _Window(window, rule.period)
+                if len(windows) > self.max_entries:
+                    windows.popitem(last=False)
+                    self.stats["evicted"] += 1
+            else:
+                windows.move_to_end(key)
+                state.roll(window)
+            states.append(state)
+            counts.append((state.current, state.previous))
+
+        allowed, decision = decide(checks, counts, now)
+        if allowed:
+            for state in states:
+                state.current += 1
+        return allowed, decision
+
+
+# KEYS: (current, previous) counter keys per check; ARGV: expiry (ms) per
+# check. Returns the counts as they were before the increment.
+_SLIDING_WINDOW_SCRIPT = """
+local counts = {}
+for i = 1, #KEYS / 2 do
+    counts[2 * i - 1] = tonumber(redis.call('GET', KEYS[2 * i - 1]) or '0')
+    counts[2 * i] = tonumber(redis.call('GET', KEYS[2 * i]) or '0')
+    redis.call('INCR', KEYS[2 * i - 1])
+    redis.call('PEXPIRE', KEYS[2 * i - 1], ARGV[i])
+end
+return counts
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """
+    Counters shared by every worker through Redis.
+
+    Counters live under ``{prefix}{key}:{window}`` and expire after two
+    periods, so Redis does the idle sweep.  To keep each request a single
+    round trip, the script is called optimistically: counts are read and
+    incremented atomically, and an over-limit request rolls its increment
+    back with a second call (only rejected requests pay for it).
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str = "redis://localhost:6379", prefix: str = "ratelimit:", client: Any = None):
+        if client is None:
+            import redis.asyncio as redis_asyncio
+
+            client = redis_asyncio.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(_SLIDING_WINDOW_SCRIPT)
+
+    def _keys(self, checks: Sequence[Check], now: float) -> List[str]:
+        keys = []
+        for key, rule in checks:
+            window = int(now // rule.period)
+            keys.append(f"{self.prefix}{key}:{window}")
+            keys.append(f"{self.prefix}{key}:{window - 1}")
+        return keys
+
+    async def hit(self, checks: Sequence[Check], now: float) -> Tuple[bool, RateLimitDecision]:
+        keys = self._keys(checks, now)
+        expiries = [int(rule.period * 2000) for _, rule in checks]
+        raw = await self._script(keys=keys, args=expiries)
+        counts = [(int(raw[i]), int(raw[i + 1])) for i in range(0, len(raw), 2)]
+
+        allowed, decision = decide(checks, counts, now)
+        if not allowed:
+            pipe = self.client.pipeline(transaction=False)
+            for i in range(0, len(keys), 2):
+                pipe.decr(keys[i])
+            await pipe.execute()
+        return allowed, decision
+
+    async def close(self) -> None:
+        try:
+            await self.client.close()
+        except Exception:
+            pass
+
+
+def rate_limit_backend_from_url(url: Optional[str]) -> RateLimitBackend:
+    """``None``/``memory://`` for per-process counters, ``redis://...`` for shared ones."""
+    if not url or url.startswith("memory://"):
+        return InMemoryRateLimitBackend()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisRateLimitBackend(url)
+    raise ValueError(f"Unsupported rate limit backend URL: {url}")
+
+
+class RateLimiter:
+    """
+    Resolves which quotas apply to a request and asks the backend.
+
+    * Every client is held to ``default`` (or its API key's own quota).
+    * ``route_limits`` adds a quota per path prefix (longest prefix wins),
+      counted separately per client.
+    * Requests carrying a key listed in ``api_key_limits`` are counted per
+      key instead of per IP.  Unknown keys are counted by IP, so rotating
+      made-up keys does not reset a client's budget.
+    """
+
+    def __init__(
+        self,
+        default: RateLimitRule,
+        route_limits: Optional[Dict[str, RateLimitRule]] = None,
+        api_key_limits: Optional[Dict[str, RateLimitRule]] = None,
+        backend: Optional[RateLimitBackend] = None,
+        fail_open: bool = True,
+    ):
+        self.default = default
+        # Longest prefix first so the first match is the most specific
+        self.route_limits = sorted((route_limits or {}).items(), key=lambda item: len(item[0]), reverse=True)
+        self.api_key_limits = {
+            self._key_id(api_key): rule for api_key, rule in (api_key_limits or {}).items()
+        }
+        self.backend = backend or InMemoryRateLimitBackend()
+        self.fail_open = fail_open
+        self.stats = {"allowed": 0, "limited": 0, "backend_errors": 0}
+
+    @staticmethod
+    def _key_id(api_key: str) -> str:
+        # Keys are never stored or sent to the shared backend in clear text
+        return hashlib.blake2b(api_key.encode("utf-8"), digest_size=8).hexdigest()
+
+    def checks_for(self, path: str, client_ip: str, api_key: Optional[str] = None) -> List[Check]:
+        identity = f"ip:{client_ip}"
+        rule = self.default
+        if api_key:
+            key_id = self._key_id(api_key)
+            key_rule = self.api_key_limits.get(key_id)
+            if key_rule is not None:
+                identity, rule = f"key:{key_id}", key_rule
+
+        checks = [(f"all:{identity}", rule)]
+        for prefix, route_rule in self.route_limits:
+            if path.startswith(prefix):
+                checks.append((f"route:{prefix}:{identity}", route_rule))
+                break
+        return checks
+
+    async def check(
+        self,
+        path: str,
+        client_ip: str,
+        api_key: Optional[str] = None,
+        now: Optional[float] = None,
+    ) -> RateLimitDecision:
+        checks = self.checks_for(path, client_ip, api_key)
+        now = time.time() if now is None else now
+        try:
+            allowed, decision = await self.backend.hit(checks, now)
+        except Exception as e:
+            self.stats["backend_errors"] += 1
+            logger.error(f"Rate limit backend {self.backend.name} failed: {str(e)}")
+            rule = checks[0][1]
+            return RateLimitDecision(self.fail_open, rule.calls, 0, rule.period, rule.period)
+
+        self.stats["allowed" if allowed else "limited"] += 1
+        return decision
@@ -3,13 +3,13 @@ from typing import Dict, Any
 import asyncio
 import time
 from datetime import datetime
-import psutil
 import redis
 import asyncpg
 from sqlalchemy import text
 
 from .database_manager import DatabaseManager
 from .config import get_settings
+from .monitoring.system_sampler import system_sampler
 
 settings = get_settings()
 health_router = APIRouter()
@@ -95,25 +95,15 @@ class HealthChecker:
     def check_system_resources(self) -> Dict[str, Any]:
         """Check system resource usage."""
         try:
-            cpu_percent = psutil.cpu_percent(interval=1)
-            memory = psutil.virtual_memory()
-            disk = psutil.disk_usage('/')
+            # Shared background sampler: no 1s cpu_percent sleep per check
+            snapshot = system_sampler.snapshot()
             
             return {
                 "status": "healthy",
-                "cpu_usage_percent": cpu_percent,
-                "memory": {
-                    "total": memory.total,
-                    "available": memory.available,
-                    "percent": memory.percent,
-                    "used": memory.used
-                },
-                "disk": {
-                    "total": disk.total,
-                    "used": disk.used,
-                    "free": disk.free,
-                    "percent": (disk.used / disk.total) * 100
-                }
+                "cpu_usage_percent": snapshot["cpu_percent"],
+                "memory": dict(snapshot["memory"]),
+                "disk": dict(snapshot["disk"]),
+                "sampled_at": snapshot["timestamp"]
             }
             
         except Exception as e:
@@ -27,6 +27,12 @@ from backend.core.config import settings
 from backend.core import database as db
 from backend.core.seed_db import seed_db
 from backend.services.bizop_service import BizOpportunityService
+from backend.monitoring.system_sampler import system_sampler
+from backend.analytics.performance_analytics import performance_analytics
+from backend.monitoring.health_monitor import connect_anomaly_alerts, disconnect_anomaly_alerts
+from backend.services.http_client import http_pool
+from backend.services.email_transport import close_email_transport
+from backend.ai_modules.batch_channel_analysis import shutdown_shared_pool
 
 # Import routers with absolute imports
 from backend.api.dashboard import router as dashboard_router
@@ -73,6 +79,16 @@ async def lifespan(app: FastAPI):
         logger.error(f"Database initialization failed: {e}")
         # Continue startup even if database fails
 
+    # /api/growth reads the daily revenue rollup from this database too
+    try:
+        from modules.growth_engine_v1.rollup import ensure_daily_revenue
+
+        if db.engine is None:
+            db.create_database_engines()
+        logger.info("Growth revenue rollup ready: %s", ensure_daily_revenue(db.engine))
+    except Exception as e:
+        logger.warning("Growth revenue rollup migration failed: %s", e)
+
     try:
         auto_sync = os.getenv("BIZOP_AUTO_SYNC", "true").lower() in ("1", "true", "yes")
         if auto_sync:
@@ -83,10 +99,43 @@ async def lifespan(app: FastAPI):
                 logger.info("BizOp sync completed: %s", result)
     except Exception as e:
         logger.warning("BizOp sync failed: %s", e)
+
+    # Host/process metrics for every health check come from one background sampler
+    try:
+        system_sampler.start()
+    except Exception as e:
+        logger.warning("System metrics sampler failed to start: %s", e)
+
+    # Anomalies flagged as metrics are recorded raise health alerts
+    connect_anomaly_alerts()
+
+    youtube_sync_scheduler = None
+    if os.getenv("YOUTUBE_SYNC_SCHEDULER", "false").lower() in ("1", "true", "yes"):
+        try:
+            from backend.services.youtube_sync_scheduler import YouTubeSyncScheduler
+
+            youtube_sync_scheduler = YouTubeSyncScheduler()
+            youtube_sync_scheduler.start(interval=float(os.getenv("YOUTUBE_SYNC_INTERVAL", "900")))
+            logger.info("YouTube sync scheduler started")
+        except Exception as e:
+            logger.warning("YouTube sync scheduler failed to start: %s", e)
     
     yield
     
     # Shutdown
+    if youtube_sync_scheduler is not None:
+        await youtube_sync_scheduler.stop()
+    disconnect_anomaly_alerts()
+    system_sampler.stop()
+    # Write out every buffered metric while the database is still up
+    await performance_analytics.shutdown()
+    await http_pool.aclose()
+    close_email_transport()
+    shutdown_shared_pool()
+    # Section pools exist only once the analytics engine has been loaded
+    advanced_analytics = sys.modules.get("backend.ai_modules.advanced_analytics")
+    if advanced_analytics is not None:
+        advanced_analytics.shutdown_section_executors()
     logger.info("Shutting down YouTube AI Content Creator")
 
 # Create FastAPI app
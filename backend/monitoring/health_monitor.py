@@ -6,10 +6,10 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
 from collections import defaultdict, deque
-import aioredis
 import sqlite3
 from ..config.enhanced_settings import settings
 from ..database import get_db_connection
+from .system_sampler import system_sampler
 
 logger = logging.getLogger(__name__)
 
@@ -95,8 +95,11 @@ class HealthMonitor:
     async def check_system_resources(self):
         """Check system resource utilization."""
         try:
+            # Latest reading from the shared background sampler (never blocks)
+            snapshot = system_sampler.snapshot()
+            
             # CPU usage
-            cpu_percent = psutil.cpu_percent(interval=1)
+            cpu_percent = snapshot["cpu_percent"]
             cpu_metric = HealthMetric(
                 name="cpu_usage",
                 value=cpu_percent,
@@ -109,11 +112,11 @@ class HealthMonitor:
             )
             
             # Memory usage
-            memory = psutil.virtual_memory()
+            memory_percent = snapshot["memory"]["percent"]
             memory_metric = HealthMetric(
                 name="memory_usage",
-                value=memory.percent,
-                status=self.get_status(memory.percent, 80, 95),
+                value=memory_percent,
+                status=self.get_status(memory_percent, 80, 95),
                 threshold_warning=80.0,
                 threshold_critical=95.0,
                 timestamp=datetime.now(),
@@ -122,8 +125,7 @@ class HealthMonitor:
             )
             
             # Disk usage
-            disk = psutil.disk_usage('/')
-            disk_percent = (disk.used / disk.total) * 100
+            disk_percent = snapshot["disk"]["percent"]
             disk_metric = HealthMetric(
                 name="disk_usage",
                 value=disk_percent,
@@ -136,7 +138,7 @@ class HealthMonitor:
             )
             
             # Network connections
-            connections = len(psutil.net_connections())
+            connections = snapshot["network_connections"]
             connection_metric = HealthMetric(
                 name="network_connections",
                 value=connections,
@@ -155,7 +157,7 @@ class HealthMonitor:
                 status=system_status,
                 metrics=[cpu_metric, memory_metric, disk_metric, connection_metric],
                 last_check=datetime.now(),
-                uptime=time.time() - psutil.boot_time()
+                uptime=time.time() - snapshot["boot_time"]
             )
             
             # Store metrics history
@@ -269,7 +271,9 @@ class HealthMonitor:
             start_time = time.time()
             
             # Connect to Redis
-            redis = aioredis.from_url(settings.cache.redis_url)
+            import redis.asyncio as redis_asyncio
+            
+            redis = redis_asyncio.from_url(settings.cache.redis_url)
             
             # Test basic operations
             await redis.set("health_check", "test", ex=60)
@@ -599,6 +603,52 @@ class HealthMonitor:
                     # Send notification if configured
                     await self.send_alert_notification(alert)
     
+    async def report_anomaly(self, anomaly: Dict[str, Any]):
+        """Raise an alert for an anomaly flagged by streaming performance analytics."""
+        try:
+            current_time = datetime.now()
+            source = f"{anomaly['component']}:{anomaly['metric_name']}"
+            
+            # Same 15 minute suppression as component alerts, per metric series
+            recent_alert = any(
+                alert.get("source") == source and
+                alert["timestamp"] > current_time - timedelta(minutes=15)
+                for alert in self.alerts
+            )
+            if recent_alert:
+                return
+            
+            status = "unhealthy" if anomaly["severity"] == "high" else "degraded"
+            low, high = anomaly["expected_range"]
+            alert = {
+                "id": f"anomaly_{anomaly['component']}_{anomaly['metric_name']}_{int(current_time.timestamp())}",
+                "component": anomaly["component"],
+                "source": source,
+                "type": "performance_anomaly",
+                "status": status,
+                "message": (
+                    f"{anomaly['metric_name']} on {anomaly['component']} is anomalous "
+                    f"({anomaly['type']}): {anomaly['value']:.2f}, expected {low:.2f}..{high:.2f}"
+                ),
+                "timestamp": current_time,
+                "metrics": [{
+                    "name": anomaly["metric_name"],
+                    "value": anomaly["value"],
+                    "unit": "",
+                    "status": "critical" if status == "unhealthy" else "warning"
+                }],
+                "anomaly": anomaly,
+                "error": None
+            }
+            
+            self.alerts.append(alert)
+            logger.warning(f"Health alert: {alert['message']}")
+            
+            await self.send_alert_notification(alert)
+            
+        except Exception as e:
+            logger.error(f"Error reporting performance anomaly: {str(e)}")
+    
     async def send_alert_notification(self, alert: Dict[str, Any]):
         """Send alert notification via configured channels."""
         try:
@@ -770,14 +820,28 @@ class HealthMonitor:
 # Global health monitor instance
 health_monitor = HealthMonitor()
 
+def connect_anomaly_alerts():
+    """Send anomalies flagged at metric ingest straight to the alert path."""
+    from ..analytics.performance_analytics import performance_analytics
+    
+    performance_analytics.anomaly_detector.add_listener(health_monitor.report_anomaly)
+
+def disconnect_anomaly_alerts():
+    from ..analytics.performance_analytics import performance_analytics
+    
+    performance_analytics.anomaly_detector.remove_listener(health_monitor.report_anomaly)
+
 # Startup and shutdown functions
 async def start_health_monitoring():
     """Start health monitoring on application startup."""
+    connect_anomaly_alerts()
+    
     if settings.monitoring.metrics_enabled:
         asyncio.create_task(health_monitor.start_monitoring())
         logger.info("Health monitoring started")
 
 async def stop_health_monitoring():
     """Stop health monitoring on application shutdown."""
+    disconnect_anomaly_alerts()
     health_monitor.stop_monitoring()
     logger.info("Health monitoring stopped")
\ No newline at end of file
@@ -0,0 +1,233 @@
+"""
+Shared background sampler for host and process metrics.
+
+Health checks used to call ``psutil.cpu_percent(interval=1)`` inline,
+which sleeps for a full second (on the event loop, in the async
+handlers), and ``psutil.net_connections()``, which scans every socket on
+the host.  ``SystemMetricsSampler`` takes those readings once, on a
+daemon thread, at a fixed cadence:
+
+- ``cpu_percent`` is measured over the interval between samples
+  (``interval=None``), so it never sleeps;
+- expensive whole-system scans (connections, process states) run on a
+  slower cadence and are carried over between slow samples.
+
+Each sample replaces an immutable snapshot dict, so readers get the
+latest values with one attribute read, and is appended to a ring
+buffer for short-term history.  The sampler also reports its own cost
+(wall and CPU time per sample, and as a share of the interval).
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = float(os.getenv("SYSTEM_METRICS_INTERVAL", "5.0"))
+DEFAULT_SLOW_INTERVAL = float(os.getenv("SYSTEM_METRICS_SLOW_INTERVAL", "60.0"))
+DEFAULT_HISTORY = int(os.getenv("SYSTEM_METRICS_HISTORY", "720"))
+
+
+class SystemMetricsSampler:
+    """Samples psutil on a background thread into a shared snapshot."""
+
+    def __init__(
+        self,
+        interval: float = DEFAULT_INTERVAL,
+        slow_interval: float = DEFAULT_SLOW_INTERVAL,
+        history: int = DEFAULT_HISTORY,
+        disk_path: str = "/",
+    ):
+        self.interval = interval
+        self.slow_interval = slow_interval
+        self.disk_path = disk_path
+        self._history: Deque[Dict[str, Any]] = deque(maxlen=history)
+        self._snapshot: Dict[str, Any] = {}
+        self._slow: Dict[str, Any] = {}
+        self._slow_at = 0.0
+        self._previous_net = None
+        self._process = psutil.Process()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats: Dict[str, Any] = {
+            "samples": 0,
+            "slow_samples": 0,
+            "errors": 0,
+            "last_sample_ms": 0.0,
+            "max_sample_ms": 0.0,
+            "total_sample_seconds": 0.0,
+            "total_cpu_seconds": 0.0,
+            "started_at": None,
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Take a first sample and start the background thread (idempotent)."""
+        with self._lock:
+            if self.running:
+                return
+            self._stop.clear()
+            # Prime the counters: the first cpu_percent(None) call is meaningless
+            psutil.cpu_percent(interval=None)
+            self._process.cpu_percent(interval=None)
+            self.stats["started_at"] = time.time()
+            self._sample()
+            self._thread = threading.Thread(target=self._run, name="system-metrics-sampler", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def _sample(self) -> None:
+        started = time.perf_counter()
+        cpu_started = time.thread_time()
+        try:
+            snapshot = self._collect(time.time())
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"Error sampling system metrics: {str(e)}")
+            return
+        elapsed = time.perf_counter() - started
+        stats = self.stats
+        stats["samples"] += 1
+        stats["last_sample_ms"] = elapsed * 1000
+        stats["max_sample_ms"] = max(stats["max_sample_ms"], elapsed * 1000)
+        stats["total_sample_seconds"] += elapsed
+        stats["total_cpu_seconds"] += time.thread_time() - cpu_started
+        self._history.append(snapshot)
+        # Replacing the reference is atomic; readers never see a half-built dict
+        self._snapshot = snapshot
+
+    def _collect(self, now: float) -> Dict[str, Any]:
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage(self.disk_path)
+        network = psutil.net_io_counters()
+        process = self._process
+
+        send_rate = recv_rate = 0.0
+        if self._previous_net is not None:
+            previous, previous_at = self._previous_net
+            span = max(now - previous_at, 1e-9)
+            send_rate = (network.bytes_sent - previous.bytes_sent) / span
+            recv_rate = (network.bytes_recv - previous.bytes_recv) / span
+        self._previous_net = (network, now)
+
+        if now - self._slow_at >= self.slow_interval or not self._slow:
+            self._slow = self._collect_slow()
+            self._slow_at = now
+            self.stats["slow_samples"] += 1
+
+        try:
+            open_fds = process.num_fds()
+        except (AttributeError, psutil.Error):
+            open_fds = None
+
+        return {
+            "timestamp": datetime.fromtimestamp(now).isoformat(),
+            "epoch": now,
+            "cpu_percent": psutil.cpu_percent(interval=None),
+            "cpu_count": psutil.cpu_count(logical=False),
+            "cpu_count_logical": psutil.cpu_count(logical=True),
+            "load_average": list(os.getloadavg()) if hasattr(os, "getloadavg") else None,
+            "memory": {
+                "total": memory.total,
+                "available": memory.available,
+                "used": memory.used,
+                "percent": memory.percent,
+            },
+            "disk": {
+                "total": disk.total,
+                "used": disk.used,
+                "free": disk.free,
+                "percent": (disk.used / disk.total) * 100 if disk.total else 0.0,
+            },
+            "network": {
+                "bytes_sent": network.bytes_sent,
+                "bytes_recv": network.bytes_recv,
+                "packets_sent": network.packets_sent,
+                "packets_recv": network.packets_recv,
+                "send_bytes_per_sec": send_rate,
+                "recv_bytes_per_sec": recv_rate,
+            },
+            "process": {
+                "pid": process.pid,
+                "rss": process.memory_info().rss,
+                "cpu_percent": process.cpu_percent(interval=None),
+                "threads": process.num_threads(),
+                "open_fds": open_fds,
+            },
+            "boot_time": psutil.boot_time(),
+            **self._slow,
+        }
+
+    def _collect_slow(self) -> Dict[str, Any]:
+        try:
+            connections = len(psutil.net_connections())
+        except (psutil.AccessDenied, OSError):
+            # Not permitted for other users' sockets on some platforms
+            connections = len(self._process.connections())
+        running = 0
+        total = 0
+        for proc in psutil.process_iter(["status"]):
+            total += 1
+            if proc.info["status"] == psutil.STATUS_RUNNING:
+                running += 1
+        return {
+            "network_connections": connections,
+            "processes": {"total": total, "running": running},
+            "slow_sampled_at": datetime.now().isoformat(),
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Latest sample (read-only); starts the sampler on first use."""
+        if not self._snapshot:
+            self.start()
+        return self._snapshot
+
+    def history(self, seconds: Optional[float] = None) -> List[Dict[str, Any]]:
+        samples = list(self._history)
+        if seconds is None:
+            return samples
+        cutoff = time.time() - seconds
+        return [sample for sample in samples if sample["epoch"] >= cutoff]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Sampler overhead: per-sample cost and share of wall/CPU time."""
+        stats = dict(self.stats)
+        samples = stats["samples"]
+        stats["interval"] = self.interval
+        stats["slow_interval"] = self.slow_interval
+        stats["running"] = self.running
+        stats["history_size"] = len(self._history)
+        stats["avg_sample_ms"] = stats["total_sample_seconds"] * 1000 / samples if samples else 0.0
+        uptime = time.time() - stats["started_at"] if stats["started_at"] else 0.0
+        stats["cpu_overhead_percent"] = stats["total_cpu_seconds"] / uptime * 100 if uptime else 0.0
+        return stats
+
+
+# Shared by every health check in the process
+system_sampler = SystemMetricsSampler()
+
+
+def get_system_snapshot() -> Dict[str, Any]:
+    """Latest host/process metrics from the shared sampler."""
+    return system_sampler.snapshot()
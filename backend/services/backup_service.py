@@ -1,47 +1,69 @@
 """
 Backup and Recovery Service
 Automated data backup and recovery functionality
+
+SQLite databases and uploads go into an incremental, deduplicated store
+(see ``incremental_backup``): databases are snapshotted with the online
+backup API and only chunks that changed since the previous backup are
+written.
 """
 
 import os
-import shutil
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
+from functools import partial
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 import asyncio
 
 from backend.core.config import settings
+from backend.services.incremental_backup import IncrementalBackupEngine
 
 logger = logging.getLogger(__name__)
 
 class BackupService:
     """Handle database and file backups."""
     
-    def __init__(self):
-        self.backup_dir = Path("backups")
-        self.backup_dir.mkdir(exist_ok=True)
+    def __init__(self, backup_dir: Optional[str] = None):
+        self.backup_dir = Path(backup_dir or os.getenv("BACKUP_DIR", "backups"))
+        self.backup_dir.mkdir(parents=True, exist_ok=True)
+        self.engine = IncrementalBackupEngine(self.backup_dir / "store")
+    
+    def _sqlite_path(self) -> Optional[str]:
+        """Database file path when DATABASE_URL points at SQLite."""
+        database_url = settings.database_url
+        if not database_url.startswith("sqlite"):
+            return None
+        return database_url.split(":///", 1)[-1].split("?", 1)[0]
+    
+    def _uploads_dir(self) -> Path:
+        return Path(os.getenv("UPLOAD_FOLDER", settings.storage.local_path))
+    
+    async def _run(self, func, *args, **kwargs):
+        # Backups read and hash whole files; keep that off the event loop
+        return await asyncio.get_running_loop().run_in_executor(None, partial(func, *args, **kwargs))
+    
+    def _result(self, report: Dict[str, Any], timestamp: str) -> Dict[str, Any]:
+        return {
+            "status": "success",
+            "backup_id": report["backup_id"],
+            "backup_size_bytes": report["bytes_written"],
+            "logical_size_bytes": report["logical_bytes"],
+            "report": report,
+            "timestamp": timestamp
+        }
     
     async def create_database_backup(self) -> Dict[str, Any]:
         """Create a backup of the database."""
         try:
             timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+            db_path = self._sqlite_path()
             
-            if settings.DATABASE_URL.startswith("sqlite"):
-                # SQLite backup
-                db_path = settings.DATABASE_URL.replace("sqlite:///", "")
-                backup_path = self.backup_dir / f"database_backup_{timestamp}.db"
-                
+            if db_path is not None:
+                # SQLite: online, incremental snapshot
                 if os.path.exists(db_path):
-                    shutil.copy2(db_path, backup_path)
-                    backup_size = os.path.getsize(backup_path)
-                    
-                    return {
-                        "status": "success",
-                        "backup_file": str(backup_path),
-                        "backup_size_bytes": backup_size,
-                        "timestamp": timestamp
-                    }
+                    report = await self._run(self.engine.create_backup, databases=[db_path], label="database")
+                    return self._result(report, timestamp)
                 else:
                     return {"status": "error", "message": "Database file not found"}
             
@@ -51,7 +73,7 @@ class BackupService:
                 
                 # Run pg_dump command
                 process = await asyncio.create_subprocess_exec(
-                    "pg_dump", settings.DATABASE_URL,
+                    "pg_dump", settings.database_url,
                     stdout=asyncio.subprocess.PIPE,
                     stderr=asyncio.subprocess.PIPE
                 )
@@ -84,20 +106,24 @@ class BackupService:
         """Create a complete backup including database and files."""
         try:
             timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+            db_path = self._sqlite_path()
+            uploads_dir = self._uploads_dir()
+            paths = [uploads_dir] if uploads_dir.exists() else []
+            
+            if db_path is not None:
+                # One snapshot: database plus uploads, unchanged files are not re-read
+                databases = [db_path] if os.path.exists(db_path) else []
+                report = await self._run(self.engine.create_backup, databases=databases, paths=paths, label="full")
+                return self._result(report, timestamp)
             
             # Create database backup
             db_backup = await self.create_database_backup()
             
             # Create uploads backup if directory exists
             uploads_backup = None
-            uploads_dir = Path(settings.UPLOAD_FOLDER)
-            if uploads_dir.exists():
-                backup_uploads_dir = self.backup_dir / f"uploads_backup_{timestamp}"
-                shutil.copytree(uploads_dir, backup_uploads_dir)
-                uploads_backup = {
-                    "backup_dir": str(backup_uploads_dir),
-                    "file_count": len(list(backup_uploads_dir.rglob("*")))
-                }
+            if paths:
+                report = await self._run(self.engine.create_backup, paths=paths, label="uploads")
+                uploads_backup = self._result(report, timestamp)
             
             return {
                 "status": "success",
@@ -125,12 +151,41 @@ class BackupService:
                         "type": "database" if backup_file.suffix in [".db", ".sql"] else "unknown"
                     })
             
+            for backup in self.engine.list_backups():
+                backups.append({
+                    "backup_id": backup["backup_id"],
+                    "label": backup["label"],
+                    "size_bytes": backup["bytes_written"],
+                    "logical_size_bytes": backup["logical_bytes"],
+                    "entries": backup["entries"],
+                    "created_at": backup["created_at"],
+                    "type": "incremental"
+                })
+            
             return sorted(backups, key=lambda x: x["created_at"], reverse=True)
             
         except Exception as e:
             logger.error(f"Failed to list backups: {e}")
             return []
     
+    async def verify_backup(self, backup_id: str, full: bool = False) -> Dict[str, Any]:
+        """Check an incremental backup: chunk presence, or re-hash with ``full``."""
+        try:
+            result = await self._run(self.engine.verify, backup_id, full=full)
+            return {"status": "success" if result["ok"] else "error", **result}
+        except Exception as e:
+            logger.error(f"Backup verification failed: {e}")
+            return {"status": "error", "message": str(e)}
+    
+    async def restore_backup(self, backup_id: str, target_dir: str) -> Dict[str, Any]:
+        """Restore an incremental backup into ``target_dir`` (never over live files)."""
+        try:
+            result = await self._run(self.engine.restore, backup_id, target_dir)
+            return {"status": "success", **result}
+        except Exception as e:
+            logger.error(f"Backup restore failed: {e}")
+            return {"status": "error", "message": str(e)}
+    
     def cleanup_old_backups(self, keep_days: int = 30) -> Dict[str, Any]:
         """Remove backups older than specified days."""
         try:
@@ -142,9 +197,13 @@ class BackupService:
                     backup_file.unlink()
                     removed_count += 1
             
+            pruned = self.engine.prune(older_than=datetime.utcnow() - timedelta(days=keep_days))
+            
             return {
                 "status": "success",
-                "removed_count": removed_count,
+                "removed_count": removed_count + len(pruned["removed_backups"]),
+                "chunks_removed": pruned["chunks_removed"],
+                "bytes_freed": pruned["bytes_freed"],
                 "keep_days": keep_days
             }
             
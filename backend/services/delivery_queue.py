@@ -0,0 +1,250 @@
+"""
+Delivery Queue - durable retry queue for digital deliveries
+
+Replaces ``logs/delivery_queue.jsonl``.  The retry job used to read that
+file whole, retry every entry inline (blocking on SMTP), then rewrite it,
+so anything ``_queue_delivery`` appended in the meantime was lost.  Here
+each queued delivery is one row in a SQLite database (WAL mode):
+
+- enqueue is a single INSERT; nothing is ever rewritten wholesale;
+- ``lease`` claims ready items with one ``UPDATE ... RETURNING``, hiding
+  them for a visibility timeout.  A worker that dies without answering
+  simply lets the lease expire and the item becomes visible again;
+- ``ack`` deletes a leased item, ``fail`` reschedules it with
+  exponential backoff or, after ``max_attempts`` leases, moves it to the
+  dead-letter state where it waits for ``requeue_dead``.
+
+Every ack/fail is checked against the lease token, so a worker whose
+lease expired cannot clobber a newer claim.  A legacy JSONL queue is
+imported once on first open and renamed to ``*.migrated``.
+"""
+
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+VISIBILITY_TIMEOUT = float(os.getenv("DELIVERY_QUEUE_VISIBILITY_TIMEOUT", "300"))
+MAX_ATTEMPTS = int(os.getenv("DELIVERY_QUEUE_MAX_ATTEMPTS", "8"))
+RETRY_BASE_SECONDS = float(os.getenv("DELIVERY_RETRY_BASE_SECONDS", "60"))
+RETRY_MAX_SECONDS = float(os.getenv("DELIVERY_RETRY_MAX_SECONDS", "21600"))
+
+READY = "ready"
+DEAD = "dead"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS delivery_queue (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    order_id TEXT,
+    state TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL,
+    lease_token TEXT,
+    last_error TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_delivery_queue_ready ON delivery_queue (state, available_at);
+"""
+
+_LEASE = """
+UPDATE delivery_queue
+SET lease_token = ?, available_at = ?, attempts = attempts + 1, updated_at = ?
+WHERE id IN (
+    SELECT id FROM delivery_queue
+    WHERE state = 'ready' AND available_at <= ?
+    ORDER BY available_at, id
+    LIMIT ?
+)
+RETURNING id, order_id, payload, attempts
+"""
+
+
+@dataclass
+class QueueItem:
+    id: int
+    order_id: Optional[str]
+    payload: Dict[str, Any]
+    attempts: int
+    lease_token: str
+
+
+def retry_delay(attempts: int, base: float = RETRY_BASE_SECONDS, cap: float = RETRY_MAX_SECONDS) -> float:
+    """Backoff after the ``attempts``-th failed lease: base, 2x base, 4x base ... with +-10% jitter."""
+    delay = min(cap, base * (2 ** max(0, attempts - 1)))
+    return delay * random.uniform(0.9, 1.1)
+
+
+class DeliveryQueue:
+    """SQLite-backed delivery queue with leases, retry scheduling and a dead-letter state."""
+
+    def __init__(
+        self,
+        db_path: Path,
+        legacy_jsonl: Optional[Path] = None,
+        visibility_timeout: float = VISIBILITY_TIMEOUT,
+        max_attempts: int = MAX_ATTEMPTS,
+        retry_base: float = RETRY_BASE_SECONDS,
+    ):
+        self.db_path = Path(db_path)
+        self.legacy_jsonl = Path(legacy_jsonl) if legacy_jsonl else None
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+            self._import_legacy(conn)
+        return self._conn
+
+    def _import_legacy(self, conn: sqlite3.Connection) -> None:
+        if self.legacy_jsonl is None or not self.legacy_jsonl.exists():
+            return
+        try:
+            rows = []
+            now = datetime.utcnow().isoformat()
+            for line in self.legacy_jsonl.read_text(encoding="utf-8").splitlines():
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                rows.append((
+                    entry.get("order_id"), READY, json.dumps(entry, ensure_ascii=True),
+                    int(entry.get("attempts", 0)), time.time(), now, now,
+                ))
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT INTO delivery_queue (order_id, state, payload, attempts, available_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            conn.execute("COMMIT")
+            self.legacy_jsonl.rename(self.legacy_jsonl.with_name(self.legacy_jsonl.name + ".migrated"))
+            logger.info(f"Imported {len(rows)} queued deliveries from {self.legacy_jsonl}")
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            logger.error(f"Failed to import legacy delivery queue: {str(e)}")
+
+    def enqueue(self, payload: Dict[str, Any], order_id: Optional[str] = None, delay: float = 0.0) -> int:
+        now = datetime.utcnow().isoformat()
+        order_id = order_id if order_id is not None else payload.get("order_id")
+        with self._lock:
+            cursor = self._connection().execute(
+                "INSERT INTO delivery_queue (order_id, state, payload, attempts, available_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, 0, ?, ?, ?)",
+                (order_id, READY, json.dumps(payload, ensure_ascii=True), time.time() + delay, now, now),
+            )
+        return cursor.lastrowid
+
+    def lease(self, limit: int = 1, visibility_timeout: Optional[float] = None) -> List[QueueItem]:
+        """Claim up to ``limit`` ready items; they stay invisible until acked, failed or timed out."""
+        token = uuid.uuid4().hex
+        now = time.time()
+        hidden_until = now + (visibility_timeout if visibility_timeout is not None else self.visibility_timeout)
+        with self._lock:
+            rows = self._connection().execute(
+                _LEASE, (token, hidden_until, datetime.utcnow().isoformat(), now, limit)
+            ).fetchall()
+        return [
+            QueueItem(id=row[0], order_id=row[1], payload=json.loads(row[2]), attempts=row[3], lease_token=token)
+            for row in sorted(rows)
+        ]
+
+    def ack(self, item: QueueItem) -> bool:
+        """Remove a delivered item; False if the lease was lost to another worker."""
+        with self._lock:
+            cursor = self._connection().execute(
+                "DELETE FROM delivery_queue WHERE id = ? AND lease_token = ?", (item.id, item.lease_token)
+            )
+        return cursor.rowcount == 1
+
+    def fail(self, item: QueueItem, error: Optional[str] = None, dead: bool = False) -> str:
+        """
+        Record a failed attempt: reschedule with backoff, or dead-letter the item
+        once it has been leased ``max_attempts`` times (or ``dead=True``).
+        Returns the new state, or ``"lost"`` if the lease had expired.
+        """
+        state = DEAD if dead or item.attempts >= self.max_attempts else READY
+        available_at = time.time() + (retry_delay(item.attempts, self.retry_base) if state == READY else 0)
+        with self._lock:
+            cursor = self._connection().execute(
+                "UPDATE delivery_queue SET state = ?, available_at = ?, lease_token = NULL, last_error = ?, updated_at = ? "
+                "WHERE id = ? AND lease_token = ?",
+                (state, available_at, error, datetime.utcnow().isoformat(), item.id, item.lease_token),
+            )
+        return state if cursor.rowcount == 1 else "lost"
+
+    def requeue_dead(self, ids: Optional[Iterable[int]] = None) -> int:
+        """Move dead-lettered items (all, or just ``ids``) back to ready with a fresh attempt budget."""
+        sql = ("UPDATE delivery_queue SET state = 'ready', attempts = 0, available_at = ?, lease_token = NULL, "
+               "updated_at = ? WHERE state = 'dead'")
+        params: List[Any] = [time.time(), datetime.utcnow().isoformat()]
+        if ids is not None:
+            ids = [int(i) for i in ids]
+            if not ids:
+                return 0
+            sql += f" AND id IN ({','.join('?' * len(ids))})"
+            params.extend(ids)
+        with self._lock:
+            cursor = self._connection().execute(sql, params)
+        return cursor.rowcount
+
+    def dead_letters(self, limit: int = 100) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT id, order_id, attempts, last_error, updated_at, payload FROM delivery_queue "
+                "WHERE state = 'dead' ORDER BY id LIMIT ?", (limit,)
+            ).fetchall()
+        return [
+            {"id": row[0], "order_id": row[1], "attempts": row[2], "last_error": row[3],
+             "updated_at": row[4], "payload": json.loads(row[5])}
+            for row in rows
+        ]
+
+    def stats(self) -> Dict[str, int]:
+        now = time.time()
+        with self._lock:
+            ready, in_flight, scheduled, dead = self._connection().execute(
+                "SELECT "
+                "COALESCE(SUM(state = 'ready' AND available_at <= ?), 0), "
+                "COALESCE(SUM(state = 'ready' AND available_at > ? AND lease_token IS NOT NULL), 0), "
+                "COALESCE(SUM(state = 'ready' AND available_at > ? AND lease_token IS NULL), 0), "
+                "COALESCE(SUM(state = 'dead'), 0) "
+                "FROM delivery_queue",
+                (now, now, now),
+            ).fetchone()
+        return {
+            "ready": ready,
+            "in_flight": in_flight,
+            "scheduled": scheduled,
+            "dead": dead,
+            "pending": ready + in_flight + scheduled,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
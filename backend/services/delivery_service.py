@@ -1,13 +1,16 @@
+import asyncio
 import json
 import logging
 import os
-import smtplib
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
-from email.message import EmailMessage
 from pathlib import Path
-from typing import Any, Dict, Optional, List
+from typing import Any, Dict, Optional
 
+from backend.services.delivery_queue import DeliveryQueue, QueueItem
+from backend.services.email_transport import get_email_transport
+from backend.services.order_ledger import OrderLedger
 
 logger = logging.getLogger(__name__)
 
@@ -20,8 +23,15 @@ ZEN_ART_TEMPLATE = Path("backend/templates/zen_art_delivery.txt")
 # Data Persistence (Cloud Run GCS Volume Support)
 # Use DATA_DIR env var to point to mounted volume (e.g. /app/persistent)
 DATA_DIR = Path(os.getenv("DATA_DIR", "."))
+# Legacy JSONL queue, imported into the SQLite queue on first use
 DELIVERY_QUEUE_FILE = DATA_DIR / "logs/delivery_queue.jsonl"
+DELIVERY_QUEUE_DB = Path(os.getenv("DELIVERY_QUEUE_DB", str(DATA_DIR / "logs/delivery_queue.sqlite")))
+DELIVERY_RETRY_WORKERS = int(os.getenv("DELIVERY_RETRY_WORKERS", "8"))
+DELIVERY_RETRY_BATCH = int(os.getenv("DELIVERY_RETRY_BATCH", "10"))
 ORDER_LOG_FILE = DATA_DIR / "logs/shopier_orders.jsonl"
+# Index next to the log by default; point elsewhere if DATA_DIR is a
+# network volume that does not support SQLite locking
+ORDER_LEDGER_INDEX = os.getenv("ORDER_LEDGER_INDEX")
 
 
 @dataclass
@@ -40,6 +50,8 @@ class DeliveryService:
     def __init__(self) -> None:
         self._title_to_sku = self._load_title_map()
         self._sku_to_delivery = self._load_delivery_map()
+        self._ledger: Optional[OrderLedger] = None
+        self._queue: Optional[DeliveryQueue] = None
 
     def _load_title_map(self) -> Dict[str, str]:
         mapping: Dict[str, str] = {}
@@ -135,32 +147,21 @@ class DeliveryService:
             logger.info("BODY: %s", body)
             return
 
-        smtp_host = os.getenv("SMTP_HOST") or os.getenv("NOTIFICATIONS_SMTP_SERVER")
-        smtp_port = int(os.getenv("SMTP_PORT") or os.getenv("NOTIFICATIONS_SMTP_PORT", "587"))
-        smtp_user = os.getenv("SMTP_USERNAME") or os.getenv("NOTIFICATIONS_SMTP_USERNAME")
-        smtp_pass = (
-            os.getenv("SMTP_PASSWORD")
-            or os.getenv("SMTP_APP_PASSWORD")
-            or os.getenv("NOTIFICATIONS_SMTP_PASSWORD")
-        )
-        if not smtp_host or not smtp_user or not smtp_pass:
-            raise RuntimeError("SMTP settings incomplete")
-
-        sender = os.getenv("DELIVERY_FROM_EMAIL") or os.getenv("NOTIFICATIONS_FROM_EMAIL") or smtp_user
-        message = EmailMessage()
-        message["From"] = sender
-        message["To"] = to_email
-        message["Subject"] = subject
-        message.set_content(body)
-
-        with smtplib.SMTP(smtp_host, smtp_port) as server:
-            server.starttls()
-            server.login(smtp_user, smtp_pass)
-            server.send_message(message)
+        # Pooled, authenticated sessions; raises RuntimeError if SMTP settings are incomplete
+        transport = get_email_transport()
+        transport.send(transport.build_message(to_email, subject, body))
 
     def send_email(self, to_email: str, subject: str, body: str) -> None:
         self._send_email(to_email, subject, body)
 
+    async def send_email_async(self, to_email: str, subject: str, body: str) -> None:
+        """``send_email`` for async call sites: the SMTP round trips run off the event loop."""
+        await asyncio.to_thread(self._send_email, to_email, subject, body)
+
+    async def deliver_digital_async(self, data: Dict[str, Any], base_url: str, allow_queue: bool = True) -> DeliveryResult:
+        """``deliver_digital`` for async call sites (email and ledger I/O off the event loop)."""
+        return await asyncio.to_thread(self.deliver_digital, data, base_url, allow_queue)
+
     def build_zen_art_delivery_message(
         self,
         title: str,
@@ -204,31 +205,39 @@ class DeliveryService:
         subject = f"{brand} Printable Delivery: {title}"
         return subject, body
 
+    @property
+    def delivery_queue(self) -> DeliveryQueue:
+        # Same lazy/repointable pattern as the order ledger
+        if self._queue is None or self._queue.db_path != DELIVERY_QUEUE_DB:
+            if self._queue is not None:
+                self._queue.close()
+            self._queue = DeliveryQueue(DELIVERY_QUEUE_DB, legacy_jsonl=DELIVERY_QUEUE_FILE)
+        return self._queue
+
     def _queue_delivery(self, payload: Dict[str, Any]) -> None:
-        DELIVERY_QUEUE_FILE.parent.mkdir(parents=True, exist_ok=True)
-        with DELIVERY_QUEUE_FILE.open("a", encoding="utf-8") as handle:
-            handle.write(json.dumps(payload, ensure_ascii=True))
-            handle.write("\n")
+        self.delivery_queue.enqueue(payload, order_id=payload.get("order_id"))
+
+    @property
+    def order_ledger(self) -> OrderLedger:
+        # Created on first use (and again if ORDER_LOG_FILE is repointed);
+        # the first access indexes whatever the log already holds
+        if self._ledger is None or self._ledger.log_path != ORDER_LOG_FILE:
+            if self._ledger is not None:
+                self._ledger.close()
+            self._ledger = OrderLedger(ORDER_LOG_FILE, Path(ORDER_LEDGER_INDEX) if ORDER_LEDGER_INDEX else None)
+        return self._ledger
 
     def _log_order(self, payload: Dict[str, Any]) -> None:
-        ORDER_LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
-        with ORDER_LOG_FILE.open("a", encoding="utf-8") as handle:
-            handle.write(json.dumps(payload, ensure_ascii=True))
-            handle.write("\n")
+        self.order_ledger.append(payload)
 
     def _order_already_processed(self, order_id: Optional[str]) -> bool:
-        if not order_id or not ORDER_LOG_FILE.exists():
+        if not order_id:
             return False
         try:
-            for line in ORDER_LOG_FILE.read_text(encoding="utf-8").splitlines():
-                if not line.strip():
-                    continue
-                data = json.loads(line)
-                if data.get("order_id") == order_id and data.get("status") == "delivered":
-                    return True
-        except Exception:
+            return self.order_ledger.is_delivered(order_id)
+        except Exception as e:
+            logger.error(f"Order ledger lookup failed for {order_id}: {str(e)}")
             return False
-        return False
 
     @staticmethod
     def _mask_email(email: Optional[str]) -> Optional[str]:
@@ -368,68 +377,84 @@ class DeliveryService:
             currency=currency_raw,
         )
 
-    def retry_queued_deliveries(self, base_url: Optional[str] = None, max_items: int = 50) -> Dict[str, int]:
-        if not DELIVERY_QUEUE_FILE.exists():
-            return {"attempted": 0, "delivered": 0, "remaining": 0}
+    @staticmethod
+    def _retry_payload(entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if entry.get("raw"):
+            return entry["raw"]
+        if entry.get("buyer_email") and entry.get("sku"):
+            return {"sku": entry["sku"], "buyer_email": entry["buyer_email"], "order_id": entry.get("order_id")}
+        return None
 
+    def _retry_item(self, item: QueueItem, base_url: str) -> str:
+        """Attempt one leased delivery (blocking) and ack/fail it; returns the outcome."""
+        payload = self._retry_payload(item.payload)
+        if payload is None:
+            # Queued without the order payload or an email: nothing to retry with
+            self.delivery_queue.fail(item, "No payload or buyer email stored", dead=True)
+            return "dead"
+        try:
+            result = self.deliver_digital(payload, base_url, allow_queue=False)
+        except Exception as e:
+            logger.error(f"Delivery retry failed for {item.order_id}: {str(e)}")
+            return self.delivery_queue.fail(item, str(e))
+        if result.status in ("delivered", "skipped"):
+            self.delivery_queue.ack(item)
+            return "delivered"
+        return self.delivery_queue.fail(item, result.message)
+
+    async def drain_queued_deliveries(
+        self,
+        base_url: Optional[str] = None,
+        max_items: int = 50,
+        workers: int = DELIVERY_RETRY_WORKERS,
+        batch_size: int = DELIVERY_RETRY_BATCH,
+    ) -> Dict[str, int]:
+        """
+        Retry due deliveries with a pool of async workers.  Each worker leases
+        a batch of up to ``batch_size`` items in one query and flushes it on a
+        thread pool of ``workers`` threads, so up to ``workers`` emails are in
+        flight over the pooled SMTP sessions; new items can be queued throughout.
+        """
         base_url = base_url or os.getenv("BACKEND_ORIGIN") or ""
         if not base_url:
             return {"attempted": 0, "delivered": 0, "remaining": 0, "error": "BASE_URL missing"}
 
-        attempted = 0
-        delivered = 0
-        remaining: List[Dict[str, Any]] = []
-        now = datetime.utcnow().isoformat()
+        queue = self.delivery_queue
+        counts = {"attempted": 0, "delivered": 0, "retrying": 0, "dead_lettered": 0}
+        workers = max(1, min(workers, max_items))
+        loop = asyncio.get_running_loop()
+        # Own pool: the default executor is sized by CPU count, not by SMTP latency
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="delivery-retry")
+
+        async def worker() -> None:
+            while counts["attempted"] < max_items:
+                take = min(max(1, batch_size), max_items - counts["attempted"])
+                counts["attempted"] += take
+                items = await loop.run_in_executor(executor, queue.lease, take)
+                counts["attempted"] -= take - len(items)
+                if not items:
+                    return
+                outcomes = await asyncio.gather(*(
+                    loop.run_in_executor(executor, self._retry_item, item, base_url) for item in items
+                ))
+                for outcome in outcomes:
+                    if outcome == "delivered":
+                        counts["delivered"] += 1
+                    elif outcome == "dead":
+                        counts["dead_lettered"] += 1
+                    elif outcome == "ready":
+                        counts["retrying"] += 1
 
-        for line in DELIVERY_QUEUE_FILE.read_text(encoding="utf-8").splitlines():
-            if not line.strip():
-                continue
-            try:
-                entry = json.loads(line)
-            except Exception:
-                continue
-
-            if attempted >= max_items:
-                remaining.append(entry)
-                continue
-
-            payload = entry.get("raw")
-            buyer_email = entry.get("buyer_email")
-            sku = entry.get("sku")
-            order_id = entry.get("order_id")
-
-            if payload:
-                attempted += 1
-                result = self.deliver_digital(payload, base_url, allow_queue=False)
-                if result.status == "delivered":
-                    delivered += 1
-                    continue
-                entry["status"] = result.status
-                entry["last_attempt_at"] = now
-                entry["attempts"] = int(entry.get("attempts", 0)) + 1
-                remaining.append(entry)
-                continue
-
-            if buyer_email and sku:
-                attempted += 1
-                payload = {"sku": sku, "buyer_email": buyer_email, "order_id": order_id}
-                result = self.deliver_digital(payload, base_url, allow_queue=False)
-                if result.status == "delivered":
-                    delivered += 1
-                    continue
-                entry["status"] = result.status
-                entry["last_attempt_at"] = now
-                entry["attempts"] = int(entry.get("attempts", 0)) + 1
-
-            remaining.append(entry)
-
-        DELIVERY_QUEUE_FILE.parent.mkdir(parents=True, exist_ok=True)
-        with DELIVERY_QUEUE_FILE.open("w", encoding="utf-8") as handle:
-            for entry in remaining:
-                handle.write(json.dumps(entry, ensure_ascii=True))
-                handle.write("\n")
-
-        return {"attempted": attempted, "delivered": delivered, "remaining": len(remaining)}
+        try:
+            await asyncio.gather(*(worker() for _ in range(workers)))
+            stats = await loop.run_in_executor(executor, queue.stats)
+        finally:
+            executor.shutdown(wait=False)
+        return {**counts, "remaining": stats["pending"], "dead": stats["dead"]}
+
+    def retry_queued_deliveries(self, base_url: Optional[str] = None, max_items: int = 50) -> Dict[str, int]:
+        """Blocking entry point for scripts; async callers use ``drain_queued_deliveries``."""
+        return asyncio.run(self.drain_queued_deliveries(base_url=base_url, max_items=max_items))
 
 
 delivery_service = DeliveryService()
@@ -0,0 +1,325 @@
+"""
+Email Transport - pooled SMTP sender for delivery emails
+
+``DeliveryService._send_email`` used to open a fresh ``smtplib.SMTP``
+connection, run STARTTLS and log in again for every message, blocking
+whichever thread (or event loop) called it.  During a launch that is
+hundreds of handshakes in a burst.  ``SmtpConnectionPool`` instead keeps
+up to ``SMTP_POOL_SIZE`` authenticated connections open:
+
+- a connection idle for longer than ``SMTP_IDLE_TIMEOUT`` is replaced
+  before use (servers drop quiet sessions), and a send that finds the
+  session dropped reconnects and retries once;
+- a token bucket caps the send rate at ``SMTP_MAX_PER_SECOND`` across all
+  connections, so bursts stay under the provider's limits;
+- ``send_async`` / ``send_batch_async`` run sends on the pool's own
+  threads, off the event loop;
+- stats report sends, failures, connections opened, rate-limit waits,
+  per-message latency and emails per second.
+
+``get_email_transport()`` returns a shared pool for the SMTP settings in
+the environment, rebuilding it if those settings change.
+"""
+
+import asyncio
+import logging
+import os
+import smtplib
+import ssl
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from email.message import EmailMessage
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", "4"))
+IDLE_TIMEOUT = float(os.getenv("SMTP_IDLE_TIMEOUT", "60"))
+MAX_PER_SECOND = float(os.getenv("SMTP_MAX_PER_SECOND", "10"))
+CONNECT_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", "30"))
+
+_LATENCY_WINDOW = 1000
+
+
+@dataclass(frozen=True)
+class SmtpSettings:
+    host: str
+    port: int
+    username: Optional[str]
+    password: Optional[str]
+    sender: str
+    starttls: bool = True
+
+    @classmethod
+    def from_env(cls) -> "SmtpSettings":
+        host = os.getenv("SMTP_HOST") or os.getenv("NOTIFICATIONS_SMTP_SERVER")
+        port = int(os.getenv("SMTP_PORT") or os.getenv("NOTIFICATIONS_SMTP_PORT", "587"))
+        username = os.getenv("SMTP_USERNAME") or os.getenv("NOTIFICATIONS_SMTP_USERNAME")
+        password = (
+            os.getenv("SMTP_PASSWORD")
+            or os.getenv("SMTP_APP_PASSWORD")
+            or os.getenv("NOTIFICATIONS_SMTP_PASSWORD")
+        )
+        if not host or not username or not password:
+            raise RuntimeError("SMTP settings incomplete")
+        sender = os.getenv("DELIVERY_FROM_EMAIL") or os.getenv("NOTIFICATIONS_FROM_EMAIL") or username
+        starttls = os.getenv("SMTP_STARTTLS", "true").lower() in ("1", "true", "yes")
+        return cls(host, port, username, password, sender, starttls)
+
+
+class RateLimiter:
+    """Thread-safe token bucket; ``rate`` <= 0 disables limiting."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until one is available; returns seconds waited."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class _PooledConnection:
+    def __init__(self, smtp: smtplib.SMTP):
+        self.smtp = smtp
+        self.last_used = time.monotonic()
+
+
+class SmtpConnectionPool:
+    """Bounded pool of authenticated SMTP sessions with rate-limited sends."""
+
+    def __init__(
+        self,
+        settings: SmtpSettings,
+        size: int = POOL_SIZE,
+        idle_timeout: float = IDLE_TIMEOUT,
+        max_per_second: float = MAX_PER_SECOND,
+        timeout: float = CONNECT_TIMEOUT,
+    ):
+        self.settings = settings
+        self.size = max(1, size)
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.limiter = RateLimiter(max_per_second)
+        self._idle: List[_PooledConnection] = []
+        self._open = 0
+        self._available = threading.Condition()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._stats_lock = threading.Lock()
+        self._latencies = deque(maxlen=_LATENCY_WINDOW)
+        self._first_send: Optional[float] = None
+        self._last_send: Optional[float] = None
+        self.stats = {
+            "sent": 0,
+            "failed": 0,
+            "connections_opened": 0,
+            "reconnects": 0,
+            "idle_expired": 0,
+            "rate_wait_seconds": 0.0,
+        }
+
+    def _count(self, key: str, amount: float = 1) -> None:
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    def _connect(self) -> _PooledConnection:
+        settings = self.settings
+        smtp = smtplib.SMTP(settings.host, settings.port, timeout=self.timeout)
+        try:
+            smtp.ehlo()
+            if settings.starttls:
+                smtp.starttls(context=ssl.create_default_context())
+                smtp.ehlo()
+            if settings.username:
+                smtp.login(settings.username, settings.password or "")
+        except Exception:
+            self._quit(smtp)
+            raise
+        self._count("connections_opened")
+        return _PooledConnection(smtp)
+
+    @staticmethod
+    def _quit(smtp: smtplib.SMTP) -> None:
+        try:
+            smtp.quit()
+        except Exception:
+            try:
+                smtp.close()
+            except Exception:
+                pass
+
+    @staticmethod
+    def _dropped(error: Exception) -> bool:
+        # Servers answer 421 before closing an idle session
+        if isinstance(error, smtplib.SMTPServerDisconnected):
+            return True
+        return getattr(error, "smtp_code", None) == 421
+
+    def _checkout(self) -> _PooledConnection:
+        stale = None
+        with self._available:
+            while not self._idle and self._open >= self.size:
+                self._available.wait()
+            if self._idle:
+                conn = self._idle.pop()  # most recently used first
+                if time.monotonic() - conn.last_used <= self.idle_timeout:
+                    return conn
+                # The server has probably dropped it already; replace quietly
+                stale = conn
+            else:
+                self._open += 1
+        if stale is not None:
+            self._count("idle_expired")
+            self._quit(stale.smtp)
+        try:
+            return self._connect()
+        except Exception:
+            self._discard()
+            raise
+
+    def _checkin(self, conn: _PooledConnection) -> None:
+        conn.last_used = time.monotonic()
+        with self._available:
+            self._idle.append(conn)
+            self._available.notify()
+
+    def _discard(self, conn: Optional[_PooledConnection] = None) -> None:
+        if conn is not None:
+            self._quit(conn.smtp)
+        with self._available:
+            self._open -= 1
+            self._available.notify()
+
+    def build_message(self, to_email: str, subject: str, body: str) -> EmailMessage:
+        message = EmailMessage()
+        message["From"] = self.settings.sender
+        message["To"] = to_email
+        message["Subject"] = subject
+        message.set_content(body)
+        return message
+
+    def send(self, message: EmailMessage) -> float:
+        """Send one message over a pooled session (blocking); returns its latency in seconds."""
+        waited = self.limiter.acquire()
+        if waited:
+            self._count("rate_wait_seconds", waited)
+        started = time.perf_counter()
+        conn = self._checkout()
+        try:
+            try:
+                conn.smtp.send_message(message)
+            except (smtplib.SMTPServerDisconnected, smtplib.SMTPResponseException) as e:
+                if not self._dropped(e):
+                    raise
+                # Dropped between sends: one fresh session, one retry
+                self._quit(conn.smtp)
+                self._count("reconnects")
+                conn = self._connect()
+                conn.smtp.send_message(message)
+        except smtplib.SMTPRecipientsRefused:
+            # The session itself is fine
+            self._checkin(conn)
+            self._count("failed")
+            raise
+        except Exception:
+            self._discard(conn)
+            self._count("failed")
+            raise
+        self._checkin(conn)
+        latency = time.perf_counter() - started
+        with self._stats_lock:
+            self.stats["sent"] += 1
+            self._latencies.append(latency)
+            now = time.monotonic()
+            if self._first_send is None:
+                self._first_send = now - latency
+            self._last_send = now
+        return latency
+
+    def _loop_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="smtp-pool")
+        return self._executor
+
+    async def send_async(self, message: EmailMessage) -> float:
+        """Send off the event loop on one of the pool's threads."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._loop_executor(), self.send, message)
+
+    async def send_batch_async(self, messages: List[EmailMessage]) -> List[Any]:
+        """
+        Flush a batch across all pooled sessions; returns, per message, its
+        latency or the exception it raised.
+        """
+        return await asyncio.gather(*(self.send_async(message) for message in messages), return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self.stats)
+            latencies = sorted(self._latencies)
+            span = (self._last_send - self._first_send) if self._first_send is not None else 0.0
+        with self._available:
+            stats["open_connections"] = self._open
+            stats["idle_connections"] = len(self._idle)
+        stats["rate_wait_seconds"] = round(stats["rate_wait_seconds"], 3)
+        stats["emails_per_second"] = round(stats["sent"] / span, 2) if span > 0 else 0.0
+
+        def percentile(p: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 2)
+
+        stats["latency_ms"] = {"p50": percentile(0.50), "p95": percentile(0.95), "samples": len(latencies)}
+        return stats
+
+    def close(self) -> None:
+        with self._available:
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+        for conn in idle:
+            self._quit(conn.smtp)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+_transport: Optional[SmtpConnectionPool] = None
+_transport_lock = threading.Lock()
+
+
+def get_email_transport() -> SmtpConnectionPool:
+    """Shared pool for the SMTP settings currently in the environment."""
+    global _transport
+    settings = SmtpSettings.from_env()
+    with _transport_lock:
+        if _transport is None or _transport.settings != settings:
+            if _transport is not None:
+                _transport.close()
+            _transport = SmtpConnectionPool(
+                settings, size=POOL_SIZE, idle_timeout=IDLE_TIMEOUT, max_per_second=MAX_PER_SECOND
+            )
+        return _transport
+
+
+def close_email_transport() -> None:
+    global _transport
+    with _transport_lock:
+        if _transport is not None:
+            _transport.close()
+            _transport = None
@@ -0,0 +1,466 @@
+"""
+Outbound HTTP - shared, pooled clients for third-party APIs
+
+Shopify calls used to open a new ``httpx.AsyncClient`` (and with it a new
+TCP/TLS connection) per GraphQL request, and Shopier calls went through
+blocking ``requests`` with fixed sleeps.  ``http_pool`` keeps one
+long-lived client per host instead:
+
+- keep-alive connection pools sized to a per-host concurrency limit;
+- a per-host semaphore, so a burst of calls queues locally rather than
+  opening more sockets than the remote end will serve;
+- retries with jittered exponential backoff on transport errors, 429 and
+  5xx, honouring ``Retry-After``;
+- an optional throttle (``ShopifyThrottle``) for APIs that report their
+  rate-limit state in the response body;
+- per-host metrics: calls, attempts, new vs reused connections, latency.
+
+Async code uses ``await http_pool.request(...)``.  Scripts that are still
+synchronous use ``http_pool.request_sync(...)``, which applies the same
+retry policy and metrics over a pooled ``httpx.Client``.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+MAX_CONCURRENCY_PER_HOST = int(os.getenv("HTTP_MAX_CONCURRENCY_PER_HOST", "10"))
+KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+DEFAULT_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))
+RETRY_ATTEMPTS = int(os.getenv("HTTP_RETRY_ATTEMPTS", "4"))
+BACKOFF_BASE = float(os.getenv("HTTP_BACKOFF_BASE", "0.5"))
+BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", "30"))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+# Failures where the request provably never reached the server
+_SAFE_TRANSPORT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+_LATENCY_WINDOW = 1000
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a ``Retry-After`` header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_MAX) -> float:
+    """Exponential backoff with equal jitter: half fixed, half random."""
+    ceiling = min(cap, base * (2 ** attempt))
+    return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+
+class ShopifyThrottle:
+    """
+    Client-side view of a Shopify GraphQL leaky bucket.
+
+    Admin API responses carry ``extensions.cost``: the query's
+    ``requestedQueryCost`` and a ``throttleStatus`` with
+    ``currentlyAvailable``, ``maximumAvailable`` and ``restoreRate``.
+    ``reserve`` waits until the bucket has restored enough points for a
+    query of the last observed cost; a ``THROTTLED`` error is retried after
+    the time the bucket needs to refill.
+    """
+
+    def __init__(self):
+        self.available: Optional[float] = None
+        self.maximum: float = 0.0
+        self.restore_rate: float = 0.0
+        self.expected_cost: float = 0.0
+        self.observed_at: float = 0.0
+        self._lock = threading.Lock()
+
+    def _projected(self, now: float) -> float:
+        return min(self.maximum, self.available + (now - self.observed_at) * self.restore_rate)
+
+    def reserve(self) -> float:
+        """Seconds to wait before sending; debits the expected cost from the estimate."""
+        with self._lock:
+            if self.available is None or self.restore_rate <= 0:
+                return 0.0
+            now = time.monotonic()
+            available = self._projected(now)
+            wait = max(0.0, (self.expected_cost - available) / self.restore_rate)
+            self.available = available - self.expected_cost
+            self.observed_at = now
+            return wait
+
+    def observe(self, response: httpx.Response) -> Optional[float]:
+        """Record the bucket state; return a retry delay if the query was throttled."""
+        try:
+            payload = response.json()
+        except ValueError:
+            return None
+        if not isinstance(payload, dict):
+            return None
+        cost = (payload.get("extensions") or {}).get("cost") or {}
+        status = cost.get("throttleStatus") or {}
+        with self._lock:
+            if status:
+                self.available = float(status.get("currentlyAvailable", 0))
+                self.maximum = float(status.get("maximumAvailable", self.available))
+                self.restore_rate = float(status.get("restoreRate", 0))
+                self.observed_at = time.monotonic()
+            if cost.get("requestedQueryCost") is not None:
+                self.expected_cost = float(cost["requestedQueryCost"])
+        throttled = any(
+            isinstance(error, dict) and (error.get("extensions") or {}).get("code") == "THROTTLED"
+            for error in payload.get("errors") or []
+        )
+        if not throttled:
+            return None
+        with self._lock:
+            if self.available is None or self.restore_rate <= 0:
+                return 1.0
+            return max(0.0, (self.expected_cost - self.available) / self.restore_rate)
+
+
+class HostStats:
+    """Counters and a latency window for one host."""
+
+    def __init__(self):
+        self.calls = 0
+        self.attempts = 0
+        self.retries = 0
+        self.errors = 0
+        self.connections_opened = 0
+        self.throttle_wait_seconds = 0.0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.latencies = deque(maxlen=_LATENCY_WINDOW)
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            self.attempts += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def finish(self, seconds: float) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.latencies.append(seconds)
+
+    def add(self, field: str, amount: float = 1) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + amount)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = sorted(self.latencies)
+            attempts, opened = self.attempts, self.connections_opened
+            data = {
+                "calls": self.calls,
+                "attempts": attempts,
+                "retries": self.retries,
+                "errors": self.errors,
+                "connections_opened": opened,
+                "connections_reused": max(0, attempts - opened),
+                "reuse_ratio": round(max(0, attempts - opened) / attempts, 3) if attempts else 0.0,
+                "throttle_wait_seconds": round(self.throttle_wait_seconds, 3),
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+            }
+
+        def percentile(p: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 2)
+
+        data["latency_ms"] = {
+            "p50": percentile(0.50),
+            "p95": percentile(0.95),
+            "max": round(latencies[-1] * 1000, 2) if latencies else None,
+            "samples": len(latencies),
+        }
+        return data
+
+
+class HttpClientPool:
+    """One keep-alive client, concurrency limit and stats record per host."""
+
+    def __init__(
+        self,
+        max_concurrency: int = MAX_CONCURRENCY_PER_HOST,
+        keepalive_expiry: float = KEEPALIVE_EXPIRY,
+        timeout: float = DEFAULT_TIMEOUT,
+    ):
+        self.max_concurrency = max_concurrency
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        self._host_limits: Dict[str, int] = {}
+        self._stats: Dict[str, HostStats] = {}
+        self._lock = threading.Lock()
+        # Async clients and semaphores belong to the event loop they were created on
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._sync_clients: Dict[str, httpx.Client] = {}
+        self._sync_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+
+    @staticmethod
+    def host_key(url: str) -> str:
+        parsed = httpx.URL(url)
+        port = parsed.port or (443 if parsed.scheme == "https" else 80)
+        return f"{parsed.scheme}://{parsed.host}:{port}"
+
+    def configure_host(self, url: str, max_concurrency: int) -> None:
+        """Override the concurrency limit for one host (before its first request)."""
+        self._host_limits[self.host_key(url)] = max(1, int(max_concurrency))
+
+    def limit_for(self, key: str) -> int:
+        return self._host_limits.get(key, self.max_concurrency)
+
+    def _limits(self, key: str) -> httpx.Limits:
+        limit = self.limit_for(key)
+        return httpx.Limits(
+            max_connections=limit,
+            max_keepalive_connections=limit,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    def _host_stats(self, key: str) -> HostStats:
+        with self._lock:
+            if key not in self._stats:
+                self._stats[key] = HostStats()
+            return self._stats[key]
+
+    def _async_state(self, key: str):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # A new loop (asyncio.run per script/test) cannot use the old sockets
+            self._loop = loop
+            self._clients = {}
+            self._semaphores = {}
+        if key not in self._clients:
+            self._clients[key] = httpx.AsyncClient(timeout=self.timeout, limits=self._limits(key))
+            self._semaphores[key] = asyncio.Semaphore(self.limit_for(key))
+        return self._clients[key], self._semaphores[key]
+
+    def _sync_state(self, key: str):
+        with self._lock:
+            if key not in self._sync_clients:
+                self._sync_clients[key] = httpx.Client(timeout=self.timeout, limits=self._limits(key))
+                self._sync_semaphores[key] = threading.BoundedSemaphore(self.limit_for(key))
+            return self._sync_clients[key], self._sync_semaphores[key]
+
+    @staticmethod
+    def _send_kwargs(headers, params, json, content, timeout, trace) -> Dict[str, Any]:
+        kwargs: Dict[str, Any] = {"headers": headers, "params": params, "extensions": {"trace": trace}}
+        if json is not None:
+            kwargs["json"] = json
+        if content is not None:
+            kwargs["content"] = content
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        return kwargs
+
+    @staticmethod
+    def _retry_delay(
+        response: Optional[httpx.Response],
+        error: Optional[Exception],
+        attempt: int,
+        idempotent: bool,
+        backoff_base: float,
+        throttle: Optional[ShopifyThrottle],
+    ) -> Optional[float]:
+        """Seconds to wait before the next attempt, or None if the outcome is final."""
+        if error is not None:
+            if idempotent or isinstance(error, _SAFE_TRANSPORT_ERRORS):
+                return backoff_delay(attempt, backoff_base)
+            return None
+        if throttle is not None:
+            throttled = throttle.observe(response)
+            if throttled is not None:
+                return min(throttled, BACKOFF_MAX)
+        if response.status_code in RETRY_STATUSES and (idempotent or response.status_code == 429):
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                return min(retry_after, BACKOFF_MAX)
+            return backoff_delay(attempt, backoff_base)
+        return None
+
+    def _outcome(self, stats: HostStats, response, error) -> httpx.Response:
+        if error is not None:
+            stats.add("errors")
+            raise error
+        if response.is_error:
+            stats.add("errors")
+            response.raise_for_status()
+        return response
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        json: Any = None,
+        content: Any = None,
+        timeout: Optional[float] = None,
+        attempts: int = RETRY_ATTEMPTS,
+        backoff_base: float = BACKOFF_BASE,
+        idempotent: Optional[bool] = None,
+        throttle: Optional[ShopifyThrottle] = None,
+    ) -> httpx.Response:
+        """
+        Send a request over the host's pooled client, retrying transient failures.
+
+        Non-idempotent requests (POST/PATCH unless ``idempotent=True``) are only
+        retried when they provably were not processed: connect failures, 429,
+        or a throttle rejection.  Raises ``httpx.HTTPStatusError`` for a final
+        4xx/5xx and the last transport error if every attempt failed.
+        """
+        method = method.upper()
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        key = self.host_key(url)
+        client, semaphore = self._async_state(key)
+        stats = self._host_stats(key)
+        stats.add("calls")
+
+        async def trace(name: str, info: Dict[str, Any]) -> None:
+            if name == "connection.connect_tcp.complete":
+                stats.add("connections_opened")
+
+        kwargs = self._send_kwargs(headers, params, json, content, timeout, trace)
+        response, error = None, None
+        for attempt in range(attempts):
+            if throttle is not None:
+                wait = throttle.reserve()
+                if wait > 0:
+                    stats.add("throttle_wait_seconds", wait)
+                    await asyncio.sleep(wait)
+            async with semaphore:
+                stats.start()
+                started = time.perf_counter()
+                try:
+                    response, error = await client.request(method, url, **kwargs), None
+                except httpx.TransportError as e:
+                    response, error = None, e
+                finally:
+                    stats.finish(time.perf_counter() - started)
+            delay = self._retry_delay(response, error, attempt, idempotent, backoff_base, throttle)
+            if delay is None or attempt == attempts - 1:
+                break
+            stats.add("retries")
+            logger.warning(
+                "%s %s failed (%s); retry %d/%d in %.2fs", method, url,
+                error or response.status_code, attempt + 1, attempts - 1, delay,
+            )
+            await asyncio.sleep(delay)
+        return self._outcome(stats, response, error)
+
+    def request_sync(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        json: Any = None,
+        content: Any = None,
+        timeout: Optional[float] = None,
+        attempts: int = RETRY_ATTEMPTS,
+        backoff_base: float = BACKOFF_BASE,
+        idempotent: Optional[bool] = None,
+        throttle: Optional[ShopifyThrottle] = None,
+    ) -> httpx.Response:
+        """Blocking counterpart of ``request`` for synchronous callers."""
+        method = method.upper()
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        key = self.host_key(url)
+        client, semaphore = self._sync_state(key)
+        stats = self._host_stats(key)
+        stats.add("calls")
+
+        def trace(name: str, info: Dict[str, Any]) -> None:
+            if name == "connection.connect_tcp.complete":
+                stats.add("connections_opened")
+
+        kwargs = self._send_kwargs(headers, params, json, content, timeout, trace)
+        response, error = None, None
+        for attempt in range(attempts):
+            if throttle is not None:
+                wait = throttle.reserve()
+                if wait > 0:
+                    stats.add("throttle_wait_seconds", wait)
+                    time.sleep(wait)
+            with semaphore:
+                stats.start()
+                started = time.perf_counter()
+                try:
+                    response, error = client.request(method, url, **kwargs), None
+                except httpx.TransportError as e:
+                    response, error = None, e
+                finally:
+                    stats.finish(time.perf_counter() - started)
+            delay = self._retry_delay(response, error, attempt, idempotent, backoff_base, throttle)
+            if delay is None or attempt == attempts - 1:
+                break
+            stats.add("retries")
+            logger.warning(
+                "%s %s failed (%s); retry %d/%d in %.2fs", method, url,
+                error or response.status_code, attempt + 1, attempts - 1, delay,
+            )
+            time.sleep(delay)
+        return self._outcome(stats, response, error)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            stats = dict(self._stats)
+        return {key: host.snapshot() for key, host in stats.items()}
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats = {}
+
+    def close(self) -> None:
+        """Close the synchronous clients."""
+        with self._lock:
+            clients, self._sync_clients, self._sync_semaphores = self._sync_clients, {}, {}
+        for client in clients.values():
+            client.close()
+
+    async def aclose(self) -> None:
+        """Close every client; call from the application's shutdown hook."""
+        clients, self._clients, self._semaphores = self._clients, {}, {}
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is self._loop:
+            for client in clients.values():
+                try:
+                    await client.aclose()
+                except Exception as e:
+                    logger.error(f"Failed to close HTTP client: {str(e)}")
+        self._loop = None
+        self.close()
+
+
+# Global instance
+http_pool = HttpClientPool()
@@ -0,0 +1,445 @@
+"""
+Incremental Backup Engine - online SQLite snapshots and deduplicated chunks
+
+A backup is a small JSON manifest listing, for every database and file,
+its size, SHA-256 and the ordered list of chunk digests that make it up.
+Chunks live in a content-addressed object store
+(``objects/<aa>/<sha256>``) shared by all backups, so a chunk that is
+already stored is never written again:
+
+- SQLite databases are snapshotted with the online backup API, copied in
+  steps of ``pages_per_step`` pages with a short pause between steps so
+  writers keep going.  The snapshot is cut into page-aligned chunks, so
+  only the regions whose pages changed since the last backup add bytes.
+- Regular files are cut into fixed-size chunks.  A file whose size and
+  mtime match the previous backup reuses its chunk list without being
+  read at all.
+
+Each backup reports its logical size against the bytes it actually wrote.
+``verify`` checks that every chunk exists (fast) or re-hashes them
+(``full=True``); ``restore`` reassembles entries and integrity-checks
+restored databases.  ``prune`` drops old manifests and garbage-collects
+chunks nothing references any more.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows: only in-process locking
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_CHUNK_SIZE = int(os.getenv("BACKUP_DB_CHUNK_SIZE", str(64 * 1024)))
+DEFAULT_FILE_CHUNK_SIZE = int(os.getenv("BACKUP_FILE_CHUNK_SIZE", str(1024 * 1024)))
+DEFAULT_PAGES_PER_STEP = int(os.getenv("BACKUP_PAGES_PER_STEP", "256"))
+DEFAULT_STEP_SLEEP = float(os.getenv("BACKUP_STEP_SLEEP", "0.005"))
+
+# Object header: compressed or stored as-is (already-compressed media)
+_ZLIB = b"z"
+_RAW = b"r"
+
+PathLike = Union[str, Path]
+
+
+class BackupError(Exception):
+    """Raised for a missing backup or an entry that cannot be restored."""
+
+
+class IncrementalBackupEngine:
+    """Content-addressed backup store with per-backup manifests."""
+
+    def __init__(
+        self,
+        root: PathLike,
+        db_chunk_size: int = DEFAULT_DB_CHUNK_SIZE,
+        file_chunk_size: int = DEFAULT_FILE_CHUNK_SIZE,
+        pages_per_step: int = DEFAULT_PAGES_PER_STEP,
+        step_sleep: float = DEFAULT_STEP_SLEEP,
+        compress_level: int = 1,
+    ):
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.manifests_dir = self.root / "manifests"
+        self.tmp_dir = self.root / "tmp"
+        for directory in (self.objects_dir, self.manifests_dir, self.tmp_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+        self.db_chunk_size = db_chunk_size
+        self.file_chunk_size = file_chunk_size
+        self.pages_per_step = pages_per_step
+        self.step_sleep = step_sleep
+        self.compress_level = compress_level
+        self._lock = threading.Lock()
+
+    # -- store ---------------------------------------------------------
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Serialise backups and garbage collection, across processes too."""
+        with self._lock:
+            with open(self.root / "lock", "a") as handle:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / digest
+
+    def _put_chunk(self, data: bytes) -> Tuple[str, int]:
+        """Store ``data`` unless already present; returns (digest, bytes written)."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if path.exists():
+            return digest, 0
+        compressed = zlib.compress(data, self.compress_level)
+        payload = _ZLIB + compressed if len(compressed) < len(data) else _RAW + data
+        path.parent.mkdir(exist_ok=True)
+        tmp = self.tmp_dir / f"{digest}.{os.getpid()}.{threading.get_ident()}"
+        with open(tmp, "wb") as handle:
+            handle.write(payload)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp, path)
+        return digest, len(payload)
+
+    def _get_chunk(self, digest: str, check: bool = False) -> bytes:
+        try:
+            payload = self._object_path(digest).read_bytes()
+        except FileNotFoundError:
+            raise BackupError(f"Chunk {digest} is missing")
+        try:
+            data = zlib.decompress(payload[1:]) if payload[:1] == _ZLIB else payload[1:]
+        except zlib.error:
+            raise BackupError(f"Chunk {digest} is corrupt")
+        if check and hashlib.sha256(data).hexdigest() != digest:
+            raise BackupError(f"Chunk {digest} is corrupt")
+        return data
+
+    # -- backup --------------------------------------------------------
+
+    def _snapshot_sqlite(self, source: Path) -> Path:
+        """Consistent copy of a live database via the online backup API."""
+        target = self.tmp_dir / f"{source.name}.{os.getpid()}.snapshot"
+        if target.exists():
+            target.unlink()
+        src = sqlite3.connect(str(source))
+        dst = sqlite3.connect(str(target))
+        try:
+            # Stepped copy: the source is only locked while a step runs
+            src.backup(dst, pages=self.pages_per_step, sleep=self.step_sleep)
+        finally:
+            dst.close()
+            src.close()
+        return target
+
+    def _chunk_file(self, path: Path, chunk_size: int, report: Dict[str, Any]) -> Dict[str, Any]:
+        whole = hashlib.sha256()
+        chunks = []
+        size = 0
+        with open(path, "rb") as handle:
+            while True:
+                data = handle.read(chunk_size)
+                if not data:
+                    break
+                whole.update(data)
+                size += len(data)
+                digest, written = self._put_chunk(data)
+                chunks.append(digest)
+                report["chunks_total"] += 1
+                if written:
+                    report["chunks_new"] += 1
+                    report["bytes_written"] += written
+        return {"size": size, "sha256": whole.hexdigest(), "chunks": chunks}
+
+    def _iter_files(self, root: Path) -> Iterator[Path]:
+        if root.is_file():
+            yield root
+            return
+        for directory, _dirs, files in os.walk(root):
+            for name in sorted(files):
+                yield Path(directory) / name
+
+    def create_backup(
+        self,
+        databases: Iterable[PathLike] = (),
+        paths: Iterable[PathLike] = (),
+        label: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Snapshot ``databases`` (SQLite files) and ``paths`` (files or
+        directory trees) into a new backup; returns its report.
+        """
+        started = time.perf_counter()
+        created_at = datetime.utcnow()
+        backup_id = created_at.strftime("%Y%m%dT%H%M%S%fZ")
+        report = {
+            "backup_id": backup_id,
+            "logical_bytes": 0,
+            "bytes_written": 0,
+            "chunks_total": 0,
+            "chunks_new": 0,
+            "files_unchanged": 0,
+        }
+        entries: List[Dict[str, Any]] = []
+
+        with self._locked():
+            previous = self._previous_files()
+
+            for database in databases:
+                source = Path(database)
+                if not source.exists():
+                    logger.warning(f"Skipping missing database {source}")
+                    continue
+                snapshot = self._snapshot_sqlite(source)
+                try:
+                    entry = self._chunk_file(snapshot, self.db_chunk_size, report)
+                finally:
+                    snapshot.unlink()
+                entry.update({"name": f"databases/{source.name}", "kind": "sqlite", "source": str(source)})
+                entries.append(entry)
+                report["logical_bytes"] += entry["size"]
+
+            for root in paths:
+                root = Path(root)
+                if not root.exists():
+                    logger.warning(f"Skipping missing path {root}")
+                    continue
+                base = root.parent if root.is_file() else root
+                for path in self._iter_files(root):
+                    name = f"files/{root.name}/{path.relative_to(base)}" if root.is_dir() else f"files/{root.name}"
+                    stat = path.stat()
+                    known = previous.get(str(path))
+                    if (
+                        known
+                        and known["size"] == stat.st_size
+                        and known["mtime_ns"] == stat.st_mtime_ns
+                        and all(self._object_path(d).exists() for d in known["chunks"])
+                    ):
+                        entry = {key: known[key] for key in ("size", "sha256", "chunks")}
+                        report["files_unchanged"] += 1
+                        report["chunks_total"] += len(entry["chunks"])
+                    else:
+                        entry = self._chunk_file(path, self.file_chunk_size, report)
+                    entry.update({"name": name, "kind": "file", "source": str(path), "mtime_ns": stat.st_mtime_ns})
+                    entries.append(entry)
+                    report["logical_bytes"] += entry["size"]
+
+            report["elapsed_seconds"] = time.perf_counter() - started
+            manifest = {
+                "backup_id": backup_id,
+                "label": label,
+                "created_at": created_at.isoformat(),
+                "entries": entries,
+                "report": report,
+            }
+            # Count the manifest itself (its size barely moves when this number is added)
+            report["bytes_written"] += len(json.dumps(manifest, separators=(",", ":")))
+            self._write_manifest(backup_id, json.dumps(manifest, separators=(",", ":")).encode())
+
+        report["entries"] = len(entries)
+        report["dedup_ratio"] = report["logical_bytes"] / report["bytes_written"] if report["bytes_written"] else 0.0
+        logger.info(
+            f"Backup {backup_id}: {len(entries)} entries, {report['logical_bytes']} logical bytes, "
+            f"{report['bytes_written']} bytes written ({report['chunks_new']}/{report['chunks_total']} new chunks)"
+        )
+        return report
+
+    def _write_manifest(self, backup_id: str, data: bytes) -> None:
+        tmp = self.tmp_dir / f"{backup_id}.manifest"
+        with open(tmp, "wb") as handle:
+            handle.write(data)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp, self.manifests_dir / f"{backup_id}.json")
+
+    def _previous_files(self) -> Dict[str, Dict[str, Any]]:
+        """Latest backup's file entries by source path (for the unchanged fast path)."""
+        backups = self._manifest_ids()
+        if not backups:
+            return {}
+        manifest = self.load_manifest(backups[-1])
+        return {entry["source"]: entry for entry in manifest["entries"] if entry["kind"] == "file"}
+
+    # -- manifests -----------------------------------------------------
+
+    def _manifest_ids(self) -> List[str]:
+        return sorted(path.stem for path in self.manifests_dir.glob("*.json"))
+
+    def load_manifest(self, backup_id: str) -> Dict[str, Any]:
+        path = self.manifests_dir / f"{backup_id}.json"
+        if not path.exists():
+            raise BackupError(f"Backup {backup_id} not found")
+        return json.loads(path.read_text())
+
+    def list_backups(self) -> List[Dict[str, Any]]:
+        """Backups newest first, with their size reports."""
+        backups = []
+        for backup_id in reversed(self._manifest_ids()):
+            manifest = self.load_manifest(backup_id)
+            backups.append({
+                "backup_id": backup_id,
+                "label": manifest.get("label"),
+                "created_at": manifest["created_at"],
+                "entries": len(manifest["entries"]),
+                "logical_bytes": manifest["report"]["logical_bytes"],
+                "bytes_written": manifest["report"]["bytes_written"],
+            })
+        return backups
+
+    # -- verify / restore ----------------------------------------------
+
+    def verify(self, backup_id: str, full: bool = False) -> Dict[str, Any]:
+        """
+        Check a backup.  The fast check only confirms every chunk exists;
+        ``full`` also re-hashes every chunk and every entry.
+        """
+        started = time.perf_counter()
+        manifest = self.load_manifest(backup_id)
+        missing: Set[str] = set()
+        corrupt: Set[str] = set()
+        mismatched: List[str] = []
+        verified: Set[str] = set()
+
+        for entry in manifest["entries"]:
+            whole = hashlib.sha256() if full else None
+            for digest in entry["chunks"]:
+                if not self._object_path(digest).exists():
+                    missing.add(digest)
+                    continue
+                if not full:
+                    continue
+                try:
+                    data = self._get_chunk(digest, check=digest not in verified)
+                    verified.add(digest)
+                except BackupError:
+                    corrupt.add(digest)
+                    continue
+                whole.update(data)
+            if full and whole.hexdigest() != entry["sha256"]:
+                mismatched.append(entry["name"])
+
+        return {
+            "backup_id": backup_id,
+            "ok": not (missing or corrupt or mismatched),
+            "full": full,
+            "entries": len(manifest["entries"]),
+            "missing_chunks": sorted(missing),
+            "corrupt_chunks": sorted(corrupt),
+            "mismatched_entries": mismatched,
+            "elapsed_seconds": time.perf_counter() - started,
+        }
+
+    def restore(
+        self,
+        backup_id: str,
+        target_dir: PathLike,
+        names: Optional[Iterable[str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Write the entries of a backup under ``target_dir`` (at their
+        manifest names).  Each entry is written to a temporary file,
+        hash-checked and, for databases, integrity-checked before it is
+        moved into place.
+        """
+        manifest = self.load_manifest(backup_id)
+        wanted = set(names) if names is not None else None
+        target_dir = Path(target_dir)
+        restored = []
+
+        for entry in manifest["entries"]:
+            if wanted is not None and entry["name"] not in wanted:
+                continue
+            destination = target_dir / entry["name"]
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            tmp = destination.with_name(destination.name + ".restoring")
+            whole = hashlib.sha256()
+            try:
+                with open(tmp, "wb") as handle:
+                    for digest in entry["chunks"]:
+                        data = self._get_chunk(digest)
+                        whole.update(data)
+                        handle.write(data)
+            except BackupError:
+                tmp.unlink()
+                raise
+            if whole.hexdigest() != entry["sha256"]:
+                tmp.unlink()
+                raise BackupError(f"Restored {entry['name']} does not match its checksum")
+            if entry["kind"] == "sqlite":
+                conn = sqlite3.connect(str(tmp))
+                try:
+                    result = conn.execute("PRAGMA quick_check").fetchone()[0]
+                finally:
+                    conn.close()
+                if result != "ok":
+                    tmp.unlink()
+                    raise BackupError(f"Restored database {entry['name']} failed quick_check: {result}")
+            os.replace(tmp, destination)
+            restored.append(str(destination))
+
+        return {"backup_id": backup_id, "restored": restored, "count": len(restored)}
+
+    # -- retention -----------------------------------------------------
+
+    def delete_backup(self, backup_id: str) -> None:
+        with self._locked():
+            path = self.manifests_dir / f"{backup_id}.json"
+            if not path.exists():
+                raise BackupError(f"Backup {backup_id} not found")
+            path.unlink()
+
+    def prune(self, keep_last: Optional[int] = None, older_than: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Drop backups beyond the newest ``keep_last`` and/or created before
+        ``older_than`` (UTC), then collect chunks nothing references.
+        """
+        removed = []
+        with self._locked():
+            backup_ids = self._manifest_ids()
+            expired = set()
+            if keep_last is not None:
+                expired.update(backup_ids[:max(len(backup_ids) - keep_last, 0)])
+            if older_than is not None:
+                cutoff = older_than.strftime("%Y%m%dT%H%M%S%fZ")
+                # Ids are UTC timestamps, so they sort chronologically
+                expired.update(backup_id for backup_id in backup_ids if backup_id < cutoff)
+            for backup_id in sorted(expired):
+                (self.manifests_dir / f"{backup_id}.json").unlink()
+                removed.append(backup_id)
+            collected = self._collect_garbage()
+        return {"removed_backups": removed, **collected}
+
+    def _collect_garbage(self) -> Dict[str, int]:
+        # Caller holds the store lock
+        referenced: Set[str] = set()
+        for backup_id in self._manifest_ids():
+            for entry in self.load_manifest(backup_id)["entries"]:
+                referenced.update(entry["chunks"])
+        chunks_removed = 0
+        bytes_freed = 0
+        for path in self.objects_dir.glob("*/*"):
+            if path.name not in referenced:
+                bytes_freed += path.stat().st_size
+                path.unlink()
+                chunks_removed += 1
+        return {"chunks_removed": chunks_removed, "bytes_freed": bytes_freed}
+
+    def store_size(self) -> int:
+        """Bytes used by all stored chunks and manifests."""
+        return sum(path.stat().st_size for path in self.root.rglob("*") if path.is_file())
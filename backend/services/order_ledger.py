@@ -0,0 +1,224 @@
+"""
+Order Ledger - append-only order log with a persistent lookup index
+
+The JSONL log (``logs/shopier_orders.jsonl``) stays the source of truth and
+keeps its format, so existing scripts that tail it keep working.  Next to it
+lives a small SQLite index mapping ``order_id`` to the latest status, whether
+the order was ever delivered, and the byte offset of its last entry.
+
+- Lookups are a primary-key query instead of a scan of the whole log.
+- Appends from several processes are serialised with an exclusive ``flock``
+  on the log; the line and its index row are written under the same lock.
+- The index remembers how many bytes of the log it covers.  Any lines
+  appended behind its back (older code, other tools, a crash between the
+  log write and the index update) are folded in on the next access, and a
+  log that shrank or was replaced triggers a full rebuild.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: only in-process locking
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    order_id TEXT PRIMARY KEY,
+    status TEXT,
+    delivered INTEGER NOT NULL DEFAULT 0,
+    entries INTEGER NOT NULL DEFAULT 0,
+    log_offset INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ledger_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_UPSERT = """
+INSERT INTO orders (order_id, status, delivered, entries, log_offset)
+VALUES (?, ?, ?, 1, ?)
+ON CONFLICT(order_id) DO UPDATE SET
+    status = excluded.status,
+    delivered = MAX(orders.delivered, excluded.delivered),
+    entries = orders.entries + 1,
+    log_offset = excluded.log_offset
+"""
+
+
+class OrderLedger:
+    """Append-only order log plus an O(1) ``order_id`` index."""
+
+    def __init__(self, log_path: Path, index_path: Optional[Path] = None):
+        self.log_path = Path(log_path)
+        self.index_path = Path(index_path) if index_path else self.log_path.with_suffix(".index.sqlite")
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.index_path), timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _open_log(self) -> int:
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        return os.open(str(self.log_path), os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+
+    @staticmethod
+    def _flock(fd: int, exclusive: bool) -> None:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+
+    @staticmethod
+    def _funlock(fd: int) -> None:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def _meta(self, conn: sqlite3.Connection) -> Dict[str, str]:
+        return dict(conn.execute("SELECT key, value FROM ledger_meta").fetchall())
+
+    def _catch_up(self, fd: int, conn: sqlite3.Connection) -> int:
+        """Index log lines past the covered offset; caller holds the log lock."""
+        stat = os.fstat(fd)
+        identity = f"{stat.st_dev}:{stat.st_ino}"
+        meta = self._meta(conn)
+        offset = int(meta.get("offset", 0))
+        if meta.get("identity") != identity or stat.st_size < offset:
+            # New, truncated or replaced log: start over
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM orders")
+            conn.execute("DELETE FROM ledger_meta")
+            conn.execute("INSERT INTO ledger_meta (key, value) VALUES ('identity', ?), ('offset', '0')", (identity,))
+            conn.execute("COMMIT")
+            offset = 0
+        if stat.st_size == offset:
+            return 0
+
+        indexed = 0
+        rows = []
+        with open(fd, "rb", closefd=False) as handle:
+            handle.seek(offset)
+            for line in handle:
+                if not line.endswith(b"\n"):
+                    break  # a writer is mid-line (or crashed); leave it for later
+                entry_offset = offset
+                offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    logger.error(f"Skipping malformed order log line at byte {entry_offset}")
+                    continue
+                row = self._row(entry, entry_offset)
+                if row is not None:
+                    rows.append(row)
+                    indexed += 1
+
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(_UPSERT, rows)
+        conn.execute("UPDATE ledger_meta SET value = ? WHERE key = 'offset'", (str(offset),))
+        conn.execute("COMMIT")
+        return indexed
+
+    @staticmethod
+    def _row(entry: Dict[str, Any], offset: int) -> Optional[tuple]:
+        order_id = entry.get("order_id") if isinstance(entry, dict) else None
+        if order_id is None:
+            return None
+        status = entry.get("status")
+        return (str(order_id), status, 1 if status == "delivered" else 0, offset)
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        """Append one entry to the log and index it atomically w.r.t. other writers."""
+        line = (json.dumps(entry, ensure_ascii=True) + "\n").encode("utf-8")
+        with self._lock:
+            conn = self._connection()
+            fd = self._open_log()
+            try:
+                self._flock(fd, exclusive=True)
+                try:
+                    self._catch_up(fd, conn)
+                    offset = os.fstat(fd).st_size
+                    os.write(fd, line)
+                    row = self._row(entry, offset)
+                    conn.execute("BEGIN IMMEDIATE")
+                    if row is not None:
+                        conn.execute(_UPSERT, row)
+                    conn.execute("UPDATE ledger_meta SET value = ? WHERE key = 'offset'", (str(offset + len(line)),))
+                    conn.execute("COMMIT")
+                finally:
+                    self._funlock(fd)
+            finally:
+                os.close(fd)
+
+    def sync(self) -> int:
+        """Fold any unindexed log lines into the index; returns how many were added."""
+        if not self.log_path.exists():
+            return 0
+        with self._lock:
+            conn = self._connection()
+            fd = self._open_log()
+            try:
+                self._flock(fd, exclusive=True)
+                try:
+                    return self._catch_up(fd, conn)
+                finally:
+                    self._funlock(fd)
+            finally:
+                os.close(fd)
+
+    def rebuild(self) -> int:
+        """Drop the index and rebuild it from the whole log."""
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM ledger_meta")
+        return self.sync()
+
+    def _lookup(self, order_id: str) -> Optional[tuple]:
+        if not self.log_path.exists():
+            return None
+        with self._lock:
+            conn = self._connection()
+            covered = int(self._meta(conn).get("offset", -1))
+        # One stat per lookup tells whether someone appended without indexing
+        if self.log_path.stat().st_size != covered:
+            self.sync()
+        with self._lock:
+            return conn.execute(
+                "SELECT status, delivered, entries FROM orders WHERE order_id = ?", (str(order_id),)
+            ).fetchone()
+
+    def status(self, order_id: Optional[str]) -> Optional[str]:
+        """Status of the latest log entry for ``order_id``."""
+        if not order_id:
+            return None
+        row = self._lookup(order_id)
+        return row[0] if row else None
+
+    def is_delivered(self, order_id: Optional[str]) -> bool:
+        """True if any entry for ``order_id`` was logged as delivered."""
+        if not order_id:
+            return False
+        row = self._lookup(order_id)
+        return bool(row and row[1])
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
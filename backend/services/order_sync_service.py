@@ -6,26 +6,60 @@ This service provides:
 2. Automatic fulfillment for missed webhook callbacks
 3. Revenue ledger synchronization
 4. Delivery queue processing
+
+Sync pipeline:
+- Pages are fetched asynchronously (a few in flight over one keep-alive
+  client), starting from a persisted high-water-mark cursor, so each run
+  only asks Shopier for orders created since the last one.
+- Orders flow through a bounded queue to a pool of fulfillment workers;
+  delivery (SMTP, file I/O) runs off the event loop.
+- Processed orders live in an indexed SQLite store (``ProcessedOrderStore``)
+  instead of a JSON file rewritten after every sync.
 """
 
 import asyncio
 import json
 import logging
 import os
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 from dataclasses import dataclass, asdict
 
-from backend.services.shopier_api_service import ShopierApiService
+from backend.services.shopier_api_service import ShopierApiService, ORDERS_PAGE_SIZE
 from backend.services.delivery_service import delivery_service, DeliveryResult
-from modules.ai_agency.fulfillment_engine import fulfillment_engine
+from backend.services.processed_order_store import ProcessedOrderStore
 
 logger = logging.getLogger(__name__)
 
 DATA_DIR = Path(os.getenv("DATA_DIR", "."))
 SYNC_STATE_FILE = DATA_DIR / "logs/order_sync_state.json"
+# Legacy JSON list of processed ids; imported into the store on first use
 PROCESSED_ORDERS_FILE = DATA_DIR / "logs/processed_orders.json"
+PROCESSED_ORDERS_DB = Path(os.getenv("PROCESSED_ORDERS_DB", str(DATA_DIR / "logs/processed_orders.sqlite")))
+
+SYNC_WORKERS = int(os.getenv("ORDER_SYNC_WORKERS", "8"))
+FETCH_CONCURRENCY = int(os.getenv("ORDER_SYNC_FETCH_CONCURRENCY", "4"))
+# Re-read this much history before the cursor to catch late-arriving orders
+CURSOR_OVERLAP_SECONDS = int(os.getenv("ORDER_SYNC_CURSOR_OVERLAP", "3600"))
+# With no cursor and no stored orders, start this far back (0 = whole history)
+INITIAL_LOOKBACK_SECONDS = int(os.getenv("ORDER_SYNC_INITIAL_LOOKBACK", str(7 * 24 * 3600)))
+CURSOR_KEY = "cursor"
+FULFILLED_STATUSES = ("paid", "completed", "success", "delivered")
+
+
+def _parse_timestamp(value: Any) -> Optional[datetime]:
+    """Order timestamps as naive UTC datetimes (None if absent or unparsable)."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = (parsed - parsed.utcoffset()).replace(tzinfo=None)
+    return parsed
 
 
 @dataclass
@@ -39,6 +73,9 @@ class SyncResult:
     revenue_recorded: float = 0.0
     sync_timestamp: str = ""
     details: List[Dict[str, Any]] = None
+    pages_fetched: int = 0
+    cursor: Optional[str] = None
+    elapsed_seconds: float = 0.0
 
     def __post_init__(self):
         if self.details is None:
@@ -50,47 +87,49 @@ class OrderSyncService:
     Automated order synchronization service for Shopier.
     
     Features:
-    - Fetches orders via PAT API
-    - Tracks processed orders to avoid duplicates
-    - Triggers fulfillment for unprocessed orders
+    - Fetches orders via PAT API, paginated from a persisted cursor
+    - Tracks processed orders in an indexed store to avoid duplicates
+    - Triggers fulfillment for unprocessed orders on a worker pool
     - Updates revenue ledger
     - Supports scheduled execution via Cloud Scheduler
     """
 
-    def __init__(self):
-        self.shopier_api = ShopierApiService()
+    def __init__(
+        self,
+        shopier_api: Optional[ShopierApiService] = None,
+        store: Optional[ProcessedOrderStore] = None,
+        delivery=None,
+        fulfillment=None,
+        workers: int = SYNC_WORKERS,
+        fetch_concurrency: int = FETCH_CONCURRENCY,
+    ):
+        self.shopier_api = shopier_api or ShopierApiService()
+        self.delivery = delivery or delivery_service
+        self._fulfillment = fulfillment
+        self.workers = workers
+        self.fetch_concurrency = fetch_concurrency
         self.base_url = os.getenv("BACKEND_ORIGIN", "")
+        self._store = store
         self._ensure_directories()
-        self._processed_orders = self._load_processed_orders()
 
     def _ensure_directories(self):
         """Ensure required directories exist."""
         SYNC_STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
 
-    def _load_processed_orders(self) -> set:
-        """Load set of already processed order IDs."""
-        if not PROCESSED_ORDERS_FILE.exists():
-            return set()
-        try:
-            data = json.loads(PROCESSED_ORDERS_FILE.read_text(encoding="utf-8"))
-            return set(data.get("order_ids", []))
-        except Exception as e:
-            logger.warning(f"Failed to load processed orders: {e}")
-            return set()
-
-    def _save_processed_orders(self):
-        """Save processed order IDs."""
-        try:
-            data = {
-                "order_ids": list(self._processed_orders),
-                "last_updated": datetime.utcnow().isoformat()
-            }
-            PROCESSED_ORDERS_FILE.write_text(
-                json.dumps(data, indent=2, ensure_ascii=False),
-                encoding="utf-8"
-            )
-        except Exception as e:
-            logger.error(f"Failed to save processed orders: {e}")
+    @property
+    def store(self) -> ProcessedOrderStore:
+        # Opened lazily so importing the module does not touch the disk
+        if self._store is None:
+            self._store = ProcessedOrderStore(PROCESSED_ORDERS_DB, legacy_json=PROCESSED_ORDERS_FILE)
+        return self._store
+
+    @property
+    def fulfillment(self):
+        # Imported lazily: the engine creates its earnings ledger on import
+        if self._fulfillment is None:
+            from modules.ai_agency.fulfillment_engine import fulfillment_engine
+            self._fulfillment = fulfillment_engine
+        return self._fulfillment
 
     def _save_sync_state(self, result: SyncResult):
         """Save sync state for monitoring."""
@@ -98,7 +137,8 @@ class OrderSyncService:
             state = {
                 "last_sync": result.sync_timestamp,
                 "last_result": asdict(result),
-                "total_processed_orders": len(self._processed_orders)
+                "total_processed_orders": self.store.count(),
+                "cursor": self.store.get_meta(CURSOR_KEY)
             }
             SYNC_STATE_FILE.write_text(
                 json.dumps(state, indent=2, ensure_ascii=False),
@@ -182,90 +222,94 @@ class OrderSyncService:
         self,
         limit: int = 50,
         status_filter: Optional[str] = "paid",
-        force_reprocess: bool = False
+        force_reprocess: bool = False,
+        since: Optional[str] = None,
     ) -> SyncResult:
         """
         Sync orders from Shopier API and process any unfulfilled ones.
         
         Args:
-            limit: Maximum orders to fetch
+            limit: Maximum orders to fetch in this run (across pages)
             status_filter: Filter by order status (paid, pending, etc.)
             force_reprocess: If True, reprocess already processed orders
+            since: ISO timestamp to start from instead of the stored cursor
+                (e.g. a backfill of the last month)
             
         Returns:
             SyncResult with details of the sync operation
         """
         result = SyncResult(sync_timestamp=datetime.utcnow().isoformat())
-        
+        started = time.perf_counter()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.workers * 2)
+        watermark = {"high": None, "low_failed": None, "ordered": True}
+
+        def observe(created_at: Optional[datetime], failed: bool) -> None:
+            if created_at is None:
+                return
+            if watermark["high"] is not None and created_at < watermark["high"]:
+                watermark["ordered"] = False
+            if watermark["high"] is None or created_at > watermark["high"]:
+                watermark["high"] = created_at
+            if failed and (watermark["low_failed"] is None or created_at < watermark["low_failed"]):
+                watermark["low_failed"] = created_at
+
+        async def worker() -> None:
+            while True:
+                order_data = await queue.get()
+                try:
+                    if order_data is None:
+                        return
+                    try:
+                        failed = not await self._fulfill(order_data, result)
+                    except Exception as e:
+                        # Keep the worker alive; the producer would block on a full queue
+                        logger.error(f"Order worker failed on {order_data['order_id']}: {str(e)}")
+                        result.errors += 1
+                        failed = True
+                    observe(_parse_timestamp(order_data.get("created_at")), failed)
+                finally:
+                    queue.task_done()
+
+        start_from = since or self._fetch_start()
+        workers = [asyncio.create_task(worker()) for _ in range(self.workers)]
+        exhausted = True
         try:
             # Fetch orders from Shopier API
-            logger.info(f"Fetching orders from Shopier (limit={limit}, status={status_filter})")
-            orders = self.shopier_api.get_orders(status=status_filter, limit=limit)
-            result.total_fetched = len(orders)
-            logger.info(f"Fetched {len(orders)} orders from Shopier")
-
-            for order in orders:
-                order_data = self._extract_order_data(order)
-                order_id = order_data["order_id"]
-                
-                if not order_id:
-                    logger.warning("Order missing ID, skipping")
-                    continue
-
-                # Check if already processed
-                if order_id in self._processed_orders and not force_reprocess:
-                    result.already_processed += 1
-                    continue
-
-                result.new_orders += 1
-                
-                # Check if order is paid/completed
-                if order_data["status"] not in ("paid", "completed", "success", "delivered"):
-                    logger.info(f"Order {order_id} status is {order_data['status']}, skipping fulfillment")
-                    result.details.append({
-                        "order_id": order_id,
-                        "status": "skipped",
-                        "reason": f"Order status: {order_data['status']}"
-                    })
-                    continue
-
-                # Process the order
-                try:
-                    delivery_result = await self._process_order(order_data)
-                    
-                    if delivery_result.status in ("delivered", "queued"):
-                        result.fulfilled += 1
-                        result.revenue_recorded += order_data.get("amount", 0)
-                        
-                        # Mark as processed
-                        self._processed_orders.add(order_id)
-                        
-                        result.details.append({
-                            "order_id": order_id,
-                            "status": delivery_result.status,
-                            "sku": delivery_result.sku,
-                            "amount": delivery_result.amount,
-                            "message": delivery_result.message
-                        })
-                    else:
-                        result.details.append({
-                            "order_id": order_id,
-                            "status": delivery_result.status,
-                            "message": delivery_result.message
-                        })
-                        
-                except Exception as e:
-                    logger.error(f"Error processing order {order_id}: {e}")
-                    result.errors += 1
-                    result.details.append({
-                        "order_id": order_id,
-                        "status": "error",
-                        "error": str(e)
-                    })
-
-            # Save state
-            self._save_processed_orders()
-            self._save_sync_state(result)
+            logger.info(f"Fetching orders from Shopier (limit={limit}, status={status_filter}, since={start_from})")
+            async for page in self.shopier_api.iter_order_pages(
+                status=status_filter,
+                since=start_from,
+                max_orders=limit,
+                page_size=min(limit, ORDERS_PAGE_SIZE),
+                concurrency=self.fetch_concurrency,
+            ):
+                result.pages_fetched += 1
+                result.total_fetched += len(page)
+                orders = []
+                for order in page:
+                    order_data = self._extract_order_data(order)
+                    if not order_data["order_id"]:
+                        logger.warning("Order missing ID, skipping")
+                        continue
+                    orders.append(order_data)
+
+                # Check if already processed (one indexed query per page)
+                done = set() if force_reprocess else self.store.contains_many(o["order_id"] for o in orders)
+                for order_data in orders:
+                    if order_data["order_id"] in done:
+                        result.already_processed += 1
+                        observe(_parse_timestamp(order_data.get("created_at")), failed=False)
+                        continue
+                    result.new_orders += 1
+                    await queue.put(order_data)
+            exhausted = result.total_fetched < limit
+
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+
+            self._advance_cursor(watermark, exhausted)
+            result.cursor = self.store.get_meta(CURSOR_KEY)
             
             logger.info(
                 f"Sync complete: fetched={result.total_fetched}, "
@@ -277,9 +321,103 @@ class OrderSyncService:
             logger.error(f"Order sync failed: {e}")
             result.errors += 1
             result.details.append({"error": str(e)})
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
 
+        result.elapsed_seconds = time.perf_counter() - started
+        # Save state
+        self._save_sync_state(result)
         return result
 
+    def _fetch_start(self) -> Optional[str]:
+        """
+        The cursor minus the overlap.  Without a cursor (first run, fresh
+        DATA_DIR) seed it from the newest order already in the store, else
+        ``INITIAL_LOOKBACK_SECONDS`` ago: pages come back oldest-first, so an
+        unbounded first run would walk the shop's oldest orders instead of
+        recovering recent missed webhooks.
+        """
+        start = _parse_timestamp(self.store.get_meta(CURSOR_KEY))
+        if start is None:
+            start = _parse_timestamp(self.store.newest_order_created_at())
+        if start is None:
+            if INITIAL_LOOKBACK_SECONDS <= 0:
+                return None
+            return (datetime.utcnow() - timedelta(seconds=INITIAL_LOOKBACK_SECONDS)).isoformat()
+        return (start - timedelta(seconds=CURSOR_OVERLAP_SECONDS)).isoformat()
+
+    def _advance_cursor(self, watermark: Dict[str, Any], exhausted: bool) -> None:
+        """
+        Move the cursor to the newest order seen, but never past an order
+        that failed (it must be fetched again).  A run cut short by ``limit``
+        only advances if Shopier returned orders oldest-first; otherwise
+        older unseen orders could be skipped.
+        """
+        candidate = watermark["high"]
+        if candidate is None or not (exhausted or watermark["ordered"]):
+            return
+        if watermark["low_failed"] is not None:
+            candidate = min(candidate, watermark["low_failed"])
+        current = _parse_timestamp(self.store.get_meta(CURSOR_KEY))
+        if current is None or candidate > current:
+            self.store.set_meta(CURSOR_KEY, candidate.isoformat())
+
+    async def _fulfill(self, order_data: Dict[str, Any], result: SyncResult) -> bool:
+        """Fulfill one order and fold the outcome into ``result``; False means retry next run."""
+        order_id = order_data["order_id"]
+
+        # Check if order is paid/completed
+        if order_data["status"] not in FULFILLED_STATUSES:
+            logger.info(f"Order {order_id} status is {order_data['status']}, skipping fulfillment")
+            result.details.append({
+                "order_id": order_id,
+                "status": "skipped",
+                "reason": f"Order status: {order_data['status']}"
+            })
+            return True
+
+        # Process the order
+        try:
+            delivery_result = await self._process_order(order_data)
+        except Exception as e:
+            logger.error(f"Error processing order {order_id}: {e}")
+            result.errors += 1
+            result.details.append({
+                "order_id": order_id,
+                "status": "error",
+                "error": str(e)
+            })
+            return False
+
+        if delivery_result.status in ("delivered", "queued"):
+            result.fulfilled += 1
+            result.revenue_recorded += order_data.get("amount", 0)
+            
+            # Mark as processed
+            self.store.mark(
+                order_id,
+                delivery_result.status,
+                amount=order_data.get("amount"),
+                currency=order_data.get("currency"),
+                order_created_at=order_data.get("created_at"),
+            )
+            
+            result.details.append({
+                "order_id": order_id,
+                "status": delivery_result.status,
+                "sku": delivery_result.sku,
+                "amount": delivery_result.amount,
+                "message": delivery_result.message
+            })
+        else:
+            result.details.append({
+                "order_id": order_id,
+                "status": delivery_result.status,
+                "message": delivery_result.message
+            })
+        return True
+
     async def _process_order(self, order_data: Dict[str, Any]) -> DeliveryResult:
         """Process a single order - fulfill and record revenue."""
         order_id = order_data["order_id"]
@@ -287,16 +425,19 @@ class OrderSyncService:
         
         logger.info(f"Processing order {order_id} (amount: {amount})")
         
-        # Trigger digital delivery
-        delivery_result = delivery_service.deliver_digital(
+        # Trigger digital delivery (blocking SMTP/file I/O, so off the loop)
+        delivery_result = await asyncio.to_thread(
+            self.delivery.deliver_digital,
             order_data,
             self.base_url,
             allow_queue=True
         )
         
-        # Record revenue if delivery successful
+        # Record revenue if delivery successful.  Stays on the loop: the
+        # earnings file update is not thread-safe and the DB write is
+        # scheduled as a task on the running loop.
         if delivery_result.status in ("delivered", "queued") and amount > 0:
-            fulfillment_engine.record_sale(
+            self.fulfillment.record_sale(
                 amount=amount,
                 source=f"Shopier Order Sync: {order_id}",
                 metadata={
@@ -313,7 +454,7 @@ class OrderSyncService:
 
     async def retry_failed_deliveries(self, max_items: int = 50) -> Dict[str, int]:
         """Retry any queued/failed deliveries."""
-        return delivery_service.retry_queued_deliveries(
+        return await self.delivery.drain_queued_deliveries(
             base_url=self.base_url,
             max_items=max_items
         )
@@ -323,37 +464,27 @@ class OrderSyncService:
         if not SYNC_STATE_FILE.exists():
             return {
                 "status": "never_synced",
-                "total_processed": len(self._processed_orders)
+                "total_processed": self.store.count()
             }
         
         try:
             state = json.loads(SYNC_STATE_FILE.read_text(encoding="utf-8"))
             state["status"] = "ok"
+            state["processed_store"] = self.store.stats()
             return state
         except Exception as e:
             return {
                 "status": "error",
                 "error": str(e),
-                "total_processed": len(self._processed_orders)
+                "total_processed": self.store.count()
             }
 
     def clear_processed_orders(self, older_than_days: int = 30) -> int:
         """
-        Clear old processed order IDs to prevent unbounded growth.
-        
-        Note: This is a simple implementation. A production system would
-        store timestamps with order IDs for proper aging.
+        Forget processed order IDs older than ``older_than_days`` to bound
+        the store.  The cursor keeps old orders from being fetched again.
         """
-        # For now, just keep the last N orders
-        max_orders = 10000
-        if len(self._processed_orders) > max_orders:
-            # Convert to list, keep last max_orders
-            orders_list = list(self._processed_orders)
-            removed = len(orders_list) - max_orders
-            self._processed_orders = set(orders_list[-max_orders:])
-            self._save_processed_orders()
-            return removed
-        return 0
+        return self.store.prune(older_than_days)
 
 
 # Singleton instance
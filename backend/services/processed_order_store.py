@@ -0,0 +1,174 @@
+"""
+Processed Order Store - indexed record of synced Shopier orders
+
+Replaces ``logs/processed_orders.json``, which held every processed order
+id in one JSON list and was rewritten in full after each sync.  Here each
+processed order is one row in a small SQLite database (WAL mode), so:
+
+- marking an order is a single-row upsert, not a full-file rewrite;
+- "which of these ids are done?" is one indexed ``IN`` query per page;
+- rows carry ``processed_at``, so old ids can be aged out properly;
+- the sync cursor (high-water mark) lives in the same database.
+
+A legacy JSON file is imported once on first open and renamed to
+``*.migrated``.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS processed_orders (
+    order_id TEXT PRIMARY KEY,
+    status TEXT,
+    amount REAL,
+    currency TEXT,
+    order_created_at TEXT,
+    processed_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_processed_orders_processed_at ON processed_orders (processed_at);
+CREATE TABLE IF NOT EXISTS sync_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_UPSERT = """
+INSERT INTO processed_orders (order_id, status, amount, currency, order_created_at, processed_at)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT(order_id) DO UPDATE SET
+    status = excluded.status,
+    amount = excluded.amount,
+    currency = excluded.currency,
+    order_created_at = COALESCE(excluded.order_created_at, processed_orders.order_created_at),
+    processed_at = excluded.processed_at
+"""
+
+# SQLite's default limit on bound parameters is 999 on older builds
+_IN_BATCH = 900
+
+
+class ProcessedOrderStore:
+    """SQLite-backed set of processed order ids plus the sync cursor."""
+
+    def __init__(self, db_path: Path, legacy_json: Optional[Path] = None):
+        self.db_path = Path(db_path)
+        self.legacy_json = Path(legacy_json) if legacy_json else None
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+            self._import_legacy(conn)
+        return self._conn
+
+    def _import_legacy(self, conn: sqlite3.Connection) -> None:
+        if self.legacy_json is None or not self.legacy_json.exists():
+            return
+        try:
+            data = json.loads(self.legacy_json.read_text(encoding="utf-8"))
+            order_ids = [str(order_id) for order_id in data.get("order_ids", [])]
+            imported_at = data.get("last_updated") or datetime.utcnow().isoformat()
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT OR IGNORE INTO processed_orders (order_id, status, processed_at) VALUES (?, 'imported', ?)",
+                [(order_id, imported_at) for order_id in order_ids],
+            )
+            conn.execute("COMMIT")
+            self.legacy_json.rename(self.legacy_json.with_name(self.legacy_json.name + ".migrated"))
+            logger.info(f"Imported {len(order_ids)} processed orders from {self.legacy_json}")
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            logger.error(f"Failed to import legacy processed orders: {str(e)}")
+
+    def contains(self, order_id: str) -> bool:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT 1 FROM processed_orders WHERE order_id = ?", (str(order_id),)
+            ).fetchone()
+        return row is not None
+
+    def contains_many(self, order_ids: Iterable[str]) -> Set[str]:
+        """The subset of ``order_ids`` already processed (one query per 900 ids)."""
+        order_ids = [str(order_id) for order_id in order_ids]
+        found: Set[str] = set()
+        with self._lock:
+            conn = self._connection()
+            for start in range(0, len(order_ids), _IN_BATCH):
+                batch = order_ids[start:start + _IN_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                found.update(row[0] for row in conn.execute(
+                    f"SELECT order_id FROM processed_orders WHERE order_id IN ({placeholders})", batch
+                ))
+        return found
+
+    def mark(
+        self,
+        order_id: str,
+        status: str,
+        amount: Optional[float] = None,
+        currency: Optional[str] = None,
+        order_created_at: Optional[str] = None,
+    ) -> None:
+        row = (str(order_id), status, amount, currency, order_created_at, datetime.utcnow().isoformat())
+        with self._lock:
+            self._connection().execute(_UPSERT, row)
+
+    def count(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM processed_orders").fetchone()[0]
+
+    def get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._connection().execute("SELECT value FROM sync_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        with self._lock:
+            self._connection().execute(
+                "INSERT INTO sync_meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, value),
+            )
+
+    def newest_order_created_at(self) -> Optional[str]:
+        with self._lock:
+            row = self._connection().execute("SELECT MAX(order_created_at) FROM processed_orders").fetchone()
+        return row[0]
+
+    def prune(self, older_than_days: int) -> int:
+        """Forget orders processed more than ``older_than_days`` ago."""
+        cutoff = (datetime.utcnow() - timedelta(days=older_than_days)).isoformat()
+        with self._lock:
+            cursor = self._connection().execute(
+                "DELETE FROM processed_orders WHERE processed_at < ?", (cutoff,)
+            )
+        return cursor.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            conn = self._connection()
+            total, oldest, newest = conn.execute(
+                "SELECT COUNT(*), MIN(processed_at), MAX(processed_at) FROM processed_orders"
+            ).fetchone()
+        return {"total": total, "oldest_processed_at": oldest, "newest_processed_at": newest}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
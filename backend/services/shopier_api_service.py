@@ -1,13 +1,18 @@
 import os
 import json
+import asyncio
 import logging
-import time
-from typing import Any, Dict, Optional, List
+from typing import Any, AsyncIterator, Dict, Optional, List
 
-import requests
+import httpx
+
+from backend.services.http_client import http_pool
 
 logger = logging.getLogger(__name__)
 
+ORDERS_PAGE_SIZE = int(os.getenv("SHOPIER_ORDERS_PAGE_SIZE", "50"))
+RETRY_DELAY = float(os.getenv("SHOPIER_RETRY_DELAY", "2.0"))
+
 
 class ShopierApiService:
     """
@@ -21,6 +26,7 @@ class ShopierApiService:
 
         if not self.access_token:
             logger.warning("Shopier API access token missing. Set SHOPIER_PERSONAL_ACCESS_TOKEN.")
+        self.retry_delay = RETRY_DELAY
 
     def _headers(self) -> Dict[str, str]:
         if not self.access_token:
@@ -31,41 +37,70 @@ class ShopierApiService:
             "Accept": "application/json",
         }
 
+    def _url(self, path: str) -> str:
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    @staticmethod
+    def _decode(response: httpx.Response) -> Any:
+        if response.content:
+            return response.json()
+        return None
+
     def _request(
         self,
         method: str,
         path: str,
         params: Optional[Dict[str, Any]] = None,
         payload: Optional[Dict[str, Any]] = None,
+        attempts: int = 3,
+    ) -> Any:
+        url = self._url(path)
+        try:
+            response = http_pool.request_sync(
+                method,
+                url,
+                headers=self._headers(),
+                params=params,
+                content=json.dumps(payload) if payload is not None else None,
+                attempts=attempts,
+                backoff_base=self.retry_delay,
+            )
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Shopier API error response: {e.response.text}")
+            logger.error("Shopier API request failed: %s %s (%s)", method, url, e.response.status_code)
+            raise
+        except httpx.HTTPError as exc:
+            logger.error("Shopier API request failed: %s %s (%s)", method, url, exc)
+            raise
+        return self._decode(response)
+
+    async def _request_async(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        payload: Optional[Dict[str, Any]] = None,
+        attempts: int = 3,
     ) -> Any:
-        url = f"{self.base_url}/{path.lstrip('/')}"
-        last_exc = None
-        for attempt in range(3):
-            try:
-                response = requests.request(
-                    method=method.upper(),
-                    url=url,
-                    headers=self._headers(),
-                    params=params,
-                    data=json.dumps(payload) if payload is not None else None,
-                    timeout=30,
-                )
-                response.raise_for_status()
-                if response.text:
-                    return response.json()
-                return None
-            except requests.exceptions.HTTPError as e:
-                logger.error(f"Shopier API error response: {e.response.text}")
-                last_exc = e
-                logger.error("Shopier API request failed: %s %s (%s)", method, url, e)
-                if attempt < 2:
-                    time.sleep(2 * (attempt + 1))
-            except requests.RequestException as exc:
-                last_exc = exc
-                logger.error("Shopier API request failed: %s %s (%s)", method, url, exc)
-                if attempt < 2:
-                    time.sleep(2 * (attempt + 1))
-        raise last_exc
+        """Async variant of ``_request``: backs off with ``asyncio.sleep`` instead of blocking the loop."""
+        url = self._url(path)
+        try:
+            response = await http_pool.request(
+                method,
+                url,
+                headers=self._headers(),
+                params=params,
+                content=json.dumps(payload) if payload is not None else None,
+                attempts=attempts,
+                backoff_base=self.retry_delay,
+            )
+        except httpx.HTTPStatusError as e:
+            logger.error("Shopier API request failed: %s %s (%s)", method, url, e.response.status_code)
+            raise
+        except httpx.HTTPError as exc:
+            logger.error("Shopier API request failed: %s %s (%s)", method, url, exc)
+            raise
+        return self._decode(response)
 
     def create_product(self, product_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -100,6 +135,60 @@ class ShopierApiService:
         result = self._request("GET", "/orders", params=params)
         return result.get("data", []) if isinstance(result, dict) else []
     
+    async def fetch_orders_page(
+        self,
+        page: int,
+        limit: int = ORDERS_PAGE_SIZE,
+        status: Optional[str] = None,
+        since: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch one page of orders, oldest first, optionally created at or after ``since``.
+        """
+        params: Dict[str, Any] = {"limit": limit, "page": page, "sort": "dateAsc"}
+        if status and status != "all":
+            params["status"] = status
+        if since:
+            params["dateStart"] = since
+        result = await self._request_async("GET", "/orders", params=params)
+        if isinstance(result, dict):
+            return result.get("data", [])
+        return result if isinstance(result, list) else []
+
+    async def iter_order_pages(
+        self,
+        status: Optional[str] = None,
+        since: Optional[str] = None,
+        max_orders: Optional[int] = None,
+        page_size: int = ORDERS_PAGE_SIZE,
+        concurrency: int = 4,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Yield order pages in order.  Up to ``concurrency`` pages are fetched
+        at once over the shared keep-alive pool; paging stops at the first
+        short page or once ``max_orders`` orders were yielded.
+        """
+        page = 1
+        fetched = 0
+        while True:
+            window = concurrency
+            if max_orders is not None:
+                remaining = max_orders - fetched
+                window = max(1, min(concurrency, -(-remaining // page_size)))
+            pages = await asyncio.gather(*(
+                self.fetch_orders_page(page + offset, page_size, status, since)
+                for offset in range(window)
+            ))
+            for data in pages:
+                if max_orders is not None:
+                    data = data[:max_orders - fetched]
+                if data:
+                    fetched += len(data)
+                    yield data
+                if len(data) < page_size or (max_orders is not None and fetched >= max_orders):
+                    return
+            page += window
+
     def get_product(self, product_id: str) -> Dict[str, Any]:
         """
         Get details for a specific product.
@@ -1,8 +1,19 @@
-import httpx
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from loguru import logger
 import asyncio
+import hashlib
+import json
+import os
+import time
 from backend.config.enhanced_settings import get_settings
+from backend.services.http_client import ShopifyThrottle, http_pool
+
+# Bulk catalog sync: products per page/batch and batches in flight
+BULK_PAGE_SIZE = int(os.getenv("SHOPIFY_BULK_PAGE_SIZE", "50"))
+BULK_BATCH_SIZE = int(os.getenv("SHOPIFY_BULK_BATCH_SIZE", "10"))
+BULK_CONCURRENCY = int(os.getenv("SHOPIFY_BULK_CONCURRENCY", "3"))
+CATALOG_HASH_NAMESPACE = "autonomax"
+CATALOG_HASH_KEY = "catalog_hash"
 
 class ShopifyService:
     """
@@ -24,13 +35,56 @@ class ShopifyService:
         self.storefront_token = self.payment_settings.shopify_storefront_token
         self.storefront_endpoint = f"https://{self.shop_domain}/api/{self.api_version}/graphql.json" if self.storefront_token and self.shop_domain else None
         
+        # Admin API calls share Shopify's per-store cost bucket
+        self.admin_throttle = ShopifyThrottle()
+        
         self.is_configured = self.admin_endpoint is not None or self.storefront_endpoint is not None
         
         if not self.is_configured:
             logger.warning("Shopify Service initialized without full credentials (Dry-run mode)")
 
+    async def _post_graphql(
+        self,
+        endpoint: str,
+        headers: Dict[str, str],
+        query: str,
+        variables: Optional[Dict[str, Any]],
+        timeout: float,
+        throttle: Optional[ShopifyThrottle] = None,
+    ) -> Dict[str, Any]:
+        """Post a GraphQL document over the shared pooled client."""
+        # Queries are safe to resend after a lost response; mutations are not
+        is_mutation = query.lstrip().startswith("mutation")
+        response = await http_pool.request(
+            "POST",
+            endpoint,
+            headers=headers,
+            json={"query": query, "variables": variables or {}},
+            timeout=timeout,
+            idempotent=not is_mutation,
+            throttle=throttle,
+        )
+        return response.json()
+
     async def _post_admin(self, query: str, variables: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Post a GraphQL query to the Admin API."""
+        data, errors = await self._post_admin_partial(query, variables)
+        if errors:
+            logger.error(f"Shopify Admin API error: {errors}")
+            raise RuntimeError(f"Shopify Admin error: {errors}")
+            
+        return data
+
+    async def _post_admin_partial(
+        self,
+        query: str,
+        variables: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        Post to the Admin API and return ``(data, errors)``.  GraphQL reports
+        field errors next to partial ``data``; this only raises when no data
+        came back at all, so callers can attribute errors by ``path``.
+        """
         if not self.admin_endpoint:
             raise RuntimeError("Shopify Admin API not configured")
             
@@ -39,20 +93,15 @@ class ShopifyService:
             "X-Shopify-Access-Token": self.admin_token,
         }
         
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            response = await client.post(
-                self.admin_endpoint,
-                json={"query": query, "variables": variables or {}},
-                headers=headers
-            )
-            response.raise_for_status()
-            data = response.json()
+        body = await self._post_graphql(
+            self.admin_endpoint, headers, query, variables, timeout=15.0, throttle=self.admin_throttle
+        )
+        errors = body.get("errors") or []
+        if errors and not body.get("data"):
+            logger.error(f"Shopify Admin API error: {errors}")
+            raise RuntimeError(f"Shopify Admin error: {errors}")
             
-            if "errors" in data:
-                logger.error(f"Shopify Admin API error: {data['errors']}")
-                raise RuntimeError(f"Shopify Admin error: {data['errors']}")
-                
-            return data.get("data", {})
+        return body.get("data") or {}, errors
 
     async def _post_storefront(self, query: str, variables: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Post a GraphQL query to the Storefront API."""
@@ -64,20 +113,12 @@ class ShopifyService:
             "X-Shopify-Storefront-Access-Token": self.storefront_token,
         }
         
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.post(
-                self.storefront_endpoint,
-                json={"query": query, "variables": variables or {}},
-                headers=headers
-            )
-            response.raise_for_status()
-            data = response.json()
+        data = await self._post_graphql(self.storefront_endpoint, headers, query, variables, timeout=10.0)
+        if "errors" in data:
+            logger.error(f"Shopify Storefront API error: {data['errors']}")
+            raise RuntimeError(f"Shopify Storefront error: {data['errors']}")
             
-            if "errors" in data:
-                logger.error(f"Shopify Storefront API error: {data['errors']}")
-                raise RuntimeError(f"Shopify Storefront error: {data['errors']}")
-                
-            return data.get("data", {})
+        return data.get("data", {})
 
     def _build_media_inputs(self, payload: Dict[str, Any]) -> List[Dict[str, Any]]:
         media_inputs = []
@@ -317,6 +358,228 @@ class ShopifyService:
             return await self.update_product(existing, payload, update_images=update_images)
         return await self.create_product(payload)
 
+    @staticmethod
+    def content_hash(payload: Dict[str, Any]) -> str:
+        """Stable hash of the catalog fields we publish, stored on the product as a metafield."""
+        fields = {key: payload.get(key) for key in ("title", "description", "sku", "type", "vendor")}
+        fields["price"] = str(payload.get("price", 0))
+        fields["status"] = str(payload.get("status", "ACTIVE")).upper()
+        fields["tags"] = sorted(payload.get("tags") or [])
+        fields["images"] = [url for url in payload.get("images") or [] if url]
+        encoded = json.dumps(fields, sort_keys=True, default=str).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    async def fetch_sku_index(self, page_size: int = BULK_PAGE_SIZE) -> Dict[str, Dict[str, Any]]:
+        """
+        Map every variant SKU in the store to its product id and stored catalog hash.
+        One paginated Admin query replaces a ``find_product_by_sku`` search per SKU.
+        """
+        if not self.admin_endpoint:
+            return {}
+
+        query = """
+        query($first: Int!, $after: String) {
+          products(first: $first, after: $after) {
+            pageInfo { hasNextPage endCursor }
+            edges {
+              node {
+                id
+                metafield(namespace: "%s", key: "%s") { value }
+                variants(first: 5) { edges { node { id sku } } }
+              }
+            }
+          }
+        }
+        """ % (CATALOG_HASH_NAMESPACE, CATALOG_HASH_KEY)
+
+        index: Dict[str, Dict[str, Any]] = {}
+        after = None
+        while True:
+            data = await self._post_admin(query, {"first": page_size, "after": after})
+            products = data.get("products", {})
+            for edge in products.get("edges", []):
+                node = edge["node"]
+                stored_hash = (node.get("metafield") or {}).get("value")
+                for variant in node.get("variants", {}).get("edges", []):
+                    sku = variant["node"].get("sku")
+                    if sku:
+                        index[sku] = {"product_id": node["id"], "variant_id": variant["node"]["id"], "hash": stored_hash}
+            page_info = products.get("pageInfo") or {}
+            if not page_info.get("hasNextPage"):
+                return index
+            after = page_info.get("endCursor")
+
+    def _product_set_input(
+        self,
+        payload: Dict[str, Any],
+        product_id: Optional[str],
+        content_hash: str,
+        include_media: bool
+    ) -> Dict[str, Any]:
+        sku = payload.get("sku") or f"auto-{payload.get('title', 'product')[:10]}"
+        product_input = {
+            "id": product_id,
+            "title": payload.get("title"),
+            "descriptionHtml": payload.get("description", ""),
+            "status": payload.get("status", "ACTIVE").upper(),
+            "productType": payload.get("type") or None,
+            "vendor": payload.get("vendor") or None,
+            "tags": payload.get("tags") or None,
+            "productOptions": [{"name": "Title", "values": [{"name": "Default"}]}],
+            "variants": [
+                {
+                    "optionValues": [{"optionName": "Title", "name": "Default"}],
+                    "price": str(payload.get("price", 0)),
+                    "inventoryItem": {"sku": sku, "requiresShipping": False},
+                }
+            ],
+            "metafields": [
+                {
+                    "namespace": CATALOG_HASH_NAMESPACE,
+                    "key": CATALOG_HASH_KEY,
+                    "type": "single_line_text_field",
+                    "value": content_hash,
+                }
+            ],
+        }
+        if include_media:
+            product_input["files"] = [
+                {"originalSource": media["originalSource"], "alt": media["alt"], "contentType": "IMAGE"}
+                for media in self._build_media_inputs(payload)
+            ]
+        return {k: v for k, v in product_input.items() if v}
+
+    async def set_products(
+        self,
+        items: List[Dict[str, Any]],
+        update_images: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Create or update several products in one request with aliased ``productSet``
+        mutations.  ``items`` carry ``payload``, ``product_id`` (None to create) and
+        ``hash``; returns one result per item, in order.  A failed alias (user
+        errors, or a GraphQL error whose ``path`` starts with it) only fails its
+        own item; the rest of the batch keeps its outcome.
+        """
+        if not items:
+            return []
+        declarations, selections, variables = [], [], {}
+        for position, item in enumerate(items):
+            alias = f"p{position}"
+            include_media = item.get("product_id") is None or update_images
+            variables[alias] = self._product_set_input(
+                item["payload"], item.get("product_id"), item["hash"], include_media
+            )
+            declarations.append(f"${alias}: ProductSetInput!")
+            selections.append(
+                f"{alias}: productSet(input: ${alias}, synchronous: true) "
+                "{ product { id title onlineStoreUrl } userErrors { field message } }"
+            )
+        mutation = "mutation BulkProductSet(%s) {\n%s\n}" % (", ".join(declarations), "\n".join(selections))
+
+        data, errors = await self._post_admin_partial(mutation, variables)
+        alias_errors: Dict[str, List[Dict[str, Any]]] = {}
+        unattributed = []
+        for error in errors:
+            path = error.get("path") or []
+            if path:
+                alias_errors.setdefault(str(path[0]), []).append(error)
+            else:
+                unattributed.append(error)
+
+        results = []
+        for position, item in enumerate(items):
+            alias = f"p{position}"
+            outcome = data.get(alias)
+            result = {
+                "sku": item["payload"].get("sku"),
+                "title": item["payload"].get("title"),
+                "action": "update" if item.get("product_id") else "create",
+            }
+            item_errors = alias_errors.get(alias) or (outcome or {}).get("userErrors")
+            if not item_errors and not outcome:
+                item_errors = unattributed or [{"message": "no result returned"}]
+            if item_errors:
+                logger.error(f"Shopify productSet Errors ({result['sku']}): {item_errors}")
+                result["errors"] = item_errors
+            else:
+                result["product"] = outcome.get("product") or {}
+            results.append(result)
+        return results
+
+    async def sync_catalog(
+        self,
+        payloads: List[Dict[str, Any]],
+        batch_size: int = BULK_BATCH_SIZE,
+        concurrency: int = BULK_CONCURRENCY,
+        update_images: bool = False,
+        force: bool = False,
+        dry_run: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Publish a catalog in bulk: prefetch the SKU index once, skip products whose
+        stored content hash matches, and send the rest as batched ``productSet``
+        mutations with at most ``concurrency`` requests in flight.
+        """
+        started = time.perf_counter()
+        index = await self.fetch_sku_index()
+
+        pending, skipped, seen = [], 0, set()
+        for payload in payloads:
+            sku = payload.get("sku")
+            if sku:
+                if sku in seen:
+                    continue
+                seen.add(sku)
+            content_hash = self.content_hash(payload)
+            existing = index.get(sku) if sku else None
+            if existing and existing.get("hash") == content_hash and not force:
+                skipped += 1
+                continue
+            pending.append({
+                "payload": payload,
+                "product_id": existing["product_id"] if existing else None,
+                "hash": content_hash,
+            })
+
+        if dry_run or not self.admin_endpoint:
+            results = [
+                {"sku": item["payload"].get("sku"), "title": item["payload"].get("title"),
+                 "action": "update" if item["product_id"] else "create", "dry_run": True}
+                for item in pending
+            ]
+        else:
+            semaphore = asyncio.Semaphore(max(1, concurrency))
+            batches = [pending[start:start + batch_size] for start in range(0, len(pending), batch_size)]
+
+            async def send(batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+                async with semaphore:
+                    try:
+                        return await self.set_products(batch, update_images=update_images)
+                    except Exception as e:
+                        logger.error(f"Shopify bulk batch failed: {str(e)}")
+                        return [
+                            {"sku": item["payload"].get("sku"), "title": item["payload"].get("title"),
+                             "action": "update" if item["product_id"] else "create", "errors": str(e)}
+                            for item in batch
+                        ]
+
+            results = [result for batch in await asyncio.gather(*(send(b) for b in batches)) for result in batch]
+
+        elapsed = time.perf_counter() - started
+        ok = [result for result in results if "errors" not in result]
+        return {
+            "total": len(pending) + skipped,
+            "created": sum(1 for result in ok if result["action"] == "create"),
+            "updated": sum(1 for result in ok if result["action"] == "update"),
+            "skipped_unchanged": skipped,
+            "errors": len(results) - len(ok),
+            "dry_run": dry_run or not self.admin_endpoint,
+            "elapsed_seconds": round(elapsed, 3),
+            "products_per_second": round((len(pending) + skipped) / elapsed, 2) if elapsed > 0 else 0.0,
+            "results": results,
+        }
+
     async def get_storefront_info(self) -> Dict[str, Any]:
         """Fetch general shop information from the Storefront API."""
         query = """
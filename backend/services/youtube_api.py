@@ -0,0 +1,112 @@
+"""
+YouTube Data API call execution for background syncs.
+
+``googleapiclient`` requests are blocking (and ``httplib2`` connections are
+not thread-safe), so ``YouTubeApiClient`` runs ``request.execute()`` on a
+small thread pool, giving each worker thread its own authorized connection.
+Every call is charged against the Data API quota cost of its method.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Quota units per call (https://developers.google.com/youtube/v3/determine_quota_cost)
+QUOTA_COSTS: Dict[str, int] = {
+    "channels.list": 1,
+    "playlistItems.list": 1,
+    "videos.list": 1,
+    "playlists.list": 1,
+    "commentThreads.list": 1,
+    "search.list": 100,
+    "videos.update": 50,
+    "videos.insert": 1600,
+}
+
+# videos.list accepts at most this many comma-separated IDs
+MAX_IDS_PER_CALL = 50
+
+DEFAULT_SYNC_WORKERS = int(os.getenv("YOUTUBE_SYNC_WORKERS", "4"))
+
+
+def quota_cost(method: str) -> int:
+    """Quota units charged for one call of ``method`` (e.g. ``"videos.list"``)."""
+    return QUOTA_COSTS.get(method, 1)
+
+
+@dataclass
+class SyncReport:
+    """What one channel sync did and what it cost."""
+    channel_id: Optional[str] = None
+    pages: int = 0
+    videos_synced: int = 0
+    api_calls: Dict[str, int] = field(default_factory=dict)
+    quota_units: int = 0
+    elapsed: float = 0.0
+    error: Optional[str] = None
+
+    def charge(self, method: str) -> None:
+        self.api_calls[method] = self.api_calls.get(method, 0) + 1
+        self.quota_units += quota_cost(method)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class YouTubeApiClient:
+    """Runs Data API requests off the event loop and accounts their quota."""
+
+    def __init__(
+        self,
+        credentials: Any = None,
+        max_workers: int = DEFAULT_SYNC_WORKERS,
+        num_retries: int = 2,
+        report: Optional[SyncReport] = None,
+    ):
+        self.credentials = credentials
+        self.num_retries = num_retries
+        self.report = report or SyncReport()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="youtube-api")
+        self._local = threading.local()
+
+    def _thread_http(self) -> Any:
+        """Per-thread authorized connection; None lets the request use its own."""
+        if self.credentials is None:
+            return None
+        http = getattr(self._local, "http", None)
+        if http is None:
+            import google_auth_httplib2
+            import httplib2
+
+            http = self._local.http = google_auth_httplib2.AuthorizedHttp(self.credentials, http=httplib2.Http())
+        return http
+
+    def _execute_blocking(self, request: Any) -> Dict[str, Any]:
+        http = self._thread_http()
+        if http is None:
+            return request.execute(num_retries=self.num_retries)
+        return request.execute(http=http, num_retries=self.num_retries)
+
+    async def execute(self, method: str, request: Any) -> Dict[str, Any]:
+        """Execute a built request (e.g. ``service.videos().list(...)``) in the pool."""
+        self.report.charge(method)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._execute_blocking, request)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+    def __enter__(self) -> "YouTubeApiClient":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.report.elapsed += time.perf_counter() - self._started
+        self.close()
@@ -3,6 +3,7 @@ YouTube API Integration Service
 Handles OAuth2 flow and data synchronization with database.
 """
 
+import asyncio
 import logging
 from typing import Dict, Any, List, Optional
 import json
@@ -13,12 +14,16 @@ from googleapiclient.errors import HttpError
 from google_auth_oauthlib.flow import Flow
 from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request
+from sqlalchemy import bindparam
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from backend.core.config import settings
 from backend.models.youtube import ChannelStats, VideoAnalytics
 from backend.models.user import User
+from backend.services.youtube_api import MAX_IDS_PER_CALL, SyncReport, YouTubeApiClient
 
 logger = logging.getLogger(__name__)
 
@@ -92,105 +97,235 @@ class YouTubeService:
             logger.error(f"Error exchanging code: {e}")
             raise
 
-    async def sync_channel_stats(self, credentials: Credentials, user_id: int, db: AsyncSession):
-        """Fetch and store basic channel statistics."""
+    async def sync_channel_stats(
+        self,
+        credentials: Credentials,
+        user_id: int,
+        db: AsyncSession,
+        service: Any = None,
+        max_pages: Optional[int] = None,
+        refresh_video_ids: Optional[List[str]] = None,
+    ) -> Optional[SyncReport]:
+        """Fetch and store channel statistics, then sync its uploads.
+
+        ``service`` defaults to a Data API client built from ``credentials``
+        (tests pass a fake).  For an incremental sync, ``max_pages`` limits
+        the uploads walk to the newest pages and ``refresh_video_ids`` lists
+        older videos whose statistics should be refreshed as well.  Returns
+        the sync report, with the quota units spent, or None when nothing
+        could be synced.
+        """
+        report = SyncReport()
         try:
-            service = build('youtube', 'v3', credentials=credentials)
-            
-            # Get my channel
-            response = service.channels().list(
-                part='snippet,statistics,contentDetails',
-                mine=True
-            ).execute()
-            
-            if not response.get('items'):
-                logger.warning("No channel found for authenticated user")
-                return
+            service = service or build('youtube', 'v3', credentials=credentials)
+            with YouTubeApiClient(credentials, report=report) as client:
+                # Get my channel
+                response = await client.execute("channels.list", service.channels().list(
+                    part='snippet,statistics,contentDetails',
+                    mine=True
+                ))
+                
+                if not response.get('items'):
+                    logger.warning("No channel found for authenticated user")
+                    return None
 
-            channel = response['items'][0]
-            channel_id = channel['id']
-            stats = channel['statistics']
-            
-            # Create or update stats record
-            # Check if exists
-            result = await db.execute(select(ChannelStats).where(ChannelStats.channel_id == channel_id))
-            existing_stats = result.scalars().first()
-            
-            if existing_stats:
-                existing_stats.subscribers = int(stats.get('subscriberCount', 0))
-                existing_stats.views = int(stats.get('viewCount', 0))
-                existing_stats.video_count = int(stats.get('videoCount', 0))
-                existing_stats.fetched_at = datetime.now()
-            else:
-                new_stats = ChannelStats(
-                    channel_id=channel_id,
-                    user_id=user_id,
-                    subscribers=int(stats.get('subscriberCount', 0)),
-                    views=int(stats.get('viewCount', 0)),
-                    video_count=int(stats.get('videoCount', 0)),
+                channel = response['items'][0]
+                channel_id = channel['id']
+                report.channel_id = channel_id
+                await self._upsert_channel_stats(db, channel_id, user_id, channel['statistics'])
+                
+                uploads_playlist_id = channel['contentDetails']['relatedPlaylists']['uploads']
+                await self.sync_recent_videos(
+                    service, uploads_playlist_id, channel_id, user_id, db,
+                    client=client, max_pages=max_pages,
                 )
-                db.add(new_stats)
-            
-            await db.commit()
-            
-            # Trigger video sync in background (simplified here)
-            uploads_playlist_id = channel['contentDetails']['relatedPlaylists']['uploads']
-            await self.sync_recent_videos(service, uploads_playlist_id, channel_id, user_id, db)
+                if refresh_video_ids:
+                    await self.refresh_video_stats(service, refresh_video_ids, db, client)
+            logger.info(
+                f"Synced channel {channel_id}: {report.videos_synced} videos, "
+                f"{report.pages} pages, {report.quota_units} quota units in {report.elapsed:.2f}s"
+            )
+            return report
             
         except Exception as e:
             logger.error(f"Error syncing channel stats: {e}")
             # Don't raise, just log error for background job
+            report.error = str(e)
+            return report
+
+    async def _upsert_channel_stats(self, db: AsyncSession, channel_id: str, user_id: int, stats: Dict[str, Any]) -> None:
+        result = await db.execute(select(ChannelStats).where(ChannelStats.channel_id == channel_id))
+        existing_stats = result.scalars().first()
+        
+        if existing_stats:
+            existing_stats.subscribers = int(stats.get('subscriberCount', 0))
+            existing_stats.views = int(stats.get('viewCount', 0))
+            existing_stats.video_count = int(stats.get('videoCount', 0))
+            existing_stats.fetched_at = datetime.now()
+        else:
+            db.add(ChannelStats(
+                channel_id=channel_id,
+                user_id=user_id,
+                subscribers=int(stats.get('subscriberCount', 0)),
+                views=int(stats.get('viewCount', 0)),
+                video_count=int(stats.get('videoCount', 0)),
+            ))
+        await db.commit()
             
-    async def sync_recent_videos(self, service, playlist_id: str, channel_id: str, user_id: int, db: AsyncSession):
-        """Sync recent videos from the channel."""
+    async def sync_recent_videos(
+        self,
+        service,
+        playlist_id: str,
+        channel_id: str,
+        user_id: int,
+        db: AsyncSession,
+        client: Optional[YouTubeApiClient] = None,
+        max_pages: Optional[int] = None,
+    ) -> SyncReport:
+        """Sync every video in the uploads playlist.
+
+        The playlist is paged 50 items at a time; each page costs one
+        ``playlistItems.list`` plus one ``videos.list`` for all of its IDs,
+        and is written with a single bulk upsert.  The next page is fetched
+        while the current one is being resolved and stored.
+        """
+        owns_client = client is None
+        if owns_client:
+            # Reuse the service's credentials so each worker thread gets its own connection
+            credentials = getattr(getattr(service, '_http', None), 'credentials', None)
+            client = YouTubeApiClient(credentials)
+            client.__enter__()
+        report = client.report
+        report.channel_id = report.channel_id or channel_id
+
+        def fetch_page(page_token: Optional[str]) -> asyncio.Future:
+            params = dict(part='snippet,contentDetails', playlistId=playlist_id, maxResults=MAX_IDS_PER_CALL)
+            if page_token:
+                params['pageToken'] = page_token
+            return asyncio.ensure_future(client.execute("playlistItems.list", service.playlistItems().list(**params)))
+
+        next_page: Optional[asyncio.Future] = fetch_page(None)
         try:
-            # Get recent videos from uploads playlist
-            response = service.playlistItems().list(
-                part='snippet,contentDetails',
-                playlistId=playlist_id,
-                maxResults=10
-            ).execute()
-            
-            for item in response.get('items', []):
-                video_id = item['contentDetails']['videoId']
-                title = item['snippet']['title']
-                upload_date_str = item['snippet']['publishedAt']
-                upload_date = datetime.fromisoformat(upload_date_str.replace('Z', '+00:00'))
-                
-                # Get video stats
-                video_response = service.videos().list(
-                    part='statistics',
-                    id=video_id
-                ).execute()
-                
-                if not video_response.get('items'):
+            while next_page is not None:
+                page = await next_page
+                report.pages += 1
+                token = page.get('nextPageToken')
+                next_page = fetch_page(token) if token and (max_pages is None or report.pages < max_pages) else None
+
+                snippets = {}
+                for item in page.get('items', []):
+                    snippets[item['contentDetails']['videoId']] = item['snippet']
+                if not snippets:
                     continue
-                    
-                stats = video_response['items'][0]['statistics']
-                
-                # Create or update video record
-                result = await db.execute(select(VideoAnalytics).where(VideoAnalytics.video_id == video_id))
-                existing_video = result.scalars().first()
-                
-                if existing_video:
-                    existing_video.views = int(stats.get('viewCount', 0))
-                    existing_video.likes = int(stats.get('likeCount', 0))
-                    existing_video.comments = int(stats.get('commentCount', 0))
-                    existing_video.fetched_at = datetime.now()
-                else:
-                    new_video = VideoAnalytics(
-                        video_id=video_id,
-                        channel_id=channel_id,
-                        user_id=user_id,
-                        title=title,
-                        views=int(stats.get('viewCount', 0)),
-                        likes=int(stats.get('likeCount', 0)),
-                        comments=int(stats.get('commentCount', 0)),
-                        upload_date=upload_date
-                    )
-                    db.add(new_video)
-            
-            await db.commit()
+
+                video_ids = list(snippets)
+                responses = await asyncio.gather(*[
+                    client.execute("videos.list", service.videos().list(
+                        part='statistics',
+                        id=','.join(video_ids[i:i + MAX_IDS_PER_CALL]),
+                    ))
+                    for i in range(0, len(video_ids), MAX_IDS_PER_CALL)
+                ])
+
+                now = datetime.now()
+                rows = []
+                for response in responses:
+                    for video in response.get('items', []):
+                        snippet = snippets.get(video['id'])
+                        if snippet is None:
+                            continue
+                        stats = video.get('statistics', {})
+                        rows.append({
+                            "video_id": video['id'],
+                            "channel_id": channel_id,
+                            "user_id": user_id,
+                            "title": snippet['title'],
+                            "views": int(stats.get('viewCount', 0)),
+                            "likes": int(stats.get('likeCount', 0)),
+                            "comments": int(stats.get('commentCount', 0)),
+                            "upload_date": datetime.fromisoformat(snippet['publishedAt'].replace('Z', '+00:00')),
+                            "fetched_at": now,
+                        })
+                await self._upsert_videos(db, rows)
+                report.videos_synced += len(rows)
             
         except Exception as e:
-            logger.error(f"Error syncing videos: {e}")
\ No newline at end of file
+            logger.error(f"Error syncing videos: {e}")
+            report.error = str(e)
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+            if owns_client:
+                client.__exit__(None, None, None)
+        return report
+
+    async def refresh_video_stats(
+        self,
+        service,
+        video_ids: List[str],
+        db: AsyncSession,
+        client: YouTubeApiClient,
+    ) -> int:
+        """Refresh view/like/comment counts of already-synced videos, 50 IDs per call."""
+        video_ids = list(dict.fromkeys(video_ids))
+        responses = await asyncio.gather(*[
+            client.execute("videos.list", service.videos().list(
+                part='statistics',
+                id=','.join(video_ids[i:i + MAX_IDS_PER_CALL]),
+            ))
+            for i in range(0, len(video_ids), MAX_IDS_PER_CALL)
+        ])
+
+        now = datetime.now()
+        rows = []
+        for response in responses:
+            for video in response.get('items', []):
+                stats = video.get('statistics', {})
+                rows.append({
+                    "b_video_id": video['id'],
+                    "b_views": int(stats.get('viewCount', 0)),
+                    "b_likes": int(stats.get('likeCount', 0)),
+                    "b_comments": int(stats.get('commentCount', 0)),
+                    "b_fetched_at": now,
+                })
+        if rows:
+            table = VideoAnalytics.__table__
+            stmt = (
+                table.update()
+                .where(table.c.video_id == bindparam("b_video_id"))
+                .values(views=bindparam("b_views"), likes=bindparam("b_likes"),
+                        comments=bindparam("b_comments"), fetched_at=bindparam("b_fetched_at"))
+            )
+            connection = await db.connection()
+            await connection.execute(stmt, rows)
+            await db.commit()
+        client.report.videos_synced += len(rows)
+        return len(rows)
+
+    async def _upsert_videos(self, db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+        """Insert or refresh one page of ``VideoAnalytics`` rows in one statement."""
+        if not rows:
+            return
+        dialect = db.get_bind().dialect.name
+        if dialect in ("sqlite", "postgresql"):
+            insert = sqlite_insert if dialect == "sqlite" else postgresql_insert
+            stmt = insert(VideoAnalytics).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[VideoAnalytics.video_id],
+                set_={name: stmt.excluded[name] for name in ("views", "likes", "comments", "fetched_at")},
+            )
+            await db.execute(stmt)
+        else:
+            # Portable fallback: one SELECT for the page, then update or add
+            result = await db.execute(
+                select(VideoAnalytics).where(VideoAnalytics.video_id.in_([row["video_id"] for row in rows]))
+            )
+            existing = {video.video_id: video for video in result.scalars()}
+            for row in rows:
+                video = existing.get(row["video_id"])
+                if video is None:
+                    db.add(VideoAnalytics(**row))
+                    continue
+                for name in ("views", "likes", "comments", "fetched_at"):
+                    setattr(video, name, row[name])
+        await db.commit()
@@ -0,0 +1,395 @@
+"""
+YouTube Sync Scheduler - concurrent multi-channel sync under a quota budget
+
+Every authorized user's channel is synced through ``YouTubeService`` with at
+most ``max_concurrency`` syncs in flight.  Each round:
+
+1. Channels are ranked by staleness (hours since ``ChannelStats.fetched_at``)
+   weighted by view velocity (views per day of recent uploads), so busy,
+   out-of-date channels go first.
+2. Each channel gets a full sync (whole uploads playlist) when it was never
+   synced or its last full sync is older than ``full_sync_interval``;
+   otherwise an incremental one: channel stats, the newest uploads page and
+   a refresh of the older videos whose numbers are likely to have moved
+   (recent uploads and the highest-velocity videos).
+3. The estimated quota cost is reserved from the daily ``QuotaBudget``
+   before a sync starts and settled with the real cost afterwards.  Below
+   the low-water mark full syncs are downgraded to incremental ones; syncs
+   that do not fit are deferred to a later round; a ``quotaExceeded`` from
+   the API stops everything until the daily reset.
+
+Failed channels back off exponentially.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy.future import select
+
+from backend.models.user import User
+from backend.models.youtube import ChannelStats, VideoAnalytics
+from backend.services.youtube_api import MAX_IDS_PER_CALL, quota_cost
+
+logger = logging.getLogger(__name__)
+
+try:
+    from zoneinfo import ZoneInfo
+
+    # Data API quotas reset at midnight Pacific time
+    QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
+except Exception:
+    QUOTA_TIMEZONE = timezone(timedelta(hours=-8))
+
+DEFAULT_DAILY_QUOTA = int(os.getenv("YOUTUBE_DAILY_QUOTA", "10000"))
+
+
+def _aware(value: Optional[datetime]) -> Optional[datetime]:
+    # SQLite hands back naive datetimes; they are stored as UTC
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class QuotaBudget:
+    """Daily Data API quota shared by every sync in this process."""
+
+    def __init__(
+        self,
+        daily_limit: int = DEFAULT_DAILY_QUOTA,
+        low_watermark: float = 0.2,
+        hard_reserve: float = 0.05,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.daily_limit = daily_limit
+        self.low_watermark = low_watermark
+        self.hard_reserve = hard_reserve
+        self.clock = clock
+        self.spent = 0
+        self.reserved = 0
+        self.exhausted = False
+        self._day = self._quota_day()
+
+    def _quota_day(self) -> str:
+        return datetime.fromtimestamp(self.clock(), QUOTA_TIMEZONE).date().isoformat()
+
+    def _roll(self) -> None:
+        day = self._quota_day()
+        if day != self._day:
+            self._day, self.spent, self.exhausted = day, 0, False
+
+    @property
+    def remaining(self) -> int:
+        self._roll()
+        if self.exhausted:
+            return 0
+        return max(0, self.daily_limit - self.spent - self.reserved)
+
+    @property
+    def low(self) -> bool:
+        return self.remaining < self.daily_limit * self.low_watermark
+
+    def reserve(self, units: int) -> bool:
+        """Hold ``units`` for a sync if they fit above the hard reserve."""
+        if self.remaining - units < self.daily_limit * self.hard_reserve:
+            return False
+        self.reserved += units
+        return True
+
+    def settle(self, reserved: int, spent: int) -> None:
+        self._roll()
+        self.reserved = max(0, self.reserved - reserved)
+        self.spent += spent
+
+    def exhaust(self) -> None:
+        """The API reported the quota as used up: stop until the daily reset."""
+        self._roll()
+        self.exhausted = True
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "day": self._day,
+            "daily_limit": self.daily_limit,
+            "spent": self.spent,
+            "reserved": self.reserved,
+            "remaining": self.remaining,
+            "exhausted": self.exhausted,
+        }
+
+
+@dataclass
+class ChannelSyncState:
+    """What the scheduler knows about one channel between rounds."""
+    user_id: int
+    channel_id: Optional[str] = None
+    fetched_at: Optional[datetime] = None
+    video_count: int = 0
+    velocity: float = 0.0
+    last_full_sync: Optional[datetime] = None
+    failures: int = 0
+    next_attempt_at: float = 0.0
+    priority: float = 0.0
+
+
+class YouTubeSyncScheduler:
+    """Runs channel syncs concurrently, most valuable first, within the quota."""
+
+    def __init__(
+        self,
+        youtube_service: Any = None,
+        session_factory: Optional[Callable[[], Any]] = None,
+        service_factory: Optional[Callable[[User], Any]] = None,
+        budget: Optional[QuotaBudget] = None,
+        max_concurrency: int = int(os.getenv("YOUTUBE_SYNC_CONCURRENCY", "4")),
+        full_sync_interval: timedelta = timedelta(days=1),
+        recent_days: int = 7,
+        velocity_window_days: int = 30,
+        hot_fraction: float = 0.1,
+        max_hot_videos: int = 200,
+        default_video_count: int = 200,
+        backoff_base: float = 60.0,
+        backoff_max: float = 6 * 3600.0,
+    ):
+        if youtube_service is None:
+            from backend.services.youtube_service import YouTubeService
+
+            youtube_service = YouTubeService()
+        self.youtube_service = youtube_service
+        self.session_factory = session_factory
+        self.service_factory = service_factory
+        self.budget = budget or QuotaBudget()
+        self.max_concurrency = max_concurrency
+        self.full_sync_interval = full_sync_interval
+        self.recent_days = recent_days
+        self.velocity_window_days = velocity_window_days
+        self.hot_fraction = hot_fraction
+        self.max_hot_videos = max_hot_videos
+        # Assumed size of a channel that has never been synced, so its first
+        # full sync reserves a realistic share of the quota
+        self.default_video_count = default_video_count
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.states: Dict[int, ChannelSyncState] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def _session(self) -> Any:
+        if self.session_factory is None:
+            from backend.core import database as core_db
+
+            if core_db.AsyncSessionLocal is None:
+                core_db.create_database_engines()
+            self.session_factory = core_db.AsyncSessionLocal
+        return self.session_factory()
+
+    def _credentials(self, user: User) -> Any:
+        from google.oauth2.credentials import Credentials
+
+        config = self.youtube_service.client_config["web"]
+        return Credentials(
+            token=user.youtube_access_token,
+            refresh_token=user.youtube_refresh_token,
+            token_uri=config["token_uri"],
+            client_id=config["client_id"],
+            client_secret=config["client_secret"],
+        )
+
+    async def refresh_states(self, now: datetime) -> List[ChannelSyncState]:
+        """Load authorized users, their channel stats and recent-upload velocity."""
+        async with self._session() as db:
+            users = (await db.execute(
+                select(User.id).where(User.youtube_access_token.isnot(None))
+            )).scalars().all()
+            stats = (await db.execute(
+                select(ChannelStats.user_id, ChannelStats.channel_id, ChannelStats.fetched_at, ChannelStats.video_count)
+                .where(ChannelStats.user_id.in_(users))
+            )).all()
+            since = now - timedelta(days=self.velocity_window_days)
+            recent = (await db.execute(
+                select(VideoAnalytics.channel_id, VideoAnalytics.views, VideoAnalytics.upload_date)
+                .where(VideoAnalytics.upload_date >= since)
+            )).all()
+
+        velocity: Dict[str, float] = {}
+        for channel_id, views, upload_date in recent:
+            age_days = max((now - _aware(upload_date)).total_seconds() / 86400, 1.0)
+            velocity[channel_id] = velocity.get(channel_id, 0.0) + (views or 0) / age_days
+
+        for user_id in users:
+            self.states.setdefault(user_id, ChannelSyncState(user_id=user_id))
+        for user_id, channel_id, fetched_at, video_count in stats:
+            state = self.states[user_id]
+            fetched_at = _aware(fetched_at)
+            if state.fetched_at is None or (fetched_at and fetched_at > state.fetched_at):
+                state.channel_id, state.fetched_at = channel_id, fetched_at
+                state.video_count = video_count or 0
+        for user_id in list(self.states):
+            if user_id not in users:
+                del self.states[user_id]
+        for state in self.states.values():
+            state.velocity = velocity.get(state.channel_id, 0.0)
+        return list(self.states.values())
+
+    def prioritize(self, states: List[ChannelSyncState], now: datetime) -> List[ChannelSyncState]:
+        """Stalest and fastest-moving channels first; never-synced channels before all."""
+        for state in states:
+            if state.fetched_at is None:
+                state.priority = math.inf
+            else:
+                staleness_hours = max((now - state.fetched_at).total_seconds() / 3600, 0.0)
+                state.priority = staleness_hours * (1.0 + math.log1p(state.velocity))
+        return sorted(states, key=lambda state: state.priority, reverse=True)
+
+    def choose_mode(self, state: ChannelSyncState, now: datetime) -> str:
+        full_due = state.last_full_sync is None or now - state.last_full_sync >= self.full_sync_interval
+        if state.channel_id is None or (full_due and not self.budget.low):
+            return "full"
+        return "incremental"
+
+    def estimate_cost(self, state: ChannelSyncState, mode: str) -> int:
+        list_call = quota_cost("playlistItems.list") + quota_cost("videos.list")
+        if mode == "full":
+            video_count = state.video_count if state.channel_id is not None else self.default_video_count
+            pages = max(1, math.ceil(video_count / MAX_IDS_PER_CALL))
+            return quota_cost("channels.list") + pages * list_call
+        hot_calls = math.ceil(min(state.video_count, self.max_hot_videos) / MAX_IDS_PER_CALL)
+        return quota_cost("channels.list") + list_call + hot_calls * quota_cost("videos.list")
+
+    async def hot_video_ids(self, db: Any, channel_id: str, now: datetime) -> List[str]:
+        """Older videos whose statistics are likely to have moved since the last sync.
+
+        The newest page of uploads is refreshed by the playlist walk anyway;
+        beyond it, videos uploaded within ``recent_days`` and the top
+        ``hot_fraction`` by views per day are refreshed, highest velocity first.
+        """
+        rows = (await db.execute(
+            select(VideoAnalytics.video_id, VideoAnalytics.views, VideoAnalytics.upload_date)
+            .where(VideoAnalytics.channel_id == channel_id)
+            .order_by(VideoAnalytics.upload_date.desc())
+        )).all()
+        older = rows[MAX_IDS_PER_CALL:]
+        if not older:
+            return []
+
+        scored = []
+        for video_id, views, upload_date in older:
+            upload_date = _aware(upload_date)
+            age_days = max((now - upload_date).total_seconds() / 86400, 1.0) if upload_date else math.inf
+            scored.append((video_id, (views or 0) / age_days, age_days))
+        velocities = sorted(velocity for _, velocity, _ in scored)
+        threshold = velocities[min(len(velocities) - 1, int(len(velocities) * (1 - self.hot_fraction)))]
+        hot = [
+            (velocity, video_id) for video_id, velocity, age_days in scored
+            if age_days <= self.recent_days or (velocity >= threshold and velocity > 0)
+        ]
+        hot.sort(reverse=True)
+        return [video_id for _, video_id in hot[:self.max_hot_videos]]
+
+    async def sync_channel(self, state: ChannelSyncState, mode: str, now: datetime) -> Dict[str, Any]:
+        async with self._session() as db:
+            user = (await db.execute(select(User).where(User.id == state.user_id))).scalars().first()
+            if user is None:
+                raise LookupError(f"user {state.user_id} no longer exists")
+            service = self.service_factory(user) if self.service_factory else None
+            credentials = None if service is not None else self._credentials(user)
+
+            kwargs: Dict[str, Any] = {}
+            if mode == "incremental":
+                kwargs["max_pages"] = 1
+                kwargs["refresh_video_ids"] = await self.hot_video_ids(db, state.channel_id, now)
+            report = await self.youtube_service.sync_channel_stats(
+                credentials, state.user_id, db, service=service, **kwargs
+            )
+        if report is None:
+            raise LookupError(f"no channel found for user {state.user_id}")
+        return {"mode": mode, **report.to_dict()}
+
+    async def run_once(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """One scheduling round over every authorized channel."""
+        now = now or datetime.now(timezone.utc)
+        started = time.monotonic()
+        states = self.prioritize(await self.refresh_states(now), now)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        summary: Dict[str, Any] = {"synced": [], "failed": [], "deferred": [], "backing_off": []}
+
+        async def run(state: ChannelSyncState, mode: str, cost: int) -> None:
+            spent = 0
+            try:
+                async with semaphore:
+                    if self.budget.exhausted:
+                        summary["deferred"].append(state.user_id)
+                        return
+                    result = await self.sync_channel(state, mode, now)
+                spent = result["quota_units"]
+                error = result.get("error")
+                if error:
+                    if "quotaExceeded" in error or "dailyLimitExceeded" in error:
+                        self.budget.exhaust()
+                    raise RuntimeError(error)
+                state.failures = 0
+                state.next_attempt_at = 0.0
+                state.channel_id = result.get("channel_id") or state.channel_id
+                state.fetched_at = now
+                if mode == "full":
+                    state.last_full_sync = now
+                summary["synced"].append(result)
+            except Exception as e:
+                state.failures += 1
+                delay = min(self.backoff_max, self.backoff_base * 2 ** (state.failures - 1))
+                state.next_attempt_at = time.time() + delay
+                logger.error(f"YouTube sync failed for user {state.user_id}: {str(e)}")
+                summary["failed"].append({"user_id": state.user_id, "error": str(e), "retry_in": delay})
+            finally:
+                self.budget.settle(cost, spent)
+
+        tasks = []
+        for state in states:
+            if state.next_attempt_at > time.time():
+                summary["backing_off"].append(state.user_id)
+                continue
+            mode = self.choose_mode(state, now)
+            cost = self.estimate_cost(state, mode)
+            if not self.budget.reserve(cost):
+                # A full sync that does not fit may still fit as an incremental one
+                if mode != "full" or state.channel_id is None:
+                    summary["deferred"].append(state.user_id)
+                    continue
+                mode, cost = "incremental", self.estimate_cost(state, "incremental")
+                if not self.budget.reserve(cost):
+                    summary["deferred"].append(state.user_id)
+                    continue
+            tasks.append(run(state, mode, cost))
+        await asyncio.gather(*tasks)
+
+        summary["quota"] = self.budget.to_dict()
+        summary["elapsed"] = time.monotonic() - started
+        logger.info(
+            f"YouTube sync round: {len(summary['synced'])} synced, {len(summary['failed'])} failed, "
+            f"{len(summary['deferred'])} deferred, {summary['quota']['remaining']} quota units left"
+        )
+        return summary
+
+    async def run_forever(self, interval: float = 900.0) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"YouTube sync round failed: {str(e)}")
+            await asyncio.sleep(interval)
+
+    def start(self, interval: float = 900.0) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run_forever(interval))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,25 @@
+"""Run ``backend.main``'s lifespan in tests.
+
+``isolate_lifespan`` points the app at a test database engine, skips
+schema creation, seeding and the BizOp source sync, and gives it a fresh
+metrics sampler and performance analytics instance, so starting and
+stopping the app leaves the real database and the process-wide services
+alone.
+"""
+
+from backend import main
+from backend.analytics.performance_analytics import PerformanceAnalytics
+from backend.monitoring.system_sampler import SystemMetricsSampler
+
+
+def isolate_lifespan(monkeypatch, engine):
+    async def noop():
+        return None
+
+    monkeypatch.setattr(main.db, "init_db", noop)
+    monkeypatch.setattr(main, "seed_db", noop)
+    monkeypatch.setattr(main.db, "engine", engine)
+    monkeypatch.setattr(main, "system_sampler", SystemMetricsSampler())
+    monkeypatch.setattr(main, "performance_analytics", PerformanceAnalytics())
+    monkeypatch.setenv("BIZOP_AUTO_SYNC", "false")
+    return main
@@ -0,0 +1,101 @@
+"""Local SMTP sink for transport tests and benchmarks.
+
+``SmtpSink`` is a threaded, plain-text SMTP server that accepts every
+message (AUTH PLAIN with any credentials) and keeps it in ``messages``.
+``connect_delay`` is paid once per session, standing in for the TCP +
+STARTTLS + AUTH handshake of a real provider; ``message_delay`` is paid
+per DATA.  ``idle_timeout`` makes the server answer ``421`` and hang up
+on a quiet session, the way hosted SMTP services do.
+"""
+
+import socketserver
+import threading
+import time
+from email import message_from_bytes
+from typing import Any, List, Optional
+
+
+class SmtpSink:
+    def __init__(self, connect_delay: float = 0.0, message_delay: float = 0.0, idle_timeout: Optional[float] = None):
+        self.connect_delay = connect_delay
+        self.message_delay = message_delay
+        self.idle_timeout = idle_timeout
+        self.messages: List[Any] = []
+        self.sessions = 0
+        self.auths = 0
+        self.idle_drops = 0
+        self._lock = threading.Lock()
+        sink = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line: str) -> None:
+                self.wfile.write(f"{line}\r\n".encode())
+                self.wfile.flush()
+
+            def handle(self) -> None:
+                with sink._lock:
+                    sink.sessions += 1
+                time.sleep(sink.connect_delay)
+                if sink.idle_timeout:
+                    self.connection.settimeout(sink.idle_timeout)
+                self.reply("220 sink ESMTP ready")
+                while True:
+                    try:
+                        raw = self.rfile.readline()
+                    except OSError:
+                        with sink._lock:
+                            sink.idle_drops += 1
+                        try:
+                            self.reply("421 4.4.2 idle timeout")
+                        except OSError:
+                            pass
+                        return
+                    if not raw:
+                        return
+                    command = raw.decode().strip()
+                    verb = command.split(" ", 1)[0].upper()
+                    if verb in ("EHLO", "HELO"):
+                        self.wfile.write(b"250-sink\r\n250-AUTH PLAIN\r\n250 8BITMIME\r\n")
+                        self.wfile.flush()
+                    elif verb == "AUTH":
+                        with sink._lock:
+                            sink.auths += 1
+                        self.reply("235 2.7.0 authenticated")
+                    elif verb in ("MAIL", "RCPT", "RSET", "NOOP"):
+                        self.reply("250 OK")
+                    elif verb == "DATA":
+                        self.reply("354 end with .")
+                        lines = []
+                        while True:
+                            line = self.rfile.readline()
+                            if line in (b".\r\n", b".\n", b""):
+                                break
+                            lines.append(line[1:] if line.startswith(b"..") else line)
+                        time.sleep(sink.message_delay)
+                        with sink._lock:
+                            sink.messages.append(message_from_bytes(b"".join(lines)))
+                        self.reply("250 2.0.0 queued")
+                    elif verb == "QUIT":
+                        self.reply("221 bye")
+                        return
+                    else:
+                        self.reply("502 not implemented")
+
+        class Server(socketserver.ThreadingTCPServer):
+            daemon_threads = True
+            allow_reuse_address = True
+
+        self.server = Server(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def port(self) -> int:
+        return self.server.server_address[1]
+
+    def __enter__(self) -> "SmtpSink":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.shutdown()
+        self.server.server_close()
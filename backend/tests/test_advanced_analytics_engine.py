@@ -0,0 +1,98 @@
+import pytest
+
+pytest.importorskip("sklearn")
+
+from backend.ai_modules.advanced_analytics import (  # noqa: E402
+    ANALYSIS_SECTIONS,
+    AdvancedAnalyticsEngine,
+    shutdown_section_executors,
+)
+
+
+@pytest.fixture(autouse=True)
+def execution_log_dir(tmp_path, monkeypatch):
+    # The engine's log_execution writes under DATA_DIR
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    return tmp_path / "logs"
+
+
+CHANNEL = {
+    "videos": [
+        {
+            "title": f"Video {i}",
+            "views": 1000 + 250 * i,
+            "likes": 40 + i,
+            "comments": 5 + i % 4,
+            "engagement_rate": 0.02 + (i % 5) / 100,
+            "retention_rate": 0.3 + (i % 6) / 10,
+            "duration": 300 + 20 * i,
+            "category": ("tech", "music")[i % 2],
+            "ad_revenue": 1.5 * i,
+            "published_at": f"2024-{1 + i % 12:02d}-{1 + i % 27:02d}T{i % 24:02d}:00:00",
+        }
+        for i in range(24)
+    ]
+}
+
+
+def _sections(result):
+    return {key: result[key] for key, *_ in ANALYSIS_SECTIONS}
+
+
+@pytest.mark.asyncio
+async def test_thread_pool_mode_matches_sequential_and_reports_timings():
+    sequential = await AdvancedAnalyticsEngine().comprehensive_channel_analysis(CHANNEL)
+    pooled = await AdvancedAnalyticsEngine(execution_mode="thread", max_workers=3).comprehensive_channel_analysis(CHANNEL)
+    shutdown_section_executors()
+
+    assert pooled["execution_mode"] == "thread"
+    assert _sections(pooled) == _sections(sequential)
+    assert pooled["recommendations"] == sequential["recommendations"]
+    for key, *_ in ANALYSIS_SECTIONS:
+        assert pooled["section_timings"][key] >= 0
+    assert "recommendations" in pooled["section_timings"]
+
+
+def test_unknown_execution_mode_is_rejected():
+    with pytest.raises(ValueError):
+        AdvancedAnalyticsEngine(execution_mode="gpu")
+
+
+def test_incremental_clustering_updates_stored_model_with_new_videos_only(tmp_path):
+    from backend.ai_modules.incremental_clustering import ClusterModelStore
+
+    store = ClusterModelStore(directory=str(tmp_path))
+    engine = AdvancedAnalyticsEngine(clustering_mode="incremental", cluster_store=store)
+    videos = [dict(v, video_id=f"v{i}") for i, v in enumerate(CHANNEL["videos"])]
+
+    first = engine._cluster_content_performance(videos[:20], "chan-1")
+    second = engine._cluster_content_performance(videos, "chan-1")
+
+    assert first["incremental"]["model_created"] and first["incremental"]["new_videos"] == 20
+    assert second["incremental"] == {"model_created": False, "new_videos": 4, "model_updates": 2, "n_clusters": 5}
+    assert sum(c["video_count"] for c in second["clusters"].values()) == len(videos)
+
+    # A fresh store picks the model up from disk and assigns single videos
+    reloaded = AdvancedAnalyticsEngine(clustering_mode="incremental", cluster_store=ClusterModelStore(directory=str(tmp_path)))
+    assert reloaded.assign_video_cluster("chan-1", videos[0]) in second["clusters"]
+    assert reloaded.assign_video_cluster("unknown", videos[0]) is None
+
+
+@pytest.mark.asyncio
+async def test_app_shutdown_stops_the_section_pools(tmp_path, monkeypatch):
+    from sqlalchemy import create_engine
+
+    from backend.ai_modules import advanced_analytics
+    from backend.tests.app_lifespan import isolate_lifespan
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    main = isolate_lifespan(monkeypatch, engine)
+
+    async with main.lifespan(main.app):
+        executor = advanced_analytics._get_section_executor("thread", 2)
+        assert executor.submit(sum, [1, 2]).result() == 3
+
+    assert advanced_analytics._section_executors == {}
+    with pytest.raises(RuntimeError):
+        executor.submit(sum, [1, 2])
+    engine.dispose()
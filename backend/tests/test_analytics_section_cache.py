@@ -0,0 +1,55 @@
+import pytest
+
+from backend.ai_modules.analytics_section_cache import AnalyticsSection, ComprehensiveAnalyticsCache
+
+VIDEOS = [
+    {"id": 1, "title": "A", "views": 100, "revenue_total": 1.0},
+    {"id": 2, "title": "B", "views": 200, "revenue_total": 2.0},
+]
+
+
+def _sections(calls):
+    def counted(name, func):
+        def compute(videos, ctx):
+            calls[name] = calls.get(name, 0) + 1
+            return func(videos)
+        return compute
+
+    return [
+        AnalyticsSection("overview", counted("overview", len)),
+        AnalyticsSection(
+            "revenue_analysis",
+            counted("revenue_analysis", lambda v: sum(x["revenue_total"] for x in v)),
+            fields=("revenue_total",),
+        ),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_unchanged_version_is_served_without_loading_videos():
+    cache = ComprehensiveAnalyticsCache()
+    calls, loads = {}, []
+
+    def load():
+        loads.append(1)
+        return VIDEOS
+
+    first = await cache.get_report({"category": None}, (2, "t1"), _sections(calls), load)
+    second = await cache.get_report({"category": None}, (2, "t1"), _sections(calls), load)
+
+    assert first == second == {"overview": 2, "revenue_analysis": 3.0}
+    assert len(loads) == 1
+    assert cache.stats["result_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_only_sections_with_changed_inputs_are_recomputed():
+    cache = ComprehensiveAnalyticsCache()
+    calls = {}
+    await cache.get_report({}, (2, "t1"), _sections(calls), lambda: VIDEOS)
+
+    retitled = [dict(VIDEOS[0], title="A2"), VIDEOS[1]]
+    report = await cache.get_report({}, (2, "t2"), _sections(calls), lambda: retitled)
+
+    assert report["revenue_analysis"] == 3.0
+    assert calls == {"overview": 2, "revenue_analysis": 1}
@@ -0,0 +1,107 @@
+import asyncio
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.analytics.anomaly_detection import SeriesDetector, StreamingAnomalyDetector
+from backend.analytics.performance_analytics import PerformanceAnalytics
+
+
+def test_series_detector_tracks_running_stats_spikes_and_shifts():
+    rng = random.Random(3)
+    detector = SeriesDetector()
+    start = datetime(2026, 1, 1)
+    values = [100 + rng.gauss(0, 5) for _ in range(500)]
+    for i, value in enumerate(values):
+        assert detector.update(value, start + timedelta(seconds=i)) is None or i > 30
+
+    mean = sum(values) / len(values)
+    assert detector.mean == pytest.approx(mean)
+    assert detector.std_deviation == pytest.approx(5, rel=0.15)
+    assert detector.snapshot()["quantiles"]["p50"] == pytest.approx(100, abs=3)
+    assert detector.trend() == "stable"
+
+    spike = detector.update(200.0, start + timedelta(seconds=500))
+    assert spike["type"] == "spike" and spike["severity"] == "high"
+
+    # A sustained +1.5 sigma shift never crosses the point threshold, CUSUM catches it
+    shift = None
+    for i in range(50):
+        shift = shift or detector.update(107.5 + rng.gauss(0, 1), start + timedelta(seconds=501 + i))
+    assert shift["type"] == "level_shift" and shift["direction"] == "up"
+
+
+def test_seasonal_baseline_learns_a_daily_peak():
+    detector = SeriesDetector(warmup=10)
+    start = datetime(2026, 1, 1)
+    rng = random.Random(5)
+    flagged = 0
+    for day in range(40):
+        for hour in range(24):
+            value = (300 if hour == 12 else 100) + rng.gauss(0, 3)
+            if detector.update(value, start + timedelta(days=day, hours=hour)) and day >= 20:
+                flagged += 1
+    # Once the noon slot has a baseline, the daily peak is expected
+    assert flagged <= 2
+
+
+@pytest.mark.asyncio
+async def test_record_metric_pushes_anomalies_to_listeners(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'metrics.db'}")
+    analytics = PerformanceAnalytics()
+    received = []
+
+    async def alert(anomaly):
+        received.append(anomaly)
+
+    analytics.anomaly_detector.add_listener(alert)
+    rng = random.Random(1)
+    for _ in range(200):
+        await analytics.record_metric("response_time", rng.uniform(48, 52), "api")
+    await analytics.record_metric("response_time", 500.0, "api")
+    await asyncio.sleep(0)
+
+    assert [a["value"] for a in received] == [500.0]
+    assert received[0]["component"] == "api" and received[0]["metric_name"] == "response_time"
+    assert analytics.get_live_anomalies("api")[0]["value"] == 500.0
+    assert analytics.get_streaming_stats("api", "response_time")["count"] == 201
+    await analytics.shutdown()
+
+
+def test_listener_errors_do_not_break_ingest():
+    detector = StreamingAnomalyDetector(warmup=5)
+
+    def broken(anomaly):
+        raise RuntimeError("boom")
+
+    detector.add_listener(broken)
+    for value in [1.0, 1.1, 0.9, 1.0, 1.05, 0.95]:
+        detector.observe("c", "m", value)
+    assert detector.observe("c", "m", 100.0)["type"] == "spike"
+
+
+@pytest.mark.asyncio
+async def test_app_lifespan_routes_flagged_points_to_health_alerts(tmp_path, monkeypatch):
+    from sqlalchemy import create_engine
+
+    from backend.analytics.performance_analytics import performance_analytics
+    from backend.monitoring.health_monitor import health_monitor
+    from backend.tests.app_lifespan import isolate_lifespan
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    main = isolate_lifespan(monkeypatch, engine)
+    detector = performance_analytics.anomaly_detector
+
+    async with main.lifespan(main.app):
+        assert health_monitor.report_anomaly in detector.listeners
+        rng = random.Random(2)
+        for _ in range(100):
+            detector.observe("lifespan_test", "latency", rng.uniform(48, 52))
+        assert detector.observe("lifespan_test", "latency", 900.0)["type"] == "spike"
+        await asyncio.sleep(0.05)
+
+    alerts = [a for a in health_monitor.alerts if a.get("source") == "lifespan_test:latency"]
+    assert len(alerts) == 1 and alerts[0]["type"] == "performance_anomaly"
+    assert health_monitor.report_anomaly not in detector.listeners
+    engine.dispose()
@@ -0,0 +1,118 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("sklearn")
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from backend.ai_modules import batch_channel_analysis as batch_module  # noqa: E402
+from backend.ai_modules.batch_channel_analysis import analyze_channels, iter_ndjson  # noqa: E402
+from backend.api.routes.advanced_analytics import router  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def execution_log_dir(tmp_path, monkeypatch):
+    # The engine's log_execution writes under DATA_DIR; pool workers inherit
+    # it from the environment their forkserver starts with
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    return tmp_path / "logs"
+
+
+def _channel(channel_id, count=12):
+    return {
+        "channel_id": channel_id,
+        "videos": [
+            {
+                "title": f"{channel_id} {i}",
+                "views": 500 + 100 * i,
+                "engagement_rate": 0.03,
+                "published_at": f"2024-02-{1 + i:02d}T12:00:00",
+            }
+            for i in range(count)
+        ],
+    }
+
+
+async def _load(channel_id):
+    if channel_id == "missing":
+        raise LookupError("no synced videos for channel missing")
+    return _channel(channel_id)
+
+
+@pytest.mark.asyncio
+async def test_batch_isolates_failures_and_resolves_ids():
+    inputs = [_channel("a"), {}, "b", {"channel_id": "missing"}, _channel("c", count=3)]
+    records = [r async for r in analyze_channels(inputs, max_workers=2, max_in_flight=2, load_channel=_load)]
+
+    by_index = {r["index"]: r for r in records}
+    assert sorted(by_index) == [0, 1, 2, 3, 4]
+    assert by_index[0]["status"] == "success"
+    assert by_index[0]["data"]["channel_health"]["status"]
+    assert by_index[1]["status"] == "error" and "ValueError" in by_index[1]["error"]
+    assert by_index[2]["channel_id"] == "b" and by_index[2]["status"] == "success"
+    assert by_index[3]["status"] == "error" and "LookupError" in by_index[3]["error"]
+    assert by_index[4]["status"] == "success"
+    json.dumps(records)  # records are JSON-safe
+
+
+@pytest.mark.asyncio
+async def test_ndjson_parser_reports_bad_lines_individually():
+    async def chunks():
+        yield b'{"channel_id": "a", "vid'
+        yield b'eos": []}\nnot json\n"b"'
+
+    items = [item async for item in iter_ndjson(chunks())]
+
+    assert items[0] == {"channel_id": "a", "videos": []}
+    assert isinstance(items[1], ValueError)
+    assert items[2] == "b"
+
+
+def test_batch_endpoint_streams_ndjson():
+    app = FastAPI()
+    app.include_router(router, prefix="/api/analytics")
+    body = "\n".join(json.dumps(c) for c in (_channel("a"), {"videos": "broken"}))
+
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/analytics/advanced/batch?max_workers=64",
+            content=body,
+            headers={"content-type": "application/x-ndjson"},
+        )
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(r["status"] for r in records) == ["error", "success"]
+    # The caller cannot size the pool; it is the server-wide one
+    assert batch_module._shared_executor._max_workers == batch_module.BATCH_ANALYSIS_WORKERS
+    batch_module.shutdown_shared_pool()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_batches_share_one_bounded_pool(monkeypatch):
+    monkeypatch.setattr(batch_module, "BATCH_ANALYSIS_WORKERS", 2)
+    batch_module.shutdown_shared_pool()
+    pools = set()
+    real_get = batch_module.get_shared_pool
+
+    def tracking_get(broken=None):
+        pool = real_get(broken)
+        pools.add(id(pool))
+        return pool
+
+    monkeypatch.setattr(batch_module, "get_shared_pool", tracking_get)
+
+    async def run(prefix):
+        channels = [_channel(f"{prefix}{i}", count=4) for i in range(3)]
+        return [r async for r in analyze_channels(channels, max_workers=32, shared_pool=True)]
+
+    results = await asyncio.gather(*(run(p) for p in "abcd"))
+
+    assert all(r["status"] == "success" for batch in results for r in batch)
+    assert len(pools) == 1
+    pool = batch_module._shared_executor
+    assert pool._max_workers == 2 and len(pool._processes) <= 2
+    batch_module.shutdown_shared_pool()
@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI, HTTPException
+
+from backend.analytics.benchmark_engine import (
+    BenchmarkEngine,
+    BenchmarkTarget,
+    TrafficProfile,
+    default_targets,
+    run_recorded_benchmark,
+)
+from backend.analytics.performance_analytics import PerformanceAnalytics
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/widgets/fast")
+    async def fast():
+        return {"ok": True}
+
+    @app.get("/api/widgets/slow")
+    async def slow():
+        await asyncio.sleep(0.02)
+        return {"ok": True}
+
+    @app.get("/api/widgets/{widget_id}")
+    async def widget(widget_id: str):
+        return {"id": widget_id}
+
+    @app.get("/broken")
+    async def broken():
+        raise HTTPException(status_code=500, detail="boom")
+
+    return app
+
+
+@pytest.mark.asyncio
+async def test_load_profile_measures_latency_throughput_and_errors():
+    windows = []
+
+    async def on_window(window):
+        windows.append(window)
+
+    targets = [BenchmarkTarget("/api/widgets/fast"), BenchmarkTarget("/api/widgets/slow"), BenchmarkTarget("/broken")]
+    profile = TrafficProfile("load", duration=1.5, start_rate=200, end_rate=200, window=0.5)
+    summary = await BenchmarkEngine(_app(), targets, profile, on_window=on_window, sample_interval=0.1).run()
+
+    assert summary["requests"] == pytest.approx(300, abs=3)
+    assert summary["status_counts"]["500"] == pytest.approx(summary["requests"] / 3, abs=1)
+    assert summary["error_rate"] == pytest.approx(100 / 3, abs=1)
+    # A third of the requests sleep 20ms, so the upper percentiles see them
+    assert summary["latency_ms"]["p99"] >= 20 > summary["latency_ms"]["p50"]
+    assert summary["throughput_rps"] == pytest.approx(200, rel=0.2)
+    assert summary["rss_mb"]["peak"] > 0
+    assert len(windows) == 3 and sum(w["requests"] for w in windows) == summary["requests"]
+
+
+@pytest.mark.asyncio
+async def test_stress_profile_ramps_the_rate():
+    windows = []
+
+    async def on_window(window):
+        windows.append(window)
+
+    profile = TrafficProfile("stress", duration=1.0, start_rate=20, end_rate=300, window=0.5)
+    await BenchmarkEngine(_app(), [BenchmarkTarget("/api/widgets/fast")], profile, on_window=on_window).run()
+    assert windows[-1]["throughput"] > 2 * windows[0]["throughput"]
+
+
+def test_default_targets_pick_the_components_static_get_routes():
+    paths = [target.path for target in default_targets(_app(), "widgets")]
+    assert paths == ["/api/widgets/fast", "/api/widgets/slow"]
+    assert [target.path for target in default_targets(_app(), "missing")] == ["/health"]
+
+
+@pytest.mark.asyncio
+async def test_recorded_benchmark_is_stored_under_its_id(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'metrics.db'}")
+    analytics = PerformanceAnalytics()
+    profile = TrafficProfile("load", duration=0.6, start_rate=100, end_rate=100, window=0.3)
+
+    summary = await run_recorded_benchmark(analytics, _app(), "bench_1", "widgets", profile)
+    exported = await analytics.export_performance_data(component="widgets", hours=1)
+
+    rows = [row for row in exported["data"] if row["tags"]["benchmark_id"] == "bench_1"]
+    stored = {row["metric_name"]: row["value"] for row in rows if row["tags"].get("phase") == "summary"}
+    assert stored["requests"] == summary["requests"] == pytest.approx(60, abs=2)
+    assert stored["latency_p99_ms"] == summary["latency_ms"]["p99"] > 0
+    assert len([row for row in rows if row["metric_name"] == "throughput"]) == 2
+    assert [row["tags"]["status"] for row in rows if row["metric_name"] == "benchmark_status"] == ["started", "completed"]
+    await analytics.shutdown()
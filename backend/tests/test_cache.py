@@ -0,0 +1,187 @@
+import asyncio
+import fnmatch
+import time
+
+import pytest
+
+from backend.utils.cache import (
+    CacheManager,
+    LRUCacheEngine,
+    RedisCacheBackend,
+    SQLiteCacheBackend,
+)
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_keeps_recently_used_keys():
+    cache = CacheManager(max_size=3)
+    for key in ("a", "b", "c"):
+        await cache.set(key, key.upper())
+
+    # Touch "a" so "b" becomes the least recently used entry.
+    assert await cache.get("a") == "A"
+    await cache.set("d", "D")
+
+    assert await cache.get("b") is None
+    assert await cache.get("a") == "A"
+    stats = await cache.get_stats()
+    assert stats["size"] == 3
+    assert stats["stats"]["evictions"] == 1
+
+
+def test_expired_entries_are_purged_from_heap():
+    engine = LRUCacheEngine(max_size=10)
+    engine.set("short", 1, ttl=0.01)
+    engine.set("long", 2, ttl=60)
+    engine.set("short", 3, ttl=0.01)  # stale heap item must be ignored
+
+    assert engine.purge_expired(now=time.time() + 1) == 1
+    assert "short" not in engine
+    assert engine.get("long") == (True, 2)
+
+
+def test_byte_budget_evicts_until_under_limit():
+    engine = LRUCacheEngine(max_size=100, max_bytes=1000)
+    for i in range(10):
+        engine.set(f"k{i}", "x", ttl=60, size=200)
+
+    assert engine.total_bytes <= 1000
+    assert len(engine) == 5
+    assert "k9" in engine and "k0" not in engine
+
+
+@pytest.mark.asyncio
+async def test_namespace_stats_are_tracked_per_prefix():
+    cache = CacheManager()
+    await cache.set("analytics:overview", {"views": 1})
+    await cache.set("youtube:channel", {"subs": 2})
+    await cache.get("analytics:overview")
+    await cache.get("analytics:missing")
+
+    namespaces = (await cache.get_stats())["namespaces"]
+    assert namespaces["analytics"]["hits"] == 1
+    assert namespaces["analytics"]["misses"] == 1
+    assert namespaces["analytics"]["entries"] == 1
+    assert namespaces["youtube"]["sets"] == 1
+
+
+class _RespStandIn:
+    """Minimal Redis-protocol server used as a local stand-in for L2 tests."""
+
+    def __init__(self):
+        self.data = {}
+        self.server = None
+
+    async def start(self) -> int:
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _read_command(self, reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        count = int(line[1:].strip())
+        args = []
+        for _ in range(count):
+            length = int((await reader.readline())[1:].strip())
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return args
+
+    @staticmethod
+    def _bulk(value):
+        if value is None:
+            return b"$-1\r\n"
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+
+    async def _handle(self, reader, writer):
+        while True:
+            args = await self._read_command(reader)
+            if args is None:
+                break
+            command = args[0].upper()
+            if command == b"GET":
+                value, expires_at = self.data.get(args[1], (None, None))
+                if expires_at is not None and expires_at <= time.time():
+                    self.data.pop(args[1], None)
+                    value = None
+                writer.write(self._bulk(value))
+            elif command == b"SET":
+                expires_at = None
+                if len(args) >= 5 and args[3].upper() == b"PX":
+                    expires_at = time.time() + int(args[4]) / 1000
+                self.data[args[1]] = (args[2], expires_at)
+                writer.write(b"+OK\r\n")
+            elif command == b"DEL":
+                removed = sum(1 for key in args[1:] if self.data.pop(key, None) is not None)
+                writer.write(b":%d\r\n" % removed)
+            elif command == b"SCAN":
+                pattern = args[args.index(b"MATCH") + 1].decode() if b"MATCH" in args else "*"
+                keys = [k for k in self.data if fnmatch.fnmatch(k.decode(), pattern)]
+                writer.write(b"*2\r\n" + self._bulk(b"0") + b"*%d\r\n" % len(keys))
+                for key in keys:
+                    writer.write(self._bulk(key))
+            else:
+                writer.write(b"+OK\r\n")
+            await writer.drain()
+        writer.close()
+
+
+@pytest.mark.asyncio
+async def test_tiered_cache_shares_values_through_sqlite_l2(tmp_path):
+    path = tmp_path / "l2.sqlite3"
+    worker_a = CacheManager(l2=SQLiteCacheBackend(path))
+    worker_b = CacheManager(l2=SQLiteCacheBackend(path))
+
+    await worker_a.set("analytics:overview", {"views": 42}, expire=60)
+    assert await worker_b.get("analytics:overview") == {"views": 42}
+    assert worker_b.stats["l2_hits"] == 1
+
+    await worker_b.delete("analytics:overview")
+    worker_a.engine.delete("analytics:overview")  # drop worker A's L1 copy
+    assert await worker_a.get("analytics:overview") is None
+
+    await worker_a.cleanup()
+    await worker_b.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_tiered_cache_against_redis_protocol_stand_in():
+    server = _RespStandIn()
+    port = await server.start()
+    try:
+        backend = RedisCacheBackend(f"redis://127.0.0.1:{port}/0", prefix="test:")
+        cache = CacheManager(l2=backend)
+        await cache.set("youtube:channel", {"subs": 7}, expire=60)
+        assert b"test:youtube:channel" in server.data
+
+        other = CacheManager(l2=RedisCacheBackend(f"redis://127.0.0.1:{port}/0", prefix="test:"))
+        assert await other.get("youtube:channel") == {"subs": 7}
+
+        await cache.clear()
+        assert not server.data
+        await cache.cleanup()
+        await other.cleanup()
+    finally:
+        await server.stop()
+
+
+@pytest.mark.asyncio
+async def test_get_or_set_coalesces_concurrent_misses():
+    cache = CacheManager()
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"score": 1}
+
+    results = await asyncio.gather(*[cache.get_or_set("analytics:slow", compute) for _ in range(10)])
+
+    assert calls == 1
+    assert all(result == {"score": 1} for result in results)
+    assert cache.stats["coalesced"] == 9
@@ -0,0 +1,142 @@
+import json
+import multiprocessing
+import threading
+import time
+
+from backend.services import delivery_service as delivery_module
+from backend.services.delivery_queue import DeliveryQueue
+from backend.services.delivery_service import DeliveryResult
+
+
+def _drain_in_process(db_path, out_path):
+    queue = DeliveryQueue(db_path)
+    claimed = []
+    while True:
+        items = queue.lease(limit=3)
+        if not items:
+            break
+        for item in items:
+            if queue.ack(item):
+                claimed.append(item.payload["n"])
+    queue.close()
+    out_path.write_text(json.dumps(claimed))
+
+
+def test_lease_visibility_timeout_backoff_and_dead_letter(tmp_path):
+    queue = DeliveryQueue(tmp_path / "queue.sqlite", max_attempts=3, retry_base=0.05)
+    first = queue.enqueue({"order_id": "A"})
+    queue.enqueue({"order_id": "B"})
+
+    leased = queue.lease(limit=1, visibility_timeout=0.1)
+    assert [item.id for item in leased] == [first] and leased[0].attempts == 1
+    assert [item.order_id for item in queue.lease(limit=5, visibility_timeout=0.1)] == ["B"]
+    assert queue.lease(limit=5) == []
+    assert queue.stats()["in_flight"] == 2
+
+    # The first worker stalls past its lease; the item is handed out again
+    time.sleep(0.12)
+    stale = leased[0]
+    again = queue.lease(limit=1, visibility_timeout=5)[0]
+    assert again.id == first and again.attempts == 2
+    assert not queue.ack(stale) and queue.fail(stale, "late") == "lost"
+
+    # Failure reschedules with backoff, then dead-letters at max_attempts
+    assert queue.fail(again, "smtp down") == "ready"
+    assert queue.stats()["scheduled"] >= 1
+    time.sleep(0.25)
+    third = [item for item in queue.lease(limit=5) if item.id == first][0]
+    assert third.attempts == 3
+    assert queue.fail(third, "smtp down") == "dead"
+    assert [d["order_id"] for d in queue.dead_letters()] == ["A"]
+    assert queue.dead_letters()[0]["last_error"] == "smtp down"
+
+    assert queue.requeue_dead() == 1
+    revived = [item for item in queue.lease(limit=5) if item.id == first][0]
+    assert revived.attempts == 1 and queue.ack(revived)
+    assert queue.stats()["dead"] == 0
+    queue.close()
+
+
+def test_legacy_jsonl_import_and_parallel_leases_across_processes(tmp_path):
+    legacy = tmp_path / "delivery_queue.jsonl"
+    legacy.write_text("".join(json.dumps({"order_id": f"L{i}", "n": i, "attempts": 1}) + "\n" for i in range(4)) + "junk\n")
+    queue = DeliveryQueue(tmp_path / "queue.sqlite", legacy_jsonl=legacy)
+    for i in range(4, 200):
+        queue.enqueue({"order_id": f"O{i}", "n": i})
+    assert not legacy.exists() and (tmp_path / "delivery_queue.jsonl.migrated").exists()
+    assert queue.stats()["ready"] == 200
+
+    ctx = multiprocessing.get_context("spawn")
+    outputs = [tmp_path / f"claimed-{w}.json" for w in range(4)]
+    workers = [ctx.Process(target=_drain_in_process, args=(tmp_path / "queue.sqlite", out)) for out in outputs]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(60)
+        assert worker.exitcode == 0
+
+    claimed = [n for out in outputs for n in json.loads(out.read_text())]
+    assert sorted(claimed) == list(range(200))  # every item exactly once
+    assert queue.stats()["pending"] == 0
+    queue.close()
+
+
+async def test_worker_pool_drains_without_losing_concurrent_enqueues(tmp_path, monkeypatch):
+    monkeypatch.setattr(delivery_module, "DELIVERY_QUEUE_DB", tmp_path / "queue.sqlite")
+    monkeypatch.setattr(delivery_module, "DELIVERY_QUEUE_FILE", tmp_path / "delivery_queue.jsonl")
+    monkeypatch.setattr(delivery_module, "ORDER_LOG_FILE", tmp_path / "orders.jsonl")
+    service = delivery_module.DeliveryService()
+
+    lock = threading.Lock()
+    state = {"active": 0, "max_active": 0, "delivered": []}
+
+    def deliver(data, base_url, allow_queue=True):
+        assert not allow_queue
+        with lock:
+            state["active"] += 1
+            state["max_active"] = max(state["max_active"], state["active"])
+        try:
+            time.sleep(0.02)  # blocking SMTP
+            if data["order_id"].endswith("7"):
+                return DeliveryResult(status="queued", message="Email queued", order_id=data["order_id"])
+            with lock:
+                state["delivered"].append(data["order_id"])
+            return DeliveryResult(status="delivered", message="Email sent", order_id=data["order_id"])
+        finally:
+            with lock:
+                state["active"] -= 1
+
+    monkeypatch.setattr(service, "deliver_digital", deliver)
+
+    for i in range(100):
+        service._queue_delivery({"status": "queued", "order_id": f"A{i:03d}", "raw": {"order_id": f"A{i:03d}"}})
+    service._queue_delivery({"status": "queued", "order_id": "no-payload"})
+
+    def producer():
+        for i in range(50):
+            service._queue_delivery({"status": "queued", "order_id": f"B{i:03d}", "raw": {"order_id": f"B{i:03d}"}})
+            time.sleep(0.002)
+
+    thread = threading.Thread(target=producer)
+    started = time.perf_counter()
+    thread.start()
+    result = await service.drain_queued_deliveries(base_url="https://example.com", max_items=1000, workers=10)
+    thread.join()
+    elapsed = time.perf_counter() - started
+
+    # 151 x 20ms serially is ~3s; ten workers overlap the blocking sends
+    assert state["max_active"] > 5 and elapsed < 2.0
+    failing = {f"A{i:03d}" for i in range(100) if i % 10 == 7} | {f"B{i:03d}" for i in range(50) if i % 10 == 7}
+    queue = service.delivery_queue
+    stats = queue.stats()
+    assert result["dead_lettered"] == 1 and stats["dead"] == 1
+    # Nothing lost: every item is either delivered, rescheduled, or dead-lettered
+    assert len(state["delivered"]) + stats["pending"] + stats["dead"] == 151
+    assert len(state["delivered"]) == result["delivered"]
+    assert stats["pending"] >= len({o for o in failing if o.startswith("A")})
+    assert set(state["delivered"]).isdisjoint(failing)
+    # Anything the producer added after the workers went idle is still queued, not dropped
+    late = await service.drain_queued_deliveries(base_url="https://example.com", max_items=1000, workers=10)
+    assert len(state["delivered"]) == 150 - len(failing)
+    assert late["remaining"] == len(failing)
+    queue.close()
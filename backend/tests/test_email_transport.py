@@ -0,0 +1,108 @@
+import time
+
+import pytest
+
+from backend.services import delivery_service as delivery_module
+from backend.services import email_transport as transport_module
+from backend.services.email_transport import (
+    SmtpConnectionPool, SmtpSettings, close_email_transport, get_email_transport,
+)
+from backend.tests.smtp_sink import SmtpSink
+
+
+def _pool(sink, **kwargs):
+    settings = SmtpSettings("127.0.0.1", sink.port, "bot@example.com", "secret", "bot@example.com", starttls=False)
+    return SmtpConnectionPool(settings, **kwargs)
+
+
+async def test_burst_reuses_authenticated_sessions():
+    with SmtpSink(connect_delay=0.05, message_delay=0.005) as sink:
+        pool = _pool(sink, size=4, max_per_second=0)
+        messages = [pool.build_message(f"buyer{i}@example.com", f"Order {i}", "Your download") for i in range(200)]
+        started = time.perf_counter()
+        results = await pool.send_batch_async(messages)
+        elapsed = time.perf_counter() - started
+        pool.close()
+
+    assert not [r for r in results if isinstance(r, Exception)]
+    assert len(sink.messages) == 200
+    assert sorted(m["Subject"] for m in sink.messages) == sorted(f"Order {i}" for i in range(200))
+    # Four handshakes for the whole burst instead of two hundred
+    assert sink.sessions == 4 and sink.auths == 4
+    stats = pool.get_stats()
+    assert stats["sent"] == 200 and stats["connections_opened"] == 4
+    assert stats["latency_ms"]["samples"] == 200 and stats["latency_ms"]["p50"] >= 5
+    assert stats["emails_per_second"] > 100 and elapsed < 1.5
+
+
+async def test_rate_limit_spreads_a_burst():
+    with SmtpSink() as sink:
+        pool = _pool(sink, size=4, max_per_second=40)
+        messages = [pool.build_message("buyer@example.com", f"Order {i}", "Body") for i in range(80)]
+        started = time.perf_counter()
+        await pool.send_batch_async(messages)
+        elapsed = time.perf_counter() - started
+        pool.close()
+
+    # 40 go out on the initial bucket, the next 40 at 40/s
+    assert len(sink.messages) == 80
+    assert elapsed >= 0.9
+    assert pool.get_stats()["rate_wait_seconds"] > 0
+
+
+def test_reconnects_after_server_idle_drop_and_expires_idle_sessions():
+    with SmtpSink(idle_timeout=0.2) as sink:
+        pool = _pool(sink, size=1, idle_timeout=30, max_per_second=0)
+        pool.send(pool.build_message("a@example.com", "one", "Body"))
+        time.sleep(0.4)  # server hangs up with 421
+        pool.send(pool.build_message("a@example.com", "two", "Body"))
+        assert pool.get_stats()["reconnects"] == 1 and sink.idle_drops == 1
+
+        pool.idle_timeout = 0.05
+        time.sleep(0.1)  # stale by our own clock: replaced before use
+        pool.send(pool.build_message("a@example.com", "three", "Body"))
+        stats = pool.get_stats()
+        pool.close()
+
+    assert [m["Subject"] for m in sink.messages] == ["one", "two", "three"]
+    assert stats["idle_expired"] == 1 and stats["failed"] == 0
+    assert stats["connections_opened"] == 3
+
+
+async def test_queue_flush_sends_through_the_shared_pool(tmp_path, monkeypatch):
+    monkeypatch.setattr(delivery_module, "DELIVERY_QUEUE_DB", tmp_path / "queue.sqlite")
+    monkeypatch.setattr(delivery_module, "DELIVERY_QUEUE_FILE", tmp_path / "delivery_queue.jsonl")
+    monkeypatch.setattr(delivery_module, "ORDER_LOG_FILE", tmp_path / "orders.jsonl")
+    monkeypatch.setattr(transport_module, "MAX_PER_SECOND", 0)
+    with SmtpSink(connect_delay=0.05, message_delay=0.01) as sink:
+        for key, value in {
+            "EMAIL_ENABLED": "true", "SMTP_HOST": "127.0.0.1", "SMTP_PORT": str(sink.port),
+            "SMTP_USERNAME": "bot@example.com", "SMTP_PASSWORD": "secret", "SMTP_STARTTLS": "false",
+        }.items():
+            monkeypatch.setenv(key, value)
+        close_email_transport()
+        service = delivery_module.DeliveryService()
+        monkeypatch.setattr(service, "_resolve_delivery_file", lambda sku: {"file": "downloads/guide.pdf", "label": "Guide"})
+        for i in range(40):
+            service._queue_delivery({
+                "status": "queued", "order_id": f"Q{i:02d}",
+                "raw": {"order_id": f"Q{i:02d}", "buyer_email": f"buyer{i}@example.com", "sku": "GUIDE"},
+            })
+
+        result = await service.drain_queued_deliveries(base_url="https://shop.example.com", max_items=100, workers=8)
+        stats = get_email_transport().get_stats()
+        close_email_transport()
+        service.delivery_queue.close()
+
+    assert result["delivered"] == 40 and result["remaining"] == 0
+    assert len(sink.messages) == 40
+    assert "https://shop.example.com/downloads/guide.pdf" in sink.messages[0].get_payload()
+    assert sink.sessions <= stats["connections_opened"] <= 4
+    assert service._order_already_processed("Q00")
+
+
+def test_incomplete_settings_still_raise(monkeypatch):
+    for key in ("SMTP_HOST", "NOTIFICATIONS_SMTP_SERVER", "SMTP_USERNAME", "NOTIFICATIONS_SMTP_USERNAME"):
+        monkeypatch.delenv(key, raising=False)
+    with pytest.raises(RuntimeError):
+        SmtpSettings.from_env()
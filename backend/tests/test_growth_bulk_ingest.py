@@ -0,0 +1,126 @@
+import json
+
+import pytest
+from sqlalchemy import create_engine, event, func
+from sqlalchemy.orm import sessionmaker
+
+from modules.growth_engine_v1.analytics import AnalyticsService
+from modules.growth_engine_v1.ingest import IngestionService
+from modules.growth_engine_v1.models import (
+    GrowthDailyRevenue, GrowthLedgerEntry, GrowthOrder, GrowthPayout,
+)
+from modules.growth_engine_v1.rollup import ensure_daily_revenue
+
+TABLES = [GrowthPayout.__table__, GrowthLedgerEntry.__table__, GrowthOrder.__table__]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'growth.db'}", connect_args={"check_same_thread": False})
+    GrowthPayout.metadata.create_all(bind=engine, tables=TABLES)
+    ensure_daily_revenue(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _order(i, status="paid", price="2.50"):
+    return {"id": f"ord-{i}", "status": status, "total_price": price, "email": f"buyer{i}@example.com"}
+
+
+def test_bulk_ingest_dedups_with_set_queries_and_reports_per_record(engine, db):
+    service = IngestionService(db)
+    service.ingest_order(_order(0), {"origin_name": "shopify"})
+
+    records = [_order(i) for i in range(1000)]
+    records.append(_order(5))                                   # repeated inside the batch
+    records.append({"status": "paid"})                          # no id
+    records.append({"id": "bad", "total_price": "n/a"})         # unparsable price
+    records.append({"data": _order(2000, status="pending"), "provenance": {"origin_name": "etsy"}})
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    summary = service.ingest_orders_bulk(records, {"origin_name": "replay"}, chunk_size=250)
+
+    assert summary["processed"] == len(records)
+    assert (summary["ingested"], summary["skipped"], summary["errors"]) == (1000, 2, 2)
+    statuses = [r["status"] for r in summary["results"]]
+    assert statuses[0] == "skipped" and statuses[1:1000] == ["ingested"] * 999
+    assert statuses[1000:] == ["skipped", "error", "error", "ingested"]
+    assert [r["index"] for r in summary["results"]] == list(range(len(records)))
+    assert all(r["id"] for r in summary["results"] if r["status"] == "ingested")
+    # Five chunks x (order lookup, ledger lookup, order insert, ledger insert, rollup upsert), one commit
+    assert len(statements) <= 5 * 5 + 2
+
+    assert db.query(GrowthOrder).count() == 1001
+    assert db.query(GrowthOrder).filter_by(external_id="ord-2000").one().source == "etsy"
+    assert db.query(GrowthLedgerEntry).count() == 1000
+    assert db.query(func.sum(GrowthDailyRevenue.entry_count)).scalar() == 1000
+    assert AnalyticsService(db).get_dnr() == pytest.approx(2500.0)
+
+
+def test_bulk_ingest_is_one_transaction(db):
+    def records():
+        for i in range(10):
+            yield _order(i)
+        raise RuntimeError("upstream export broke")
+
+    with pytest.raises(RuntimeError):
+        IngestionService(db).ingest_orders_bulk(records(), chunk_size=3)
+    assert db.query(GrowthOrder).count() == 0
+    assert db.query(GrowthDailyRevenue).count() == 0
+
+
+async def test_ndjson_stream_with_split_lines_and_bad_json(db):
+    lines = [json.dumps(_order(i)) for i in range(7)]
+    lines.insert(3, "{not json")
+    body = ("\n".join(lines) + "\n\n").encode()
+
+    async def stream():
+        # Byte chunks that cut through lines
+        for start in range(0, len(body), 37):
+            yield body[start:start + 37]
+
+    summary = await IngestionService(db).ingest_ndjson("orders", stream(), {"origin_name": "ndjson"}, chunk_size=3)
+    assert summary["processed"] == 8
+    assert (summary["ingested"], summary["errors"]) == (7, 1)
+    assert summary["results"][3]["status"] == "error" and "invalid JSON" in summary["results"][3]["reason"]
+    assert [r["index"] for r in summary["results"]] == list(range(8))
+    assert db.query(GrowthLedgerEntry).count() == 7
+
+    ignored = await IngestionService(db).ingest_ndjson("refunds", stream())
+    assert ignored["ignored"] == 8 and ignored["ingested"] == 0
+
+
+async def test_stalled_upload_does_not_hold_the_write_lock(engine, db, tmp_path):
+    import asyncio
+
+    resume = asyncio.Event()
+
+    async def slow_upload():
+        for i in range(3):
+            yield (json.dumps(_order(i)) + "\n").encode()
+        await resume.wait()  # client stalls mid-upload
+        yield (json.dumps(_order(3)) + "\n").encode()
+
+    upload = asyncio.create_task(IngestionService(db).ingest_ndjson("orders", slow_upload(), chunk_size=2))
+    await asyncio.sleep(0.05)
+
+    # A webhook arriving meanwhile writes straight through instead of waiting on the upload
+    webhook_engine = create_engine(f"sqlite:///{tmp_path / 'growth.db'}", connect_args={"timeout": 0.2})
+    webhook_db = sessionmaker(bind=webhook_engine)()
+    result = IngestionService(webhook_db).ingest_order(_order(99), {"origin_name": "webhook"})
+    assert result["status"] == "ingested"
+    webhook_db.close()
+    webhook_engine.dispose()
+
+    resume.set()
+    summary = await upload
+    assert summary["ingested"] == 4
+    assert db.query(GrowthOrder).count() == 5
@@ -0,0 +1,176 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, func, inspect
+from sqlalchemy.orm import sessionmaker
+
+from modules.growth_engine_v1.analytics import AnalyticsService
+from modules.growth_engine_v1.automation import AnomalyService
+from modules.growth_engine_v1.ingest import IngestionService
+from modules.growth_engine_v1.models import (
+    GrowthDailyRevenue, GrowthLedgerEntry, GrowthOrder, GrowthPayout,
+)
+from modules.growth_engine_v1.monetization import MonetizationService
+from modules.growth_engine_v1.rollup import DailyRevenueRollup, ensure_daily_revenue
+
+TABLES = [GrowthPayout.__table__, GrowthLedgerEntry.__table__, GrowthOrder.__table__]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'growth.db'}")
+    GrowthPayout.metadata.create_all(bind=engine, tables=TABLES)
+    ensure_daily_revenue(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _ledger_by_day(db, status="CLEARED"):
+    rows = db.query(func.date(GrowthLedgerEntry.created_at), func.sum(GrowthLedgerEntry.amount_cents))\
+        .filter(GrowthLedgerEntry.status == status)\
+        .group_by(func.date(GrowthLedgerEntry.created_at)).all()
+    return {day: cents for day, cents in rows}
+
+
+def test_writers_maintain_rollup_and_dashboards_read_it(db):
+    ingest = IngestionService(db)
+    ingest.ingest_order({"id": 1, "status": "paid", "total_price": "19.50"}, {"origin_name": "shopier"})
+    ingest.ingest_order({"id": 2, "status": "paid", "total_price": "5.50"}, {"origin_name": "shopier"})
+    ingest.ingest_order({"id": 3, "status": "pending", "total_price": "99"}, {"origin_name": "shopier"})
+    assert ingest.ingest_order({"id": 1, "status": "paid", "total_price": "19.50"}, {})["status"] == "skipped"
+    MonetizationService(db).ingest_payout("amazon_affiliate", {"amount": 10, "ref_id": "aff-1"}, {})
+
+    today = datetime.utcnow().date()
+    buckets = {(r.stream, r.status): (r.amount_cents, r.entry_count) for r in db.query(GrowthDailyRevenue)}
+    assert buckets == {("POD", "CLEARED"): (2500, 2), ("AFFILIATE", "CLEARED"): (1000, 1)}
+    assert {str(day): cents for day, cents in _ledger_by_day(db).items()} == {str(today): 3500}
+
+    analytics = AnalyticsService(db)
+    assert analytics.get_dnr() == pytest.approx(35.0)
+    assert analytics.get_slope() == pytest.approx(5.0)
+    series = analytics.get_chart_series()
+    assert [point["net"] for point in series["dnr"]] == [0.0] * 6 + [35.0]
+    assert {s["stream"]: s["net"] for s in series["streams"]} == {"POD": 25.0, "AFFILIATE": 10.0}
+
+    anomalies = AnomalyService(db)
+    assert anomalies.get_dnr_for_date(today) == pytest.approx(35.0)
+    assert anomalies.check_anomalies() == []
+
+
+def test_rollup_rolls_back_with_the_ledger(db):
+    entry = GrowthLedgerEntry(transaction_id="t-1", stream="POD", amount_cents=100, status="CLEARED")
+    db.add(entry)
+    DailyRevenueRollup(db).record([entry])
+    db.rollback()
+    assert db.query(GrowthDailyRevenue).count() == 0
+
+
+def test_migration_backfills_existing_ledger(engine, db):
+    now = datetime.utcnow()
+    for i in range(30):
+        db.add(GrowthLedgerEntry(
+            transaction_id=f"legacy-{i}",
+            stream=["POD", "CONTENT", None][i % 3],
+            amount_cents=100 + i,
+            status="CLEARED" if i % 4 else "PENDING",
+            created_at=now - timedelta(days=i % 9, hours=i),
+        ))
+    db.commit()
+
+    result = ensure_daily_revenue(engine)
+    assert result["ledger_entries"] == 30 and result["buckets_backfilled"] > 0
+    assert ensure_daily_revenue(engine)["buckets_backfilled"] == 0  # idempotent
+
+    rollup = DailyRevenueRollup(db)
+    expected = _ledger_by_day(db)
+    start = min(datetime.strptime(day, "%Y-%m-%d").date() for day in expected)
+    totals = rollup.daily_totals_cents(start, now.date())
+    assert {str(day): cents for day, cents in totals.items()} == expected
+    total_entries = sum(r.entry_count for r in db.query(GrowthDailyRevenue))
+    assert total_entries == 30
+    assert "UNKNOWN" in {r.stream for r in db.query(GrowthDailyRevenue)}
+
+    indexes = {index["name"] for index in inspect(engine).get_indexes("growth_ledger_entries")}
+    assert "ix_growth_ledger_status_created_at" in indexes
+
+
+def test_dashboard_queries_do_not_scan_the_ledger(db):
+    rollup = DailyRevenueRollup(db)
+    query = rollup._query(func.sum(GrowthDailyRevenue.amount_cents))\
+        .filter(GrowthDailyRevenue.day == datetime.utcnow().date())
+    compiled = query.statement.compile(compile_kwargs={"literal_binds": True})
+    plan = " ".join(str(row[-1]) for row in db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}"))
+    assert "growth_ledger_entries" not in plan
+    assert "USING" in plan and "INDEX" in plan
+
+
+def test_global_revenue_sync_updates_the_rollup(engine, db, tmp_path, monkeypatch):
+    import sqlite3
+
+    from scripts.global_revenue_sync import sync
+
+    # A ledger written before the rollup existed is repaired on the way in
+    db.add(GrowthLedgerEntry(transaction_id="early", stream="POD", amount_cents=500, status="CLEARED",
+                             created_at=datetime.utcnow()))
+    db.commit()
+
+    youtube_db = tmp_path / "youtube_ai.db"
+    conn = sqlite3.connect(str(youtube_db))
+    conn.execute(
+        "CREATE TABLE revenue_events (id INTEGER PRIMARY KEY, amount REAL, currency TEXT, source TEXT, "
+        "kind TEXT, metadata_json TEXT, occurred_at TEXT)"
+    )
+    now = datetime.utcnow().isoformat(sep=" ")
+    conn.executemany(
+        "INSERT INTO revenue_events (amount, currency, source, kind, metadata_json, occurred_at) VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            (12.25, "USD", "shopier", "sale", '{"order_id": "S-1"}', now),
+            (7.75, "USD", "partner", "amazon_affiliate", None, now),
+            (99.0, "USD", "demo", "simulated", None, now),
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{youtube_db}")
+    monkeypatch.setenv("GROWTH_DATABASE_URL", f"sqlite:///{tmp_path / 'growth.db'}")
+    sync()
+    sync()  # already-synced events are skipped, buckets unchanged
+
+    db.expire_all()
+    assert AnalyticsService(db).get_dnr() == pytest.approx(25.0)
+    buckets = {r.stream: (r.amount_cents, r.entry_count) for r in db.query(GrowthDailyRevenue)}
+    assert buckets == {"POD": (1725, 2), "AFFILIATE": (775, 1)}
+    assert AnomalyService(db).get_dnr_for_date(datetime.utcnow().date()) == pytest.approx(25.0)
+
+
+async def test_backend_startup_backfills_the_rollup(tmp_path, monkeypatch):
+    from backend.tests.app_lifespan import isolate_lifespan
+
+    # A backend database whose ledger predates the rollup: create_all made
+    # an empty growth_daily_revenue and the new ledger index is missing
+    engine = create_engine(f"sqlite:///{tmp_path / 'backend.db'}")
+    GrowthPayout.metadata.create_all(bind=engine, tables=TABLES + [GrowthDailyRevenue.__table__])
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP INDEX ix_growth_ledger_status_created_at")
+    session = sessionmaker(bind=engine)()
+    session.add(GrowthLedgerEntry(transaction_id="old-1", stream="POD", amount_cents=4200, status="CLEARED",
+                                  created_at=datetime.utcnow()))
+    session.commit()
+
+    main = isolate_lifespan(monkeypatch, engine)
+    async with main.lifespan(main.app):
+        pass
+
+    assert AnalyticsService(session).get_dnr() == pytest.approx(42.0)
+    indexes = {index["name"] for index in inspect(engine).get_indexes("growth_ledger_entries")}
+    assert "ix_growth_ledger_status_created_at" in indexes
+    session.close()
+    engine.dispose()
@@ -0,0 +1,172 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from backend.services.http_client import HttpClientPool, ShopifyThrottle, parse_retry_after
+from backend.services.shopier_api_service import ShopierApiService
+
+
+class FakeUpstream:
+    """Keep-alive HTTP/1.1 server; ``respond(handler, body)`` returns (status, headers, payload)."""
+
+    def __init__(self, respond, latency=0.0):
+        self.respond = respond
+        self.latency = latency
+        self.hits = 0
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _handle(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+                with fake._lock:
+                    fake.hits += 1
+                    fake.active += 1
+                    fake.max_active = max(fake.max_active, fake.active)
+                try:
+                    time.sleep(fake.latency)
+                    status, headers, payload = fake.respond(self, body)
+                finally:
+                    with fake._lock:
+                        fake.active -= 1
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = _handle
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+async def test_keepalive_reuse_and_per_host_limit():
+    with FakeUpstream(lambda handler, body: (200, {}, {"ok": True}), latency=0.02) as fake:
+        pool = HttpClientPool()
+        pool.configure_host(fake.url, max_concurrency=4)
+        responses = await asyncio.gather(*(pool.request("GET", f"{fake.url}/item/{i}") for i in range(60)))
+        await pool.aclose()
+
+    assert all(r.json() == {"ok": True} for r in responses)
+    assert fake.max_active <= 4
+    stats = pool.get_stats()[HttpClientPool.host_key(fake.url)]
+    assert stats["calls"] == stats["attempts"] == 60
+    assert stats["max_in_flight"] <= 4
+    # 60 calls over at most 4 sockets
+    assert stats["connections_opened"] <= 4 and stats["reuse_ratio"] >= 0.9
+    assert stats["latency_ms"]["samples"] == 60 and stats["latency_ms"]["p50"] >= 20
+
+
+async def test_retry_after_honoured_and_unsafe_post_not_retried():
+    seen = []
+
+    def respond(handler, body):
+        seen.append(handler.path)
+        if handler.path == "/limited" and seen.count("/limited") == 1:
+            return 429, {"Retry-After": "0.3"}, {"error": "slow down"}
+        if handler.path == "/broken":
+            return 503, {}, {"error": "down"}
+        return 200, {}, {"ok": True}
+
+    with FakeUpstream(respond) as fake:
+        pool = HttpClientPool()
+        started = time.perf_counter()
+        response = await pool.request("GET", f"{fake.url}/limited", backoff_base=0.01)
+        assert response.status_code == 200 and time.perf_counter() - started >= 0.3
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await pool.request("POST", f"{fake.url}/broken", json={"create": 1}, backoff_base=0.01)
+        assert seen.count("/broken") == 1
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await pool.request("GET", f"{fake.url}/broken", attempts=3, backoff_base=0.01)
+        assert seen.count("/broken") == 4
+        await pool.aclose()
+
+    stats = pool.get_stats()[HttpClientPool.host_key(fake.url)]
+    assert (stats["calls"], stats["retries"], stats["errors"]) == (3, 3, 2)
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+
+
+async def test_shopify_graphql_throttle_waits_for_bucket_restore():
+    pytest.importorskip("loguru")
+    from backend.services.shopify_service import ShopifyService
+
+    calls = []
+
+    def respond(handler, body):
+        calls.append(time.perf_counter())
+        cost = {"requestedQueryCost": 10, "throttleStatus": {
+            "maximumAvailable": 100.0, "currentlyAvailable": 90 if len(calls) > 1 else 0, "restoreRate": 50.0,
+        }}
+        if len(calls) == 1:
+            return 200, {}, {"errors": [{"message": "Throttled", "extensions": {"code": "THROTTLED"}}],
+                             "extensions": {"cost": cost}}
+        node = {"id": "gid://shopify/Product/1", "title": "Guide", "handle": "guide", "variants": {"edges": []}}
+        return 200, {}, {"data": {"products": {"edges": [{"node": node}]}}, "extensions": {"cost": cost}}
+
+    with FakeUpstream(respond) as fake:
+        service = ShopifyService()
+        service.admin_endpoint = f"{fake.url}/admin/api/graphql.json"
+        service.admin_token = "token"
+        product = await service.find_product_by_sku("SKU-1")
+
+    assert product["id"] == "gid://shopify/Product/1"
+    # Empty bucket, cost 10, restore 50/s: the retry waits ~0.2s instead of failing
+    assert len(calls) == 2 and calls[1] - calls[0] >= 0.18
+    assert service.admin_throttle.expected_cost == 10
+
+    throttle = ShopifyThrottle()
+    throttle.available, throttle.maximum, throttle.restore_rate = 15.0, 100.0, 50.0
+    throttle.expected_cost, throttle.observed_at = 10.0, time.monotonic()
+    assert throttle.reserve() == 0.0
+    assert 0.08 <= throttle.reserve() <= 0.11
+
+
+def test_shopier_sync_calls_share_one_connection(monkeypatch):
+    def respond(handler, body):
+        assert handler.headers["Authorization"] == "Bearer pat"
+        return 200, {}, {"data": [{"id": "1"}]}
+
+    with FakeUpstream(respond) as fake:
+        monkeypatch.setenv("SHOPIER_API_BASE_URL", f"{fake.url}/v1")
+        monkeypatch.setenv("SHOPIER_PERSONAL_ACCESS_TOKEN", "pat")
+        pool = HttpClientPool()
+        monkeypatch.setattr("backend.services.shopier_api_service.http_pool", pool)
+        service = ShopierApiService()
+        for _ in range(5):
+            assert service.get_orders(status="paid") == [{"id": "1"}]
+        pool.close()
+
+    stats = pool.get_stats()[HttpClientPool.host_key(fake.url)]
+    assert stats["calls"] == 5 and stats["connections_opened"] == 1
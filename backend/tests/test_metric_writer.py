@@ -0,0 +1,77 @@
+import sqlite3
+
+import pytest
+
+from backend.analytics.metric_writer import MetricWriter
+from backend.analytics.performance_analytics import PerformanceAnalytics, create_performance_tables
+
+
+def _writer(db_path, **kwargs) -> MetricWriter:
+    return MetricWriter(
+        connect=lambda: sqlite3.connect(db_path),
+        insert_sql="INSERT INTO performance_metrics (timestamp, metric_name, value, component, tags) VALUES (?, ?, ?, ?, ?)",
+        prepare=create_performance_tables,
+        **kwargs,
+    )
+
+
+def _count(db_path) -> int:
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM performance_metrics").fetchone()[0]
+
+
+@pytest.mark.asyncio
+async def test_record_metric_is_written_behind_in_batches(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "metrics.db")
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{db_path}")
+    analytics = PerformanceAnalytics()
+    analytics.metric_writer.batch_size = 500
+
+    for i in range(2000):
+        await analytics.record_metric("response_time", float(i), "api", {"route": "/x"})
+    # Reads see everything recorded before them
+    history = await analytics.get_metrics_history("api", "response_time", hours=1)
+    assert len(history) == 2000
+
+    stats = analytics.get_writer_stats()
+    assert stats["written"] == 2000 and stats["pending"] == 0
+    assert stats["batches"] <= 2000 // 100
+    await analytics.shutdown()
+
+
+def test_full_buffer_drops_are_counted_and_close_drains(tmp_path):
+    db_path = str(tmp_path / "metrics.db")
+    writer = _writer(db_path, capacity=100, batch_size=1000, flush_interval=60)
+    row = ("2026-01-01T00:00:00", "m", 1.0, "c", "{}")
+
+    # The writer waits for a full batch or the interval, so the buffer fills up
+    accepted = [writer.submit(row) for _ in range(150)]
+    assert accepted.count(True) == 100
+    assert writer.stats["dropped_full"] == 50
+
+    writer.close()
+    assert _count(db_path) == 100
+    assert writer.submit(row) is False
+    assert writer.stats["dropped_closed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_app_shutdown_writes_buffered_metrics(tmp_path, monkeypatch):
+    from sqlalchemy import create_engine
+
+    from backend.tests.app_lifespan import isolate_lifespan
+
+    db_path = str(tmp_path / "metrics.db")
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{db_path}")
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    main = isolate_lifespan(monkeypatch, engine)
+    # Only a full batch or the interval would write before shutdown
+    main.performance_analytics.metric_writer.flush_interval = 60
+
+    async with main.lifespan(main.app):
+        for i in range(250):
+            await main.performance_analytics.record_metric("response_time", float(i), "api")
+
+    assert _count(db_path) == 250
+    assert main.performance_analytics.get_writer_stats()["pending"] == 0
+    engine.dispose()
@@ -0,0 +1,94 @@
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from backend.core.middleware import (
+    CombinedMiddleware,
+    RateLimitMiddleware,
+    RequestLoggingMiddleware,
+    SecurityHeadersMiddleware,
+)
+
+
+def build_app(combined: bool, **rate_limit) -> FastAPI:
+    app = FastAPI()
+    rate_limit = dict(calls=3, period=60, **rate_limit)
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.get("/api/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.get("/api/stream")
+    async def stream():
+        async def chunks():
+            for i in range(3):
+                await asyncio.sleep(0)
+                yield f"chunk-{i}\n"
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    if combined:
+        app.add_middleware(CombinedMiddleware, rate_limit=rate_limit)
+    else:
+        app.add_middleware(SecurityHeadersMiddleware)
+        app.add_middleware(RateLimitMiddleware, **rate_limit)
+        app.add_middleware(RequestLoggingMiddleware)
+    return app
+
+
+def test_stacked_and_combined_middleware_behave_alike():
+    for combined in (False, True):
+        client = TestClient(build_app(combined))
+
+        response = client.get("/api/ping")
+        assert response.status_code == 200
+        assert response.headers["X-Content-Type-Options"] == "nosniff"
+        assert response.headers["X-RateLimit-Remaining"] == "2"
+        assert float(response.headers["X-Process-Time"]) >= 0
+
+        streamed = client.get("/api/stream")
+        assert streamed.text == "chunk-0\nchunk-1\nchunk-2\n"
+        assert streamed.headers["X-Frame-Options"] == "DENY"
+
+        assert client.get("/api/ping").status_code == 200
+        limited = client.get("/api/ping")
+        assert limited.status_code == 429
+        assert "Retry-After" in limited.headers
+        assert "X-Process-Time" in limited.headers
+
+
+def test_rate_limit_headers_report_the_quota():
+    for combined in (False, True):
+        client = TestClient(build_app(combined))
+
+        headers = [client.get("/api/ping").headers for _ in range(3)]
+        assert [h["X-RateLimit-Limit"] for h in headers] == ["3"] * 3
+        assert [h["X-RateLimit-Remaining"] for h in headers] == ["2", "1", "0"]
+        assert all(0 < int(h["X-RateLimit-Reset"]) <= 60 for h in headers)
+
+        limited = client.get("/api/ping")
+        assert limited.status_code == 429
+        assert limited.headers["X-RateLimit-Remaining"] == "0"
+        # The previous window still weighs in, so the wait can exceed one period
+        assert 0 < int(limited.headers["Retry-After"]) <= 120
+
+
+def test_health_is_exempt_from_rate_limiting_by_default():
+    for combined in (False, True):
+        client = TestClient(build_app(combined))
+
+        for _ in range(5):
+            response = client.get("/health")
+            assert response.status_code == 200
+            assert "X-RateLimit-Limit" not in response.headers
+        # Exempt requests do not use up the quota
+        assert client.get("/api/ping").headers["X-RateLimit-Remaining"] == "2"
+
+        # Without exemptions /health is limited like any other path
+        client = TestClient(build_app(combined, exempt_paths=()))
+        assert [client.get("/health").status_code for _ in range(4)] == [200, 200, 200, 429]
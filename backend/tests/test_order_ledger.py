@@ -0,0 +1,67 @@
+import json
+import multiprocessing
+
+from backend.services import delivery_service as delivery_module
+from backend.services.order_ledger import OrderLedger
+
+
+def _append_orders(log_path, worker, count):
+    ledger = OrderLedger(log_path)
+    for i in range(count):
+        ledger.append({"order_id": f"w{worker}-{i}", "status": "delivered" if i % 2 else "queued"})
+    ledger.close()
+
+
+def test_index_rebuilds_from_existing_log_and_tracks_outside_appends(tmp_path):
+    log_path = tmp_path / "shopier_orders.jsonl"
+    lines = [
+        {"order_id": "A1", "status": "queued"},
+        {"order_id": "A1", "status": "delivered"},
+        {"order_id": "B2", "status": "missing_delivery"},
+    ]
+    log_path.write_text("".join(json.dumps(line) + "\n" for line in lines) + "not json\n")
+
+    ledger = OrderLedger(log_path)
+    assert ledger.is_delivered("A1")
+    assert not ledger.is_delivered("B2")
+    assert ledger.status("B2") == "missing_delivery"
+
+    # Appended by something that bypasses the ledger, plus a torn last line
+    with log_path.open("a") as handle:
+        handle.write(json.dumps({"order_id": "B2", "status": "delivered"}) + "\n")
+        handle.write('{"order_id": "C3", "sta')
+    assert ledger.is_delivered("B2")
+    assert ledger.status("C3") is None
+
+    # A fresh ledger on an existing index trusts it; rebuild re-reads everything
+    ledger.close()
+    reopened = OrderLedger(log_path)
+    assert reopened.is_delivered("A1")
+    assert reopened.rebuild() == 4
+    reopened.close()
+
+
+def test_concurrent_appends_from_several_processes(tmp_path):
+    log_path = tmp_path / "shopier_orders.jsonl"
+    ctx = multiprocessing.get_context("spawn")
+    workers = [ctx.Process(target=_append_orders, args=(log_path, w, 40)) for w in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(60)
+        assert worker.exitcode == 0
+
+    entries = [json.loads(line) for line in log_path.read_text().splitlines()]
+    assert len(entries) == 160
+    ledger = OrderLedger(log_path)
+    assert ledger.sync() == 0  # every append was indexed under the lock
+    assert all(ledger.is_delivered(f"w{w}-{i}") == bool(i % 2) for w in range(4) for i in range(40))
+    ledger.close()
+
+
+def test_delivery_service_uses_ledger(tmp_path, monkeypatch):
+    monkeypatch.setattr(delivery_module, "ORDER_LOG_FILE", tmp_path / "orders.jsonl")
+    service = delivery_module.DeliveryService()
+    assert not service._order_already_processed("X9")
+    service._log_order({"order_id": "X9", "status": "delivered"})
+    assert service._order_already_processed("X9")
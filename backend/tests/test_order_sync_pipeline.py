@@ -0,0 +1,238 @@
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from backend.services.delivery_service import DeliveryResult
+from backend.services.order_sync_service import OrderSyncService
+from backend.services.processed_order_store import ProcessedOrderStore
+from backend.services.shopier_api_service import ShopierApiService
+
+TOKEN = "test-token"
+
+
+class FakeShopier:
+    """Local Shopier /v1/orders: paging, dateStart filter, latency and one transient 503."""
+
+    def __init__(self, orders, latency=0.01):
+        self.orders = orders
+        self.latency = latency
+        self.requests = []
+        self.failed_once = set()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+                fake.requests.append(params)
+                time.sleep(fake.latency)
+                if self.headers.get("Authorization") != f"Bearer {TOKEN}" or parsed.path != "/v1/orders":
+                    self.send_response(401 if parsed.path == "/v1/orders" else 404)
+                    self.end_headers()
+                    return
+                page, limit = int(params.get("page", 1)), int(params.get("limit", 50))
+                if page == 3 and page not in fake.failed_once:
+                    fake.failed_once.add(page)
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                rows = fake.orders
+                if "dateStart" in params:
+                    since = datetime.fromisoformat(params["dateStart"])
+                    rows = [o for o in rows if datetime.fromisoformat(o["createdAt"][:-1]) >= since]
+                if "status" in params:
+                    rows = [o for o in rows if o["status"] == params["status"]]
+                rows = sorted(rows, key=lambda o: o["createdAt"])[(page - 1) * limit:page * limit]
+                body = json.dumps({"data": rows}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class FakeDelivery:
+    """Stands in for SMTP delivery: blocking, slow, and can fail chosen orders once."""
+
+    def __init__(self, delay=0.01, fail_once=()):
+        self.delay = delay
+        self.fail_once = set(fail_once)
+        self.delivered = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def deliver_digital(self, data, base_url, allow_queue=True):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            if data["order_id"] in self.fail_once:
+                self.fail_once.discard(data["order_id"])
+                raise RuntimeError("SMTP unavailable")
+            with self._lock:
+                self.delivered.append(data["order_id"])
+            return DeliveryResult(status="delivered", message="Email sent", order_id=data["order_id"], amount=data["amount"])
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+class FakeFulfillment:
+    def __init__(self):
+        self.sales = []
+
+    def record_sale(self, amount, source, metadata=None):
+        self.sales.append((amount, metadata["order_id"]))
+
+
+def _month_of_orders(now, per_day=20):
+    orders = []
+    for day in range(30):
+        for i in range(per_day):
+            created = now - timedelta(days=30 - day, minutes=i * 7)
+            orders.append({
+                "id": f"{day:02d}-{i:03d}",
+                "status": "paid",
+                "totalPrice": "12.5",
+                "currency": "TRY",
+                "buyerEmail": f"buyer{day}-{i}@example.com",
+                "createdAt": created.isoformat() + "Z",
+            })
+    return orders
+
+
+@pytest.fixture
+def make_service(tmp_path, monkeypatch):
+    # Nothing the service reaches may write into the working tree
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    monkeypatch.setattr("backend.services.order_sync_service.DATA_DIR", tmp_path)
+    monkeypatch.setattr("backend.services.order_sync_service.SYNC_STATE_FILE", tmp_path / "state.json")
+    monkeypatch.setattr("backend.services.order_sync_service.PROCESSED_ORDERS_FILE", tmp_path / "processed.json")
+    monkeypatch.setattr("backend.services.order_sync_service.PROCESSED_ORDERS_DB", tmp_path / "processed.sqlite")
+
+    def build(fake, delivery, fulfillment):
+        monkeypatch.setenv("SHOPIER_API_BASE_URL", fake.base_url)
+        monkeypatch.setenv("SHOPIER_PERSONAL_ACCESS_TOKEN", TOKEN)
+        api = ShopierApiService()
+        api.retry_delay = 0.01
+        store = ProcessedOrderStore(tmp_path / "processed.sqlite")
+        return OrderSyncService(api, store, delivery, fulfillment, workers=16, fetch_concurrency=4)
+
+    return build
+
+
+async def test_backfill_month_then_incremental_from_cursor(make_service):
+    now = datetime.utcnow().replace(microsecond=0)
+    orders = _month_of_orders(now)
+    delivery, fulfillment = FakeDelivery(), FakeFulfillment()
+    with FakeShopier(orders) as fake:
+        service = make_service(fake, delivery, fulfillment)
+
+        started = time.perf_counter()
+        result = await service.sync_orders(limit=10000, since=(now - timedelta(days=31)).isoformat())
+        elapsed = time.perf_counter() - started
+
+        assert result.errors == 0
+        assert result.total_fetched == result.fulfilled == len(orders) == 600
+        assert result.pages_fetched == 12
+        assert sorted(delivery.delivered) == sorted(o["id"] for o in orders)
+        assert len(fulfillment.sales) == 600 and result.revenue_recorded == pytest.approx(7500.0)
+        # 600 x 10ms deliveries serially would take 6s; the pool overlaps them
+        assert delivery.max_active > 4
+        assert elapsed < 3.0
+        newest = max(o["createdAt"] for o in orders)
+        assert result.cursor == datetime.fromisoformat(newest[:-1]).isoformat()
+        assert service.store.count() == 600
+
+        # Next run starts from the cursor (minus the overlap) and re-fetches only the tail
+        fake.requests.clear()
+        again = await service.sync_orders(limit=10000)
+        assert "dateStart" in fake.requests[0]
+        assert 0 < again.total_fetched < 20
+        assert again.already_processed == again.total_fetched and again.fulfilled == 0
+        assert len(delivery.delivered) == 600
+
+
+async def test_failed_order_pins_cursor_and_is_retried(make_service):
+    now = datetime.utcnow().replace(microsecond=0)
+    orders = _month_of_orders(now, per_day=5)
+    failing = orders[40]["id"]
+    delivery, fulfillment = FakeDelivery(fail_once=[failing]), FakeFulfillment()
+    with FakeShopier(orders) as fake:
+        service = make_service(fake, delivery, fulfillment)
+
+        first = await service.sync_orders(limit=1000, since=(now - timedelta(days=31)).isoformat())
+        assert first.errors == 1 and first.fulfilled == 149
+        assert first.cursor == datetime.fromisoformat(orders[40]["createdAt"][:-1]).isoformat()
+        assert not service.store.contains(failing)
+
+        second = await service.sync_orders(limit=1000)
+        assert second.errors == 0 and second.fulfilled == 1
+        assert service.store.contains(failing)
+        assert second.cursor == datetime.fromisoformat(max(o["createdAt"] for o in orders)[:-1]).isoformat()
+
+
+async def test_first_run_without_cursor_starts_from_recent_orders(make_service, monkeypatch):
+    monkeypatch.setattr("backend.services.order_sync_service.INITIAL_LOOKBACK_SECONDS", 2 * 24 * 3600)
+    now = datetime.utcnow().replace(microsecond=0)
+    orders = _month_of_orders(now)
+    recent = [o for o in orders if datetime.fromisoformat(o["createdAt"][:-1]) > now - timedelta(days=2)]
+    delivery, fulfillment = FakeDelivery(delay=0), FakeFulfillment()
+    with FakeShopier(orders) as fake:
+        service = make_service(fake, delivery, fulfillment)
+
+        # Scheduled-sync sized run on a fresh store: the last two days, not the oldest 100 orders
+        result = await service.sync_orders(limit=100)
+        assert "dateStart" in fake.requests[0]
+        assert 0 < len(recent) < 100
+        assert sorted(delivery.delivered) == sorted(o["id"] for o in recent)
+        assert result.cursor == datetime.fromisoformat(max(o["createdAt"] for o in orders)[:-1]).isoformat()
+
+        # Cursor lost but orders stored (e.g. state reset): resume from the newest stored order
+        service.store.set_meta("cursor", "")
+        fake.requests.clear()
+        again = await service.sync_orders(limit=100)
+        start = datetime.fromisoformat(fake.requests[0]["dateStart"])
+        assert start == datetime.fromisoformat(result.cursor) - timedelta(hours=1)
+        assert again.fulfilled == 0
+
+
+def test_store_imports_legacy_json_and_ages_out(tmp_path):
+    legacy = tmp_path / "processed_orders.json"
+    legacy.write_text(json.dumps({"order_ids": ["a", "b", "c"], "last_updated": "2020-01-01T00:00:00"}))
+    store = ProcessedOrderStore(tmp_path / "processed.sqlite", legacy_json=legacy)
+
+    assert store.contains_many(["a", "c", "x"]) == {"a", "c"}
+    assert not legacy.exists() and (tmp_path / "processed_orders.json.migrated").exists()
+    store.mark("d", "delivered", amount=5.0, currency="TRY")
+    assert store.count() == 4
+    assert store.prune(older_than_days=30) == 3
+    assert store.contains_many(["a", "b", "c", "d"]) == {"d"}
+    store.set_meta("cursor", "2026-01-01T00:00:00")
+    assert store.get_meta("cursor") == "2026-01-01T00:00:00"
+    store.close()
@@ -0,0 +1,79 @@
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.analytics.performance_analytics import PerformanceAnalytics, create_performance_tables
+from backend.analytics.rollups import TIERS_BY_NAME, QuantileSketch, choose_tier, cleanup_rollups
+
+
+def test_sketch_quantiles_are_within_relative_accuracy():
+    rng = random.Random(7)
+    values = [rng.lognormvariate(3, 1) for _ in range(20000)]
+    left, right = QuantileSketch(), QuantileSketch()
+    for i, value in enumerate(values):
+        (left if i % 2 else right).add(value)
+    # Merging two halves gives the same answer as one sketch over everything
+    left.merge(QuantileSketch.from_json(right.to_json()))
+
+    ordered = sorted(values)
+    for q in (0.5, 0.95):
+        exact = ordered[int(q * (len(ordered) - 1))]
+        assert abs(left.quantile(q) - exact) / exact <= 0.011
+
+
+def test_choose_tier_picks_coarsest_tier_with_enough_points():
+    assert choose_tier(1, raw_retention_days=30) is None
+    assert choose_tier(24, raw_retention_days=30).name == "1m"
+    assert choose_tier(24 * 30, raw_retention_days=30).name == "1h"
+    assert choose_tier(24 * 365, raw_retention_days=30).name == "1d"
+
+
+@pytest.mark.asyncio
+async def test_rollups_serve_history_and_analysis(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "metrics.db")
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{db_path}")
+    analytics = PerformanceAnalytics()
+
+    values = [float(i % 100) for i in range(3000)]
+    for value in values:
+        await analytics.record_metric("response_time", value, "api")
+
+    raw = await analytics.analyze_performance("api", "response_time", hours=1, resolution="raw")
+    rolled = await analytics.analyze_performance("api", "response_time", hours=1, resolution="1m")
+    assert rolled.average == pytest.approx(raw.average)
+    assert rolled.std_deviation == pytest.approx(raw.std_deviation)
+    assert (rolled.min_value, rolled.max_value) == (0.0, 99.0)
+    assert rolled.median == pytest.approx(raw.median, rel=0.02)
+
+    history = await analytics.get_metrics_history("api", "response_time", hours=1, resolution="1m")
+    assert 1 <= len(history) <= 2
+    assert sum(int(point.tags["count"]) for point in history) == 3000
+
+    summary = await analytics.get_component_performance_summary("api", hours=24)
+    assert summary["metrics_analyzed"] == 1
+    await analytics.shutdown()
+
+
+def test_cleanup_applies_each_tier_retention(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "metrics.db"))
+    create_performance_tables(conn)
+    old = (datetime.now() - timedelta(days=30)).isoformat()
+    conn.execute(
+        "INSERT INTO performance_metrics (timestamp, metric_name, value, component, tags) VALUES (?, ?, ?, ?, ?)",
+        (old, "cpu", 1.0, "system", "{}"),
+    )
+    conn.commit()
+    conn.close()
+
+    # A fresh process backfills the rollups from the raw history
+    conn = sqlite3.connect(str(tmp_path / "metrics.db"))
+    create_performance_tables(conn)
+    deleted = cleanup_rollups(conn, time.time())
+    assert deleted == {"1m": 1, "1h": 0, "1d": 0}
+    tiers = {row[0] for row in conn.execute("SELECT tier FROM performance_rollups")}
+    assert tiers == {"1h", "1d"}
+    assert TIERS_BY_NAME["1m"].retention_days < 30 < TIERS_BY_NAME["1h"].retention_days
+    conn.close()
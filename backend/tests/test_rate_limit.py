@@ -0,0 +1,80 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.core.middleware import RateLimitMiddleware
+from backend.core.rate_limit import InMemoryRateLimitBackend, RateLimiter, RateLimitRule
+
+
+@pytest.mark.asyncio
+async def test_sliding_window_blocks_then_decays():
+    limiter = RateLimiter(default=RateLimitRule(3, 10))
+    t0 = 1000.0  # start of a window
+
+    results = [await limiter.check("/api", "1.1.1.1", now=t0 + i) for i in range(4)]
+    assert [r.allowed for r in results] == [True, True, True, False]
+    assert results[2].remaining == 0
+    # The full window must roll over, then a third of the next one pass
+    assert results[3].retry_after == pytest.approx(7 + 10 / 3)
+
+    # Halfway through the next window the previous count weighs 1.5
+    assert (await limiter.check("/api", "1.1.1.1", now=t0 + 15)).allowed
+    assert (await limiter.check("/api", "1.1.1.1", now=t0 + 15.1)).allowed is False
+    # Other clients are unaffected
+    assert (await limiter.check("/api", "2.2.2.2", now=t0 + 3)).allowed
+
+
+def test_idle_clients_are_swept_lazily():
+    backend = InMemoryRateLimitBackend(sweep_batch=8)
+    rule = RateLimitRule(5, 1)
+    for i in range(100):
+        backend.hit_sync([(f"all:ip:{i}", rule)], now=50.0)
+    assert len(backend) == 100
+
+    for i in range(20):
+        backend.hit_sync([("all:ip:active", rule)], now=60.0 + i * 0.01)
+    assert len(backend) == 1
+    assert backend.stats["swept"] == 100
+
+
+def test_max_entries_caps_memory():
+    backend = InMemoryRateLimitBackend(max_entries=10)
+    for i in range(50):
+        backend.hit_sync([(f"all:ip:{i}", RateLimitRule(5, 60))], now=1.0)
+    assert len(backend) == 10
+    assert backend.stats["evicted"] == 40
+
+
+def test_middleware_applies_route_and_api_key_quotas():
+    app = FastAPI()
+
+    @app.get("/api/search")
+    async def search():
+        return {"ok": True}
+
+    @app.get("/api/other")
+    async def other():
+        return {"ok": True}
+
+    app.add_middleware(
+        RateLimitMiddleware,
+        calls=5,
+        period=60,
+        route_limits={"/api/search": (2, 60)},
+        api_key_limits={"partner-key": (20, 60)},
+    )
+    client = TestClient(app)
+
+    assert [client.get("/api/search").status_code for _ in range(3)] == [200, 200, 429]
+    limited = client.get("/api/search")
+    assert "Retry-After" in limited.headers
+    # The default quota still has budget for other routes
+    response = client.get("/api/other")
+    assert response.status_code == 200
+    assert response.headers["X-RateLimit-Limit"] == "5"
+
+    # A known API key gets its own counters and quota; unknown keys count by IP
+    headers = {"X-API-Key": "partner-key"}
+    assert [client.get("/api/other", headers=headers).status_code for _ in range(6)] == [200] * 6
+    unknown_keys = [client.get("/api/other", headers={"X-API-Key": f"made-up-{i}"}).status_code for i in range(3)]
+    assert unknown_keys == [200, 200, 429]
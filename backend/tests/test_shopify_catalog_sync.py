@@ -0,0 +1,170 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("loguru")
+
+from backend.services.shopify_service import ShopifyService  # noqa: E402
+
+
+class FakeShopifyAdmin:
+    """Admin GraphQL stand-in: paginated ``products`` and aliased ``productSet`` mutations."""
+
+    def __init__(self, latency=0.02):
+        self.latency = latency
+        self.products = {}
+        self.queries = 0
+        self.mutations = 0
+        self.active_mutations = 0
+        self.max_active_mutations = 0
+        self._lock = threading.Lock()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                assert self.headers["X-Shopify-Access-Token"] == "token"
+                errors = []
+                if body["query"].lstrip().startswith("mutation"):
+                    data, errors = fake.product_set(body["variables"])
+                else:
+                    data = fake.list_products(body["variables"])
+                payload = json.dumps({"data": data, **({"errors": errors} if errors else {})}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def list_products(self, variables):
+        with self._lock:
+            self.queries += 1
+            ids = sorted(self.products)
+        start = int(variables["after"]) if variables.get("after") else 0
+        page = ids[start:start + variables["first"]]
+        edges = [{"node": {
+            "id": pid,
+            "metafield": {"value": self.products[pid]["hash"]},
+            "variants": {"edges": [{"node": {"id": f"{pid}/v", "sku": self.products[pid]["sku"]}}]},
+        }} for pid in page]
+        end = start + len(page)
+        return {"products": {"edges": edges, "pageInfo": {"hasNextPage": end < len(ids), "endCursor": str(end)}}}
+
+    def product_set(self, variables):
+        with self._lock:
+            self.mutations += 1
+            self.active_mutations += 1
+            self.max_active_mutations = max(self.max_active_mutations, self.active_mutations)
+        time.sleep(self.latency)
+        data, errors = {}, []
+        with self._lock:
+            for alias, product in variables.items():
+                if product["title"] == "break me":
+                    # Field-level GraphQL error: the alias resolves to null, siblings still run
+                    data[alias] = None
+                    errors.append({"message": "Internal error", "path": [alias]})
+                    continue
+                if product["title"] == "reject me":
+                    data[alias] = {"product": None, "userErrors": [{"field": ["title"], "message": "invalid"}]}
+                    continue
+                pid = product.get("id") or f"gid://shopify/Product/{len(self.products) + 1:04d}"
+                self.products[pid] = {
+                    "sku": product["variants"][0]["inventoryItem"]["sku"],
+                    "hash": product["metafields"][0]["value"],
+                    "title": product["title"],
+                    "files": product.get("files"),
+                }
+                data[alias] = {"product": {"id": pid, "title": product["title"], "onlineStoreUrl": None}, "userErrors": []}
+            self.active_mutations -= 1
+        return data, errors
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _catalog(count):
+    return [{
+        "title": f"Product {i}",
+        "description": "Digital download",
+        "price": 9.99,
+        "sku": f"SKU-{i:03d}",
+        "status": "ACTIVE",
+        "images": [f"https://cdn.example.com/{i}.png"],
+        "tags": ["digital"],
+    } for i in range(count)]
+
+
+async def test_bulk_sync_creates_then_sends_only_changed_products():
+    with FakeShopifyAdmin() as fake:
+        service = ShopifyService()
+        service.admin_endpoint = f"http://127.0.0.1:{fake.server.server_address[1]}/admin/api/graphql.json"
+        service.admin_token = "token"
+        catalog = _catalog(120)
+
+        first = await service.sync_catalog(catalog, batch_size=10, concurrency=3)
+        assert (first["created"], first["updated"], first["skipped_unchanged"], first["errors"]) == (120, 0, 0, 0)
+        assert fake.mutations == 12 and fake.queries == 1
+        assert 1 < fake.max_active_mutations <= 3
+        assert first["products_per_second"] > 0
+        assert all(p["files"] for p in fake.products.values())
+
+        catalog[3]["price"] = 14.99
+        catalog[50]["tags"] = ["digital", "bestseller"]
+        catalog[99]["title"] = "reject me"
+        fake.queries = fake.mutations = 0
+        second = await service.sync_catalog(catalog, batch_size=10, concurrency=3)
+
+    assert second["total"] == 120 and second["skipped_unchanged"] == 117
+    assert (second["updated"], second["errors"]) == (2, 1)
+    # Three pages of 50 to build the SKU index, one batched mutation for the changes
+    assert fake.queries == 3 and fake.mutations == 1
+    failed = [r for r in second["results"] if "errors" in r]
+    assert failed[0]["sku"] == "SKU-099"
+    # Updates keep existing media unless asked to replace it
+    updated = [p for p in fake.products.values() if p["sku"] == "SKU-003"][0]
+    assert updated["files"] is None and len(fake.products) == 120
+
+
+async def test_dry_run_reports_plan_without_mutations():
+    with FakeShopifyAdmin() as fake:
+        service = ShopifyService()
+        service.admin_endpoint = f"http://127.0.0.1:{fake.server.server_address[1]}/admin/api/graphql.json"
+        service.admin_token = "token"
+        summary = await service.sync_catalog(_catalog(5), dry_run=True)
+
+    assert fake.mutations == 0 and summary["dry_run"]
+    assert [r["action"] for r in summary["results"]] == ["create"] * 5
+    assert summary["created"] == 5
+
+
+async def test_partial_batch_failure_only_fails_its_alias():
+    with FakeShopifyAdmin(latency=0) as fake:
+        service = ShopifyService()
+        service.admin_endpoint = f"http://127.0.0.1:{fake.server.server_address[1]}/admin/api/graphql.json"
+        service.admin_token = "token"
+        catalog = _catalog(6)
+        catalog[2]["title"] = "break me"
+
+        summary = await service.sync_catalog(catalog, batch_size=10)
+
+    assert fake.mutations == 1
+    assert (summary["created"], summary["errors"]) == (5, 1)
+    failed = [r for r in summary["results"] if "errors" in r]
+    assert failed[0]["sku"] == "SKU-002" and failed[0]["errors"][0]["path"] == ["p2"]
+    assert len(fake.products) == 5
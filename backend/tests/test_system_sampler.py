@@ -0,0 +1,43 @@
+import time
+
+from backend.monitoring.system_sampler import SystemMetricsSampler
+from backend.utils.monitoring import SystemMonitor
+
+
+def test_sampler_serves_snapshots_without_blocking():
+    sampler = SystemMetricsSampler(interval=0.05, slow_interval=0.2, history=50)
+    try:
+        first = sampler.snapshot()  # starts the sampler
+        assert sampler.running
+        assert 0 <= first["memory"]["percent"] <= 100
+        assert first["network_connections"] >= 0 and first["processes"]["total"] > 0
+
+        started = time.perf_counter()
+        for _ in range(10000):
+            sampler.snapshot()
+        assert (time.perf_counter() - started) / 10000 < 50e-6
+
+        time.sleep(0.5)
+        history = sampler.history()
+        assert 5 <= len(history) <= 50
+        assert history[-1]["epoch"] > first["epoch"]
+        assert len(sampler.history(seconds=0.2)) < len(history)
+
+        stats = sampler.get_stats()
+        assert stats["samples"] == len(history)
+        assert 2 <= stats["slow_samples"] < stats["samples"]
+        assert stats["avg_sample_ms"] > 0 and stats["cpu_overhead_percent"] >= 0
+    finally:
+        sampler.stop()
+    assert not sampler.running
+
+
+def test_system_monitor_reads_the_shared_snapshot():
+    started = time.perf_counter()
+    metrics = SystemMonitor().get_system_metrics()
+    application = SystemMonitor().get_application_metrics()
+    # The old implementation slept a full second in cpu_percent(interval=1)
+    assert time.perf_counter() - started < 0.5
+    assert set(metrics["memory"]) >= {"total", "available", "percent", "used"}
+    assert application["memory_usage_mb"] > 0
+    assert application["sampler"]["running"]
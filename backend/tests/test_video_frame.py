@@ -0,0 +1,35 @@
+import numpy as np
+
+from backend.ai_modules.video_frame import VideoFrame, first_seen_order, grouped_means, rolling_mean
+
+VIDEOS = [
+    {"title": "a", "views": 100, "engagement_rate": 0.1, "category": "tech", "published_at": "2024-03-04T10:00:00"},
+    {"title": "bb", "views": "250", "engagement_rate": None, "category": "music", "published_at": "2024-03-02T18:30:00Z"},
+    {"title": "c", "views": 50, "ad_revenue": 2.5, "category": "tech", "published_at": "not a date"},
+    {"views": 10, "sponsorship_revenue": 1, "category": "tech"},
+]
+
+
+def test_frame_extracts_typed_columns_and_dates():
+    frame = VideoFrame(VIDEOS)
+
+    assert frame.views.tolist() == [100.0, 250.0, 50.0, 10.0]
+    assert frame.engagement.tolist() == [0.1, 0.0, 0.0, 0.0]
+    assert frame.revenue.tolist() == [0.0, 0.0, 2.5, 1.0]
+    assert frame.title_length.tolist() == [1.0, 2.0, 1.0, 0.0]
+    assert frame.category_labels == ["tech", "music"]
+    assert frame.has_date.tolist() == [True, True, False, False]
+    assert frame.weekday[:2].tolist() == [0, 5]
+    assert frame.hour[:2].tolist() == [10, 18]
+    assert frame.order_by_published_ts().tolist() == [1, 0]
+
+
+def test_group_and_window_helpers():
+    codes = np.array([2, 0, 2, 1])
+    counts, (means,) = grouped_means(codes, np.array([1.0, 2.0, 3.0, 4.0]))
+
+    assert first_seen_order(codes).tolist() == [2, 0, 1]
+    assert counts.tolist() == [1, 1, 2]
+    assert means.tolist() == [2.0, 4.0, 2.0]
+    assert rolling_mean(np.array([1.0, 2.0, 3.0, 4.0]), 2).tolist() == [1.5, 2.5, 3.5]
+    assert rolling_mean(np.array([1.0]), 2).size == 0
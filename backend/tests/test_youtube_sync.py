@@ -0,0 +1,41 @@
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from backend.core.database import Base
+from backend.models.youtube import ChannelStats, VideoAnalytics
+from backend.services.youtube_service import YouTubeService
+from backend.tests.youtube_fake import FakeYouTubeService, channel_recording
+import backend.models.user  # noqa: F401  (registers users table for the youtube FKs)
+
+
+@pytest.mark.asyncio
+async def test_sync_pages_uploads_and_batches_video_stats():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+    service = YouTubeService()
+
+    fake = FakeYouTubeService(channel_recording("UC_fake", videos=120))
+    async with SessionLocal() as db:
+        report = await service.sync_channel_stats(None, user_id=1, db=db, service=fake)
+
+    assert report.error is None
+    assert report.videos_synced == 120 and report.pages == 3
+    # 1 channels.list + 3 playlist pages + one 50-ID videos.list per page
+    assert fake.count("videos.list") == 3
+    assert report.api_calls == {"channels.list": 1, "playlistItems.list": 3, "videos.list": 3}
+    assert report.quota_units == 7
+
+    # A second sync updates in place
+    refreshed = FakeYouTubeService(channel_recording("UC_fake", videos=120, views={"UC_fake-v0000": 5}))
+    async with SessionLocal() as db:
+        await service.sync_channel_stats(None, user_id=1, db=db, service=refreshed)
+        assert await db.scalar(select(func.count()).select_from(VideoAnalytics)) == 120
+        assert await db.scalar(select(func.count()).select_from(ChannelStats)) == 1
+        video = (await db.execute(
+            select(VideoAnalytics).where(VideoAnalytics.video_id == "UC_fake-v0000")
+        )).scalars().one()
+        assert video.views == 5 and video.title == "Video UC_fake-v0000"
+    await engine.dispose()
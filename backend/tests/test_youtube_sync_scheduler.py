@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from backend.core.database import Base
+from backend.models.user import User
+from backend.services.youtube_sync_scheduler import QuotaBudget, YouTubeSyncScheduler
+from backend.tests.youtube_fake import FakeYouTubeService, channel_recording
+import backend.models.youtube  # noqa: F401  (registers the youtube tables on Base.metadata)
+
+NOW = datetime(2026, 1, 1, 12, tzinfo=timezone.utc)
+
+
+async def _setup(users: int):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+    async with SessionLocal() as db:
+        for i in range(users):
+            db.add(User(
+                id=i + 1, email=f"u{i}@example.com", username=f"user{i}",
+                hashed_password="x", youtube_access_token=f"token-{i}",
+            ))
+        await db.commit()
+    fakes = {
+        i + 1: FakeYouTubeService(channel_recording(f"UC_chan{i}", videos=120, now=NOW))
+        for i in range(users)
+    }
+    return engine, SessionLocal, fakes
+
+
+@pytest.mark.asyncio
+async def test_full_then_incremental_rounds_stay_within_budget():
+    engine, SessionLocal, fakes = await _setup(3)
+    budget = QuotaBudget(daily_limit=1000, clock=lambda: NOW.timestamp())
+    scheduler = YouTubeSyncScheduler(
+        session_factory=SessionLocal,
+        service_factory=lambda user: fakes[user.id],
+        budget=budget,
+        max_concurrency=2,
+    )
+
+    first = await scheduler.run_once(now=NOW)
+    assert sorted(result["mode"] for result in first["synced"]) == ["full"] * 3
+    assert budget.spent == 3 * 7 and budget.reserved == 0
+
+    # Two hours later the channels are synced incrementally: channel stats,
+    # the newest uploads page and one batch of hot older videos
+    second = await scheduler.run_once(now=NOW + timedelta(hours=2))
+    assert [result["mode"] for result in second["synced"]] == ["incremental"] * 3
+    for result in second["synced"]:
+        assert result["api_calls"] == {"channels.list": 1, "playlistItems.list": 1, "videos.list": 2}
+    assert budget.spent == 3 * 7 + 3 * 4
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_low_quota_defers_and_quota_exceeded_stops():
+    engine, SessionLocal, fakes = await _setup(3)
+    budget = QuotaBudget(daily_limit=100, hard_reserve=0.8, clock=lambda: NOW.timestamp())
+    scheduler = YouTubeSyncScheduler(
+        session_factory=SessionLocal,
+        service_factory=lambda user: fakes[user.id],
+        budget=budget,
+    )
+    # Only 20 units are usable above the hard reserve and a never-synced
+    # channel reserves 9 (four pages), so one channel has to wait
+    summary = await scheduler.run_once(now=NOW)
+    assert len(summary["synced"]) == 2 and len(summary["deferred"]) == 1
+
+    budget.exhaust()
+    assert budget.remaining == 0
+    summary = await scheduler.run_once(now=NOW + timedelta(hours=1))
+    assert summary["synced"] == [] and len(summary["deferred"]) == 3
+    await engine.dispose()
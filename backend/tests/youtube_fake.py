@@ -0,0 +1,147 @@
+"""Recorded-response fake of the YouTube Data API client.
+
+``FakeYouTubeService`` mimics the ``googleapiclient`` resource interface
+(``service.videos().list(**params).execute()``) and answers from a
+recording: ``{"videos.list": [{"params": {...}, "response": {...}}, ...]}``.
+Requests are matched on their exact parameters (``videos.list`` batches
+may also be assembled from recorded per-video items); anything else raises.
+Recordings are plain JSON, so a real session can be captured to a file and
+replayed with ``FakeYouTubeService.from_file``.
+"""
+
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+
+class UnrecordedRequest(KeyError):
+    pass
+
+
+class _FakeRequest:
+    def __init__(self, service: "FakeYouTubeService", method: str, params: Dict[str, Any]):
+        self.service = service
+        self.method = method
+        self.params = params
+
+    def execute(self, http: Any = None, num_retries: int = 0) -> Dict[str, Any]:
+        return self.service._answer(self.method, self.params)
+
+
+class _FakeResource:
+    def __init__(self, service: "FakeYouTubeService", name: str):
+        self.service = service
+        self.name = name
+
+    def list(self, **params: Any) -> _FakeRequest:
+        return _FakeRequest(self.service, f"{self.name}.list", params)
+
+
+class FakeYouTubeService:
+    def __init__(self, recording: Dict[str, List[Dict[str, Any]]]):
+        self.recording = recording
+        self.calls: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path: str) -> "FakeYouTubeService":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def _answer(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            self.calls.append({"method": method, "params": params})
+        for entry in self.recording.get(method, []):
+            if entry["params"] == params:
+                return json.loads(json.dumps(entry["response"]))
+        if method == "videos.list" and "id" in params:
+            # Any ID batch can be answered from the recorded per-video items
+            known = {
+                item["id"]: item
+                for entry in self.recording.get(method, [])
+                for item in entry["response"].get("items", [])
+            }
+            items = [known[video_id] for video_id in params["id"].split(",") if video_id in known]
+            return json.loads(json.dumps({"items": items}))
+        raise UnrecordedRequest(f"{method} {params}")
+
+    def channels(self) -> _FakeResource:
+        return _FakeResource(self, "channels")
+
+    def playlistItems(self) -> _FakeResource:
+        return _FakeResource(self, "playlistItems")
+
+    def videos(self) -> _FakeResource:
+        return _FakeResource(self, "videos")
+
+    def count(self, method: str) -> int:
+        return sum(1 for call in self.calls if call["method"] == method)
+
+
+def channel_recording(
+    channel_id: str = "UC_fake",
+    videos: int = 120,
+    page_size: int = 50,
+    views: Optional[Dict[str, int]] = None,
+    now: Optional[datetime] = None,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """A recording of one channel's sync: channel, uploads pages and video stats.
+
+    Video ``i`` was published ``i`` days before ``now`` and has ``1000 * (i + 1)``
+    views unless ``views`` overrides it.
+    """
+    now = now or datetime(2026, 1, 1, tzinfo=timezone.utc)
+    playlist_id = f"UU{channel_id[2:]}"
+    video_ids = [f"{channel_id}-v{i:04d}" for i in range(videos)]
+    views = views or {}
+    position = {video_id: i for i, video_id in enumerate(video_ids)}
+
+    recording: Dict[str, List[Dict[str, Any]]] = {
+        "channels.list": [{
+            "params": {"part": "snippet,statistics,contentDetails", "mine": True},
+            "response": {"items": [{
+                "id": channel_id,
+                "statistics": {"subscriberCount": "1500", "viewCount": "250000", "videoCount": str(videos)},
+                "contentDetails": {"relatedPlaylists": {"uploads": playlist_id}},
+            }]},
+        }],
+        "playlistItems.list": [],
+        "videos.list": [],
+    }
+
+    pages = [video_ids[i:i + page_size] for i in range(0, len(video_ids), page_size)] or [[]]
+    for number, page in enumerate(pages):
+        params = {"part": "snippet,contentDetails", "playlistId": playlist_id, "maxResults": page_size}
+        if number:
+            params["pageToken"] = f"page-{number}"
+        response: Dict[str, Any] = {"items": [
+            {
+                "snippet": {
+                    "title": f"Video {video_id}",
+                    "publishedAt": (now - timedelta(days=position[video_id])).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                },
+                "contentDetails": {"videoId": video_id},
+            }
+            for video_id in page
+        ]}
+        if number + 1 < len(pages):
+            response["nextPageToken"] = f"page-{number + 1}"
+        recording["playlistItems.list"].append({"params": params, "response": response})
+
+        if page:
+            recording["videos.list"].append({
+                "params": {"part": "statistics", "id": ",".join(page)},
+                "response": {"items": [
+                    {
+                        "id": video_id,
+                        "statistics": {
+                            "viewCount": str(views.get(video_id, 1000 * (position[video_id] + 1))),
+                            "likeCount": "10",
+                            "commentCount": "2",
+                        },
+                    }
+                    for video_id in page
+                ]},
+            })
+    return recording
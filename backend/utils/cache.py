@@ -1,207 +1,674 @@
 import asyncio
-import json
+import heapq
+import itertools
+import pickle
+import sqlite3
+import sys
+import threading
 import time
-from typing import Any, Optional, Dict
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional, Dict, List, Tuple, Union
 import logging
-from datetime import datetime, timedelta
+
+try:
+    from backend import metrics as prom_metrics
+except Exception:  # pragma: no cover - optional dependency
+    prom_metrics = None
 
 logger = logging.getLogger(__name__)
 
-class CacheManager:
-    def __init__(self, max_size: int = 1000, default_ttl: int = 3600):
-        self.cache: Dict[str, Dict[str, Any]] = {}
+# Keys are namespaced by the text before the first separator, e.g.
+# "analytics:channel:123" is accounted under the "analytics" namespace.
+NAMESPACE_SEPARATOR = ":"
+DEFAULT_NAMESPACE = "default"
+
+# Fixed per-entry overhead (entry object, OrderedDict link, heap tuple).
+ENTRY_OVERHEAD_BYTES = 160
+
+
+def _namespace_of(key: str) -> str:
+    head, sep, _ = key.partition(NAMESPACE_SEPARATOR)
+    return head if sep and head else DEFAULT_NAMESPACE
+
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """Approximate the in-memory footprint of a cached value in bytes.
+
+    Computed once when a value is stored, so containers are walked only a
+    few levels deep to keep ``set()`` cheap for large payloads.
+    """
+    try:
+        if isinstance(value, (str, bytes, bytearray, int, float, bool)) or value is None:
+            return sys.getsizeof(value)
+        size = sys.getsizeof(value)
+        if _depth >= 3:
+            return size
+        if isinstance(value, dict):
+            for k, v in value.items():
+                size += estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1)
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            for item in value:
+                size += estimate_size(item, _depth + 1)
+        elif hasattr(value, "__dict__"):
+            size += estimate_size(vars(value), _depth + 1)
+        return size
+    except Exception:
+        return len(str(value))
+
+
+class _CacheEntry:
+    __slots__ = ("value", "created_at", "accessed_at", "expires_at", "size", "namespace")
+
+    def __init__(self, value: Any, expires_at: float, size: int, namespace: str):
+        now = time.time()
+        self.value = value
+        self.created_at = now
+        self.accessed_at = now
+        self.expires_at = expires_at
+        self.size = size
+        self.namespace = namespace
+
+
+class LRUCacheEngine:
+    """Synchronous LRU/TTL store with O(1) get, set, delete and eviction.
+
+    Recency is tracked by an ``OrderedDict`` (most recent entry at the end)
+    and expiry by a min-heap of ``(expires_at, key)`` pairs.  Heap items are
+    invalidated lazily: an item is only honoured when the live entry for
+    that key still carries the same deadline.
+    """
+
+    def __init__(self, max_size: int = 1000, max_bytes: Optional[int] = None):
         self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self.total_bytes = 0
+        self._expiry_heap: List[Tuple[float, int, str]] = []
+        self._sequence = itertools.count()
+        self.namespace_stats: Dict[str, Dict[str, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.entries
+
+    def _ns_stats(self, namespace: str) -> Dict[str, int]:
+        stats = self.namespace_stats.get(namespace)
+        if stats is None:
+            stats = {"hits": 0, "misses": 0, "sets": 0, "deletes": 0,
+                     "evictions": 0, "expirations": 0, "entries": 0, "bytes": 0}
+            self.namespace_stats[namespace] = stats
+        return stats
+
+    def _remove(self, key: str) -> _CacheEntry:
+        entry = self.entries.pop(key)
+        self.total_bytes -= entry.size
+        stats = self._ns_stats(entry.namespace)
+        stats["entries"] -= 1
+        stats["bytes"] -= entry.size
+        return entry
+
+    def get(self, key: str, now: Optional[float] = None) -> Tuple[bool, Any]:
+        """Return ``(found, value)`` and mark the entry most recently used."""
+        entry = self.entries.get(key)
+        if entry is None:
+            self._ns_stats(_namespace_of(key))["misses"] += 1
+            return False, None
+
+        now = time.time() if now is None else now
+        if entry.expires_at <= now:
+            self._remove(key)
+            stats = self._ns_stats(entry.namespace)
+            stats["expirations"] += 1
+            stats["misses"] += 1
+            return False, None
+
+        entry.accessed_at = now
+        self.entries.move_to_end(key)
+        self._ns_stats(entry.namespace)["hits"] += 1
+        return True, entry.value
+
+    def set(self, key: str, value: Any, ttl: float, size: Optional[int] = None) -> int:
+        """Store a value and return the number of entries evicted to make room."""
+        namespace = _namespace_of(key)
+        if size is None:
+            size = estimate_size(key) + estimate_size(value) + ENTRY_OVERHEAD_BYTES
+
+        if key in self.entries:
+            self._remove(key)
+
+        expires_at = time.time() + ttl
+        entry = _CacheEntry(value, expires_at, size, namespace)
+        self.entries[key] = entry
+        self.total_bytes += size
+        stats = self._ns_stats(namespace)
+        stats["sets"] += 1
+        stats["entries"] += 1
+        stats["bytes"] += size
+
+        heapq.heappush(self._expiry_heap, (expires_at, next(self._sequence), key))
+        if len(self._expiry_heap) > 2 * len(self.entries) + 64:
+            self._compact_heap()
+
+        return self._enforce_limits(protect=key)
+
+    def delete(self, key: str) -> bool:
+        if key not in self.entries:
+            return False
+        entry = self._remove(key)
+        self._ns_stats(entry.namespace)["deletes"] += 1
+        return True
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self._expiry_heap.clear()
+        self.total_bytes = 0
+        for stats in self.namespace_stats.values():
+            stats["entries"] = 0
+            stats["bytes"] = 0
+
+    def _over_budget(self) -> bool:
+        if len(self.entries) > self.max_size:
+            return True
+        return self.max_bytes is not None and self.total_bytes > self.max_bytes
+
+    def _enforce_limits(self, protect: Optional[str] = None) -> int:
+        evicted = 0
+        while self._over_budget() and self.entries:
+            lru_key = next(iter(self.entries))
+            if lru_key == protect and len(self.entries) == 1:
+                # A single value larger than the byte budget is kept rather
+                # than stored-and-immediately-dropped.
+                break
+            entry = self._remove(lru_key)
+            self._ns_stats(entry.namespace)["evictions"] += 1
+            evicted += 1
+        return evicted
+
+    def purge_expired(self, now: Optional[float] = None) -> int:
+        """Drop expired entries in O(k log n) for k expired keys."""
+        now = time.time() if now is None else now
+        heap = self._expiry_heap
+        purged = 0
+        while heap and heap[0][0] <= now:
+            expires_at, _, key = heapq.heappop(heap)
+            entry = self.entries.get(key)
+            if entry is not None and entry.expires_at == expires_at:
+                self._remove(key)
+                self._ns_stats(entry.namespace)["expirations"] += 1
+                purged += 1
+        return purged
+
+    def next_expiry(self) -> Optional[float]:
+        return self._expiry_heap[0][0] if self._expiry_heap else None
+
+    def _compact_heap(self) -> None:
+        self._expiry_heap = [
+            item for item in self._expiry_heap
+            if (entry := self.entries.get(item[2])) is not None and entry.expires_at == item[0]
+        ]
+        heapq.heapify(self._expiry_heap)
+
+
+class CacheBackend(ABC):
+    """Shared (L2) cache store holding serialized values.
+
+    Backends deal in bytes only; serialization and the in-process L1 live in
+    ``CacheManager``.  Every operation reports through
+    ``MetricsCollector.record_redis_operation`` via ``_record``.
+    """
+
+    name = "backend"
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, data: bytes, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def clear(self) -> None:
+        ...
+
+    async def close(self) -> None:
+        return None
+
+    def _record(self, operation: str, success: bool) -> None:
+        if prom_metrics is None:
+            return
+        try:
+            prom_metrics.MetricsCollector.record_redis_operation(f"{self.name}_{operation}", success)
+        except Exception:
+            pass
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """Single-host shared cache in a WAL-mode SQLite file.
+
+    All uvicorn workers on one machine can point at the same file.  Calls run
+    in a worker thread so the event loop never waits on disk.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: Union[str, Path] = "cache/l2_cache.sqlite3"):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_cache_entries_expires ON cache_entries(expires_at)"
+        )
+
+    def _get_sync(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= time.time():
+                self._conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+                return None
+            return row[0]
+
+    def _set_sync(self, key: str, data: bytes, ttl: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at",
+                (key, sqlite3.Binary(data), time.time() + ttl),
+            )
+
+    def _delete_sync(self, key: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+            return cursor.rowcount > 0
+
+    def _clear_sync(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries")
+
+    def _purge_sync(self) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),)
+            )
+            return cursor.rowcount
+
+    async def _call(self, operation: str, func: Callable, *args):
+        try:
+            result = await asyncio.to_thread(func, *args)
+            self._record(operation, True)
+            return result
+        except Exception:
+            self._record(operation, False)
+            raise
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._call("get", self._get_sync, key)
+
+    async def set(self, key: str, data: bytes, ttl: float) -> None:
+        await self._call("set", self._set_sync, key, data, ttl)
+
+    async def delete(self, key: str) -> bool:
+        return await self._call("delete", self._delete_sync, key)
+
+    async def clear(self) -> None:
+        await self._call("clear", self._clear_sync)
+
+    async def purge_expired(self) -> int:
+        return await self._call("purge", self._purge_sync)
+
+    async def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class RedisCacheBackend(CacheBackend):
+    """Shared cache on any Redis-protocol server (Redis, KeyDB, Valkey...)."""
+
+    name = "redis"
+
+    def __init__(self, url: str = "redis://localhost:6379", prefix: str = "cache:", client: Any = None):
+        if client is None:
+            import redis.asyncio as redis_asyncio
+
+            client = redis_asyncio.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    async def _call(self, operation: str, coro: Awaitable):
+        try:
+            result = await coro
+            self._record(operation, True)
+            return result
+        except Exception:
+            self._record(operation, False)
+            raise
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._call("get", self.client.get(self.prefix + key))
+
+    async def set(self, key: str, data: bytes, ttl: float) -> None:
+        await self._call("set", self.client.set(self.prefix + key, data, px=max(1, int(ttl * 1000))))
+
+    async def delete(self, key: str) -> bool:
+        return bool(await self._call("delete", self.client.delete(self.prefix + key)))
+
+    async def clear(self) -> None:
+        async def _clear():
+            batch = []
+            async for key in self.client.scan_iter(match=f"{self.prefix}*", count=500):
+                batch.append(key)
+                if len(batch) >= 500:
+                    await self.client.delete(*batch)
+                    batch = []
+            if batch:
+                await self.client.delete(*batch)
+
+        await self._call("clear", _clear())
+
+    async def close(self) -> None:
+        await self.client.close()
+
+
+def cache_backend_from_url(url: str) -> CacheBackend:
+    """Build an L2 backend from a URL such as ``sqlite:///cache/l2.sqlite3``
+    or ``redis://localhost:6379/0``."""
+    if url.startswith("sqlite:///"):
+        return SQLiteCacheBackend(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisCacheBackend(url)
+    raise ValueError(f"Unsupported cache backend URL: {url}")
+
+
+class CacheManager:
+    def __init__(
+        self,
+        max_size: int = 1000,
+        default_ttl: int = 3600,
+        max_bytes: Optional[int] = None,
+        cleanup_interval: float = 300,
+        l2: Optional[CacheBackend] = None,
+        l1_ttl: Optional[int] = 60,
+    ):
+        """Create a cache manager.
+
+        With ``l2`` set the manager runs in tiered mode: this process keeps
+        an L1 copy of recently used values for at most ``l1_ttl`` seconds
+        (bounding staleness across workers) in front of the shared backend.
+        """
+        self.engine = LRUCacheEngine(max_size=max_size, max_bytes=max_bytes)
         self.default_ttl = default_ttl
+        self.cleanup_interval = cleanup_interval
+        self.l2 = l2
+        self.l1_ttl = l1_ttl
         self.stats = {
             "hits": 0,
             "misses": 0,
             "sets": 0,
             "deletes": 0,
-            "evictions": 0
+            "evictions": 0,
+            "expirations": 0,
+            "l2_hits": 0,
+            "l2_misses": 0,
+            "l2_errors": 0,
+            "coalesced": 0
         }
         self.cleanup_task = None
-    
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    @property
+    def cache(self) -> "OrderedDict[str, _CacheEntry]":
+        return self.engine.entries
+
+    @property
+    def max_size(self) -> int:
+        return self.engine.max_size
+
+    @property
+    def max_bytes(self) -> Optional[int]:
+        return self.engine.max_bytes
+
     async def initialize(self):
         """Initialize cache manager."""
         try:
             # Start cleanup task
             self.cleanup_task = asyncio.create_task(self._cleanup_loop())
             logger.info("Cache manager initialized")
-            
+
         except Exception as e:
             logger.error(f"Cache initialization failed: {e}")
             raise
-    
+
+    def _l1_ttl(self, ttl: float) -> float:
+        if self.l2 is None or self.l1_ttl is None:
+            return ttl
+        return min(ttl, self.l1_ttl)
+
     async def get(self, key: str) -> Optional[Any]:
         """Get value from cache."""
         try:
-            if key not in self.cache:
-                self.stats["misses"] += 1
-                return None
-            
-            entry = self.cache[key]
-            
-            # Check if expired
-            if entry["expires_at"] < time.time():
-                del self.cache[key]
-                self.stats["misses"] += 1
-                return None
-            
-            # Update access time
-            entry["accessed_at"] = time.time()
-            self.stats["hits"] += 1
-            
-            return entry["value"]
-            
+            had_entry = key in self.engine
+            found, value = self.engine.get(key)
+            if found:
+                self.stats["hits"] += 1
+                return value
+            if had_entry:
+                self.stats["expirations"] += 1
+
+            if self.l2 is not None:
+                found, value = await self._l2_get(key)
+                if found:
+                    self.stats["hits"] += 1
+                    self.stats["l2_hits"] += 1
+                    self.stats["evictions"] += self.engine.set(
+                        key, value, self._l1_ttl(self.default_ttl)
+                    )
+                    return value
+                self.stats["l2_misses"] += 1
+
+            self.stats["misses"] += 1
+            return None
+
         except Exception as e:
             logger.error(f"Cache get failed for key {key}: {e}")
             self.stats["misses"] += 1
             return None
-    
+
     async def set(self, key: str, value: Any, expire: Optional[int] = None) -> bool:
         """Set value in cache."""
         try:
             # Use default TTL if not specified
             ttl = expire or self.default_ttl
-            
-            # Check if cache is full and evict if necessary
-            if len(self.cache) >= self.max_size and key not in self.cache:
-                await self._evict_lru()
-            
-            # Store value
-            self.cache[key] = {
-                "value": value,
-                "created_at": time.time(),
-                "accessed_at": time.time(),
-                "expires_at": time.time() + ttl
-            }
-            
+            self.stats["evictions"] += self.engine.set(key, value, self._l1_ttl(ttl))
             self.stats["sets"] += 1
+            if self.l2 is not None:
+                await self._l2_set(key, value, ttl)
             return True
-            
+
         except Exception as e:
             logger.error(f"Cache set failed for key {key}: {e}")
             return False
-    
+
+    async def get_or_set(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[Any]],
+        expire: Optional[int] = None,
+    ) -> Any:
+        """Return the cached value or compute it once via ``factory``.
+
+        Concurrent misses on the same key within this process are coalesced
+        (single-flight): the first caller runs ``factory`` and the rest await
+        its result instead of recomputing it.
+        """
+        value = await self.get(key)
+        if value is not None:
+            return value
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await factory()
+            if value is not None:
+                await self.set(key, value, expire=expire)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting.
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
     async def delete(self, key: str) -> bool:
         """Delete value from cache."""
         try:
-            if key in self.cache:
-                del self.cache[key]
+            deleted = self.engine.delete(key)
+            if self.l2 is not None:
+                try:
+                    deleted = await self.l2.delete(key) or deleted
+                except Exception as e:
+                    self.stats["l2_errors"] += 1
+                    logger.warning(f"L2 cache delete failed for key {key}: {e}")
+            if deleted:
                 self.stats["deletes"] += 1
-                return True
-            return False
-            
+            return deleted
+
         except Exception as e:
             logger.error(f"Cache delete failed for key {key}: {e}")
             return False
-    
+
+    async def _l2_get(self, key: str) -> Tuple[bool, Any]:
+        try:
+            data = await self.l2.get(key)
+            if data is None:
+                return False, None
+            return True, pickle.loads(data)
+        except Exception as e:
+            self.stats["l2_errors"] += 1
+            logger.warning(f"L2 cache get failed for key {key}: {e}")
+            return False, None
+
+    async def _l2_set(self, key: str, value: Any, ttl: float) -> None:
+        try:
+            await self.l2.set(key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), ttl)
+        except Exception as e:
+            self.stats["l2_errors"] += 1
+            logger.warning(f"L2 cache set failed for key {key}: {e}")
+
     async def clear(self):
         """Clear all cache entries."""
         try:
-            self.cache.clear()
+            self.engine.clear()
+            if self.l2 is not None:
+                await self.l2.clear()
             logger.info("Cache cleared")
-            
+
         except Exception as e:
             logger.error(f"Cache clear failed: {e}")
-    
-    async def _evict_lru(self):
-        """Evict least recently used entry."""
-        try:
-            if not self.cache:
-                return
-            
-            # Find LRU entry
-            lru_key = min(
-                self.cache.keys(),
-                key=lambda k: self.cache[k]["accessed_at"]
-            )
-            
-            del self.cache[lru_key]
-            self.stats["evictions"] += 1
-            
-        except Exception as e:
-            logger.error(f"LRU eviction failed: {e}")
-    
+
     async def _cleanup_loop(self):
         """Periodic cleanup of expired entries."""
         while True:
             try:
-                current_time = time.time()
-                expired_keys = [
-                    key for key, entry in self.cache.items()
-                    if entry["expires_at"] < current_time
-                ]
-                
-                for key in expired_keys:
-                    del self.cache[key]
-                
-                if expired_keys:
-                    logger.debug(f"Cleaned up {len(expired_keys)} expired cache entries")
-                
-                # Sleep for 5 minutes before next cleanup
-                await asyncio.sleep(300)
-                
+                purged = self.engine.purge_expired()
+                self.stats["expirations"] += purged
+                if isinstance(self.l2, SQLiteCacheBackend):
+                    await self.l2.purge_expired()
+
+                if purged:
+                    logger.debug(f"Cleaned up {purged} expired cache entries")
+
+                await asyncio.sleep(self.cleanup_interval)
+
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 logger.error(f"Cache cleanup failed: {e}")
-                await asyncio.sleep(300)  # Continue cleanup despite errors
-    
+                await asyncio.sleep(self.cleanup_interval)  # Continue cleanup despite errors
+
     async def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
         try:
             total_requests = self.stats["hits"] + self.stats["misses"]
             hit_rate = (self.stats["hits"] / total_requests) if total_requests > 0 else 0
-            
+
             return {
-                "size": len(self.cache),
+                "size": len(self.engine),
                 "max_size": self.max_size,
+                "max_bytes": self.max_bytes,
+                "mode": "tiered" if self.l2 is not None else "local",
+                "l2_backend": self.l2.name if self.l2 is not None else None,
                 "hit_rate": round(hit_rate, 3),
                 "stats": self.stats.copy(),
+                "namespaces": self._namespace_stats(),
                 "memory_usage": self._estimate_memory_usage()
             }
-            
+
         except Exception as e:
             logger.error(f"Cache stats failed: {e}")
             return {"error": str(e)}
-    
-    def _estimate_memory_usage(self) -> Dict[str, Any]:
-        """Estimate cache memory usage."""
-        try:
-            total_size = 0
-            for key, entry in self.cache.items():
-                # Rough estimation
-                key_size = len(str(key))
-                value_size = len(str(entry["value"]))
-                metadata_size = 100  # Rough estimate for timestamps
-                total_size += key_size + value_size + metadata_size
-            
-            return {
-                "estimated_bytes": total_size,
-                "estimated_mb": round(total_size / (1024 * 1024), 2),
-                "entries": len(self.cache)
+
+    def _namespace_stats(self) -> Dict[str, Dict[str, Any]]:
+        result = {}
+        for namespace, stats in self.engine.namespace_stats.items():
+            lookups = stats["hits"] + stats["misses"]
+            result[namespace] = {
+                **stats,
+                "hit_rate": round(stats["hits"] / lookups, 3) if lookups else 0,
             }
-            
-        except Exception as e:
-            logger.error(f"Memory usage estimation failed: {e}")
-            return {"error": str(e)}
-    
+        return result
+
+    def _estimate_memory_usage(self) -> Dict[str, Any]:
+        """Report cache memory usage from the sizes recorded at insert time."""
+        total_size = self.engine.total_bytes
+        return {
+            "estimated_bytes": total_size,
+            "estimated_mb": round(total_size / (1024 * 1024), 2),
+            "entries": len(self.engine)
+        }
+
     async def health_check(self) -> bool:
         """Check if cache is healthy."""
         try:
             # Test basic operations
             test_key = "__health_check__"
             test_value = "test"
-            
+
             await self.set(test_key, test_value, expire=60)
             retrieved = await self.get(test_key)
             await self.delete(test_key)
-            
+
             return retrieved == test_value
-            
+
         except Exception as e:
             logger.error(f"Cache health check failed: {e}")
             return False
-    
+
     async def cleanup(self):
         """Cleanup cache manager."""
         try:
@@ -211,9 +678,11 @@ class CacheManager:
                     await self.cleanup_task
                 except asyncio.CancelledError:
                     pass
-            
-            await self.clear()
+
+            self.engine.clear()
+            if self.l2 is not None:
+                await self.l2.close()
             logger.info("Cache manager cleaned up")
-            
+
         except Exception as e:
-            logger.error(f"Cache cleanup failed: {e}")
\ No newline at end of file
+            logger.error(f"Cache cleanup failed: {e}")
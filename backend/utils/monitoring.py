@@ -3,12 +3,12 @@ Production Monitoring and Health Checks
 System monitoring, performance tracking, and alerting
 """
 
-import psutil
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, Any, List
 from sqlalchemy import text
 from backend.core.database import get_db
+from backend.monitoring.system_sampler import system_sampler
 
 logger = logging.getLogger(__name__)
 
@@ -21,20 +21,12 @@ class SystemMonitor:
     def get_system_metrics(self) -> Dict[str, Any]:
         """Get current system resource usage."""
         try:
+            snapshot = system_sampler.snapshot()
             return {
-                "cpu_percent": psutil.cpu_percent(interval=1),
-                "memory": {
-                    "total": psutil.virtual_memory().total,
-                    "available": psutil.virtual_memory().available,
-                    "percent": psutil.virtual_memory().percent,
-                    "used": psutil.virtual_memory().used
-                },
-                "disk": {
-                    "total": psutil.disk_usage('/').total,
-                    "used": psutil.disk_usage('/').used,
-                    "free": psutil.disk_usage('/').free,
-                    "percent": psutil.disk_usage('/').percent
-                },
+                "cpu_percent": snapshot["cpu_percent"],
+                "memory": dict(snapshot["memory"]),
+                "disk": dict(snapshot["disk"]),
+                "sampled_at": snapshot["timestamp"],
                 "uptime": str(datetime.utcnow() - self.start_time),
                 "timestamp": datetime.utcnow().isoformat()
             }
@@ -74,15 +66,17 @@ class SystemMonitor:
     
     def get_application_metrics(self) -> Dict[str, Any]:
         """Get application-specific metrics."""
+        process = system_sampler.snapshot()["process"]
         return {
             "uptime": str(datetime.utcnow() - self.start_time),
             "start_time": self.start_time.isoformat(),
             "current_time": datetime.utcnow().isoformat(),
-            "process_id": psutil.Process().pid,
-            "memory_usage_mb": round(psutil.Process().memory_info().rss / 1024 / 1024, 2),
-            "cpu_percent": psutil.Process().cpu_percent(),
-            "open_files": len(psutil.Process().open_files()),
-            "threads": psutil.Process().num_threads()
+            "process_id": process["pid"],
+            "memory_usage_mb": round(process["rss"] / 1024 / 1024, 2),
+            "cpu_percent": process["cpu_percent"],
+            "open_files": process["open_fds"],
+            "threads": process["threads"],
+            "sampler": system_sampler.get_stats()
         }
 
 # Global monitor instance
@@ -1,11 +1,11 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, select, text
 from datetime import datetime, timedelta
-from .models import GrowthLedgerEntry
+from .rollup import DailyRevenueRollup
 
 class AnalyticsService:
     def __init__(self, db: Session):
         self.db = db
+        self.rollup = DailyRevenueRollup(db)
 
     def get_dnr(self) -> float:
         """
@@ -13,12 +13,7 @@ class AnalyticsService:
         DNR = Sum of CLEARED ledger entries for today.
         """
         today = datetime.utcnow().date()
-        result = self.db.query(func.sum(GrowthLedgerEntry.amount_cents))\
-            .filter(GrowthLedgerEntry.status == "CLEARED")\
-            .filter(func.date(GrowthLedgerEntry.created_at) == today)\
-            .scalar()
-        
-        return float(result or 0) / 100.0
+        return self.rollup.day_total_cents(today) / 100.0
 
     def get_slope(self) -> float:
         """
@@ -29,12 +24,7 @@ class AnalyticsService:
         
         # Get DNR 7 days ago
         seven_days_ago = datetime.utcnow().date() - timedelta(days=7)
-        dnr_7d_ago_cents = self.db.query(func.sum(GrowthLedgerEntry.amount_cents))\
-            .filter(GrowthLedgerEntry.status == "CLEARED")\
-            .filter(func.date(GrowthLedgerEntry.created_at) == seven_days_ago)\
-            .scalar()
-        
-        dnr_7d_ago = float(dnr_7d_ago_cents or 0) / 100.0
+        dnr_7d_ago = self.rollup.day_total_cents(seven_days_ago) / 100.0
         
         # Simple Linear Slope
         slope = (dnr_today - dnr_7d_ago) / 7.0
@@ -58,15 +48,9 @@ class AnalyticsService:
         dnr_data = []
         today = datetime.utcnow().date()
         
-        # Fetch real daily aggregates
-        rows = self.db.query(
-            func.date(GrowthLedgerEntry.created_at).label("d"), 
-            func.sum(GrowthLedgerEntry.amount_cents).label("net")
-        ).filter(GrowthLedgerEntry.status == "CLEARED")\
-         .group_by(func.date(GrowthLedgerEntry.created_at))\
-         .all()
-         
-        real_map = {str(r.d): r.net/100.0 for r in rows}
+        # Fetch real daily aggregates (only the 7 days on the chart)
+        totals = self.rollup.daily_totals_cents(today - timedelta(days=6), today)
+        real_map = {str(d): cents/100.0 for d, cents in totals.items()}
         
         # Fill last 7 days (including today)
         for i in range(7):
@@ -85,15 +69,9 @@ class AnalyticsService:
         Group revenue by stream for today.
         """
         today = datetime.utcnow().date()
-        rows = self.db.query(
-            GrowthLedgerEntry.stream,
-            func.sum(GrowthLedgerEntry.amount_cents).label("net")
-        ).filter(GrowthLedgerEntry.status == "CLEARED")\
-         .filter(func.date(GrowthLedgerEntry.created_at) == today)\
-         .group_by(GrowthLedgerEntry.stream)\
-         .all()
+        totals = self.rollup.stream_totals_cents(today)
          
         return [
-            {"date": str(today), "stream": r.stream or "UNKNOWN", "net": float(r.net)/100.0}
-            for r in rows
+            {"date": str(today), "stream": stream, "net": float(cents)/100.0}
+            for stream, cents in totals.items()
         ]
@@ -18,6 +18,10 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base.metadata.create_all(bind=engine)
 
+# Daily revenue rollup: add the ledger index and backfill on first run
+from .rollup import ensure_daily_revenue
+ensure_daily_revenue(engine)
+
 def get_db():
     db = SessionLocal()
     try:
@@ -61,6 +65,27 @@ def ingest_data(topic: str, payload: IngestRequest, background_tasks: Background
         print(f"Ingest Error: {e}")
         return {"accepted": False, "error": str(e)}
 
+@app.post("/ingest/bulk/{topic}", status_code=202)
+async def ingest_bulk(topic: str, request: Request, source: str = "bulk_upload", db: Session = Depends(get_db)):
+    """
+    Bulk NDJSON ingestion (webhook replays, historical exports).
+    Body: one JSON order per line, or {"data": ..., "provenance": ...}.
+    Spools the body, then writes it in one transaction; returns per-record statuses.
+    """
+    service = IngestionService(db)
+    provenance = {
+        "origin_name": source,
+        "origin_type": "bulk_ndjson",
+        "quality_score": 1.0
+    }
+    
+    try:
+        result = await service.ingest_ndjson(topic, request.stream(), provenance)
+        return {"accepted": True, "result": result}
+    except Exception as e:
+        print(f"Bulk Ingest Error: {e}")
+        return {"accepted": False, "error": str(e)}
+
 @app.post("/ingest/webhook/{source}", status_code=202)
 def ingest_webhook(source: str, request: Request, payload: Dict[str, Any], background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """
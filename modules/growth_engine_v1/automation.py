@@ -1,8 +1,7 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from datetime import datetime, timedelta
 from typing import Dict, Any, List
-from .models import GrowthLedgerEntry
+from .rollup import DailyRevenueRollup
 
 class AnomalyService:
     """
@@ -14,13 +13,10 @@ class AnomalyService:
     
     def __init__(self, db: Session):
         self.db = db
+        self.rollup = DailyRevenueRollup(db)
 
     def get_dnr_for_date(self, date_obj) -> float:
-        val = self.db.query(func.sum(GrowthLedgerEntry.amount_cents))\
-            .filter(GrowthLedgerEntry.status == "CLEARED")\
-            .filter(func.date(GrowthLedgerEntry.created_at) == date_obj)\
-            .scalar()
-        return float(val or 0) / 100.0
+        return self.rollup.day_total_cents(date_obj) / 100.0
 
     def check_anomalies(self) -> list:
         alerts = []
@@ -42,9 +38,7 @@ class AnomalyService:
                 })
         
         # 2. Silence Check (No events today?)
-        count = self.db.query(GrowthLedgerEntry)\
-            .filter(func.date(GrowthLedgerEntry.created_at) == today)\
-            .count()
+        count = self.rollup.day_entry_count(today)
             
         if count == 0:
              alerts.append({
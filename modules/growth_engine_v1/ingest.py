@@ -1,8 +1,18 @@
 from sqlalchemy.orm import Session
+from sqlalchemy import insert, select
 from datetime import datetime
+import asyncio
 import hashlib
 import json
+import os
+import tempfile
+from typing import IO, Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
 from .models import GrowthOrder, GrowthLedgerEntry, GrowthTraffic, GrowthAdSpend
+from .rollup import DailyRevenueRollup
+
+PAID_STATUSES = ["paid", "fulfilled", "complete"]
+BULK_CHUNK_SIZE = int(os.getenv("GROWTH_BULK_CHUNK_SIZE", "500"))
+SPOOL_MAX_MEMORY = 8 * 1024 * 1024
 
 class IngestionService:
     def __init__(self, db: Session):
@@ -13,6 +23,34 @@ class IngestionService:
         if not raw_str: return None
         return hashlib.sha256(raw_str.encode()).hexdigest()
 
+    def _order_row(self, data: dict, provenance: dict) -> Dict[str, Any]:
+        # Hash PII
+        customer_email = data.get("email") or data.get("customer", {}).get("email")
+
+        return {
+            "external_id": str(data.get("id")),
+            "source": provenance.get("origin_name", "unknown"),
+            "status": data.get("status", "unknown"),
+            "total_price": float(data.get("total_price", 0)),
+            "currency": data.get("currency", "USD"),
+            "customer_hash": self.hash_pii(customer_email),
+            "items_json": data.get("line_items", []),
+            "provenance_meta": provenance
+        }
+
+    def _ledger_row(self, order: Dict[str, Any], provenance: dict) -> Optional[Dict[str, Any]]:
+        # Auto-create Ledger Entry if paid
+        if order["status"] not in PAID_STATUSES:
+            return None
+        return {
+            "transaction_id": f"order_{order['external_id']}",
+            "stream": "POD",  # Defaulting to POD for now, logic can be smarter
+            "amount_cents": int(order["total_price"] * 100),
+            "currency": "USD",
+            "status": "CLEARED",
+            "provenance_meta": provenance
+        }
+
     def ingest_order(self, data: dict, provenance: dict):
         """Ingest an order permissively."""
         # Check if exists
@@ -21,32 +59,16 @@ class IngestionService:
             # Idempotency: Update or Skip
             return {"status": "skipped", "reason": "duplicate"}
 
-        # Hash PII
-        customer_email = data.get("email") or data.get("customer", {}).get("email")
-        
-        order = GrowthOrder(
-            external_id=str(data.get("id")),
-            source=provenance.get("origin_name", "unknown"),
-            status=data.get("status", "unknown"),
-            total_price=float(data.get("total_price", 0)),
-            currency=data.get("currency", "USD"),
-            customer_hash=self.hash_pii(customer_email),
-            items_json=data.get("line_items", []),
-            provenance_meta=provenance
-        )
+        order_row = self._order_row(data, provenance)
+        order = GrowthOrder(**order_row)
         self.db.add(order)
-        
-        # Auto-create Ledger Entry if paid
-        if order.status in ["paid", "fulfilled", "complete"]:
-             ledger = GrowthLedgerEntry(
-                 transaction_id=f"order_{order.external_id}",
-                 stream="POD",  # Defaulting to POD for now, logic can be smarter
-                 amount_cents=int(order.total_price * 100),
-                 status="CLEARED",
-                 provenance_meta=provenance
-             )
+
+        ledger_row = self._ledger_row(order_row, provenance)
+        if ledger_row:
+             ledger = GrowthLedgerEntry(**ledger_row)
              self.db.add(ledger)
-             
+             DailyRevenueRollup(self.db).record([ledger])
+
         self.db.commit()
         return {"status": "ingested", "id": order.id}
 
@@ -56,3 +78,175 @@ class IngestionService:
             return self.ingest_order(data, provenance)
         # Add other topics here
         return {"status": "ignored", "reason": f"unknown topic {topic}"}
+
+    # -- bulk intake -----------------------------------------------------
+
+    def ingest_orders_bulk(
+        self,
+        records: Iterable[dict],
+        provenance: Optional[dict] = None,
+        chunk_size: int = BULK_CHUNK_SIZE,
+        commit: bool = True,
+        start_index: int = 0,
+    ) -> Dict[str, Any]:
+        """
+        Ingest many orders in one transaction (webhook replays, exports).
+
+        Each record is an order dict, or ``{"data": ..., "provenance": ...}``
+        to override the shared provenance.  Per chunk, existing orders are
+        found with one ``IN`` query and new orders / ledger entries are
+        written with one multi-row insert each.  Returns a status per
+        record (``ingested``, ``skipped`` or ``error``), in input order.
+        With ``commit=False`` the caller owns the transaction.
+        """
+        provenance = provenance or {}
+        summary = {"processed": 0, "ingested": 0, "skipped": 0, "errors": 0, "results": []}
+        try:
+            for chunk in _chunked(enumerate(records, start_index), chunk_size):
+                for result in self._ingest_order_chunk(chunk, provenance):
+                    summary["processed"] += 1
+                    summary[{"ingested": "ingested", "skipped": "skipped"}.get(result["status"], "errors")] += 1
+                    summary["results"].append(result)
+            if commit:
+                self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return summary
+
+    def _ingest_order_chunk(self, chunk: List[Tuple[int, Any]], provenance: dict) -> List[Dict[str, Any]]:
+        results: Dict[int, Dict[str, Any]] = {}
+        candidates: List[Tuple[int, Dict[str, Any], dict]] = []
+        for index, record in chunk:
+            data, record_provenance = record, provenance
+            if isinstance(record, dict) and isinstance(record.get("data"), dict):
+                data, record_provenance = record["data"], record.get("provenance") or provenance
+            if isinstance(data, Exception):
+                results[index] = {"index": index, "status": "error", "reason": str(data)}
+                continue
+            if not isinstance(data, dict) or data.get("id") in (None, ""):
+                results[index] = {"index": index, "status": "error", "reason": "missing order id"}
+                continue
+            try:
+                candidates.append((index, self._order_row(data, record_provenance), record_provenance))
+            except (TypeError, ValueError, AttributeError) as e:
+                results[index] = {"index": index, "external_id": str(data.get("id")), "status": "error", "reason": str(e)}
+
+        external_ids = {row["external_id"] for _, row, _ in candidates}
+        existing = set()
+        existing_ledger = set()
+        if external_ids:
+            existing = set(self.db.execute(
+                select(GrowthOrder.external_id).where(GrowthOrder.external_id.in_(external_ids))
+            ).scalars())
+            existing_ledger = set(self.db.execute(
+                select(GrowthLedgerEntry.transaction_id).where(
+                    GrowthLedgerEntry.transaction_id.in_([f"order_{external_id}" for external_id in external_ids])
+                )
+            ).scalars())
+
+        order_rows: List[Dict[str, Any]] = []
+        ledger_rows: List[Dict[str, Any]] = []
+        now = datetime.utcnow()
+        for index, row, record_provenance in candidates:
+            external_id = row["external_id"]
+            if external_id in existing:
+                # Idempotency: already stored, or repeated earlier in this batch
+                results[index] = {"index": index, "external_id": external_id, "status": "skipped", "reason": "duplicate"}
+                continue
+            existing.add(external_id)
+            row["created_at"] = now
+            order_rows.append(row)
+            ledger_row = self._ledger_row(row, record_provenance)
+            if ledger_row and ledger_row["transaction_id"] not in existing_ledger:
+                ledger_row["created_at"] = now
+                ledger_rows.append(ledger_row)
+            results[index] = {"index": index, "external_id": external_id, "status": "ingested"}
+
+        if order_rows:
+            if self.db.get_bind().dialect.insert_executemany_returning:
+                ids = dict(
+                    (external_id, order_id) for order_id, external_id in self.db.execute(
+                        insert(GrowthOrder).returning(GrowthOrder.id, GrowthOrder.external_id), order_rows
+                    )
+                )
+                for result in results.values():
+                    if result["status"] == "ingested":
+                        result["id"] = ids.get(result["external_id"])
+            else:
+                self.db.execute(insert(GrowthOrder), order_rows)
+        if ledger_rows:
+            self.db.execute(insert(GrowthLedgerEntry), ledger_rows)
+            DailyRevenueRollup(self.db).record_rows(ledger_rows)
+
+        return [results[index] for index, _ in chunk]
+
+    def ingest_generic_bulk(self, topic: str, records: Iterable[dict], provenance: Optional[dict] = None, **kwargs) -> Dict[str, Any]:
+        """Bulk intake router."""
+        if topic == "orders":
+            return self.ingest_orders_bulk(records, provenance, **kwargs)
+        results = [
+            {"index": index, "status": "ignored", "reason": f"unknown topic {topic}"}
+            for index, _ in enumerate(records, kwargs.get("start_index", 0))
+        ]
+        return {"processed": len(results), "ingested": 0, "skipped": 0, "errors": 0, "results": results}
+
+    async def ingest_ndjson(
+        self,
+        topic: str,
+        body: AsyncIterator[bytes],
+        provenance: Optional[dict] = None,
+        chunk_size: int = BULK_CHUNK_SIZE,
+    ) -> Dict[str, Any]:
+        """
+        Ingest an NDJSON upload (one order per line) with ``ingest_generic_bulk``.
+        The body is spooled first (to disk past a few MB), then decoded line
+        by line and written in one transaction off the event loop, so a slow
+        uploader never holds the database write lock.
+        """
+        spool = await spool_body(body)
+        try:
+            summary = await asyncio.to_thread(
+                self.ingest_generic_bulk, topic, iter_ndjson(spool), provenance, chunk_size=chunk_size,
+            )
+        finally:
+            spool.close()
+        summary["ignored"] = sum(1 for r in summary["results"] if r["status"] == "ignored")
+        return summary
+
+def _chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+async def spool_body(chunks: AsyncIterator[bytes], max_memory: int = SPOOL_MAX_MEMORY) -> IO[bytes]:
+    """Receive a request body into a spooled temp file, rewound for reading."""
+    spool = tempfile.SpooledTemporaryFile(max_size=max_memory)
+    try:
+        async for chunk in chunks:
+            spool.write(chunk)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
+
+def iter_ndjson(lines: Iterable[bytes]) -> Iterator[Any]:
+    """
+    Decode NDJSON one line at a time.  Lines that are not valid JSON yield
+    a ``ValueError`` in their place so the caller can report them per record.
+    """
+    for line in lines:
+        if line.strip():
+            yield _decode_line(line)
+
+def _decode_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return ValueError(f"invalid JSON: {e}")
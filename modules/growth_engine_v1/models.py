@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, Text, func, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, JSON, Text, func, ForeignKey, Index
 from backend.core.database import Base
 from datetime import datetime
 
@@ -19,6 +19,22 @@ class GrowthLedgerEntry(Base, ProvenanceMixin):
     currency = Column(String, default="USD")
     status = Column(String, default="PENDING") # PENDING, CLEARED, DISPUTED
     payout_id = Column(Integer, ForeignKey("growth_payouts.id"), nullable=True)
+
+    __table_args__ = (
+        # Range scans by day (status = ? AND created_at >= ? AND created_at < ?)
+        Index("ix_growth_ledger_status_created_at", "status", "created_at"),
+    )
+
+class GrowthDailyRevenue(Base):
+    """Daily ledger totals per stream and status, maintained on every ledger write."""
+    __tablename__ = "growth_daily_revenue"
+
+    day = Column(Date, primary_key=True)
+    stream = Column(String, primary_key=True)
+    status = Column(String, primary_key=True)
+    amount_cents = Column(Integer, nullable=False, default=0)
+    entry_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
 class GrowthOrder(Base, ProvenanceMixin):
     """Permissive order intake."""
@@ -1,5 +1,6 @@
 from sqlalchemy.orm import Session
 from .models import GrowthLedgerEntry
+from .rollup import DailyRevenueRollup
 from typing import Dict, Any
 
 class MonetizationService:
@@ -47,6 +48,7 @@ class MonetizationService:
         )
         
         self.db.add(entry)
+        DailyRevenueRollup(self.db).record([entry])
         self.db.commit()
         
         return {"status": "ingested", "id": entry.id, "stream": stream, "amount": amount}
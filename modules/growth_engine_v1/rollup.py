@@ -0,0 +1,177 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, select, insert, inspect
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Optional, Tuple
+from .models import GrowthLedgerEntry, GrowthDailyRevenue
+
+UNKNOWN_STREAM = "UNKNOWN"
+
+class DailyRevenueRollup:
+    """
+    Maintains ``growth_daily_revenue``: one row per (day, stream, status)
+    holding the ledger total and entry count for that day.
+
+    Writers call ``record`` with the ledger entries they add, in the same
+    session and before commit, so the rollup and the ledger commit (or
+    roll back) together.  Dashboards read a handful of rollup rows
+    instead of scanning the ledger with ``date(created_at) = ?``.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    # -- writes ----------------------------------------------------------
+
+    def record(self, entries: Iterable[GrowthLedgerEntry]) -> int:
+        """Add new ledger entries to their day buckets. Returns rows touched."""
+        deltas: Dict[Tuple[date, str, str], list] = {}
+        for entry in entries:
+            if entry.created_at is None:
+                # Pin the timestamp so the ledger row and its bucket agree
+                entry.created_at = datetime.utcnow()
+            self._accumulate(deltas, entry.created_at, entry.stream, entry.status, entry.amount_cents)
+        if deltas:
+            self._apply(deltas)
+        return len(deltas)
+
+    def record_rows(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """Same as ``record`` for ledger rows inserted as plain dicts (bulk inserts)."""
+        deltas: Dict[Tuple[date, str, str], list] = {}
+        for row in rows:
+            if row.get("created_at") is None:
+                row["created_at"] = datetime.utcnow()
+            self._accumulate(deltas, row["created_at"], row.get("stream"), row.get("status"), row.get("amount_cents"))
+        if deltas:
+            self._apply(deltas)
+        return len(deltas)
+
+    @staticmethod
+    def _accumulate(deltas, created_at: datetime, stream: Optional[str], status: Optional[str], amount_cents: Optional[int]) -> None:
+        key = (created_at.date(), stream or UNKNOWN_STREAM, status or "PENDING")
+        bucket = deltas.setdefault(key, [0, 0])
+        bucket[0] += amount_cents or 0
+        bucket[1] += 1
+
+    def _apply(self, deltas: Dict[Tuple[date, str, str], list]) -> None:
+        rows = [
+            {"day": day, "stream": stream, "status": status, "amount_cents": amount, "entry_count": count}
+            for (day, stream, status), (amount, count) in deltas.items()
+        ]
+        dialect = self.db.get_bind().dialect.name
+        if dialect in ("sqlite", "postgresql"):
+            if dialect == "sqlite":
+                from sqlalchemy.dialects.sqlite import insert as dialect_insert
+            else:
+                from sqlalchemy.dialects.postgresql import insert as dialect_insert
+            stmt = dialect_insert(GrowthDailyRevenue)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["day", "stream", "status"],
+                set_={
+                    "amount_cents": GrowthDailyRevenue.amount_cents + stmt.excluded.amount_cents,
+                    "entry_count": GrowthDailyRevenue.entry_count + stmt.excluded.entry_count,
+                    "updated_at": func.now(),
+                },
+            )
+            self.db.execute(stmt, rows)
+            return
+
+        # Portable fallback: update the bucket, insert it if it did not exist
+        for row in rows:
+            updated = self.db.query(GrowthDailyRevenue).filter_by(
+                day=row["day"], stream=row["stream"], status=row["status"]
+            ).update({
+                GrowthDailyRevenue.amount_cents: GrowthDailyRevenue.amount_cents + row["amount_cents"],
+                GrowthDailyRevenue.entry_count: GrowthDailyRevenue.entry_count + row["entry_count"],
+            }, synchronize_session=False)
+            if not updated:
+                self.db.add(GrowthDailyRevenue(**row))
+        self.db.flush()
+
+    def clear(self) -> int:
+        """Drop every bucket (use alongside a ledger reset)."""
+        return self.db.query(GrowthDailyRevenue).delete(synchronize_session=False)
+
+    def rebuild(self) -> int:
+        """Recompute every bucket from the ledger. Returns the number of buckets."""
+        self.clear()
+        day = func.date(GrowthLedgerEntry.created_at)
+        stream = func.coalesce(GrowthLedgerEntry.stream, UNKNOWN_STREAM)
+        status = func.coalesce(GrowthLedgerEntry.status, "PENDING")
+        source = select(
+            day, stream, status,
+            func.sum(GrowthLedgerEntry.amount_cents),
+            func.count(GrowthLedgerEntry.id),
+        ).where(GrowthLedgerEntry.created_at.isnot(None)).group_by(day, stream, status)
+        self.db.execute(
+            insert(GrowthDailyRevenue).from_select(
+                ["day", "stream", "status", "amount_cents", "entry_count"], source
+            )
+        )
+        return self.db.query(func.count()).select_from(GrowthDailyRevenue).scalar() or 0
+
+    # -- reads -----------------------------------------------------------
+
+    def _query(self, *columns, status: Optional[str] = "CLEARED"):
+        query = self.db.query(*columns)
+        if status is not None:
+            query = query.filter(GrowthDailyRevenue.status == status)
+        return query
+
+    def day_total_cents(self, day: date, status: Optional[str] = "CLEARED") -> int:
+        return self._query(func.sum(GrowthDailyRevenue.amount_cents), status=status)\
+            .filter(GrowthDailyRevenue.day == day)\
+            .scalar() or 0
+
+    def day_entry_count(self, day: date, status: Optional[str] = None) -> int:
+        return self._query(func.sum(GrowthDailyRevenue.entry_count), status=status)\
+            .filter(GrowthDailyRevenue.day == day)\
+            .scalar() or 0
+
+    def daily_totals_cents(self, start: date, end: date, status: Optional[str] = "CLEARED") -> Dict[date, int]:
+        """Totals per day for ``start <= day <= end``."""
+        rows = self._query(GrowthDailyRevenue.day, func.sum(GrowthDailyRevenue.amount_cents), status=status)\
+            .filter(GrowthDailyRevenue.day >= start, GrowthDailyRevenue.day <= end)\
+            .group_by(GrowthDailyRevenue.day)\
+            .all()
+        return {day: cents or 0 for day, cents in rows}
+
+    def stream_totals_cents(self, day: date, status: Optional[str] = "CLEARED") -> Dict[str, int]:
+        rows = self._query(GrowthDailyRevenue.stream, func.sum(GrowthDailyRevenue.amount_cents), status=status)\
+            .filter(GrowthDailyRevenue.day == day)\
+            .group_by(GrowthDailyRevenue.stream)\
+            .all()
+        return {stream: cents or 0 for stream, cents in rows}
+
+def ensure_daily_revenue(bind) -> Dict[str, int]:
+    """
+    Migration: create the rollup table and the ledger (status, created_at)
+    index if missing, and rebuild the rollup from the ledger when their
+    entry counts or totals disagree (first run, or rows written around the
+    rollup).  Safe to run repeatedly.
+    """
+    GrowthDailyRevenue.__table__.create(bind=bind, checkfirst=True)
+    existing = {index["name"] for index in inspect(bind).get_indexes(GrowthLedgerEntry.__tablename__)}
+    created_index = 0
+    for index in GrowthLedgerEntry.__table__.indexes:
+        if index.name not in existing:
+            index.create(bind=bind)
+            created_index += 1
+
+    db = Session(bind=bind)
+    try:
+        rolled_up = db.query(
+            func.coalesce(func.sum(GrowthDailyRevenue.entry_count), 0),
+            func.coalesce(func.sum(GrowthDailyRevenue.amount_cents), 0),
+        ).one()
+        ledger = db.query(
+            func.count(GrowthLedgerEntry.id),
+            func.coalesce(func.sum(GrowthLedgerEntry.amount_cents), 0),
+        ).filter(GrowthLedgerEntry.created_at.isnot(None)).one()
+        entries = db.query(func.count(GrowthLedgerEntry.id)).scalar()
+        backfilled = 0
+        if tuple(rolled_up) != tuple(ledger):
+            backfilled = DailyRevenueRollup(db).rebuild()
+            db.commit()
+        return {"indexes_created": created_index, "buckets_backfilled": backfilled, "ledger_entries": entries}
+    finally:
+        db.close()
@@ -11,12 +11,26 @@ from datetime import datetime, timedelta
 from pathlib import Path
 import hashlib
 
+try:
+    from backend.services.incremental_backup import IncrementalBackupEngine
+except ImportError:
+    IncrementalBackupEngine = None
+
 class BackupManager:
+    DATABASES = [
+        'youtube_projects.db',
+        'revenue_tracker.db',
+        'evidence_master.db'
+    ]
+    
     def __init__(self):
         self.backup_dir = Path("backups")
         self.backup_dir.mkdir(exist_ok=True)
         self.config_file = "config/backup_config.json"
         self.load_config()
+        self.engine = None
+        if self.config['incremental'] and IncrementalBackupEngine is not None:
+            self.engine = IncrementalBackupEngine(self.backup_dir / "store")
     
     def load_config(self):
         """Load backup configuration"""
@@ -28,6 +42,7 @@ class BackupManager:
             "include_evidence": True,
             "include_databases": True,
             "include_config": True,
+            "incremental": True,
             "compression_level": 6
         }
         
@@ -53,6 +68,9 @@ class BackupManager:
     def create_backup(self, backup_name=None, include_outputs=None):
         """Create a complete system backup"""
         
+        if self.engine is not None:
+            return self._create_incremental_backup(backup_name, include_outputs)
+        
         if backup_name is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             backup_name = f"backup_{timestamp}"
@@ -103,17 +121,48 @@ class BackupManager:
                 backup_path.unlink()
             return None
     
+    def _create_incremental_backup(self, backup_name=None, include_outputs=None):
+        """Snapshot into the deduplicated store; unchanged files and pages are not rewritten"""
+        
+        print(f"🔄 Creating incremental backup{': ' + backup_name if backup_name else ''}")
+        
+        databases = []
+        if self.config['include_databases']:
+            databases = [db_file for db_file in self.DATABASES if os.path.exists(db_file)]
+        paths = []
+        if self.config['include_config']:
+            paths.append("config")
+        if include_outputs or self.config['include_outputs']:
+            paths.append("outputs")
+        if self.config['include_evidence']:
+            paths.append("evidence")
+        paths = [path for path in paths if os.path.exists(path)]
+        
+        try:
+            report = self.engine.create_backup(databases=databases, paths=paths, label=backup_name)
+        except Exception as e:
+            print(f"❌ Backup failed: {e}")
+            return None
+        
+        print(f"✅ Backup created successfully: {report['backup_id']}")
+        print(f"📊 Logical size: {report['logical_bytes'] / (1024 * 1024):.1f} MB, "
+              f"written: {report['bytes_written'] / (1024 * 1024):.2f} MB "
+              f"({report['chunks_new']}/{report['chunks_total']} new chunks, "
+              f"{report['files_unchanged']} files unchanged)")
+        
+        if self.config['max_backups'] > 0:
+            self.engine.prune(keep_last=self.config['max_backups'])
+        
+        return report['backup_id']
+    
+    def _is_incremental(self, backup_name):
+        return self.engine is not None and (self.engine.manifests_dir / f"{backup_name}.json").exists()
+    
     def _backup_databases(self, zipf):
         """Backup database files"""
         print("   📊 Backing up databases...")
         
-        db_files = [
-            'youtube_projects.db',
-            'revenue_tracker.db',
-            'evidence_master.db'
-        ]
-        
-        for db_file in db_files:
+        for db_file in self.DATABASES:
             if os.path.exists(db_file):
                 # Create a backup copy to ensure consistency
                 temp_backup = f"temp_{db_file}"
@@ -211,7 +260,7 @@ class BackupManager:
         backup_files = list(self.backup_dir.glob("backup_*.zip"))
         backup_files.sort(key=lambda x: x.stat().st_mtime, reverse=True)
         
-        if not backup_files:
+        if not backup_files and not (self.engine and self.engine.list_backups()):
             print("📦 No backups found")
             return []
         
@@ -248,6 +297,22 @@ class BackupManager:
             except Exception as e:
                 print(f"❌ Error reading {backup_file.name}: {e}")
         
+        if self.engine is not None:
+            for backup in self.engine.list_backups():
+                backups.append({
+                    "name": backup["backup_id"],
+                    "label": backup["label"],
+                    "size_mb": backup["bytes_written"] / (1024 * 1024),
+                    "logical_size_mb": backup["logical_bytes"] / (1024 * 1024),
+                    "created": datetime.fromisoformat(backup["created_at"]),
+                    "metadata": None
+                })
+                print(f"📁 {backup['backup_id']} (incremental{', ' + backup['label'] if backup['label'] else ''})")
+                print(f"   📅 Created: {backup['created_at']}")
+                print(f"   📊 Written: {backup['bytes_written'] / (1024 * 1024):.2f} MB of "
+                      f"{backup['logical_bytes'] / (1024 * 1024):.1f} MB")
+                print()
+        
         return backups
     
     def _read_backup_metadata(self, backup_path):
@@ -267,6 +332,9 @@ class BackupManager:
         if restore_path is None:
             restore_path = "."
         
+        if self._is_incremental(backup_name):
+            return self._restore_incremental(backup_name, restore_path)
+        
         backup_file = self.backup_dir / f"{backup_name}.zip"
         
         if not backup_file.exists():
@@ -290,7 +358,7 @@ class BackupManager:
                 # Read metadata
                 metadata = self._read_backup_metadata(backup_file)
                 
-                print(f"✅ Backup restored successfully")
+                print("✅ Backup restored successfully")
                 if metadata:
                     print(f"📊 Restored {metadata.get('file_count', 'unknown')} files")
                     print(f"📅 Backup created: {metadata.get('created_at', 'unknown')}")
@@ -301,9 +369,39 @@ class BackupManager:
             print(f"❌ Restore failed: {e}")
             return False
     
-    def verify_backup(self, backup_name):
+    def _restore_incremental(self, backup_name, restore_path):
+        """Restore an incremental backup; every file is checksum-verified before it is moved into place"""
+        print(f"🔄 Restoring backup: {backup_name}")
+        print(f"📁 Restore location: {restore_path}")
+        
+        confirm = input("⚠️ This will overwrite existing files. Continue? (y/N): ")
+        if confirm.lower() not in ['y', 'yes']:
+            print("❌ Restore cancelled")
+            return False
+        
+        try:
+            result = self.engine.restore(backup_name, restore_path)
+            print(f"✅ Backup restored successfully")
+            print(f"📊 Restored {result['count']} files")
+            return True
+        except Exception as e:
+            print(f"❌ Restore failed: {e}")
+            return False
+    
+    def verify_backup(self, backup_name, full=True):
         """Verify backup integrity"""
         
+        if self._is_incremental(backup_name):
+            print(f"🔍 Verifying backup: {backup_name}")
+            result = self.engine.verify(backup_name, full=full)
+            if not result['ok']:
+                print(f"❌ Backup corrupted: {len(result['missing_chunks'])} missing, "
+                      f"{len(result['corrupt_chunks'])} corrupt chunks")
+                return False
+            print("✅ Backup verified successfully")
+            print(f"📊 Files: {result['entries']}")
+            return True
+        
         backup_file = self.backup_dir / f"{backup_name}.zip"
         
         if not backup_file.exists():
@@ -347,6 +445,18 @@ class BackupManager:
         if not self.config['auto_backup']:
             return False
         
+        if self.engine is not None:
+            backups = self.engine.list_backups()
+            if not backups:
+                print("🔄 No previous backups found, creating initial backup...")
+                return True
+            backup_age = datetime.utcnow() - datetime.fromisoformat(backups[0]["created_at"])
+            hours_since_backup = backup_age.total_seconds() / 3600
+            if hours_since_backup >= self.config['backup_interval_hours']:
+                print(f"🔄 Last backup was {hours_since_backup:.1f} hours ago, creating new backup...")
+                return True
+            return False
+        
         # Find most recent backup
         backup_files = list(self.backup_dir.glob("backup_*.zip"))
         
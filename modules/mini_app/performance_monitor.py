@@ -20,6 +20,8 @@ class PerformanceMonitor:
         self.alerts = []
         self.config = self.load_config()
         self.db_path = "performance_metrics.db"
+        # One Process object, so cpu_percent() measures since the previous sample
+        self._process = psutil.Process()
         self.init_database()
         
     def load_config(self):
@@ -85,6 +87,9 @@ class PerformanceMonitor:
             return
         
         print("🔍 Starting performance monitoring...")
+        # Prime the CPU counters; later readings cover one monitor interval
+        psutil.cpu_percent(interval=None)
+        self._process.cpu_percent(interval=None)
         self.monitoring = True
         self.monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
         self.monitor_thread.start()
@@ -106,12 +111,18 @@ class PerformanceMonitor:
         """Main monitoring loop"""
         while self.monitoring:
             try:
+                started = time.perf_counter()
+                
                 # Collect system metrics
                 self._collect_system_metrics()
                 
                 # Collect application metrics
                 self._collect_application_metrics()
                 
+                # The monitor's own cost per collection
+                self._record_metric("application", "monitor_overhead", 
+                                  (time.perf_counter() - started) * 1000, "ms", datetime.now())
+                
                 # Check for alerts
                 if self.config['enable_alerts']:
                     self._check_alerts()
@@ -129,7 +140,8 @@ class PerformanceMonitor:
         
         try:
             # CPU metrics
-            cpu_percent = psutil.cpu_percent(interval=1)
+            # Average since the previous collection; never sleeps
+            cpu_percent = psutil.cpu_percent(interval=None)
             cpu_count = psutil.cpu_count()
             cpu_freq = psutil.cpu_freq()
             
@@ -173,11 +185,11 @@ class PerformanceMonitor:
             self._collect_filesystem_metrics(timestamp)
             
             # Process metrics
-            current_process = psutil.Process()
+            current_process = self._process
             self._record_metric("application", "process_memory", 
                               current_process.memory_info().rss / (1024**2), "MB", timestamp)
             self._record_metric("application", "process_cpu", 
-                              current_process.cpu_percent(), "%", timestamp)
+                              current_process.cpu_percent(interval=None), "%", timestamp)
             
         except Exception as e:
             print(f"Error collecting application metrics: {e}")
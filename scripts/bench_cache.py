@@ -0,0 +1,68 @@
+"""Microbenchmark for backend.utils.cache set/get throughput.
+
+Usage:
+    python scripts/bench_cache.py --sizes 10000 100000 1000000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.getcwd())
+
+from backend.utils.cache import CacheManager
+
+
+async def bench_size(entries: int, max_bytes: int = None) -> dict:
+    # Cap the cache at half the key space so the second half of the inserts
+    # exercises eviction on every set().
+    cache = CacheManager(max_size=max(1, entries // 2), default_ttl=3600, max_bytes=max_bytes)
+    keys = [f"analytics:video:{i}" for i in range(entries)]
+    payload = {"views": 1234, "likes": 56, "title": "benchmark"}
+
+    start = time.perf_counter()
+    for key in keys:
+        await cache.set(key, payload)
+    set_elapsed = time.perf_counter() - start
+
+    lookups = random.Random(42).choices(keys, k=entries)
+    start = time.perf_counter()
+    for key in lookups:
+        await cache.get(key)
+    get_elapsed = time.perf_counter() - start
+
+    stats = await cache.get_stats()
+    return {
+        "entries": entries,
+        "set_ops_per_sec": round(entries / set_elapsed),
+        "get_ops_per_sec": round(entries / get_elapsed),
+        "set_us_per_op": round(set_elapsed / entries * 1e6, 3),
+        "get_us_per_op": round(get_elapsed / entries * 1e6, 3),
+        "evictions": stats["stats"]["evictions"],
+        "hit_rate": stats["hit_rate"],
+        "estimated_mb": stats["memory_usage"]["estimated_mb"],
+    }
+
+
+async def run(sizes, max_bytes):
+    results = []
+    for size in sizes:
+        result = await bench_size(size, max_bytes=max_bytes)
+        print(json.dumps(result))
+        results.append(result)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark CacheManager set/get throughput.")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--max-bytes", dest="max_bytes", type=int, default=None)
+    args = parser.parse_args()
+    asyncio.run(run(args.sizes, args.max_bytes))
+
+
+if __name__ == "__main__":
+    main()
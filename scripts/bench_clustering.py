@@ -0,0 +1,105 @@
+"""Benchmark full refit vs incremental update for content performance clustering.
+
+For each channel size the script times:
+  * full      - StandardScaler.fit_transform + KMeans.fit_predict on all videos
+                (what _cluster_content_performance does in "full" mode)
+  * seed      - first incremental fit of a ChannelClusterModel
+  * update    - folding in --new-videos unseen videos and relabelling all videos
+  * assign    - assigning one new video to its nearest centroid
+
+Usage:
+    python scripts/bench_clustering.py --sizes 10000 100000 --new-videos 100
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.getcwd())
+
+import numpy as np
+from sklearn.cluster import KMeans
+from sklearn.preprocessing import StandardScaler
+
+from backend.ai_modules.incremental_clustering import ChannelClusterModel
+
+
+def synthetic_features(count: int, rng: np.random.Generator) -> np.ndarray:
+    return np.column_stack([
+        rng.lognormal(8, 1.5, count),       # views
+        rng.beta(2, 40, count),             # engagement
+        rng.beta(4, 6, count),              # retention
+        rng.integers(60, 3600, count),      # duration
+        rng.integers(10, 90, count),        # title length
+        rng.integers(0, 2000, count),       # description length
+    ]).astype(np.float64)
+
+
+def timed(func, repeat: int = 1):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def bench_size(count: int, new_videos: int, repeat: int) -> dict:
+    rng = np.random.default_rng(42)
+    features = synthetic_features(count + new_videos, rng)
+    base, extra = features[:count], features[count:]
+    keys = list(range(count + new_videos))
+
+    def full_refit():
+        scaled = StandardScaler().fit_transform(features)
+        return KMeans(n_clusters=5, random_state=42).fit_predict(scaled)
+
+    full_seconds, _ = timed(full_refit, repeat)
+
+    model = ChannelClusterModel(n_clusters=5)
+    seed_seconds, _ = timed(lambda: model.update(base, keys[:count]))
+
+    def incremental_update():
+        model.seen.difference_update(keys[count:])  # make the new videos unseen again
+        model.update(features, keys)
+        return model.predict(features)
+
+    update_seconds, _ = timed(incremental_update, repeat)
+
+    video = {
+        "views": float(extra[0][0]), "engagement_rate": float(extra[0][1]),
+        "retention_rate": float(extra[0][2]), "duration": float(extra[0][3]),
+        "title": "x" * int(extra[0][4]), "description": "x" * int(extra[0][5]),
+    }
+    assignments = 2000
+    start = time.perf_counter()
+    for _ in range(assignments):
+        model.assign(video)
+    assign_seconds = (time.perf_counter() - start) / assignments
+
+    return {
+        "videos": count,
+        "new_videos": new_videos,
+        "full_refit_ms": round(full_seconds * 1000, 2),
+        "incremental_seed_ms": round(seed_seconds * 1000, 2),
+        "incremental_update_ms": round(update_seconds * 1000, 2),
+        "speedup": round(full_seconds / update_seconds, 1),
+        "single_assign_us": round(assign_seconds * 1e6, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--new-videos", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for count in args.sizes:
+        print(json.dumps(bench_size(count, args.new_videos, args.repeat)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Benchmark the pooled SMTP transport against connect-per-message sends.
+
+Starts a local SMTP sink whose --connect-delay stands in for the TCP +
+STARTTLS + AUTH handshake of a real provider, then sends --emails messages
+through the previous path (new connection and login per message, one at
+a time) and through SmtpConnectionPool (--pool-size sessions, optional
+--rate limit).  Reports emails per second and per-message latency.
+
+Usage:
+    python scripts/bench_email_transport.py --emails 500 --connect-delay 0.08
+"""
+import argparse
+import asyncio
+import json
+import os
+import smtplib
+import sys
+import time
+
+sys.path.append(os.getcwd())
+
+from backend.services.email_transport import SmtpConnectionPool, SmtpSettings
+from backend.tests.smtp_sink import SmtpSink
+
+
+def summarize(name, latencies, total):
+    latencies.sort()
+    return {
+        "path": name,
+        "emails": len(latencies),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95)] * 1000, 2),
+        "emails_per_sec": round(len(latencies) / total, 1),
+    }
+
+
+def legacy_send(settings, message):
+    """The previous _send_email: one session, login and QUIT per message."""
+    with smtplib.SMTP(settings.host, settings.port) as server:
+        server.login(settings.username, settings.password)
+        server.send_message(message)
+
+
+async def main_async(args):
+    results = []
+    with SmtpSink(connect_delay=args.connect_delay, message_delay=args.message_delay) as sink:
+        settings = SmtpSettings("127.0.0.1", sink.port, "bench@example.com", "secret", "bench@example.com", starttls=False)
+        pool = SmtpConnectionPool(settings, size=args.pool_size, max_per_second=args.rate)
+        messages = [pool.build_message(f"buyer{i}@example.com", f"Order {i}", "Your download is ready.") for i in range(args.emails)]
+
+        started = time.perf_counter()
+        outcomes = await pool.send_batch_async(messages)
+        total = time.perf_counter() - started
+        latencies = [outcome for outcome in outcomes if isinstance(outcome, float)]
+        results.append(summarize("pooled", latencies, total))
+        results[-1]["failed"] = len(outcomes) - len(latencies)
+        results[-1]["transport"] = pool.get_stats()
+        pool.close()
+
+        legacy = min(args.emails, args.legacy_emails)
+        latencies = []
+        started = time.perf_counter()
+        for message in messages[:legacy]:
+            t0 = time.perf_counter()
+            legacy_send(settings, message)
+            latencies.append(time.perf_counter() - t0)
+        results.append(summarize("connect_per_message", latencies, time.perf_counter() - started))
+        results[-1]["sink_sessions"] = sink.sessions
+
+    for result in results:
+        print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--emails", type=int, default=500)
+    parser.add_argument("--legacy-emails", type=int, default=100)
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=0, help="Max emails/sec for the pool (0 = unlimited)")
+    parser.add_argument("--connect-delay", type=float, default=0.08, help="Simulated handshake cost per session (s)")
+    parser.add_argument("--message-delay", type=float, default=0.005, help="Simulated server time per message (s)")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
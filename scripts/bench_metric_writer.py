@@ -0,0 +1,86 @@
+"""Benchmark PerformanceAnalytics.record_metric with the write-behind writer.
+
+Records --metrics metrics as fast as possible from the event loop and
+reports the per-call latency (what a request pays) and the end-to-end
+rate including the final flush, against the previous connect-and-commit-
+per-row path.
+
+Usage:
+    python scripts/bench_metric_writer.py --metrics 20000
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.getcwd())
+
+from backend.analytics.performance_analytics import PerformanceAnalytics, create_performance_tables
+from backend.database import get_db_connection
+
+
+async def legacy_record(metric_row):
+    """The previous _store_metric_to_db: one connection and commit per row."""
+    with get_db_connection() as conn:
+        conn.execute("""
+            INSERT OR IGNORE INTO performance_metrics
+            (timestamp, metric_name, value, component, tags)
+            VALUES (?, ?, ?, ?, ?)
+        """, metric_row)
+        conn.commit()
+
+
+def summarize(name, latencies, total):
+    latencies.sort()
+    return {
+        "path": name,
+        "metrics": len(latencies),
+        "p50_us": round(latencies[len(latencies) // 2] * 1e6, 1),
+        "p99_us": round(latencies[int(len(latencies) * 0.99)] * 1e6, 1),
+        "metrics_per_sec": round(len(latencies) / total),
+    }
+
+
+async def main_async(args):
+    results = []
+    analytics = PerformanceAnalytics()
+    latencies = []
+    started = time.perf_counter()
+    for i in range(args.metrics):
+        t0 = time.perf_counter()
+        await analytics.record_metric("response_time", float(i), "bench", {"i": str(i % 10)})
+        latencies.append(time.perf_counter() - t0)
+    await analytics.shutdown()
+    results.append(summarize("write_behind", latencies, time.perf_counter() - started))
+    results[-1]["writer"] = analytics.get_writer_stats()
+
+    legacy = min(args.metrics, args.legacy_metrics)
+    latencies = []
+    started = time.perf_counter()
+    for i in range(legacy):
+        t0 = time.perf_counter()
+        await legacy_record(("2026-01-01T00:00:00", "response_time", float(i), "bench", "{}"))
+        latencies.append(time.perf_counter() - t0)
+    results.append(summarize("connect_per_row", latencies, time.perf_counter() - started))
+
+    for result in results:
+        print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--metrics", type=int, default=20000)
+    parser.add_argument("--legacy-metrics", type=int, default=2000)
+    args = parser.parse_args()
+    if "DATABASE_URL" not in os.environ:
+        os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench_metrics.db"
+    with get_db_connection() as conn:
+        create_performance_tables(conn)
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -475,9 +475,15 @@ def operate_deliveries():
             missing.append({"sku": sku, "expected": info.get("file", "")})
     
     # Check delivery queue
+    queue_db = Path(os.getenv("DELIVERY_QUEUE_DB", str(ROOT / "logs" / "delivery_queue.sqlite")))
     queue_file = ROOT / "logs" / "delivery_queue.jsonl"
     queue_count = 0
-    if queue_file.exists():
+    if queue_db.exists():
+        from backend.services.delivery_queue import DeliveryQueue
+        queue = DeliveryQueue(queue_db)
+        queue_count = queue.stats()["pending"]
+        queue.close()
+    elif queue_file.exists():
         queue_count = sum(1 for _ in queue_file.read_text().splitlines() if _.strip())
     
     # Check processed orders
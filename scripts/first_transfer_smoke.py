@@ -2,8 +2,15 @@ import os
 import sys
 import time
 import json
+from pathlib import Path
+
 import requests
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.services.delivery_queue import DeliveryQueue
+from backend.services.delivery_service import DELIVERY_QUEUE_DB
+
 
 def _read_log_tail(path: str) -> str:
     try:
@@ -14,6 +21,16 @@ def _read_log_tail(path: str) -> str:
         return ""
 
 
+def _queue_summary() -> dict:
+    if not DELIVERY_QUEUE_DB.exists():
+        return {}
+    queue = DeliveryQueue(DELIVERY_QUEUE_DB)
+    try:
+        return {"stats": queue.stats(), "dead": queue.dead_letters(limit=5)}
+    finally:
+        queue.close()
+
+
 def main() -> int:
     base_url = os.getenv("BASE_URL", "http://localhost:8000").rstrip("/")
     sku = os.getenv("SMOKE_SKU", "ZEN-ART-BASE")
@@ -70,10 +87,9 @@ def main() -> int:
     print("== Step 3: Inspect delivery logs ==")
     data_dir = os.getenv("DATA_DIR", ".")
     orders_log = os.path.join(data_dir, "logs", "shopier_orders.jsonl")
-    queue_log = os.path.join(data_dir, "logs", "delivery_queue.jsonl")
 
     orders_tail = _read_log_tail(orders_log)
-    queue_tail = _read_log_tail(queue_log)
+    queue_summary = _queue_summary()
 
     if orders_tail:
         print("shopier_orders.jsonl tail:")
@@ -81,11 +97,11 @@ def main() -> int:
     else:
         print("shopier_orders.jsonl not found or empty.")
 
-    if queue_tail:
-        print("delivery_queue.jsonl tail:")
-        print(queue_tail)
+    if queue_summary:
+        print(f"delivery queue ({DELIVERY_QUEUE_DB}):")
+        print(json.dumps(queue_summary, indent=2))
     else:
-        print("delivery_queue.jsonl not found or empty.")
+        print(f"delivery queue not found at {DELIVERY_QUEUE_DB}.")
 
     print("Smoke test complete.")
     return 0
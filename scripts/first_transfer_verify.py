@@ -2,7 +2,14 @@ import json
 import os
 import sqlite3
 import subprocess
+import sys
 from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.services.delivery_queue import DeliveryQueue
+from backend.services.delivery_service import DELIVERY_QUEUE_DB
 
 
 def _read_jsonl_tail(path: str, limit: int = 5) -> list[dict]:
@@ -20,6 +27,16 @@ def _read_jsonl_tail(path: str, limit: int = 5) -> list[dict]:
         return []
 
 
+def _queue_summary() -> dict:
+    if not DELIVERY_QUEUE_DB.exists():
+        return {"status": "missing", "path": str(DELIVERY_QUEUE_DB)}
+    queue = DeliveryQueue(DELIVERY_QUEUE_DB)
+    try:
+        return {"path": str(DELIVERY_QUEUE_DB), "stats": queue.stats(), "dead": queue.dead_letters(limit=5)}
+    finally:
+        queue.close()
+
+
 def _read_json(path: str) -> dict:
     try:
         with open(path, "r", encoding="utf-8") as handle:
@@ -91,7 +108,6 @@ def _read_cloud_run_logs(project_id: str, service: str) -> str:
 def main() -> None:
     data_dir = os.getenv("DATA_DIR", ".")
     orders_log = os.path.join(data_dir, "logs", "shopier_orders.jsonl")
-    queue_log = os.path.join(data_dir, "logs", "delivery_queue.jsonl")
     earnings_path = os.path.join(data_dir, "earnings.json")
     growth_db = os.getenv("GROWTH_DATABASE_URL", "sqlite:///./growth_engine.db").replace(
         "sqlite:///", ""
@@ -99,8 +115,7 @@ def main() -> None:
 
     print("== Delivery Logs ==")
     orders_tail = _read_jsonl_tail(orders_log)
-    queue_tail = _read_jsonl_tail(queue_log)
-    print(json.dumps({"orders_tail": orders_tail, "queue_tail": queue_tail}, indent=2))
+    print(json.dumps({"orders_tail": orders_tail, "delivery_queue": _queue_summary()}, indent=2))
 
     print("\n== Earnings Ledger ==")
     earnings = _read_json(earnings_path)
@@ -12,6 +12,20 @@ from datetime import datetime
 # Add project root to path
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
+from sqlalchemy import create_engine
+
+from modules.growth_engine_v1.rollup import ensure_daily_revenue
+
+# Same bucket DailyRevenueRollup.record would touch for the ledger row
+ROLLUP_UPSERT = """
+    INSERT INTO growth_daily_revenue (day, stream, status, amount_cents, entry_count, updated_at)
+    VALUES (date(?), ?, ?, ?, 1, CURRENT_TIMESTAMP)
+    ON CONFLICT (day, stream, status) DO UPDATE SET
+        amount_cents = amount_cents + excluded.amount_cents,
+        entry_count = entry_count + 1,
+        updated_at = CURRENT_TIMESTAMP
+"""
+
 def sync():
     print("🚀 [GLOBAL SYNC] Initiating Financial Reconciliation...")
     
@@ -47,7 +61,14 @@ def sync():
         print("✅ No pending real events to sync.")
         return
 
-    # 2. Ingest into Growth Engine Ledger
+    # Dashboards read growth_daily_revenue; make sure it exists and is current
+    growth_engine = create_engine(f"sqlite:///{GROWTH_DB}")
+    try:
+        ensure_daily_revenue(growth_engine)
+    finally:
+        growth_engine.dispose()
+
+    # 2. Ingest into Growth Engine Ledger (and its daily rollup, same transaction)
     conn_gr = sqlite3.connect(str(GROWTH_DB))
     cursor_gr = conn_gr.cursor()
     
@@ -107,6 +128,8 @@ def sync():
                 occurred_at,
                 occurred_at
             ))
+            if occurred_at:
+                cursor_gr.execute(ROLLUP_UPSERT, (occurred_at, stream, "CLEARED", amount_cents))
             
             synced_count += 1
             total_value += float(amount)
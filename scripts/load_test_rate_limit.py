@@ -0,0 +1,149 @@
+"""Load test for RateLimitMiddleware overhead with many distinct clients.
+
+Requests are driven straight through the ASGI app (no sockets), round-robin
+over --clients distinct IPs, so the numbers isolate middleware cost.  Each
+configuration is timed per request; the report gives p50/p99 latency and
+the p99 overhead relative to the same app without rate limiting.
+
+Usage:
+    python scripts/load_test_rate_limit.py --clients 10000 --requests 100000
+    python scripts/load_test_rate_limit.py --legacy          # include the old list-of-timestamps limiter
+    python scripts/load_test_rate_limit.py --backend-url redis://localhost:6379
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Callable
+
+sys.path.append(os.getcwd())
+
+from fastapi import FastAPI, Request, Response
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from backend.core.middleware import RateLimitMiddleware
+
+
+class LegacyRateLimitMiddleware(BaseHTTPMiddleware):
+    """The previous implementation, kept here only as a baseline."""
+
+    def __init__(self, app, calls: int = 100, period: int = 60):
+        super().__init__(app)
+        self.calls = calls
+        self.period = period
+        self.clients = {}
+
+    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        client_ip = request.client.host
+        current_time = time.time()
+        self.clients = {
+            ip: times for ip, times in self.clients.items()
+            if any(t > current_time - self.period for t in times)
+        }
+        if client_ip in self.clients:
+            recent_calls = [t for t in self.clients[client_ip] if t > current_time - self.period]
+            if len(recent_calls) >= self.calls:
+                return Response(content=json.dumps({"error": "Rate limit exceeded"}), status_code=429)
+            self.clients[client_ip] = recent_calls + [current_time]
+        else:
+            self.clients[client_ip] = [current_time]
+        return await call_next(request)
+
+
+def build_app(middleware=None, **options) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/ping")
+    async def ping():
+        return {"ok": True}
+
+    if middleware is not None:
+        app.add_middleware(middleware, **options)
+    return app
+
+
+async def drive(app, clients: int, requests: int, api_keys: int = 0) -> dict:
+    statuses = {}
+    state = {"body_sent": False, "done": None}
+
+    async def receive():
+        # One empty body, then block until the response is finished: a
+        # receive() that keeps returning would spin disconnect listeners
+        if not state["body_sent"]:
+            state["body_sent"] = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await state["done"].wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses[message["status"]] = statuses.get(message["status"], 0) + 1
+        elif message["type"] == "http.response.body" and not message.get("more_body"):
+            state["done"].set()
+
+    latencies = []
+    for i in range(requests):
+        client = i % clients
+        headers = [(b"host", b"bench")]
+        if api_keys and client < api_keys:
+            headers.append((b"x-api-key", f"key-{client}".encode()))
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+            "method": "GET", "scheme": "http", "path": "/api/ping", "raw_path": b"/api/ping",
+            "query_string": b"", "root_path": "", "headers": headers,
+            "client": (f"10.{client >> 16 & 255}.{client >> 8 & 255}.{client & 255}", 40000),
+            "server": ("bench", 80),
+        }
+        state["body_sent"], state["done"] = False, asyncio.Event()
+        start = time.perf_counter()
+        await app(scope, receive, send)
+        latencies.append(time.perf_counter() - start)
+
+    latencies.sort()
+    return {
+        "p50_us": round(latencies[len(latencies) // 2] * 1e6, 1),
+        "p99_us": round(latencies[int(len(latencies) * 0.99)] * 1e6, 1),
+        "max_us": round(latencies[-1] * 1e6, 1),
+        "req_per_sec": round(len(latencies) / sum(latencies)),
+        "statuses": statuses,
+    }
+
+
+async def main_async(args):
+    configs = [("baseline", build_app())]
+    options = dict(calls=1000, period=60, route_limits={"/api/": (1000, 60)})
+    if args.api_keys:
+        options["api_key_limits"] = {f"key-{i}": (2000, 60) for i in range(args.api_keys)}
+    if args.backend_url:
+        options["backend_url"] = args.backend_url
+    configs.append(("sliding_window", build_app(RateLimitMiddleware, **options)))
+    if args.legacy:
+        configs.append(("legacy", build_app(LegacyRateLimitMiddleware, calls=1000, period=60)))
+
+    results = {}
+    for name, app in configs:
+        requests = args.requests if name != "legacy" else min(args.requests, args.legacy_requests)
+        await drive(app, args.clients, min(requests, 2000), args.api_keys)  # warm up
+        results[name] = await drive(app, args.clients, requests, args.api_keys)
+
+    baseline_p99 = results["baseline"]["p99_us"]
+    for name, result in results.items():
+        result["p99_overhead_us"] = round(result["p99_us"] - baseline_p99, 1)
+        print(json.dumps({"config": name, "clients": args.clients, **result}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=100000)
+    parser.add_argument("--api-keys", type=int, default=1000, help="clients that send a known API key")
+    parser.add_argument("--backend-url", default=None, help="e.g. redis://localhost:6379 for the shared backend")
+    parser.add_argument("--legacy", action="store_true", help="also time the previous implementation")
+    parser.add_argument("--legacy-requests", type=int, default=20000)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Migration: daily revenue rollup for the Growth Engine ledger.
+
+Creates ``growth_daily_revenue`` and the ledger (status, created_at) index
+if they are missing, then backfills the rollup from the existing ledger.
+
+Usage:
+  python scripts/migrate_growth_daily_revenue.py
+  python scripts/migrate_growth_daily_revenue.py --rebuild   # recompute every bucket
+  python scripts/migrate_growth_daily_revenue.py --database-url sqlite:///./growth_engine.db
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.getcwd())
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from modules.growth_engine_v1.config import settings
+from modules.growth_engine_v1.rollup import DailyRevenueRollup, ensure_daily_revenue
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create and backfill the growth daily revenue rollup")
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--rebuild", action="store_true", help="Recompute all buckets even if the rollup is populated")
+    args = parser.parse_args()
+
+    connect_args = {"check_same_thread": False} if args.database_url.startswith("sqlite") else {}
+    engine = create_engine(args.database_url, connect_args=connect_args)
+
+    started = time.perf_counter()
+    result = ensure_daily_revenue(engine)
+    if args.rebuild:
+        with Session(bind=engine) as db:
+            result["buckets_backfilled"] = DailyRevenueRollup(db).rebuild()
+            db.commit()
+    result["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -118,6 +118,64 @@ async def _publish_products(
     print(f"Shopify publication complete. Items processed: {created}")
 
 
+def _select_products(
+    products: List[Dict[str, Any]],
+    skus: Optional[List[str]],
+    limit: Optional[int]
+) -> List[Dict[str, Any]]:
+    selected = []
+    for product in products:
+        if "shopify" not in product.get("channels", []):
+            continue
+        if skus and product.get("sku") not in skus:
+            continue
+        selected.append(product)
+        if limit and len(selected) >= limit:
+            break
+    return selected
+
+
+async def _publish_bulk(
+    shopify_service,
+    products: List[Dict[str, Any]],
+    backend_url: Optional[str],
+    status: str,
+    vendor: Optional[str],
+    limit: Optional[int],
+    skus: Optional[List[str]],
+    dry_run: bool,
+    update_images: bool,
+    batch_size: int,
+    concurrency: int,
+    force: bool
+) -> Dict[str, Any]:
+    payloads = [
+        _build_payload(product, backend_url, status, vendor)
+        for product in _select_products(products, skus, limit)
+    ]
+    summary = await shopify_service.sync_catalog(
+        payloads,
+        batch_size=batch_size,
+        concurrency=concurrency,
+        update_images=update_images,
+        force=force,
+        dry_run=dry_run,
+    )
+    for result in summary["results"]:
+        title = result.get("title") or "Untitled"
+        if "errors" in result:
+            print(f"[ERROR] {title}: {result['errors']}")
+        elif result.get("dry_run"):
+            print(f"[DRY-RUN:{result['action'].upper()}] {title} ({result.get('sku')})")
+        else:
+            label = "UPDATED" if result["action"] == "update" else "OK"
+            print(f"[{label}] {title} -> {result.get('product', {}).get('onlineStoreUrl') or ''}")
+
+    report = {key: value for key, value in summary.items() if key != "results"}
+    print(json.dumps(report, indent=2))
+    return summary
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Publish Shopify listings from the product catalog.")
     parser.add_argument("--catalog", default="docs/commerce/product_catalog.json")
@@ -130,6 +188,10 @@ def main() -> None:
     parser.add_argument("--skip-existing", action="store_true", help="Skip SKUs already present in Shopify")
     parser.add_argument("--update-existing", action="store_true", help="Update existing products by SKU instead of skipping")
     parser.add_argument("--update-images", action="store_true", help="Add listing images when updating existing products")
+    parser.add_argument("--bulk", action="store_true", help="Diff against the store by content hash and publish changes in batches")
+    parser.add_argument("--batch-size", type=int, default=10, help="Products per batched mutation (--bulk)")
+    parser.add_argument("--concurrency", type=int, default=3, help="Batched mutations in flight (--bulk)")
+    parser.add_argument("--force", action="store_true", help="Publish every product even if its content hash is unchanged (--bulk)")
     args = parser.parse_args()
 
     _load_env_file(args.env_file)
@@ -143,6 +205,25 @@ def main() -> None:
     catalog = _load_catalog(args.catalog)
     products = catalog.get("products", [])
     vendor = catalog.get("brand")
+    if args.bulk:
+        summary = asyncio.run(
+            _publish_bulk(
+                shopify_service,
+                products,
+                args.backend_url,
+                args.status,
+                vendor,
+                args.limit,
+                args.skus,
+                args.dry_run,
+                args.update_images,
+                args.batch_size,
+                args.concurrency,
+                args.force
+            )
+        )
+        sys.exit(1 if summary["errors"] else 0)
+
     asyncio.run(
         _publish_products(
             shopify_service,
@@ -14,6 +14,7 @@ sys.path.insert(0, str(project_root))
 
 from modules.growth_engine_v1.app import SessionLocal
 from modules.growth_engine_v1.models import GrowthLedgerEntry
+from modules.growth_engine_v1.rollup import DailyRevenueRollup
 
 def backup_ledger():
     """Create a backup of the current ledger before reset."""
@@ -59,6 +60,7 @@ def reset_ledger():
         
         print(f"🗑️  Deleting {count} entries from Growth Ledger...")
         db.query(GrowthLedgerEntry).delete()
+        DailyRevenueRollup(db).clear()
         db.commit()
         
         print("✅ Growth Ledger reset complete!")
@@ -1,19 +1,31 @@
 import argparse
+import asyncio
 import json
 
-from backend.services.delivery_service import delivery_service
+from backend.services.delivery_service import DELIVERY_RETRY_WORKERS, delivery_service
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Retry queued digital deliveries.")
     parser.add_argument("--base-url", dest="base_url", default=None)
     parser.add_argument("--max-items", dest="max_items", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=DELIVERY_RETRY_WORKERS, help="Deliveries retried in parallel")
+    parser.add_argument("--requeue-dead", action="store_true", help="Move dead-lettered deliveries back to the queue first")
+    parser.add_argument("--dead-letters", action="store_true", help="List dead-lettered deliveries and exit")
     args = parser.parse_args()
 
-    result = delivery_service.retry_queued_deliveries(
+    queue = delivery_service.delivery_queue
+    if args.dead_letters:
+        print(json.dumps({"stats": queue.stats(), "dead": queue.dead_letters()}, indent=2))
+        return
+    if args.requeue_dead:
+        print(json.dumps({"requeued": queue.requeue_dead()}, indent=2))
+
+    result = asyncio.run(delivery_service.drain_queued_deliveries(
         base_url=args.base_url,
         max_items=args.max_items,
-    )
+        workers=args.workers,
+    ))
     print(json.dumps(result, indent=2))
 
 
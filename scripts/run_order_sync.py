@@ -53,7 +53,8 @@ async def main(args):
         result = await order_sync_service.sync_orders(
             limit=args.limit,
             status_filter=args.status,
-            force_reprocess=args.force_reprocess
+            force_reprocess=args.force_reprocess,
+            since=args.since
         )
 
         # Log results
@@ -65,6 +66,7 @@ async def main(args):
         logger.info(f"  Already Processed: {result.already_processed}")
         logger.info(f"  Errors: {result.errors}")
         logger.info(f"  Revenue Recorded: ${result.revenue_recorded:.2f}")
+        logger.info(f"  Pages: {result.pages_fetched}, Cursor: {result.cursor}, Elapsed: {result.elapsed_seconds:.2f}s")
         logger.info("-" * 40)
 
         # Run delivery retry if requested
@@ -84,6 +86,9 @@ async def main(args):
                 "already_processed": result.already_processed,
                 "errors": result.errors,
                 "revenue_recorded": result.revenue_recorded,
+                "pages_fetched": result.pages_fetched,
+                "cursor": result.cursor,
+                "elapsed_seconds": result.elapsed_seconds,
                 "details": result.details if args.verbose else []
             }, indent=2))
 
@@ -120,6 +125,9 @@ Examples:
     # Force reprocess all orders
     python scripts/run_order_sync.py --force-reprocess
 
+    # Backfill the last month (ignores the stored cursor)
+    python scripts/run_order_sync.py --since 2026-01-01T00:00:00 --limit 5000
+
     # Include delivery retry
     python scripts/run_order_sync.py --retry-deliveries
 
@@ -143,6 +151,13 @@ Examples:
         help="Order status filter (default: paid)"
     )
 
+    parser.add_argument(
+        "--since",
+        type=str,
+        default=None,
+        help="ISO timestamp to sync from instead of the stored cursor (backfill)"
+    )
+
     parser.add_argument(
         "--force-reprocess",
         action="store_true",